@@ -0,0 +1,940 @@
+########################################
+# Datei: ./benchmark_gewebe.py
+# Beschreibung: Benchmarks für NeuesTextVerstehen mit dem Stub-NLP aus gewebe_stub.py, damit sie ohne 'de_core_news_lg' laufen.
+# Sie messen nur Laufzeit und Speicher; dass die schnellen Wege dieselben Kanten liefern, prüfen die Tests in tests/.
+########################################
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from gewebe_last import drucke_ergebnis, lasttest
+from gewebe_server import GewebeServer
+from gewebe_stub import _LEXIKON, VEKTOR_DIM, StubGewebe, erzeuge_gewebe, gewebe_ohne_kanten, kanten_signatur, synthetischer_korpus
+from text_gewebe import MODELL_VERZEICHNIS, NeuesTextVerstehen
+from vektor_index import BruteForceIndex, IVFIndex
+from wald_kompiliert import KOMPILIERT_DATEI, lade_kompilierte_modelle
+
+
+# --- Benchmarks ---
+
+def bench_einfuegen(groessen: list[int], triaden_modus: str = 'batch', mit_ml: bool = True, messungen: int = 3) -> list[dict]:
+    """Misst die Latenz eines einzelnen fuege_ein bei wachsender Fragmentanzahl."""
+    ergebnisse = []
+    for groesse in groessen:
+        korpus = synthetischer_korpus(groesse + messungen)
+        gewebe = erzeuge_gewebe(triaden_modus, mit_ml)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in korpus[:groesse]:
+                gewebe.fuege_ein(text)
+            zeiten = []
+            for text in korpus[groesse:]:
+                start = time.perf_counter()
+                gewebe.fuege_ein(text)
+                zeiten.append(time.perf_counter() - start)
+        ergebnisse.append({'fragmente': groesse, 'modus': triaden_modus, 'einfuegen_ms': 1000 * float(np.median(zeiten))})
+        print(f"  n={groesse:>5} modus={triaden_modus:<7} fuege_ein: {ergebnisse[-1]['einfuegen_ms']:9.2f} ms")
+    return ergebnisse
+
+
+def bench_skalierung(groessen: list[int], triaden_modus: str = 'einzeln', mit_ml: bool = False) -> float:
+    """Schätzt den Exponenten k in t(fuege_ein) ~ n^k über eine log-log-Regression."""
+    ergebnisse = bench_einfuegen(groessen, triaden_modus, mit_ml)
+    n = np.array([e['fragmente'] for e in ergebnisse], dtype=float)
+    t = np.array([e['einfuegen_ms'] for e in ergebnisse])
+    exponent = float(np.polyfit(np.log(n), np.log(t), 1)[0])
+    for e in ergebnisse:
+        print(f"  n={e['fragmente']:>5} t/n^2 = {1e6 * e['einfuegen_ms'] / e['fragmente'] ** 2:8.2f} ns")
+    print(f"  Geschätzter Exponent pro Einfügen: {exponent:.2f}")
+    return exponent
+
+
+def bench_dyadisch(groessen: list[int]) -> list[dict]:
+    """Vergleicht die dyadische Bewertung eines neuen Fragments gegen alle: Schleife pro Paar vs. Matrix."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = gewebe_ohne_kanten(groesse)
+        merkmale = gewebe._merkmale_aus_text("Das Gewebe zeigt eine tiefe Resonanz, aber es ist schwer.")
+        ids = list(range(groesse))
+        start = time.perf_counter()
+        for i in ids:
+            gewebe._bewerte_dyadische_resonanz(merkmale, gewebe._merkmale[i], -1, i)
+        schleife = time.perf_counter() - start
+        start = time.perf_counter()
+        gewebe._bewerte_dyadisch_gegen_alle(merkmale, ids)
+        matrix = time.perf_counter() - start
+        ergebnisse.append({'fragmente': groesse, 'schleife_ms': 1000 * schleife, 'matrix_ms': 1000 * matrix})
+        print(f"  n={groesse:>6} Schleife: {1000 * schleife:9.2f} ms  Matrix: {1000 * matrix:8.2f} ms")
+    return ergebnisse
+
+
+def bench_abfrage(groessen: list[int], wiederholungen: int = 5) -> list[dict]:
+    """Misst die Impuls-Bewertung von finde_fragmente_mit_resonanz (ohne Kanten, also ohne Wellen) samt nlp-Aufrufen."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = gewebe_ohne_kanten(groesse)
+        nlp, aufrufe = gewebe.nlp, []
+        gewebe.nlp = lambda text: aufrufe.append(text) or nlp(text)
+        impuls = "Was ist schwer zu erfassen im Gewebe?"
+        start = time.perf_counter()
+        gewebe.finde_fragmente_mit_resonanz(impuls, ['VERSTAERKUNG', 'ERGAENZUNG'], 0.4)
+        erste = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(wiederholungen):
+            gewebe.finde_fragmente_mit_resonanz(impuls, ['VERSTAERKUNG', 'ERGAENZUNG'], 0.4)
+        wiederholt = (time.perf_counter() - start) / wiederholungen
+        ergebnisse.append({'fragmente': groesse, 'erste_ms': 1000 * erste, 'wiederholt_ms': 1000 * wiederholt, 'nlp_aufrufe': len(aufrufe)})
+        print(f"  n={groesse:>6} erste Abfrage: {1000 * erste:8.2f} ms  wiederholt: {1000 * wiederholt:8.2f} ms  "
+              f"nlp-Aufrufe gesamt: {len(aufrufe)}")
+    return ergebnisse
+
+
+def bench_wellen(groessen: list[int], pfade_bis: int = 25, mit_ml: bool = True) -> list[dict]:
+    """Vergleicht die Wellenausbreitung Welle für Welle ('pfade') mit der CSR-Engine ('sparse')."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in synthetischer_korpus(groesse):
+                gewebe.fuege_ein(text)
+        kanten = sum(len(z) for z in gewebe._resonanzen_struktur.values())
+        zeile = {'fragmente': groesse, 'kanten': kanten}
+        for engine in ['pfade', 'sparse']:
+            if engine == 'pfade' and groesse > pfade_bis:
+                continue
+            gewebe._wellen_engine = engine
+            gewebe.finde_fragmente_mit_resonanz("Aufwärmen", ['VERSTAERKUNG'], 0.4)
+            start = time.perf_counter()
+            gewebe.finde_fragmente_mit_resonanz("Was ist schwer zu erfassen im Gewebe?", ['VERSTAERKUNG', 'ERGAENZUNG'], 0.4)
+            zeile[f'{engine}_ms'] = 1000 * (time.perf_counter() - start)
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} Kanten={kanten:>8}  " + "  ".join(f"{k}: {v:9.2f}" for k, v in zeile.items() if k.endswith('_ms')))
+    return ergebnisse
+
+
+def bench_snapshot(groessen: list[int], mit_ml: bool = True) -> list[dict]:
+    """Misst save/load eines Gewebes gegen den Neuaufbau per fuege_ein."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in synthetischer_korpus(groesse):
+                gewebe.fuege_ein(text)
+        aufbau = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as pfad, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            gewebe.save(pfad)
+            speichern = time.perf_counter() - start
+            start = time.perf_counter()
+            StubGewebe.load(pfad)
+            laden = time.perf_counter() - start
+        zeile = {'fragmente': groesse, 'aufbau_ms': 1000 * aufbau, 'save_ms': 1000 * speichern, 'load_ms': 1000 * laden}
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} Aufbau: {zeile['aufbau_ms']:9.2f} ms  save: {zeile['save_ms']:8.2f} ms  "
+              f"load: {zeile['load_ms']:8.2f} ms")
+    return ergebnisse
+
+
+def bench_journal(groessen: list[int], mit_ml: bool = True) -> list[dict]:
+    """Misst den Aufpreis des Journals beim Einfügen und die Wiederherstellung aus Snapshot + Journal."""
+    ergebnisse = []
+    for groesse in groessen:
+        korpus = synthetischer_korpus(groesse)
+        zeile = {'fragmente': groesse}
+        with tempfile.TemporaryDirectory() as pfad, contextlib.redirect_stdout(io.StringIO()):
+            for modus in ['ohne', 'journal']:
+                gewebe = erzeuge_gewebe('batch', mit_ml)
+                if modus == 'journal':
+                    gewebe.oeffne_journal(pfad, kompaktieren_ab=max(1, groesse // 2))
+                start = time.perf_counter()
+                for text in korpus:
+                    gewebe.fuege_ein(text)
+                zeile[f'{modus}_ms'] = 1000 * (time.perf_counter() - start)
+            gewebe.schliesse_journal()
+            wiederhergestellt = erzeuge_gewebe('batch', mit_ml)
+            start = time.perf_counter()
+            wiederhergestellt.oeffne_journal(pfad)
+            zeile['wiederherstellung_ms'] = 1000 * (time.perf_counter() - start)
+            wiederhergestellt.schliesse_journal()
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} Einfügen ohne Journal: {zeile['ohne_ms']:9.2f} ms  mit Journal: {zeile['journal_ms']:9.2f} ms  "
+              f"Wiederherstellung: {zeile['wiederherstellung_ms']:8.2f} ms")
+    return ergebnisse
+
+
+def bench_bulk(groessen: list[int], mit_ml: bool = True, schleife_bis: int = 200) -> list[dict]:
+    """Vergleicht fuege_ein in einer Schleife mit fuege_ein_viele ('sequentiell' und 'batch')."""
+    ergebnisse = []
+    for groesse in groessen:
+        korpus = synthetischer_korpus(groesse)
+        zeile = {'fragmente': groesse}
+        for variante in ['schleife', 'sequentiell', 'batch']:
+            if variante != 'batch' and groesse > schleife_bis:
+                continue
+            gewebe = erzeuge_gewebe('batch', mit_ml)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if variante == 'schleife':
+                    for text in korpus:
+                        gewebe.fuege_ein(text)
+                else:
+                    gewebe.fuege_ein_viele(korpus, modus=variante)
+            zeile[f'{variante}_ms'] = 1000 * (time.perf_counter() - start)
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} " + "  ".join(f"{k}: {v:10.2f}" for k, v in zeile.items() if k != 'fragmente'))
+    return ergebnisse
+
+
+def bench_loeschen(groessen: list[int], mit_ml: bool = True, anzahl: int = 20) -> list[dict]:
+    """Misst loesche_fragment (über den Rückwärtsindex) und kompaktiere_ids bei vielen Tombstones."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe.fuege_ein_viele(synthetischer_korpus(groesse), modus='batch')
+            kanten = sum(len(z) for z in gewebe._resonanzen_struktur.values())
+            opfer = random.Random(7).sample(range(groesse), min(anzahl, groesse))
+            start = time.perf_counter()
+            for index in opfer:
+                gewebe.loesche_fragment(index)
+            loeschen = (time.perf_counter() - start) / len(opfer)
+            for index in range(0, groesse, 2):
+                if gewebe._fragmente[index] is not None:
+                    gewebe.loesche_fragment(index)
+            start = time.perf_counter()
+            gewebe.kompaktiere_ids()
+            kompaktieren = time.perf_counter() - start
+        zeile = {'fragmente': groesse, 'kanten': kanten, 'loeschen_ms': 1000 * loeschen, 'kompaktieren_ms': 1000 * kompaktieren}
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} Kanten={kanten:>8}  loesche_fragment: {zeile['loeschen_ms']:8.3f} ms  "
+              f"kompaktiere_ids (50% Tombstones): {zeile['kompaktieren_ms']:8.2f} ms")
+    return ergebnisse
+
+
+def bench_zustand(groessen: list[int], mit_ml: bool = True, wiederholungen: int = 20) -> list[dict]:
+    """Misst den Zustandsbericht (laufende Statistik) gegen eine vollständige Neuberechnung."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe.fuege_ein_viele(synthetischer_korpus(groesse), modus='batch')
+            for index in range(0, groesse, 5):
+                gewebe.loesche_fragment(index)
+        start = time.perf_counter()
+        for _ in range(wiederholungen):
+            gewebe._analysiere_gewebe_zustand(gewebe._resonanzen_struktur)
+        laufend = (time.perf_counter() - start) / wiederholungen
+        start = time.perf_counter()
+        for _ in range(wiederholungen):
+            gewebe._neue_statistik(vollstaendig=True)
+        voll = (time.perf_counter() - start) / wiederholungen
+        zeile = {'fragmente': groesse, 'kanten': gewebe._statistik.kanten, 'bericht_ms': 1000 * laufend, 'neuberechnung_ms': 1000 * voll}
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} Kanten={zeile['kanten']:>8}  Bericht: {zeile['bericht_ms']:8.3f} ms  "
+              f"Neuberechnung: {zeile['neuberechnung_ms']:8.2f} ms")
+    return ergebnisse
+
+
+def bench_pruning(groessen: list[int], top_k: int = 16, mit_ml: bool = True, einfuegungen: int = 5) -> list[dict]:
+    """Einfüge-Latenz mit allen Paaren ('exakt') gegen Top-k-Kandidaten, dazu Anteil übersprungener Paare und gleicher Kanten."""
+    ergebnisse = []
+    for groesse in groessen:
+        korpus = synthetischer_korpus(groesse + einfuegungen)
+        zeile = {'fragmente': groesse, 'top_k': top_k}
+        signaturen = {}
+        for name, k in [('exakt', None), ('top_k', top_k)]:
+            gewebe = erzeuge_gewebe('batch', mit_ml)
+            with contextlib.redirect_stdout(io.StringIO()):
+                gewebe.fuege_ein_viele(korpus[:groesse], modus='batch')
+                gewebe.setze_triaden_top_k(k)
+                gewebe._triaden_zaehler = {'paare': 0, 'ml_paare': 0, 'ml_geprueft': 0}
+                start = time.perf_counter()
+                for text in korpus[groesse:]:
+                    gewebe.fuege_ein(text)
+            zeile[f'{name}_ms'] = 1000 * (time.perf_counter() - start) / einfuegungen
+            signaturen[name] = kanten_signatur(gewebe)
+        zeile['anteil_uebersprungen'] = gewebe.triaden_statistik()['anteil_uebersprungen']
+        zeile['anteil_gleiche_kanten'] = sum(1 for kante, wert in signaturen['exakt'].items()
+                                             if signaturen['top_k'].get(kante) == wert) / max(1, len(signaturen['exakt']))
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} exakt: {zeile['exakt_ms']:9.2f} ms  top_{top_k}: {zeile['top_k_ms']:9.2f} ms  "
+              f"übersprungen: {zeile['anteil_uebersprungen']:.1%}  gleiche Kanten: {zeile['anteil_gleiche_kanten']:.1%}")
+    return ergebnisse
+
+
+def bench_index(groessen: list[int], k: int = 10, anfragen: int = 50, nprobes: tuple = (1, 2, 4, 8, 16)) -> list[dict]:
+    """Recall@k und Latenz des IVF-Index gegen die exakte Suche, dazu finde_fragmente_mit_resonanz mit und ohne Index."""
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = gewebe_ohne_kanten(groesse)
+        ids = np.flatnonzero(gewebe._merkmale.hat_vektor[:groesse])
+        exakt, ivf = BruteForceIndex(), IVFIndex()
+        start = time.perf_counter()
+        ivf.hinzufuegen_viele(ids, gewebe._merkmale.vektoren[ids])
+        aufbau = time.perf_counter() - start
+        exakt.hinzufuegen_viele(ids, gewebe._merkmale.vektoren[ids])
+        impulse = [gewebe._merkmale_aus_text(text).vektor for text in synthetischer_korpus(anfragen, seed=99)]
+
+        def messe(suche):
+            treffer, start = [], time.perf_counter()
+            for vektor in impulse:
+                treffer.append(suche(vektor))
+            return treffer, 1000 * (time.perf_counter() - start) / len(impulse)
+
+        referenz, exakt_ms = messe(lambda v: exakt.suche(v, k))
+        print(f"  n={groesse:>6} exakt: {exakt_ms:7.3f} ms/Anfrage  IVF-Aufbau: {1000 * aufbau:8.1f} ms ({len(ivf._listen)} Listen)")
+        for nprobe in nprobes:
+            gefunden, ivf_ms = messe(lambda v: ivf.suche(v, k, nprobe=nprobe))
+            # Gleichstände zählen als Treffer: gefunden ist jede Id, die mindestens so ähnlich ist wie der k-te exakte Treffer
+            recall = np.mean([np.sum(sim >= ref_sim[-1] - 1e-6) / len(ref_ids) if len(ref_ids) else 1.0
+                              for (_, sim), (ref_ids, ref_sim) in zip(gefunden, referenz)])
+            ergebnisse.append({'fragmente': groesse, 'nprobe': nprobe, 'recall': float(recall), 'ivf_ms': ivf_ms, 'exakt_ms': exakt_ms})
+            print(f"           nprobe={nprobe:>3}  recall@{k}: {recall:6.3f}  {ivf_ms:7.3f} ms/Anfrage")
+
+        impuls = "Was ist schwer zu erfassen im Gewebe?"
+        for name, top_k in [('alle Fragmente', None), (f'Index top_{10 * k}', 10 * k)]:
+            gewebe.setze_vektor_index(ivf if top_k else None, top_k)
+            gewebe.finde_fragmente_mit_resonanz(impuls, ['VERSTAERKUNG'], 0.4)
+            start = time.perf_counter()
+            for _ in range(5):
+                gewebe.finde_fragmente_mit_resonanz(impuls, ['VERSTAERKUNG', 'ERGAENZUNG'], 0.4)
+            print(f"           finde_fragmente_mit_resonanz ({name}): {1000 * (time.perf_counter() - start) / 5:8.2f} ms")
+    return ergebnisse
+
+
+_JOBLIB_MODELLE = [os.path.join(MODELL_VERZEICHNIS, name) for name in
+                   ('triadic_art_classifier.joblib', 'triadic_staerke_regressor.joblib', 'triadic_label_encoder.joblib')]
+
+
+def _frischer_prozess(code: str) -> tuple[float, str]:
+    """Führt `code` in einem frischen Interpreter außerhalb des Modulverzeichnisses aus; Laufzeit in ms und stdout."""
+    start = time.perf_counter()
+    ausgabe = subprocess.run([sys.executable, '-W', 'ignore', '-c', f"import sys; sys.path.insert(0, {MODELL_VERZEICHNIS!r})\n{code}"],
+                             check=True, capture_output=True, text=True, cwd=tempfile.gettempdir()).stdout
+    return 1000 * (time.perf_counter() - start), ausgabe
+
+
+def _startzeit(code: str, wiederholungen: int = 3) -> float:
+    """Beste Laufzeit eines frischen Interpreters für `code` in ms (Import + Laden der Modelle)."""
+    return min(_frischer_prozess(code)[0] for _ in range(wiederholungen))
+
+
+def bench_modelle(batch_groessen: list[int], wiederholungen: int = 20) -> list[dict]:
+    """Kompilierte Wälder gegen sklearn: Vorhersage-Latenz je Batch und Startzeit eines frischen Prozesses."""
+    import warnings
+    import joblib
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        art, staerke, _ = (joblib.load(p) for p in _JOBLIB_MODELLE)
+    k_art, k_staerke, _ = lade_kompilierte_modelle(os.path.join(MODELL_VERZEICHNIS, KOMPILIERT_DATEI))
+    X = np.random.default_rng(0).normal(0, 0.5, size=(max(batch_groessen), 3 * VEKTOR_DIM)).astype(np.float32)
+
+    ergebnisse = []
+    for groesse in batch_groessen:
+        zeiten = {}
+        for name, (a, s) in [('sklearn', (art, staerke)), ('kompiliert', (k_art, k_staerke))]:
+            start = time.perf_counter()
+            for _ in range(wiederholungen):
+                a.predict(X[:groesse])
+                s.predict(X[:groesse])
+            zeiten[name] = 1000 * (time.perf_counter() - start) / wiederholungen
+        ergebnisse.append({'batch': groesse, **zeiten})
+        print(f"  Batch {groesse:>5}: sklearn {zeiten['sklearn']:8.3f} ms  kompiliert {zeiten['kompiliert']:8.3f} ms  "
+              f"(x{zeiten['sklearn'] / zeiten['kompiliert']:.1f})")
+
+    start_joblib = _startzeit(f"import joblib; [joblib.load(p) for p in {_JOBLIB_MODELLE!r}]")
+    start_npz = _startzeit(f"from wald_kompiliert import lade_kompilierte_modelle; lade_kompilierte_modelle({os.path.join(MODELL_VERZEICHNIS, KOMPILIERT_DATEI)!r})")
+    start_leer = _startzeit("import numpy")
+    print(f"  Start (frischer Prozess): joblib+sklearn {start_joblib:7.1f} ms  kompiliert {start_npz:7.1f} ms  (nur numpy: {start_leer:7.1f} ms)")
+    return ergebnisse
+
+
+_START_CODE = """
+import contextlib, io, json, resource, time
+start = time.perf_counter()
+from text_gewebe import NeuesTextVerstehen
+importiert = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    gewebe = NeuesTextVerstehen(laden={laden!r}, nlp_profil={profil!r})
+    konstruiert = time.perf_counter()
+    gewebe.fuege_ein("Das Gefühl, das Muster im Ganzen zu erfassen, ist schwer.")
+    eingefuegt = time.perf_counter()
+print(json.dumps({{'import_ms': 1000 * (importiert - start), 'konstruktor_ms': 1000 * (konstruiert - importiert),
+                  'erstes_einfuegen_ms': 1000 * (eingefuegt - konstruiert), 'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def bench_start(wiederholungen: int = 3) -> list[dict]:
+    """Startzeit eines frischen Prozesses je Lademodus und NLP-Profil: Import, Konstruktor, erstes fuege_ein, Spitzen-RSS.
+
+    Läuft mit dem echten spaCy-Modell, falls installiert (sonst mit dessen leerem Fallback), und außerhalb des
+    Modulverzeichnisses, sodass auch die absoluten Modellpfade geprüft werden.
+    """
+    ergebnisse = []
+    for laden, profil in [('sofort', 'voll'), ('sofort', 'schlank'), ('lazy', 'schlank'), ('hintergrund', 'schlank')]:
+        laeufe = [json.loads(_frischer_prozess(_START_CODE.format(laden=laden, profil=profil))[1].strip().splitlines()[-1])
+                  for _ in range(wiederholungen)]
+        bester = min(laeufe, key=lambda lauf: lauf['konstruktor_ms'] + lauf['erstes_einfuegen_ms'])
+        ergebnisse.append({'laden': laden, 'profil': profil, **bester})
+        print(f"  {laden:>11}/{profil:<8} Import {bester['import_ms']:7.1f} ms  Konstruktor {bester['konstruktor_ms']:7.1f} ms  "
+              f"erstes fuege_ein {bester['erstes_einfuegen_ms']:7.1f} ms  RSS {bester['max_rss_mb']:6.0f} MB")
+    return ergebnisse
+
+
+def _nlp_mit_vektoren(woerter: list[str], seed: int = 0):
+    """Leeres deutsches spaCy mit zufälligen Wortvektoren: hat vocab.vectors, meta und pipe(n_process) wie das echte Modell."""
+    import spacy
+    nlp = spacy.blank('de')
+    rng = np.random.default_rng(seed)
+    for wort in woerter:
+        nlp.vocab.set_vector(wort, rng.normal(size=VEKTOR_DIM).astype(np.float32))
+    return nlp
+
+
+def bench_trainings_cache(anzahl: int = 2000, neue: int = 100, n_process: int = 2) -> dict:
+    """Feature-Erstellung im Trainer: ohne Cache, erster Lauf mit Cache und erneuter Lauf nach `neue` Annotationen."""
+    from model_trainer import create_features_and_labels
+    from vektor_cache import VektorCache, modell_kennung
+    nlp = _nlp_mit_vektoren([w.lower() for woerter in _LEXIKON.values() for w in woerter])
+    korpus = synthetischer_korpus(anzahl // 2, seed=3)
+    korpus_neu = [f"{text} Nummer {i}" for i, text in enumerate(synthetischer_korpus(neue, seed=11))]
+    rng = random.Random(5)
+    annotation = lambda a: {'fragment_a': a, 'fragment_b': rng.choice(korpus), 'fragment_c': rng.choice(korpus),
+                            'label': {'ergebnis_art': 'ERGAENZUNG', 'ergebnis_staerke': 0.5}}
+    daten = [annotation(rng.choice(korpus)) for _ in range(anzahl)]
+    daten_neu = daten + [annotation(text) for text in korpus_neu]
+
+    # Bisheriger Weg: drei nlp-Aufrufe je Tripel
+    start = time.perf_counter()
+    for probe in daten:
+        np.concatenate([nlp(probe[k]).vector for k in ('fragment_a', 'fragment_b', 'fragment_c')])
+    ergebnis = {'je Tripel (bisher)': 1000 * (time.perf_counter() - start)}
+    print(f"  {'je Tripel (bisher)':<32} {len(daten):>6} Tripel  {ergebnis['je Tripel (bisher)']:8.1f} ms")
+    with tempfile.TemporaryDirectory() as verzeichnis:
+        for name, kwargs, d in [('ohne Cache', {}, daten), (f'ohne Cache, n_process={n_process}', {'n_process': n_process}, daten),
+                                ('Cache, erster Lauf', {'cache': True}, daten), (f'Cache, +{neue} Annotationen', {'cache': True}, daten_neu)]:
+            if kwargs.pop('cache', False):
+                kwargs['cache'] = VektorCache(verzeichnis, modell_kennung(nlp), VEKTOR_DIM)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()) as ausgabe:
+                create_features_and_labels(d, nlp, **kwargs)
+            ergebnis[name] = 1000 * (time.perf_counter() - start)
+            eingebettet = [zeile.strip() for zeile in ausgabe.getvalue().splitlines() if 'eindeutige' in zeile]
+            print(f"  {name:<32} {len(d):>6} Tripel  {ergebnis[name]:8.1f} ms  ({eingebettet[0]})")
+    return ergebnis
+
+
+def bench_inkrementell(anzahl: int = 1000, neue: int = 100) -> dict:
+    """Volles Neutraining gegen inkrementelles Training nach `neue` Annotationen, dazu Hot-Reload in einem laufenden Gewebe."""
+    import model_trainer
+    nlp = _nlp_mit_vektoren([w.lower() for woerter in _LEXIKON.values() for w in woerter])
+    korpus = synthetischer_korpus(anzahl, seed=3)
+    rng = random.Random(7)
+    arten = ['ERGAENZUNG', 'KONTRAST', 'ENTWICKLUNG', 'EMOTIONALE_SPANNUNG']
+    zeile = lambda: json.dumps({'fragment_a': rng.choice(korpus), 'fragment_b': rng.choice(korpus), 'fragment_c': rng.choice(korpus),
+                                'label': {'ergebnis_art': rng.choice(arten), 'ergebnis_staerke': round(rng.random(), 2)}}) + '\n'
+    ergebnis = {}
+    with tempfile.TemporaryDirectory() as verzeichnis:
+        daten = os.path.join(verzeichnis, 'training_data.jsonl')
+        with open(daten, 'w', encoding='utf-8') as f:
+            f.writelines(zeile() for _ in range(anzahl))
+        trainiere = lambda funktion: funktion(cache_dir=os.path.join(verzeichnis, 'cache'), data_file=daten, model_dir=verzeichnis, nlp=nlp)
+
+        def messe(name, funktion):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                trainiere(funktion)
+            ergebnis[name] = 1000 * (time.perf_counter() - start)
+            print(f"  {name:<34} {ergebnis[name]:9.1f} ms")
+
+        messe(f'volles Training ({anzahl})', model_trainer.train)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe = StubGewebe(modell_verzeichnis=verzeichnis)
+        gewebe.beobachte_modelle(0.0)
+        baeume_vorher = len(gewebe._art_classifier.wurzeln)
+
+        with open(daten, 'a', encoding='utf-8') as f:
+            f.writelines(zeile() for _ in range(neue))
+        messe(f'inkrementell (+{neue})', model_trainer.train_incremental)
+        messe('inkrementell (nichts Neues)', model_trainer.train_incremental)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe.fuege_ein("Das Gewebe wächst weiter.")
+        print(f"  Hot-Reload im laufenden Gewebe: {baeume_vorher} -> {len(gewebe._art_classifier.wurzeln)} Bäume im Klassifikator")
+        messe(f'volles Training ({anzahl + neue})', model_trainer.train)
+    return ergebnis
+
+
+def bench_pool(groessen: list[int], arbeiter: list[int], top_k: int = 16, durchlaeufe: int = 3) -> list[dict]:
+    """Ein triadischer Durchlauf (neues Fragment gegen das ganze Gewebe) seriell gegen den TriadenPool mit n Workern."""
+    print(f"  {multiprocessing.cpu_count()} Kerne verfügbar; top_k={top_k}")
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = gewebe_ohne_kanten(groesse + 1)
+        gewebe.setze_triaden_top_k(top_k)
+        aktive = list(range(groesse))
+
+        def durchlauf():
+            start = time.perf_counter()
+            gewebe._aktualisiere_triaden_gebuendelt(groesse, aktive)
+            return time.perf_counter() - start
+
+        durchlauf()  # erster Durchlauf legt die Kanten an; danach werden sie nur überschrieben
+        seriell = min(durchlauf() for _ in range(durchlaeufe))
+        zeile = {'fragmente': groesse, 'seriell_ms': 1000 * seriell}
+        print(f"  n={groesse:>6} seriell: {1000 * seriell:9.1f} ms")
+        for anzahl in arbeiter:
+            gewebe.setze_triaden_pool(anzahl, min_fragmente=0)
+            start_s = durchlauf()  # inklusive Start der Worker und Kopie der Vektoren in den Shared Memory
+            dauer = min(durchlauf() for _ in range(durchlaeufe))
+            gewebe.setze_triaden_pool(0)
+            zeile[f'pool_{anzahl}_ms'] = 1000 * dauer
+            print(f"  n={groesse:>6} {anzahl:>2} Worker: {1000 * dauer:9.1f} ms  Speedup: {seriell / dauer:5.2f}x  "
+                  f"(erster Durchlauf {start_s:.2f} s)")
+        ergebnisse.append(zeile)
+    return ergebnisse
+
+
+def bench_nebenlaeufig(groesse: int = 300, leser: list[int] = (1, 2, 4), dauer: float = 3.0, mit_ml: bool = True) -> list[dict]:
+    """Durchsatz von Abfragen aus mehreren Threads, rein lesend und während ein Schreiber laufend Fragmente einfügt."""
+    korpus = synthetischer_korpus(groesse + 2000)
+    impulse = synthetischer_korpus(64, seed=7)
+    gewebe = erzeuge_gewebe('batch', mit_ml)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gewebe.fuege_ein_viele(korpus[:groesse], modus='batch')
+    gewebe.setze_triaden_top_k(16)  # damit der Schreiber während einer Messung mehrere Versionen veröffentlicht
+    neue = iter(korpus[groesse:])  # über alle Läufe hinweg, damit kein Text zweimal eingefügt wird
+    print(f"  {groesse} Fragmente, {len(gewebe.ansicht().adjazenz.ziele)} Kanten, {multiprocessing.cpu_count()} Kerne")
+    ergebnisse = []
+
+    for anzahl in leser:
+        gewebe.reagiere_viele(impulse, arbeiter=anzahl)  # Aufwärmen (Impuls-Cache, Thread-Pool)
+        start = time.perf_counter()
+        gewebe.reagiere_viele(impulse * 4, arbeiter=anzahl)
+        lesend = 4 * len(impulse) / (time.perf_counter() - start)
+
+        for warten in [True, False]:
+            stopp, fehler, reaktionen = threading.Event(), [], []
+            eingefuegt = [0]
+
+            def schreiber():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for text in neue:
+                        gewebe.fuege_ein(text)
+                        eingefuegt[0] += 1
+                        if stopp.is_set():
+                            break
+
+            def leser_thread(nummer: int):
+                i = nummer
+                while not stopp.is_set():
+                    try:
+                        impuls = impulse[i % len(impulse)]
+                        reaktionen.append((impuls, gewebe.reagiere(impuls, gewebe.ansicht(warten))))
+                    except Exception as e:
+                        fehler.append(e)
+                    i += anzahl
+
+            threads = [threading.Thread(target=schreiber)] + [threading.Thread(target=leser_thread, args=(n,)) for n in range(anzahl)]
+            for thread in threads:
+                thread.start()
+            time.sleep(dauer)
+            stopp.set()
+            for thread in threads:
+                thread.join()
+            zeile = {'leser': anzahl, 'warten': warten, 'lesend_qps': lesend, 'gemischt_qps': len(reaktionen) / dauer,
+                     'einfuegen_pro_s': eingefuegt[0] / dauer,
+                     'versionen': len({r.ansicht.version for _, r in reaktionen}), 'fehler': len(fehler)}
+            ergebnisse.append(zeile)
+            print(f"  {anzahl} Leser  nur lesend: {lesend:7.1f} Abfragen/s  mit Schreiber (warten={warten!s:<5}): "
+                  f"{zeile['gemischt_qps']:7.1f} Abfragen/s, {zeile['einfuegen_pro_s']:6.1f} Einfügungen/s, "
+                  f"{zeile['versionen']} Versionen, Fehler: {len(fehler)}")
+    return ergebnisse
+
+
+def bench_server(groesse: int = 300, verbindungen: int = 32, dauer: float = 5.0, mit_ml: bool = True) -> list[dict]:
+    """Lasttest gegen einen GewebeServer im selben Prozess, ohne Mikro-Batching (Fenster 0, Stapel 1) und mit."""
+    korpus = synthetischer_korpus(groesse + 4000)
+    impulse = synthetischer_korpus(64, seed=7)
+    neue = iter(korpus[groesse:])
+    ergebnisse = []
+    for titel, fenster, max_batch in [('ohne Batching', 0.0, 1), ('Fenster 5 ms', 0.005, 64)]:
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe.fuege_ein_viele(korpus[:groesse], modus='batch')
+        gewebe.setze_triaden_top_k(16)
+
+        async def lauf():
+            server = GewebeServer(gewebe, port=0, fenster=fenster, max_batch=max_batch, max_warteschlange=4 * verbindungen)
+            await server.starte()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ergebnis = await lasttest(server.host, server.port, impulse, neue, verbindungen, dauer)
+                ergebnis['stapel'] = {b.name: b.auftraege / max(1, b.stapel) for b in (server.einfuegen, server.impulse)}
+                return ergebnis
+            finally:
+                await server.stoppe()
+
+        ergebnis = asyncio.run(lauf())
+        ergebnis['modus'] = titel
+        ergebnisse.append(ergebnis)
+        drucke_ergebnis(ergebnis, f"{titel:<14} ")
+        print("    mittlere Stapelgröße: " + ", ".join(f"{name} {wert:.1f}" for name, wert in ergebnis['stapel'].items()))
+    return ergebnisse
+
+
+def _kanten_bytes(gewebe: NeuesTextVerstehen) -> int:
+    """Bytes, die nur an den Kanten hängen: wie viel tracemalloc freigibt, wenn die Kantenstruktur (bzw. früher auch der Rückwärtsindex) wegfällt."""
+    gewebe._adjazenz, gewebe._adjazenz_version, gewebe._ansicht = None, -1, None
+    gc.collect()
+    vorher = tracemalloc.get_traced_memory()[0]
+    for name in ('_resonanzen_struktur', '_eingehende'):
+        if hasattr(gewebe, name):
+            setattr(gewebe, name, None)
+    gc.collect()
+    return vorher - tracemalloc.get_traced_memory()[0]
+
+
+def bench_speicher(groessen: list[int], mit_ml: bool = True, zielgroesse: int = 10000) -> list[dict]:
+    """Speicher der Kanten je Gewebegröße (tracemalloc) und hochgerechnet auf `zielgroesse` Fragmente bei gleicher Dichte."""
+    ergebnisse = []
+    for anzahl in groessen:
+        korpus = synthetischer_korpus(anzahl)
+        tracemalloc.start()
+        try:
+            gewebe = erzeuge_gewebe('batch', mit_ml)
+            with contextlib.redirect_stdout(io.StringIO()):
+                gewebe.fuege_ein_viele(korpus, modus='batch')
+            kontexte = [len(res.kontext) for ziele in gewebe._resonanzen_struktur.values() for res in ziele.values()]
+            kanten = len(kontexte)
+            belegt = _kanten_bytes(gewebe)
+        finally:
+            tracemalloc.stop()
+        pro_kante = belegt / max(1, kanten)
+        dichte = kanten / max(1, anzahl * (anzahl - 1))
+        hochgerechnet = pro_kante * dichte * zielgroesse * (zielgroesse - 1)
+        ergebnisse.append({'fragmente': anzahl, 'kanten': kanten, 'bytes': belegt, 'bytes_pro_kante': pro_kante,
+                           'kontext_mittel': float(np.mean(kontexte)) if kontexte else 0.0,
+                           'kontext_max': max(kontexte, default=0), f'hochgerechnet_{zielgroesse}_gb': hochgerechnet / 1e9})
+        print(f"  n={anzahl:<6} {kanten:>9} Kanten  {belegt / 1e6:8.1f} MB  {pro_kante:7.1f} Bytes/Kante  "
+              f"Kontext Ø {ergebnisse[-1]['kontext_mittel']:6.1f} / max {ergebnisse[-1]['kontext_max']:5} Zeichen  "
+              f"-> {zielgroesse} Fragmente: {hochgerechnet / 1e9:6.2f} GB")
+    return ergebnisse
+
+
+def bench_verfeinerung(groessen: list[int], mit_ml: bool = True, einfuegungen: int = 10, budget_paare: int = 20000) -> list[dict]:
+    """Latenz von fuege_ein sofort gegen latenzbegrenzt (setze_verfeinerung) und die Zeit, bis der Rückstand abgearbeitet ist.
+
+    Die Verfeinerung läuft hier ohne Hintergrund-Thread, damit die Einfügezeiten nicht mit einem Schritt konkurrieren;
+    abgearbeitet wird danach in Schritten von `budget_paare` Paaren.
+    """
+    ergebnisse = []
+    for groesse in groessen:
+        korpus = synthetischer_korpus(groesse + einfuegungen)
+        zeilen = {}
+        for modus in ('sofort', 'aufgeschoben'):
+            gewebe = erzeuge_gewebe('batch', mit_ml)
+            gewebe.fuege_ein_viele(korpus[:groesse], modus='batch')
+            if modus == 'aufgeschoben':
+                gewebe.setze_verfeinerung(hintergrund=False)
+            zeiten = []
+            for text in korpus[groesse:]:
+                start = time.perf_counter()
+                gewebe.fuege_ein(text)
+                zeiten.append(time.perf_counter() - start)
+            rueckstand = gewebe.verfeinerung_status()
+            start = time.perf_counter()
+            schritte = 0
+            while gewebe.verfeinere(budget_paare=budget_paare):
+                schritte += 1
+            abarbeiten = time.perf_counter() - start
+            zeilen[modus] = {'einfuegen_ms': 1000 * float(np.median(zeiten)), 'max_ms': 1000 * max(zeiten),
+                             'rueckstand_paare': rueckstand['ausstehende_paare'], 'abarbeiten_ms': 1000 * abarbeiten,
+                             'schritte': schritte + 1 if modus == 'aufgeschoben' else 0}
+        ergebnisse.append({'fragmente': groesse, **{f'{modus}_{k}': v for modus, werte in zeilen.items() for k, v in werte.items()}})
+        s, a = zeilen['sofort'], zeilen['aufgeschoben']
+        print(f"  n={groesse:>5} fuege_ein sofort: {s['einfuegen_ms']:9.2f} ms (max {s['max_ms']:9.2f})  "
+              f"aufgeschoben: {a['einfuegen_ms']:8.2f} ms (max {a['max_ms']:8.2f})  "
+              f"Rückstand {a['rueckstand_paare']:>9} Paare, abgearbeitet in {a['abarbeiten_ms']:9.1f} ms "
+              f"({a['schritte']} Schritte)")
+    return ergebnisse
+
+
+def bench_impulse(groessen: list[int], mit_ml: bool = True, batch_groessen: tuple = (1, 8, 32), anzahl: int = 64) -> list[dict]:
+    """Durchsatz von `anzahl` Impulsen einzeln (reagiere) gegen gebündelt (reagiere_viele) je Batch-Größe.
+
+    Die Impulse sind vorher geparst (Impuls-Cache), gemessen werden Bewertung und Wellen. Behalten werden nur
+    die Treffer, denn in einem dichten
+    Gewebe belegen die Wellen eines Impulses Speicher in der Größenordnung aller Kanten (bei 1.000 Fragmenten
+    rund 100 MB); ein Batch hält sie für alle seine Impulse zugleich.
+    """
+    arten = ['VERSTAERKUNG', 'ERGAENZUNG', 'KONTRAST']
+    ergebnisse = []
+    for groesse in groessen:
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe.fuege_ein_viele(synthetischer_korpus(groesse), modus='batch')
+        impulse = synthetischer_korpus(anzahl, seed=7)
+        ansicht = gewebe.ansicht()
+        gewebe._impuls_merkmale_viele(impulse)
+        start = time.perf_counter()
+        for impuls in impulse:
+            gewebe.reagiere(impuls, ansicht).treffer(arten, 0.3)
+        zeile = {'fragmente': groesse, 'kanten': len(ansicht.adjazenz.ziele), 'einzeln_pro_s': anzahl / (time.perf_counter() - start)}
+        for batch in batch_groessen:
+            start = time.perf_counter()
+            for k in range(0, anzahl, batch):
+                for reaktion in gewebe.reagiere_viele(impulse[k:k + batch]):
+                    reaktion.treffer(arten, 0.3)
+            zeile[f'batch_{batch}_pro_s'] = anzahl / (time.perf_counter() - start)
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} ({zeile['kanten']:>8} Kanten) einzeln: {zeile['einzeln_pro_s']:8.1f} Impulse/s  " +
+              "  ".join(f"Batch {batch}: {zeile[f'batch_{batch}_pro_s']:8.1f}/s" for batch in batch_groessen))
+    return ergebnisse
+
+
+def bench_verschmelzen(groessen: list[int], mit_ml: bool = True, anzahl: int = 10) -> list[dict]:
+    """Verschmelzen von `anzahl` disjunkten Paaren: neu parsen gegen abgeleitete Merkmale, einzeln und mit verschmelze_viele.
+
+    Verglichen wird, wie nah die abgeleiteten Fragmente am neu geparsten Ergebnis liegen: Kosinus der Vektoren,
+    Jaccard-Übereinstimmung der Nachbarn (ausgehende Kanten) und mittlere Abweichung der Stärke auf den gemeinsamen
+    Kanten.
+    """
+    ergebnisse = []
+    for groesse in groessen:
+        korpus = synthetischer_korpus(groesse)
+        ids = random.Random(11).sample(range(groesse), 2 * min(anzahl, groesse // 2))
+        paare = list(zip(ids[::2], ids[1::2]))
+        gewebe = {}
+        zeile = {'fragmente': groesse, 'paare': len(paare)}
+        for variante in ('neu_parsen', 'merkmale', 'viele'):
+            g = gewebe[variante] = erzeuge_gewebe('batch', mit_ml)
+            with contextlib.redirect_stdout(io.StringIO()):
+                g.fuege_ein_viele(korpus, modus='batch')
+            start = time.perf_counter()
+            if variante == 'viele':
+                g.verschmelze_viele(paare)
+            else:
+                for index1, index2 in paare:
+                    g.verschmelze_fragmente(index1, index2, modus=variante)
+            zeile[f'{variante}_ms'] = 1000 * (time.perf_counter() - start) / len(paare)
+        referenz, abgeleitet = gewebe['neu_parsen'], gewebe['merkmale']
+        neue = range(groesse, groesse + len(paare))
+        kosinus = [abgeleitet._merkmale[i].similarity(referenz._merkmale[i]) for i in neue]
+        jaccard, abweichung = [], []
+        for i in neue:
+            a, b = referenz._resonanzen_struktur[i], abgeleitet._resonanzen_struktur[i]
+            gemeinsam = set(a) & set(b)
+            jaccard.append(len(gemeinsam) / len(set(a) | set(b)) if a or b else 1.0)
+            abweichung.extend(abs(a[j].staerke - b[j].staerke) for j in gemeinsam)
+        zeile.update(kosinus_min=min(kosinus), nachbarn_jaccard=float(np.mean(jaccard)),
+                     staerke_abweichung=float(np.mean(abweichung)) if abweichung else 0.0)
+        ergebnisse.append(zeile)
+        print(f"  n={groesse:>5} neu parsen: {zeile['neu_parsen_ms']:9.2f} ms  Merkmale: {zeile['merkmale_ms']:8.2f} ms  "
+              f"verschmelze_viele: {zeile['viele_ms']:8.2f} ms je Paar  Kosinus min {zeile['kosinus_min']:.4f}  "
+              f"Nachbarn (Jaccard) {zeile['nachbarn_jaccard']:.3f}  Stärke ±{zeile['staerke_abweichung']:.3f}")
+    return ergebnisse
+
+
+SUITE_IMPULSE = ["Wie fühlt sich das Gewebe an?", "Was ist schwer zu erfassen?", "Die Welle ist tief und klar.",
+                 "Der Konflikt stört die Harmonie.", "Freude wächst im offenen Muster."]
+
+
+def _messe_operation(aufruf, wiederholungen: int) -> dict:
+    """Median/Minimum der Laufzeit über `wiederholungen` Aufrufe, dazu die Spitze zusätzlich belegten Speichers (tracemalloc).
+
+    Die Zeiten werden ohne tracemalloc gemessen (es bremst Python-Code deutlich); der Speicher in einem
+    weiteren, eigenen Aufruf. `aufruf` bekommt die laufende Nummer und muss bei Mutationen jedes Mal neue
+    Eingaben wählen.
+    """
+    zeiten = []
+    for nummer in range(wiederholungen):
+        start = time.perf_counter()
+        aufruf(nummer)
+        zeiten.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        aufruf(wiederholungen)
+        spitze = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'median_ms': 1000 * float(np.median(zeiten)), 'min_ms': 1000 * min(zeiten), 'wiederholungen': wiederholungen,
+            'spitze_kb': spitze / 1024}
+
+
+def bench_suite(groessen: list[int], mit_ml: bool = True, wiederholungen: int = 5, seed: int = 42) -> dict:
+    """Reproduzierbare Suite je Gewebegröße: Aufbau, Einfügen (einzeln und gebündelt), Löschen, Verschmelzen,
+    Reaktion, Suche und Zustandsbericht, jeweils mit Laufzeit und Speicherspitze, dazu die messwerte() des Gewebes.
+
+    Alle Eingaben (Korpus, Impulse, gelöschte und verschmolzene Fragmente) hängen nur von `seed` ab; das
+    Ergebnis ist JSON-fähig und lässt sich mit vergleiche_suite gegen einen früheren Lauf prüfen.
+    """
+    ergebnis = {'meta': {'python': sys.version.split()[0], 'numpy': np.__version__, 'plattform': sys.platform,
+                         'mit_ml': mit_ml, 'wiederholungen': wiederholungen, 'seed': seed, 'vektor_dim': VEKTOR_DIM,
+                         'zeitpunkt': time.strftime('%Y-%m-%dT%H:%M:%S')},
+                'groessen': {}}
+    for anzahl in groessen:
+        korpus = synthetischer_korpus(anzahl + 11 * (wiederholungen + 1), seed=seed)  # Nachschub für beide Einfüge-Operationen
+        nachschub = iter(korpus[anzahl:])
+        rng = random.Random(seed)
+        gewebe = erzeuge_gewebe('batch', mit_ml)
+        gewebe.aktiviere_messung()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gewebe.fuege_ein_viele(korpus[:anzahl], modus='batch')
+        zeile = {'aufbau_ms': 1000 * (time.perf_counter() - start), 'kanten': gewebe._statistik.kanten, 'operationen': {}}
+        gewebe.reagiere(SUITE_IMPULSE[0])  # Ansicht und Adjazenz einmal bauen, wie in einem laufenden Dienst
+
+        def zufaellig_aktiv(anzahl_ids: int) -> list[int]:
+            return rng.sample([i for i, text in enumerate(gewebe._fragmente) if text is not None], anzahl_ids)
+
+        operationen = [
+            ('reaktion', lambda k: gewebe.spuere_reaktion_des_gewebes(SUITE_IMPULSE[k % len(SUITE_IMPULSE)])),
+            ('suche', lambda k: gewebe.finde_fragmente_mit_resonanz(SUITE_IMPULSE[k % len(SUITE_IMPULSE)],
+                                                                   ['VERSTAERKUNG', 'ERGAENZUNG', 'KONTRAST'], 0.3)),
+            ('zustand', lambda k: gewebe._analysiere_gewebe_zustand(gewebe._resonanzen_struktur)),
+            ('einfuegen', lambda k: gewebe.fuege_ein(next(nachschub))),
+            ('einfuegen_viele_10', lambda k: gewebe.fuege_ein_viele([next(nachschub) for _ in range(10)], modus='batch')),
+            ('loeschen', lambda k: gewebe.loesche_fragment(zufaellig_aktiv(1)[0])),
+            ('verschmelzen', lambda k: gewebe.verschmelze_fragmente(*zufaellig_aktiv(2))),
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, aufruf in operationen:
+                zeile['operationen'][name] = _messe_operation(aufruf, wiederholungen)
+        zeile['messwerte'] = gewebe.messwerte()
+        zeile['max_rss_mb'] = _max_rss_mb()
+        ergebnis['groessen'][str(anzahl)] = zeile
+        print(f"  n={anzahl:>6} Aufbau: {zeile['aufbau_ms']:10.1f} ms  Kanten: {zeile['kanten']:>10}  max. RSS: {zeile['max_rss_mb']:8.1f} MB")
+        for name, werte in zeile['operationen'].items():
+            print(f"    {name:<20} Median {werte['median_ms']:10.3f} ms   Min {werte['min_ms']:10.3f} ms   "
+                  f"Spitze {werte['spitze_kb']:10.1f} KB")
+    return ergebnis
+
+
+def _max_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def vergleiche_suite(alt: dict, neu: dict, toleranz: float = 0.25) -> list[str]:
+    """Vergleicht zwei Läufe von bench_suite; gibt die Operationen zurück, die um mehr als `toleranz` langsamer wurden.
+
+    Verglichen wird je Größe und Operation der Median (und der Aufbau). Sehr kurze Operationen (< 0.05 ms)
+    werden nicht als Regression gewertet, weil dort das Rauschen überwiegt.
+    """
+    regressionen = []
+    for groesse, zeile in neu['groessen'].items():
+        vorher = alt['groessen'].get(groesse)
+        if vorher is None:
+            continue
+        paare = [('aufbau', vorher['aufbau_ms'], zeile['aufbau_ms'])]
+        paare += [(name, vorher['operationen'][name]['median_ms'], werte['median_ms'])
+                  for name, werte in zeile['operationen'].items() if name in vorher['operationen']]
+        for name, t_alt, t_neu in paare:
+            faktor = t_neu / t_alt if t_alt > 0 else float('inf')
+            langsamer = faktor > 1 + toleranz and t_neu >= 0.05
+            if langsamer:
+                regressionen.append(f"n={groesse} {name}")
+            print(f"  n={groesse:>6} {name:<20} {t_alt:10.3f} ms -> {t_neu:10.3f} ms  x{faktor:5.2f}{'  REGRESSION' if langsamer else ''}")
+    return regressionen
+
+
+def _triaden(args, groessen: list[int], mit_ml: bool):
+    bench_einfuegen([g for g in groessen if g <= args.einzeln_bis], 'einzeln', mit_ml)
+    bench_einfuegen(groessen, 'batch', mit_ml)
+
+
+def _suite(args, groessen: list[int], mit_ml: bool):
+    ergebnis = bench_suite(groessen, mit_ml)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(ergebnis, f, ensure_ascii=False, indent=2)
+        print(f"  Ergebnis gespeichert: {args.json}")
+    if args.vergleiche:
+        with open(args.vergleiche, encoding='utf-8') as f:
+            alt = json.load(f)
+        print(f"\n=== Vergleich mit {args.vergleiche} (Toleranz {args.toleranz:.0%}) ===")
+        regressionen = vergleiche_suite(alt, ergebnis, args.toleranz)
+        print(f"  {len(regressionen)} Regression(en){': ' + ', '.join(regressionen) if regressionen else ''}")
+        if regressionen:
+            sys.exit(1)
+
+
+STANDARD_GROESSEN = [25, 50, 100, 200, 400]
+
+# Name -> (Überschrift, eigene Standardgrößen (None: STANDARD_GROESSEN, (): ohne Größen), Aufruf(args, groessen, mit_ml))
+BENCHMARKS = {
+    'triaden': ("Einfüge-Latenz gegen Fragmentanzahl", None, _triaden),
+    'skalierung': ("Skalierung von fuege_ein (Pfad pro Paar)", None, lambda a, g, ml: bench_skalierung(g, 'einzeln', ml)),
+    'dyadisch': ("Dyadische Bewertung eines Fragments gegen das ganze Gewebe", None, lambda a, g, ml: bench_dyadisch(g)),
+    'abfrage': ("Abfrage-Latenz mit Impuls-Cache", None, lambda a, g, ml: bench_abfrage(g)),
+    'wellen': ("Wellenausbreitung: pfadbasiert vs. CSR", None, lambda a, g, ml: bench_wellen(g, a.einzeln_bis, ml)),
+    'snapshot': ("Snapshot: save/load gegen Neuaufbau", None, lambda a, g, ml: bench_snapshot(g, ml)),
+    'journal': ("Journal: Aufpreis beim Einfügen und Wiederherstellung", None, lambda a, g, ml: bench_journal(g, ml)),
+    'bulk': ("Bulk-Einfügen: Schleife vs. fuege_ein_viele", None, lambda a, g, ml: bench_bulk(g, ml)),
+    'loeschen': ("Löschen über den Rückwärtsindex und Kompaktierung", None, lambda a, g, ml: bench_loeschen(g, ml)),
+    'zustand': ("Zustandsbericht: laufende Statistik vs. Neuberechnung", None, lambda a, g, ml: bench_zustand(g, ml)),
+    'pruning': ("Triadische Kandidaten: alle Paare vs. Top-k-Nachbarschaft", None, lambda a, g, ml: bench_pruning(g, a.top_k, ml)),
+    'index': ("Vektor-Index: Recall und Latenz gegen die exakte Suche", None, lambda a, g, ml: bench_index(g)),
+    'modelle': ("Triadische Modelle: kompilierte Wälder vs. sklearn", [1, 8, 64, 512], lambda a, g, ml: bench_modelle(g)),
+    'start': ("Startzeit je Lademodus und NLP-Profil (frischer Prozess)", (), lambda a, g, ml: bench_start()),
+    'training': ("Feature-Erstellung im Trainer: Deduplizierung und Vektor-Cache", (), lambda a, g, ml: bench_trainings_cache()),
+    'inkrementell': ("Inkrementelles Training und Hot-Reload", (), lambda a, g, ml: bench_inkrementell()),
+    'pool': ("Triadischer Durchlauf: seriell vs. Prozess-Pool", [1000, 2000, 5000, 10000],
+             lambda a, g, ml: bench_pool(g, a.arbeiter, a.top_k)),
+    'nebenlaeufig': ("Nebenläufige Abfragen auf Ansichten, mit und ohne Schreiber", (),
+                     lambda a, g, ml: bench_nebenlaeufig(leser=a.arbeiter, mit_ml=ml)),
+    'server': ("HTTP-Dienst unter Last: ohne und mit Mikro-Batching", (), lambda a, g, ml: bench_server(mit_ml=ml)),
+    'speicher': ("Speicher der Kanten", [100, 200, 400], lambda a, g, ml: bench_speicher(g, ml)),
+    # Läuft in wenigen Minuten; 10000 Fragmente (~1e8 Kanten im Stub-Korpus, rund 6 GB) nur ausdrücklich mit --groessen
+    'suite': ("Benchmark-Suite", [100, 1000], _suite),
+    'verfeinerung': ("Latenzbegrenztes Einfügen: sofortiger vs. aufgeschobener triadischer Durchlauf", None,
+                     lambda a, g, ml: bench_verfeinerung(g, ml)),
+    'impulse': ("Gebündelte Impuls-Abfragen: Durchsatz je Batch-Größe", [100, 300], lambda a, g, ml: bench_impulse(g, ml)),
+    'verschmelzen': ("Verschmelzen: neu parsen vs. abgeleitete Merkmale (einzeln und gebündelt)", [100, 300, 1000],
+                     lambda a, g, ml: bench_verschmelzen(g, ml)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks für das Gewebe des Verstehens")
+    parser.add_argument('benchmark', nargs='?', choices=list(BENCHMARKS), default='triaden')
+    parser.add_argument('--groessen', type=int, nargs='+',
+                        help=f"Fragmentanzahlen (bzw. Batch-Größen für 'modelle'); Standard je Benchmark, sonst {' '.join(map(str, STANDARD_GROESSEN))}")
+    parser.add_argument('--einzeln-bis', type=int, default=25, help="Der Pfad pro Paar wird nur bis zu dieser Größe gemessen")
+    parser.add_argument('--top-k', type=int, default=16, help="Anzahl Nachbarn für die Benchmarks 'pruning' und 'pool'")
+    parser.add_argument('--arbeiter', type=int, nargs='+', default=[1, 2, 4], help="Worker- bzw. Leser-Anzahlen für die Benchmarks 'pool' und 'nebenlaeufig'")
+    parser.add_argument('--ohne-ml', action='store_true', help="Heuristischen Fallback statt der ML-Modelle messen")
+    parser.add_argument('--json', help="Ergebnis der Suite als JSON in diese Datei schreiben")
+    parser.add_argument('--vergleiche', help="JSON eines früheren Suite-Laufs; Exit-Code 1 bei einer Regression")
+    parser.add_argument('--toleranz', type=float, default=0.25, help="Erlaubte Verlangsamung je Operation für --vergleiche")
+    args = parser.parse_args()
+
+    titel, standard, aufruf = BENCHMARKS[args.benchmark]
+    groessen = args.groessen or (STANDARD_GROESSEN if standard is None else list(standard))
+    if groessen:
+        titel += f" (n = {', '.join(map(str, groessen))})"
+    print(f"=== {titel} ===")
+    aufruf(args, groessen, not args.ohne_ml)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+########################################
+# Datei: ./gewebe_ansicht.py
+# Beschreibung: Unveränderliche, versionierte Ansichten des Gewebes für nebenläufige Abfragen und deren Ergebnisse.
+########################################
+
+import numpy as np
+
+
+def zustandsbericht(kennzahlen: dict) -> str:
+    """Der Text des Zustandsberichts aus den Kennzahlen einer Statistik (siehe NeuesTextVerstehen._kennzahlen)."""
+    report = [
+        "\n--- Gewebe Zustandsbericht ---",
+        f"Fragmente: {kennzahlen['aktive_fragmente']} aktiv / {kennzahlen['fragmente_gesamt']} total",
+        f"Resonanzen (aktiv): {kennzahlen['kanten']}",
+        f"Dominante Resonanz: {kennzahlen['dominante_resonanz']}",
+        f"Stimmung: " + ", ".join([f"{k}:{v:.2f}" for k, v in kennzahlen['stimmung'].items()]),
+        "---"
+    ]
+    return "\n".join(report)
+
+
+class GewebeAnsicht:
+    """Stand des Gewebes bei einer Version: Fragmente, Merkmale, CSR-Adjazenz und Kennzahlen des Zustandsberichts.
+
+    Eine veröffentlichte Ansicht wird nicht mehr verändert. Abfragen lesen sie ohne Sperre, während Schreiber das
+    Gewebe weiter verändern; die Merkmale teilen sich die Arrays mit dem Gewebe (Copy-on-Write, siehe
+    MerkmalSpeicher.ansicht), die Adjazenz wird je Version einmal gebaut. `ausstehende_auftraege` zählt die
+    triadischen Durchläufe, die bei dieser Version noch auf die Verfeinerung warteten.
+    """
+
+    def __init__(self, version: int, fragmente: tuple, merkmale, adjazenz, kennzahlen: dict, ausstehende_auftraege: int = 0):
+        self.version = version
+        self.ausstehende_auftraege = ausstehende_auftraege
+        self.fragmente = fragmente
+        self.merkmale = merkmale
+        self.adjazenz = adjazenz
+        self.kennzahlen = kennzahlen
+        self.aktiv = np.array([text is not None for text in fragmente], dtype=bool)
+        self._aktive_ids = np.flatnonzero(self.aktiv).tolist()
+
+    def __len__(self):
+        return len(self.fragmente)
+
+    @property
+    def vorlaeufig(self) -> bool:
+        """True, solange das Gewebe dieser Version noch verfeinert wird."""
+        return self.ausstehende_auftraege > 0
+
+    def aktive_ids(self) -> list[int]:
+        return list(self._aktive_ids)
+
+    def nur_aktive(self, ids):
+        """Die Ids aus `ids`, die in dieser Ansicht existieren und aktiv sind (z.B. Treffer eines Vektor-Index)."""
+        ids = np.asarray(ids, dtype=np.intp)
+        ids = ids[ids < len(self.fragmente)]
+        return ids[self.aktiv[ids]]
+
+    def bericht(self) -> str:
+        return zustandsbericht(self.kennzahlen)
+
+
+class ImpulsReaktion:
+    """Ergebnis einer Impuls-Abfrage auf einer GewebeAnsicht; wird zurückgegeben statt im Gewebe gespeichert.
+
+    `wellen_ergebnis` ist das WellenErgebnis der Engine 'sparse', `ankuenfte` die Wellen je Fragment der
+    Engine 'pfade' (genau eines von beiden ist gesetzt).
+    """
+
+    def __init__(self, impuls: str, ansicht: GewebeAnsicht, wellen_ergebnis=None, ankuenfte: dict = None, wellen_klasse=None):
+        self.impuls = impuls
+        self.ansicht = ansicht
+        self.wellen_ergebnis = wellen_ergebnis
+        self._ankuenfte = ankuenfte
+        self._wellen_klasse = wellen_klasse
+
+    @property
+    def wellen(self) -> dict:
+        """Fragment-Id -> angekommene ResonanzWellen (bei 'sparse' die stärkste je Art, erst beim Zugriff aufgebaut)."""
+        if self._ankuenfte is None:
+            ankuenfte = self.wellen_ergebnis.als_wellen(self._wellen_klasse) if self.wellen_ergebnis is not None else {}
+            self._ankuenfte = {i: wellen for i, wellen in ankuenfte.items() if self.ansicht.aktiv[i]}
+        return self._ankuenfte
+
+    def treffer(self, arten: list[str], mindest_staerke: float) -> list[int]:
+        """Sortierte Fragmente, an denen eine Welle der Arten mit staerke >= mindest_staerke ankam."""
+        if self.wellen_ergebnis is not None:
+            return self.ansicht.nur_aktive(self.wellen_ergebnis.fragmente_mit(arten, mindest_staerke)).tolist()
+        return sorted(i for i, wellen in self.wellen.items()
+                      if any(w.art in arten and w.staerke >= mindest_staerke for w in wellen))
+
+    def fragmente_mit_resonanz(self, arten: list[str], mindest_staerke: float = 0.2) -> list[str]:
+        return [self.ansicht.fragmente[i] for i in self.treffer(arten, mindest_staerke)]
+
+    def staerkste_pfade(self, fragment_index: int, k: int = 3) -> list[tuple]:
+        """Die k stärksten Wellen an einem Fragment als (art, staerke, pfad)."""
+        if self.wellen_ergebnis is not None:
+            return self.wellen_ergebnis.top_k_pfade(fragment_index, k)
+        wellen = sorted(self.wellen.get(fragment_index, []), key=lambda w: -w.staerke)
+        return [(w.art, w.staerke, w.pfad) for w in wellen[:k]]
+
+    def bericht(self) -> str:
+        return self.ansicht.bericht()
@@ -0,0 +1,240 @@
+########################################
+# Datei: ./gewebe_journal.py
+# Beschreibung: Append-only Journal (JSONL) aller Änderungen am Gewebe mit gebündeltem fsync, Wiederherstellung und Kompaktierung.
+########################################
+
+import base64
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from gewebe_snapshot import speichere_snapshot, lade_snapshot
+from merkmal_speicher import FragmentMerkmale
+
+JOURNAL_DATEI = 'journal.jsonl'
+SNAPSHOT_VERZEICHNIS = 'snapshot'
+
+# Jede Zeile des Journals ist genau eine Mutation samt aller Kanten-Deltas, die sie ausgelöst hat:
+#   {"seq": 7, "op": "fuege_ein", "id": 12, "text": "...", "merkmale": {...}, "kanten": [["s", q, z, art, staerke, kontext], ["d", q, z], ...]}
+#   (ein "s"-Delta trägt als siebten Wert das triadische Ereignis der Kante, falls sie eines hat)
+#   {"seq": 8, "op": "loesche", "id": 3}
+#   {"seq": 9, "op": "fuege_ein_viele", "fragmente": [{"id": 13, "text": "...", "merkmale": {...}}, ...], "kanten": [...]}
+#   {"seq": 10, "op": "verfeinere", "fertig": [12], "kanten": [...]}
+#   {"seq": 11, "op": "verschmelze", "quellen": [4, 9], "id": 14, "text": "...", "merkmale": {...}, "kanten": [...]}
+#   {"seq": 12, "op": "verschmelze_viele", "verschmelzungen": [{"quellen": [...], "id": 15, ..., "kanten": [...]}, ...]}
+# Eine Verschmelzung löscht ihre Quellen und legt das Fragment mit den abgeleiteten Merkmalen an; ihre Kanten-Deltas
+# gehören zu ihr selbst, weil jede weitere Verschmelzung des Eintrags auf dem Zustand danach aufsetzt.
+# Bei latenzbegrenztem Einfügen trägt ein Einfügen "triaden": "aufgeschoben"; seine triadischen Kanten folgen in
+# "verfeinere"-Einträgen (eine Verschmelzung trägt dazu "nachbarschaft", die Fragmente ihres Auftrags).
+# Aufträge, die bis zum Ende des Journals nicht als fertig gemeldet sind, werden wieder eingereiht.
+# Eine beim Absturz nur halb geschriebene letzte Zeile wird bei der Wiederherstellung verworfen.
+# Beim Wiederherstellen werden die Kanten-Deltas direkt angewendet; es wird weder geparst noch eine Resonanz neu gespürt.
+
+
+def merkmale_als_dict(merkmale: FragmentMerkmale) -> dict:
+    vektor = np.ascontiguousarray(merkmale.vektor, dtype=np.float32) if merkmale.hat_vektor else np.zeros(0, dtype=np.float32)
+    return {'vektor': base64.b64encode(vektor.tobytes()).decode('ascii'), 'norm': float(merkmale.norm),
+            'konzepte': sorted(merkmale.konzepte), 'sentiment': int(merkmale.sentiment),
+            'hat_vektor': bool(merkmale.hat_vektor), 'schluessel': int(merkmale.schluessel),
+            'kern_lemmata': None if merkmale.kern_lemmata is None else list(merkmale.kern_lemmata)}
+
+
+def merkmale_aus_dict(daten: dict) -> FragmentMerkmale:
+    vektor = np.frombuffer(base64.b64decode(daten['vektor']), dtype=np.float32).copy()
+    kern_lemmata = daten.get('kern_lemmata')
+    return FragmentMerkmale(vektor, daten['norm'], frozenset(daten['konzepte']), daten['sentiment'],
+                            daten['hat_vektor'], daten['schluessel'], None if kern_lemmata is None else tuple(kern_lemmata))
+
+
+class GewebeJournal:
+    """Hängt Mutationen als JSON-Zeilen an und synchronisiert gebündelt.
+
+    Jeder Eintrag wird sofort an das Betriebssystem übergeben (flush); ein Absturz des Prozesses verliert also
+    keinen geschriebenen Eintrag. fsync erfolgt nach `sync_alle` Einträgen, spätestens aber `sync_intervall`
+    Sekunden nach dem ersten noch nicht synchronisierten Eintrag: dafür startet schreibe() einen Timer-Thread,
+    auch wenn danach nichts mehr geschrieben wird. Ein Absturz des Systems kann höchstens die Einträge seit dem
+    letzten fsync kosten. Nach `kompaktieren_ab` Einträgen seit dem letzten Snapshot faltet kompaktiere() das
+    Journal in einen neuen Snapshot.
+    """
+
+    def __init__(self, verzeichnis: str, sync_alle: int = 64, sync_intervall: float = 1.0, kompaktieren_ab: int = None):
+        self.verzeichnis = verzeichnis
+        self.sync_alle = sync_alle
+        self.sync_intervall = sync_intervall
+        self.kompaktieren_ab = kompaktieren_ab
+        self.seq = 0
+        self.eintraege_seit_snapshot = 0
+        self._unsynchronisiert = 0
+        self._letzter_sync = time.monotonic()
+        self._datei = None
+        self._gueltige_laenge = 0
+        self._sperre = threading.RLock()  # Schreiber und Timer-Thread teilen sich die Datei
+        self._timer = None
+
+    @property
+    def journal_pfad(self) -> str:
+        return os.path.join(self.verzeichnis, JOURNAL_DATEI)
+
+    @property
+    def snapshot_pfad(self) -> str:
+        return os.path.join(self.verzeichnis, SNAPSHOT_VERZEICHNIS)
+
+    def hat_zustand(self) -> bool:
+        return os.path.exists(os.path.join(self.snapshot_pfad, 'gewebe.json')) or os.path.exists(self.journal_pfad)
+
+    def oeffnen(self):
+        os.makedirs(self.verzeichnis, exist_ok=True)
+        self._datei = open(self.journal_pfad, 'a', encoding='utf-8')
+
+    def schreibe(self, eintrag: dict):
+        """Hängt einen Eintrag an; die Sequenznummer wird hier vergeben."""
+        with self._sperre:
+            self.seq += 1
+            eintrag['seq'] = self.seq
+            self._datei.write(json.dumps(eintrag, ensure_ascii=False) + '\n')
+            self._datei.flush()
+            self.eintraege_seit_snapshot += 1
+            self._unsynchronisiert += 1
+            if self._unsynchronisiert >= self.sync_alle or time.monotonic() - self._letzter_sync >= self.sync_intervall:
+                self.synchronisiere()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.sync_intervall, self._synchronisiere_nach_intervall)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _synchronisiere_nach_intervall(self):
+        with self._sperre:
+            self._timer = None
+            self.synchronisiere()
+
+    def synchronisiere(self):
+        with self._sperre:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._datei is None or self._unsynchronisiert == 0:
+                return
+            self._datei.flush()
+            os.fsync(self._datei.fileno())
+            self._unsynchronisiert = 0
+            self._letzter_sync = time.monotonic()
+
+    def kompaktieren_faellig(self) -> bool:
+        return self.kompaktieren_ab is not None and self.eintraege_seit_snapshot >= self.kompaktieren_ab
+
+    def schliessen(self):
+        with self._sperre:
+            self.synchronisiere()
+            if self._datei is not None:
+                self._datei.close()
+                self._datei = None
+
+    def lies_eintraege(self, ab_seq: int = 0):
+        """Liefert alle vollständigen Einträge mit seq > ab_seq; eine abgeschnittene letzte Zeile wird übersprungen."""
+        self._gueltige_laenge = 0
+        if not os.path.exists(self.journal_pfad):
+            return
+        with open(self.journal_pfad, 'rb') as f:
+            for zeile in f:
+                if not zeile.endswith(b'\n'):
+                    break
+                self._gueltige_laenge += len(zeile)
+                eintrag = json.loads(zeile.decode('utf-8'))
+                if eintrag['seq'] > ab_seq:
+                    yield eintrag
+
+    def kompaktiere(self, gewebe):
+        """Schreibt den aktuellen Zustand als Snapshot und beginnt ein leeres Journal.
+
+        Der neue Snapshot wird erst vollständig geschrieben und dann an die Stelle des alten gesetzt. Er merkt sich
+        die letzte enthaltene Sequenznummer, sodass ein Absturz zwischen Tausch und Kürzen des Journals nichts doppelt anwendet.
+        """
+        self.synchronisiere()
+        neu = self.snapshot_pfad + '.neu'
+        shutil.rmtree(neu, ignore_errors=True)
+        speichere_snapshot(gewebe, neu, zusatz={'journal_seq': self.seq})
+        alt = self.snapshot_pfad + '.alt'
+        shutil.rmtree(alt, ignore_errors=True)
+        if os.path.exists(self.snapshot_pfad):
+            os.replace(self.snapshot_pfad, alt)
+        os.replace(neu, self.snapshot_pfad)
+        shutil.rmtree(alt, ignore_errors=True)
+
+        with self._sperre:
+            if self._datei is not None:
+                self._datei.close()
+            self._datei = open(self.journal_pfad, 'w', encoding='utf-8')
+            self._datei.flush()
+            os.fsync(self._datei.fileno())
+            self.eintraege_seit_snapshot = 0
+            self._unsynchronisiert = 0
+
+    def stelle_wieder_her(self, gewebe, resonanz_klasse) -> int:
+        """Lädt den Snapshot (falls vorhanden) in `gewebe` und spielt das Journal dahinter ab; gibt die Anzahl Einträge zurück."""
+        snapshot_seq = 0
+        if not os.path.exists(os.path.join(self.snapshot_pfad, 'gewebe.json')) and os.path.exists(self.snapshot_pfad + '.alt'):
+            os.replace(self.snapshot_pfad + '.alt', self.snapshot_pfad)  # Absturz mitten im Tausch
+        if os.path.exists(os.path.join(self.snapshot_pfad, 'gewebe.json')):
+            meta = lade_snapshot(gewebe, self.snapshot_pfad)
+            snapshot_seq = meta.get('zusatz', {}).get('journal_seq', 0)
+        self.seq = snapshot_seq
+        angewendet = 0
+        for eintrag in self.lies_eintraege(ab_seq=snapshot_seq):
+            spiele_ab(gewebe, eintrag, resonanz_klasse)
+            self.seq = eintrag['seq']
+            angewendet += 1
+        self.eintraege_seit_snapshot = angewendet
+        # Eine abgeschnittene letzte Zeile entfernen, damit neue Einträge nicht an sie angehängt werden
+        if os.path.exists(self.journal_pfad) and os.path.getsize(self.journal_pfad) > self._gueltige_laenge:
+            os.truncate(self.journal_pfad, self._gueltige_laenge)
+        return angewendet
+
+
+def spiele_ab(gewebe, eintrag: dict, resonanz_klasse):
+    """Wendet einen Journal-Eintrag auf das Gewebe an."""
+    if eintrag['op'] in ('verschmelze', 'verschmelze_viele'):
+        for verschmelzung in eintrag.get('verschmelzungen', [eintrag]):
+            _spiele_verschmelzung_ab(gewebe, verschmelzung, resonanz_klasse)
+        gewebe._struktur_version += 1
+        return
+    if eintrag['op'] in ('fuege_ein', 'fuege_ein_viele'):
+        for fragment in eintrag.get('fragmente', [eintrag]):
+            index = gewebe._registriere_fragment(fragment['text'], merkmale_aus_dict(fragment['merkmale']))
+            if index != fragment['id']:
+                raise ValueError(f"Journal passt nicht zum Gewebe: erwartet Fragment {fragment['id']}, erhalten {index}.")
+    elif eintrag['op'] == 'verfeinere':
+        gewebe._auftraege_erledigt(eintrag['fertig'])
+    elif eintrag['op'] == 'loesche':
+        gewebe._loesche_intern(eintrag['id'])
+    else:
+        raise ValueError(f"Unbekannte Journal-Operation '{eintrag['op']}'.")
+
+    _wende_kanten_an(gewebe, eintrag.get('kanten', []), resonanz_klasse)
+    if eintrag.get('triaden') == 'aufgeschoben':
+        fragment = eintrag.get('fragmente', [eintrag])[-1]
+        gewebe._stelle_auftrag_wieder_ein(fragment['id'], merkmale_aus_dict(fragment['merkmale']), fragment['text'])
+    gewebe._struktur_version += 1
+
+
+def _spiele_verschmelzung_ab(gewebe, verschmelzung: dict, resonanz_klasse):
+    for quelle in verschmelzung['quellen']:
+        gewebe._loesche_intern(quelle)
+    merkmale = merkmale_aus_dict(verschmelzung['merkmale'])
+    index = gewebe._registriere_fragment(verschmelzung['text'], merkmale, cachen=False)
+    if index != verschmelzung['id']:
+        raise ValueError(f"Journal passt nicht zum Gewebe: erwartet Fragment {verschmelzung['id']}, erhalten {index}.")
+    _wende_kanten_an(gewebe, verschmelzung['kanten'], resonanz_klasse)
+    if verschmelzung.get('triaden') == 'aufgeschoben':
+        gewebe._stelle_auftrag_wieder_ein(index, merkmale, verschmelzung['text'], verschmelzung['nachbarschaft'])
+
+
+def _wende_kanten_an(gewebe, kanten: list, resonanz_klasse):
+    for delta in kanten:
+        if delta[0] == 's':
+            gewebe._setze_resonanz(resonanz_klasse(*delta[1:]))
+        else:
+            gewebe._entferne_resonanz(delta[1], delta[2])
@@ -0,0 +1,147 @@
+########################################
+# Datei: ./gewebe_last.py
+# Beschreibung: Lasttest-Client für gewebe_server: parallele Keep-Alive-Verbindungen, Latenz-Perzentile und Durchsatz.
+########################################
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+class Verbindung:
+    """Eine Keep-Alive-HTTP/1.1-Verbindung zum Gewebe-Server (nur was der Server selbst spricht: JSON mit Content-Length)."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def oeffne(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def schliesse(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def anfrage(self, methode: str, pfad: str, koerper: dict = None) -> tuple[int, dict]:
+        daten = json.dumps(koerper, ensure_ascii=False).encode('utf-8') if koerper is not None else b''
+        kopf = f"{methode} {pfad} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\nContent-Length: {len(daten)}\r\n\r\n"
+        self._writer.write(kopf.encode('latin-1') + daten)
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split(b' ', 2)[1])
+        laenge = 0
+        while True:
+            zeile = await self._reader.readline()
+            if zeile in (b'\r\n', b'\n', b''):
+                break
+            name, _, wert = zeile.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                laenge = int(wert.strip())
+        antwort = await self._reader.readexactly(laenge) if laenge else b''
+        return status, json.loads(antwort) if antwort else {}
+
+
+def _anfrage_fuer(art: str, impulse: list[str], texte, arten: list[str]) -> tuple[str, str, dict]:
+    if art == 'einfuegen':
+        return 'POST', '/fragmente', {'text': next(texte)}
+    if art == 'suche':
+        return 'POST', '/suche', {'impuls': random.choice(impulse), 'arten': arten, 'mindest_staerke': 0.3}
+    return 'POST', '/reaktion', {'impuls': random.choice(impulse)}
+
+
+async def lasttest(host: str, port: int, impulse: list[str], texte: list[str], verbindungen: int = 16, dauer: float = 5.0,
+                   mischung: dict = None, arten: list[str] = None, seed: int = 0) -> dict:
+    """Schickt `dauer` Sekunden lang über `verbindungen` parallele Verbindungen Anfragen nach `mischung`.
+
+    `mischung` ordnet den Anfragearten ('reaktion', 'suche', 'einfuegen') Gewichte zu; jede Verbindung wartet
+    auf ihre Antwort, bevor sie die nächste Anfrage schickt (geschlossene Last). 503-Antworten (Gegendruck des
+    Servers) werden gezählt, aber nicht in die Latenzen aufgenommen.
+    """
+    random.seed(seed)
+    mischung = mischung or {'reaktion': 0.6, 'suche': 0.3, 'einfuegen': 0.1}
+    arten = arten or ['VERSTAERKUNG', 'ERGAENZUNG', 'KONTRAST']
+    namen, gewichte = list(mischung), list(mischung.values())
+    texte = iter(texte)
+    latenzen = {name: [] for name in namen}
+    status_zaehler = {}
+    ende = time.perf_counter() + dauer
+
+    async def arbeiter():
+        verbindung = Verbindung(host, port)
+        await verbindung.oeffne()
+        try:
+            while time.perf_counter() < ende:
+                art = random.choices(namen, gewichte)[0]
+                try:
+                    methode, pfad, koerper = _anfrage_fuer(art, impulse, texte, arten)
+                except StopIteration:
+                    art, (methode, pfad, koerper) = 'reaktion', _anfrage_fuer('reaktion', impulse, texte, arten)
+                start = time.perf_counter()
+                status, _ = await verbindung.anfrage(methode, pfad, koerper)
+                status_zaehler[status] = status_zaehler.get(status, 0) + 1
+                if status == 200:
+                    latenzen[art].append(time.perf_counter() - start)
+                elif status == 503:
+                    await asyncio.sleep(0.01)
+        finally:
+            await verbindung.schliesse()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[arbeiter() for _ in range(verbindungen)])
+    gesamt = time.perf_counter() - start
+    alle = [l for liste in latenzen.values() for l in liste]
+    ergebnis = {'verbindungen': verbindungen, 'dauer': gesamt, 'anfragen': len(alle), 'durchsatz': len(alle) / gesamt,
+                'status': status_zaehler, 'abgelehnt': status_zaehler.get(503, 0)}
+    for name, liste in [('gesamt', alle)] + list(latenzen.items()):
+        if liste:
+            ergebnis[name] = {'anzahl': len(liste), 'p50_ms': 1000 * float(np.percentile(liste, 50)),
+                              'p99_ms': 1000 * float(np.percentile(liste, 99))}
+    return ergebnis
+
+
+def drucke_ergebnis(ergebnis: dict, titel: str = ''):
+    print(f"  {titel}{ergebnis['anfragen']} Anfragen in {ergebnis['dauer']:.1f}s über {ergebnis['verbindungen']} Verbindungen: "
+          f"{ergebnis['durchsatz']:.1f} Anfragen/s, abgelehnt (503): {ergebnis['abgelehnt']}")
+    for name in ['gesamt', 'reaktion', 'suche', 'einfuegen']:
+        if name in ergebnis:
+            werte = ergebnis[name]
+            print(f"    {name:<10} n={werte['anzahl']:<6} p50 {werte['p50_ms']:8.2f} ms   p99 {werte['p99_ms']:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest gegen einen laufenden gewebe_server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--verbindungen', type=int, default=16)
+    parser.add_argument('--dauer', type=float, default=10.0)
+    parser.add_argument('--impulse', help="Datei mit einem Impuls pro Zeile (sonst einige Beispielsätze)")
+    parser.add_argument('--texte', help="Datei mit einem einzufügenden Text pro Zeile (sonst nur Abfragen)")
+    parser.add_argument('--mischung', default='reaktion=0.6,suche=0.3,einfuegen=0.1', help="Gewichte je Anfrageart")
+    args = parser.parse_args()
+
+    def zeilen(pfad):
+        with open(pfad, encoding='utf-8') as f:
+            return [zeile.strip() for zeile in f if zeile.strip()]
+
+    impulse = zeilen(args.impulse) if args.impulse else [
+        "Sonnenlicht ist wichtig für das Wachstum.", "Die Erde dreht sich um die Sonne.",
+        "Glück entsteht oft aus Dankbarkeit.", "Wasser verdunstet in der Hitze."]
+    texte = zeilen(args.texte) if args.texte else []
+    mischung = {art: float(gewicht) for art, gewicht in (teil.split('=') for teil in args.mischung.split(','))}
+    if not texte:
+        mischung.pop('einfuegen', None)
+    ergebnis = asyncio.run(lasttest(args.host, args.port, impulse, texte, args.verbindungen, args.dauer, mischung))
+    drucke_ergebnis(ergebnis)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+########################################
+# Datei: ./gewebe_messung.py
+# Beschreibung: Optionale Zeitmessung je Phase und Zähler für die heißen Pfade des Gewebes (siehe NeuesTextVerstehen.messwerte).
+########################################
+
+import contextlib
+import threading
+import time
+
+_AUS = contextlib.nullcontext()
+
+
+class GewebeMessung:
+    """Zeiten je Phase, Zähler und Verteilungen (z.B. ML-Batchgrößen); ausgeschaltet kostet jeder Aufruf nur eine Abfrage.
+
+    Die Phasen dürfen geschachtelt sein (z.B. 'triadisch' um 'triadisch_ml'); jede zählt ihre eigene Wanduhrzeit.
+    Alle Methoden sind threadsicher, da Abfragen parallel zu einem Schreiber laufen.
+    """
+
+    def __init__(self, aktiv: bool = False):
+        self.aktiv = aktiv
+        self._sperre = threading.Lock()
+        self._phasen = {}  # Name -> [Anzahl, Summe Sekunden, Maximum Sekunden]
+        self._zaehler = {}
+        self._verteilungen = {}  # Name -> [Anzahl, Summe, Minimum, Maximum]
+
+    def phase(self, name: str):
+        """Kontextmanager, der die Dauer des Blocks unter `name` verbucht (ausgeschaltet ein leerer Kontext)."""
+        if not self.aktiv:
+            return _AUS
+        return self._messe(name)
+
+    @contextlib.contextmanager
+    def _messe(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            dauer = time.perf_counter() - start
+            with self._sperre:
+                werte = self._phasen.setdefault(name, [0, 0.0, 0.0])
+                werte[0] += 1
+                werte[1] += dauer
+                werte[2] = max(werte[2], dauer)
+
+    def zaehle(self, name: str, anzahl: int = 1):
+        if not self.aktiv:
+            return
+        with self._sperre:
+            self._zaehler[name] = self._zaehler.get(name, 0) + anzahl
+
+    def verteile(self, name: str, wert: float):
+        """Nimmt einen Wert in die Verteilung `name` auf (Anzahl, Summe, Minimum, Maximum)."""
+        if not self.aktiv:
+            return
+        with self._sperre:
+            werte = self._verteilungen.get(name)
+            if werte is None:
+                self._verteilungen[name] = [1, wert, wert, wert]
+            else:
+                werte[0] += 1
+                werte[1] += wert
+                werte[2] = min(werte[2], wert)
+                werte[3] = max(werte[3], wert)
+
+    def werte(self) -> dict:
+        """Alle bisher gemessenen Werte als JSON-fähiges Dict."""
+        with self._sperre:
+            phasen = {name: {'anzahl': n, 'gesamt_ms': 1000 * summe, 'mittel_ms': 1000 * summe / n, 'max_ms': 1000 * maximum}
+                      for name, (n, summe, maximum) in self._phasen.items()}
+            verteilungen = {name: {'anzahl': n, 'summe': summe, 'mittel': summe / n, 'min': minimum, 'max': maximum}
+                            for name, (n, summe, minimum, maximum) in self._verteilungen.items()}
+            return {'aktiv': self.aktiv, 'phasen': phasen, 'zaehler': dict(self._zaehler), 'verteilungen': verteilungen}
+
+    def zuruecksetzen(self):
+        with self._sperre:
+            self._phasen.clear()
+            self._zaehler.clear()
+            self._verteilungen.clear()
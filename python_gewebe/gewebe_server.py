@@ -0,0 +1,420 @@
+########################################
+# Datei: ./gewebe_server.py
+# Beschreibung: Lokaler asyncio-HTTP/JSON-Dienst um NeuesTextVerstehen, mit Mikro-Batching und Gegendruck.
+########################################
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from text_gewebe import KONSISTENZ_STUFEN, NeuesTextVerstehen
+
+# Endpunkte (alle Antworten JSON):
+#   POST   /fragmente          {"text": ...}                                -> {"id": ...}
+#   POST   /fragmente/viele    {"texte": [...]}                             -> {"ids": [...]}
+#   DELETE /fragmente/<id>                                                  -> {"geloescht": <id>}
+#   POST   /verschmelzen       {"index1": ..., "index2": ..., "modus": "neu_parsen"} -> {"id": ..., "fragmente": <anzahl>}
+#   POST   /verschmelzen/viele {"paare": [[index1, index2], ...]}           -> {"ids": [... bzw. null], "fragmente": <anzahl>}
+# /verschmelzen nimmt optional "modus": "neu_parsen" (Standard) oder "merkmale"; /verschmelzen/viele verschmilzt immer
+# ohne Neuparsen (siehe NeuesTextVerstehen.verschmelze_fragmente).
+#   POST   /reaktion           {"impuls": ...}                              -> {"impuls": ..., "report": ..., "version": ..., "vorlaeufig": ...}
+#   POST   /suche              {"impuls": ..., "arten": [...], "mindest_staerke": 0.2} -> {"fragmente": [...], "version": ..., "vorlaeufig": ...}
+#   GET    /zustand                                                         -> Kennzahlen, Version, Warteschlangen, Verfeinerung
+# /reaktion und /suche nehmen optional "konsistenz": "vorlaeufig" (Standard) oder "vollstaendig"; mit --verfeinerung
+# wartet "vollstaendig" auf alle aufgeschobenen triadischen Durchläufe (siehe NeuesTextVerstehen.setze_verfeinerung).
+#   GET    /messwerte                                                       -> NeuesTextVerstehen.messwerte() (mit --messung)
+# Einfügungen und Impulse (reaktion, suche) laufen über den MikroBatcher; ist seine Warteschlange voll,
+# antwortet der Dienst sofort mit 503 und Retry-After statt die Latenz aller Anfragen wachsen zu lassen.
+
+STATUS_TEXTE = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+                500: 'Internal Server Error', 503: 'Service Unavailable'}
+MAX_KOERPER = 16 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class Ueberlastet(Exception):
+    """Die Warteschlange des MikroBatchers ist voll (wird als 503 beantwortet)."""
+
+
+class AnfrageFehler(Exception):
+    def __init__(self, status: int, meldung: str):
+        super().__init__(meldung)
+        self.status = status
+
+
+class MikroBatcher:
+    """Sammelt gleichartige Aufträge über ein kurzes Zeitfenster und führt sie als einen Stapel in einem Thread aus.
+
+    `verarbeite` bekommt die Liste der Auftragsdaten und gibt eine gleich lange Liste von Ergebnissen zurück
+    (ein Exception-Objekt als Ergebnis wird an den jeweiligen Aufrufer weitergereicht). Ein Stapel endet
+    nach `fenster` Sekunden ab dem ersten Auftrag oder bei `max_batch` Aufträgen; während ein Stapel läuft,
+    sammeln sich die nächsten Aufträge bereits an. Mehr als `max_warteschlange` wartende Aufträge lehnt
+    einreichen() mit Ueberlastet ab.
+    """
+
+    def __init__(self, name: str, verarbeite, executor, fenster: float = 0.005, max_batch: int = 64, max_warteschlange: int = 1024):
+        self.name = name
+        self.verarbeite = verarbeite
+        self.executor = executor
+        self.fenster = fenster
+        self.max_batch = max_batch
+        self._warteschlange = asyncio.Queue(max_warteschlange)
+        self._aufgabe = None
+        self.stapel = 0
+        self.auftraege = 0
+        self.abgelehnt = 0
+
+    def starte(self):
+        self._aufgabe = asyncio.get_running_loop().create_task(self._schleife())
+
+    async def stoppe(self):
+        if self._aufgabe is not None:
+            self._aufgabe.cancel()
+            try:
+                await self._aufgabe
+            except asyncio.CancelledError:
+                pass
+            self._aufgabe = None
+
+    def __len__(self):
+        return self._warteschlange.qsize()
+
+    async def einreichen(self, daten):
+        zukunft = asyncio.get_running_loop().create_future()
+        try:
+            self._warteschlange.put_nowait((daten, zukunft))
+        except asyncio.QueueFull:
+            self.abgelehnt += 1
+            raise Ueberlastet(f"Warteschlange '{self.name}' ist voll ({self._warteschlange.maxsize} Aufträge)")
+        return await zukunft
+
+    async def _schleife(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            stapel = [await self._warteschlange.get()]
+            ende = loop.time() + self.fenster
+            while len(stapel) < self.max_batch:
+                rest = ende - loop.time()
+                if rest <= 0:
+                    break
+                try:
+                    stapel.append(await asyncio.wait_for(self._warteschlange.get(), rest))
+                except asyncio.TimeoutError:
+                    break
+            # Auch ohne Fenster alles mitnehmen, was bereits wartet
+            while len(stapel) < self.max_batch and not self._warteschlange.empty():
+                stapel.append(self._warteschlange.get_nowait())
+            self.stapel += 1
+            self.auftraege += len(stapel)
+            try:
+                ergebnisse = await loop.run_in_executor(self.executor, self.verarbeite, [daten for daten, _ in stapel])
+            except Exception as e:
+                ergebnisse = [e] * len(stapel)
+            for (_, zukunft), ergebnis in zip(stapel, ergebnisse):
+                if zukunft.done():
+                    continue  # Verbindung inzwischen abgebrochen
+                if isinstance(ergebnis, Exception):
+                    zukunft.set_exception(ergebnis)
+                else:
+                    zukunft.set_result(ergebnis)
+
+
+class GewebeServer:
+    """HTTP/1.1-Server (Keep-Alive, JSON) über asyncio-Streams für ein NeuesTextVerstehen.
+
+    Schreibende Aufträge laufen nacheinander in einem eigenen Thread (die Schreibsperre des Gewebes
+    serialisiert sie ohnehin), Impulse in einem zweiten Thread über reagiere_viele auf einer gemeinsamen Ansicht.
+    """
+
+    def __init__(self, gewebe: NeuesTextVerstehen, host: str = '127.0.0.1', port: int = 8080, fenster: float = 0.005,
+                 max_batch: int = 64, max_warteschlange: int = 1024, abfrage_threads: int = 4, einfuege_modus: str = 'sequentiell'):
+        self.gewebe = gewebe
+        self.host = host
+        self.port = port
+        self.abfrage_threads = abfrage_threads
+        self.einfuege_modus = einfuege_modus
+        self._schreiber = ThreadPoolExecutor(1, thread_name_prefix='gewebe-schreiber')
+        self._leser = ThreadPoolExecutor(1, thread_name_prefix='gewebe-impulse')
+        self._batch_parameter = {'fenster': fenster, 'max_batch': max_batch, 'max_warteschlange': max_warteschlange}
+        self.einfuegen = None
+        self.impulse = None
+        self._server = None
+
+    # --- Stapelverarbeitung (läuft in den Executor-Threads) ---
+
+    def _verarbeite_einfuegungen(self, auftraege: list[list[str]]) -> list:
+        """Ein fuege_ein_viele für alle Texte des Stapels; jede Anfrage bekommt ihre Ids zurück."""
+        texte = [text for auftrag in auftraege for text in auftrag]
+        ids = self.gewebe.fuege_ein_viele(texte, modus=self.einfuege_modus)
+        ergebnisse, start = [], 0
+        for auftrag in auftraege:
+            ergebnisse.append(ids[start:start + len(auftrag)])
+            start += len(auftrag)
+        return ergebnisse
+
+    def _verarbeite_impulse(self, auftraege: list[dict]) -> list:
+        """Alle Impulse des Stapels gemeinsam parsen und auf einer Ansicht ausbreiten (jeder Impuls nur einmal)."""
+        impulse = list(dict.fromkeys(auftrag['impuls'] for auftrag in auftraege))
+        # Verlangt ein Auftrag des Stapels ein vollständiges Gewebe, bekommt es der ganze Stapel
+        konsistenz = 'vollstaendig' if any(auftrag['konsistenz'] == 'vollstaendig' for auftrag in auftraege) else 'vorlaeufig'
+        reaktionen = dict(zip(impulse, self.gewebe.reagiere_viele(impulse, arbeiter=self.abfrage_threads, konsistenz=konsistenz)))
+        ergebnisse = []
+        for auftrag in auftraege:
+            reaktion = reaktionen[auftrag['impuls']]
+            stand = {'version': reaktion.ansicht.version, 'vorlaeufig': reaktion.ansicht.vorlaeufig}
+            if auftrag['art'] == 'reaktion':
+                ergebnisse.append({'impuls': reaktion.impuls, 'report': reaktion.bericht(), **stand})
+            else:
+                ergebnisse.append({'fragmente': reaktion.fragmente_mit_resonanz(auftrag['arten'], auftrag['mindest_staerke']), **stand})
+        return ergebnisse
+
+    def _loesche(self, index: int) -> dict:
+        if not self.gewebe._ist_aktiv(index):
+            raise AnfrageFehler(404, f"Fragment {index} existiert nicht oder ist bereits gelöscht.")
+        self.gewebe.loesche_fragment(index)
+        return {'geloescht': index}
+
+    def _verschmelze(self, index1: int, index2: int, modus: str) -> dict:
+        for index in (index1, index2):
+            if not self.gewebe._ist_aktiv(index):
+                raise AnfrageFehler(404, f"Fragment {index} existiert nicht oder ist bereits gelöscht.")
+        if index1 == index2:
+            raise AnfrageFehler(400, "Ein Fragment kann nicht mit sich selbst verschmolzen werden.")
+        neu = self.gewebe.verschmelze_fragmente(index1, index2, modus=modus)
+        return {'id': neu, 'fragmente': len(self.gewebe._fragmente)}
+
+    def _verschmelze_viele(self, paare: list) -> dict:
+        return {'ids': self.gewebe.verschmelze_viele(paare), 'fragmente': len(self.gewebe._fragmente)}
+
+    def _zustand(self) -> dict:
+        ansicht = self.gewebe.ansicht(warten=False)
+        return {**ansicht.kennzahlen, 'version': ansicht.version,
+                'warteschlangen': {b.name: {'wartend': len(b), 'stapel': b.stapel, 'auftraege': b.auftraege, 'abgelehnt': b.abgelehnt}
+                                   for b in (self.einfuegen, self.impulse)},
+                'verfeinerung': self.gewebe.verfeinerung_status()}
+
+    # --- Routing ---
+
+    async def bearbeite(self, methode: str, pfad: str, koerper: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        teile = [teil for teil in urlsplit(pfad).path.split('/') if teil]
+        if teile == ['fragmente']:
+            self._erwarte(methode, 'POST')
+            return {'id': (await self.einfuegen.einreichen([_text(koerper, 'text')]))[0]}
+        if teile == ['fragmente', 'viele']:
+            self._erwarte(methode, 'POST')
+            texte = koerper.get('texte')
+            if not isinstance(texte, list) or not all(isinstance(t, str) for t in texte):
+                raise AnfrageFehler(400, "'texte' muss eine Liste von Strings sein.")
+            return {'ids': await self.einfuegen.einreichen(texte)}
+        if len(teile) == 2 and teile[0] == 'fragmente':
+            self._erwarte(methode, 'DELETE')
+            return await loop.run_in_executor(self._schreiber, self._loesche, _ganzzahl(teile[1]))
+        if teile == ['verschmelzen']:
+            self._erwarte(methode, 'POST')
+            index1, index2 = _ganzzahl(koerper.get('index1')), _ganzzahl(koerper.get('index2'))
+            modus = koerper.get('modus', 'neu_parsen')
+            if modus not in ('neu_parsen', 'merkmale'):
+                raise AnfrageFehler(400, "'modus' muss 'neu_parsen' oder 'merkmale' sein.")
+            return await loop.run_in_executor(self._schreiber, self._verschmelze, index1, index2, modus)
+        if teile == ['verschmelzen', 'viele']:
+            self._erwarte(methode, 'POST')
+            paare = koerper.get('paare')
+            if not isinstance(paare, list) or not all(isinstance(paar, list) and len(paar) == 2 for paar in paare):
+                raise AnfrageFehler(400, "'paare' muss eine Liste von Paaren [index1, index2] sein.")
+            paare = [(_ganzzahl(index1), _ganzzahl(index2)) for index1, index2 in paare]
+            return await loop.run_in_executor(self._schreiber, self._verschmelze_viele, paare)
+        if teile == ['reaktion']:
+            self._erwarte(methode, 'POST')
+            return await self.impulse.einreichen({'art': 'reaktion', 'impuls': _text(koerper, 'impuls'),
+                                                  'konsistenz': _konsistenz(koerper)})
+        if teile == ['suche']:
+            self._erwarte(methode, 'POST')
+            arten = koerper.get('arten')
+            if not isinstance(arten, list) or not arten:
+                raise AnfrageFehler(400, "'arten' muss eine nicht leere Liste von Resonanz-Arten sein.")
+            mindest_staerke = koerper.get('mindest_staerke', 0.2)
+            if not isinstance(mindest_staerke, (int, float)):
+                raise AnfrageFehler(400, "'mindest_staerke' muss eine Zahl sein.")
+            return await self.impulse.einreichen({'art': 'suche', 'impuls': _text(koerper, 'impuls'), 'arten': arten,
+                                                  'mindest_staerke': float(mindest_staerke), 'konsistenz': _konsistenz(koerper)})
+        # Zustand und Messwerte können kurz auf die Schreibsperre warten: im Standard-Executor statt in der Ereignisschleife
+        if teile == ['zustand']:
+            self._erwarte(methode, 'GET')
+            return await loop.run_in_executor(None, self._zustand)
+        if teile == ['messwerte']:
+            self._erwarte(methode, 'GET')
+            return await loop.run_in_executor(None, self.gewebe.messwerte)
+        raise AnfrageFehler(404, f"Unbekannter Pfad '{pfad}'.")
+
+    @staticmethod
+    def _erwarte(methode: str, erlaubt: str):
+        if methode != erlaubt:
+            raise AnfrageFehler(405, f"Methode {methode} nicht erlaubt (erwartet {erlaubt}).")
+
+    # --- HTTP ---
+
+    async def _verbindung(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                anfrage = await _lies_anfrage(reader)
+                if anfrage is None:
+                    break
+                methode, pfad, kopf, rohkoerper = anfrage
+                kopfzeilen = {}
+                try:
+                    koerper = json.loads(rohkoerper) if rohkoerper else {}
+                    if not isinstance(koerper, dict):
+                        raise AnfrageFehler(400, "Der Anfragekörper muss ein JSON-Objekt sein.")
+                    status, antwort = 200, await self.bearbeite(methode, pfad, koerper)
+                except json.JSONDecodeError as e:
+                    status, antwort = 400, {'fehler': f"Ungültiges JSON: {e}"}
+                except AnfrageFehler as e:
+                    status, antwort = e.status, {'fehler': str(e)}
+                except Ueberlastet as e:
+                    status, antwort = 503, {'fehler': str(e)}
+                    kopfzeilen['Retry-After'] = '1'
+                except Exception as e:
+                    logger.exception("Fehler bei %s %s", methode, pfad)
+                    status, antwort = 500, {'fehler': f"{type(e).__name__}: {e}"}
+                schliessen = kopf.get('connection', '').lower() == 'close'
+                _schreibe_antwort(writer, status, antwort, kopfzeilen, schliessen)
+                await writer.drain()
+                if schliessen:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except AnfrageFehler as e:
+            _schreibe_antwort(writer, e.status, {'fehler': str(e)}, {}, True)
+        finally:
+            writer.close()
+
+    async def starte(self):
+        params = self._batch_parameter
+        self.einfuegen = MikroBatcher('einfuegen', self._verarbeite_einfuegungen, self._schreiber, **params)
+        self.impulse = MikroBatcher('impulse', self._verarbeite_impulse, self._leser, **params)
+        self.einfuegen.starte()
+        self.impulse.starte()
+        self._server = await asyncio.start_server(self._verbindung, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # bei port=0 der tatsächlich vergebene Port
+
+    async def stoppe(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.einfuegen.stoppe()
+        await self.impulse.stoppe()
+        self._schreiber.shutdown(wait=True)
+        self._leser.shutdown(wait=True)
+
+    async def laufe(self):
+        await self.starte()
+        logger.info("Gewebe-Server lauscht auf http://%s:%d", self.host, self.port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stoppe()
+
+
+def _text(koerper: dict, feld: str) -> str:
+    wert = koerper.get(feld)
+    if not isinstance(wert, str) or not wert.strip():
+        raise AnfrageFehler(400, f"'{feld}' muss ein nicht leerer String sein.")
+    return wert
+
+
+def _konsistenz(koerper: dict) -> str:
+    konsistenz = koerper.get('konsistenz', 'vorlaeufig')
+    if konsistenz not in KONSISTENZ_STUFEN:
+        raise AnfrageFehler(400, f"'konsistenz' muss einer von {', '.join(KONSISTENZ_STUFEN)} sein.")
+    return konsistenz
+
+
+def _ganzzahl(wert) -> int:
+    try:
+        return int(wert)
+    except (TypeError, ValueError):
+        raise AnfrageFehler(400, f"'{wert}' ist keine gültige Fragment-Id.")
+
+
+async def _lies_anfrage(reader: asyncio.StreamReader):
+    """Liest eine HTTP/1.1-Anfrage; None, wenn der Client die Verbindung geschlossen hat."""
+    zeile = await reader.readline()
+    if not zeile:
+        return None
+    try:
+        methode, pfad, _ = zeile.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise AnfrageFehler(400, "Ungültige Anfragezeile.")
+    kopf = {}
+    while True:
+        zeile = await reader.readline()
+        if zeile in (b'\r\n', b'\n', b''):
+            break
+        name, _, wert = zeile.decode('latin-1').partition(':')
+        kopf[name.strip().lower()] = wert.strip()
+    try:
+        laenge = int(kopf.get('content-length', 0) or 0)
+    except ValueError:
+        laenge = -1
+    if laenge < 0:
+        raise AnfrageFehler(400, f"Ungültige Content-Length '{kopf['content-length']}'.")
+    if laenge > MAX_KOERPER:
+        raise AnfrageFehler(413, f"Anfragekörper größer als {MAX_KOERPER} Bytes.")
+    koerper = await reader.readexactly(laenge) if laenge else b''
+    return methode.upper(), pfad, kopf, koerper
+
+
+def _schreibe_antwort(writer: asyncio.StreamWriter, status: int, antwort: dict, kopfzeilen: dict, schliessen: bool):
+    daten = json.dumps(antwort, ensure_ascii=False).encode('utf-8')
+    kopf = [f"HTTP/1.1 {status} {STATUS_TEXTE.get(status, '')}", "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(daten)}", f"Connection: {'close' if schliessen else 'keep-alive'}"]
+    kopf += [f"{name}: {wert}" for name, wert in kopfzeilen.items()]
+    writer.write(("\r\n".join(kopf) + "\r\n\r\n").encode('latin-1') + daten)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON-Dienst für das Gewebe des Verstehens")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--snapshot', help="Gewebe aus diesem Snapshot-Verzeichnis laden (siehe NeuesTextVerstehen.save)")
+    parser.add_argument('--journal', help="Journal-Verzeichnis öffnen (stellt nach einem Absturz den Zustand wieder her)")
+    parser.add_argument('--fenster-ms', type=float, default=5.0, help="Sammelfenster des Mikro-Batchings")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--warteschlange', type=int, default=1024, help="Wartende Aufträge je Art, darüber 503")
+    parser.add_argument('--abfrage-threads', type=int, default=4)
+    parser.add_argument('--einfuege-modus', choices=['sequentiell', 'batch'], default='sequentiell')
+    parser.add_argument('--messung', action='store_true', help="Zeiten und Zähler der heißen Pfade erfassen (GET /messwerte)")
+    parser.add_argument('--verfeinerung', action='store_true',
+                        help="Latenzbegrenztes Einfügen: triadische Durchläufe im Hintergrund (siehe setze_verfeinerung)")
+    parser.add_argument('--budget-paare', type=int, default=20000, help="ML-Paare je Schritt der Verfeinerung")
+    parser.add_argument('--budget-ms', type=float, default=50.0, help="Millisekunden je Schritt der Verfeinerung")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    gewebe = NeuesTextVerstehen.load(args.snapshot) if args.snapshot else NeuesTextVerstehen()
+    if args.verfeinerung:
+        gewebe.setze_verfeinerung(budget_paare=args.budget_paare, budget_ms=args.budget_ms)
+    if args.journal:
+        gewebe.oeffne_journal(args.journal)
+    if args.messung:
+        gewebe.aktiviere_messung()
+    server = GewebeServer(gewebe, args.host, args.port, fenster=args.fenster_ms / 1000, max_batch=args.max_batch,
+                          max_warteschlange=args.warteschlange, abfrage_threads=args.abfrage_threads,
+                          einfuege_modus=args.einfuege_modus)
+    try:
+        asyncio.run(server.laufe())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gewebe.schliesse()
+
+
+if __name__ == "__main__":
+    main()
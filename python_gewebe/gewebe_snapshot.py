@@ -0,0 +1,96 @@
+########################################
+# Datei: ./gewebe_snapshot.py
+# Beschreibung: Speichern und schnelles Laden eines Gewebes ohne erneutes Parsen und ohne Neuberechnung der Resonanzen.
+########################################
+
+import json
+import os
+
+import numpy as np
+
+from kanten_speicher import KantenSpeicher
+from merkmal_speicher import MerkmalSpeicher
+from vektor_index import lade_vektor_index
+
+SNAPSHOT_FORMAT = 2
+LESBARE_FORMATE = (1, 2)
+META_DATEI = 'gewebe.json'
+
+# Verzeichnislayout eines Snapshots:
+#   gewebe.json          Format, Fragmenttexte (null = Tombstone), Konzepte, Kern-Lemmata, Art-Namen, Kontext-Tabelle
+#   merkmale_*.npy       Vektoren (memory-mapbar), Normen, Sentiments, has_vector, Token-Schlüssel
+#   kanten_*.npy         Kanten spaltenweise: quelle, ziel, art (Code), staerke (float32), kontext und ereignis (Ids in der Kontext-Tabelle)
+#   struktur_quellen.npy Quellen mit einer Zeile im KantenSpeicher (auch solche ohne ausgehende Kanten)
+#   vektor_index.npz     der Vektor-Index, falls einer gesetzt ist
+INDEX_DATEI = 'vektor_index.npz'
+MERKMAL_ARRAYS = ('vektoren', 'normen', 'sentiments', 'hat_vektor', 'schluessel')
+
+
+def _speichere_npy(verzeichnis: str, name: str, array):
+    np.save(os.path.join(verzeichnis, f"{name}.npy"), np.ascontiguousarray(array))
+
+
+def speichere_snapshot(gewebe, pfad: str, zusatz: dict = None):
+    """Schreibt den Zustand eines Gewebes in das Verzeichnis `pfad` (wird angelegt bzw. überschrieben).
+
+    `zusatz` landet unverändert in den Metadaten (z.B. die letzte Sequenznummer des Journals).
+    """
+    os.makedirs(pfad, exist_ok=True)
+    for name, array in gewebe._merkmale.als_arrays().items():
+        _speichere_npy(pfad, f"merkmale_{name}", array)
+
+    # Die Kantenspalten des KantenSpeichers unverändert, nach Quelle und Einfügereihenfolge geordnet
+    kanten = gewebe._resonanzen_struktur
+    for name, spalte in kanten.spalten().items():
+        _speichere_npy(pfad, f"kanten_{name}", spalte)
+    _speichere_npy(pfad, 'struktur_quellen', np.array(kanten.keys(), dtype=np.int32))
+
+    index_pfad = os.path.join(pfad, INDEX_DATEI)
+    if gewebe._vektor_index is not None:
+        gewebe._vektor_index.speichere(index_pfad)
+    elif os.path.exists(index_pfad):
+        os.remove(index_pfad)
+
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'fragmente': gewebe._fragmente,
+        'konzepte': [sorted(k) for k in gewebe._merkmale.konzepte],
+        'kern_lemmata': [None if k is None else list(k) for k in gewebe._merkmale.kern_lemmata],
+        'art_namen': kanten.art_namen,
+        'kontexte': kanten.kontexte,
+        'zusatz': zusatz or {},
+    }
+    # Die Metadaten zuletzt und atomar schreiben: ein Snapshot ohne gewebe.json gilt als unvollständig
+    temp = os.path.join(pfad, META_DATEI + '.tmp')
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(temp, os.path.join(pfad, META_DATEI))
+
+
+def lade_snapshot(gewebe, pfad: str, mmap: bool = True) -> dict:
+    """Stellt ein Gewebe aus einem Snapshot wieder her und gibt die Metadaten zurück; die Vektoren werden bei `mmap` nur eingeblendet."""
+    with open(os.path.join(pfad, META_DATEI), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') not in LESBARE_FORMATE:
+        raise ValueError(f"Unbekanntes Snapshot-Format {meta.get('format')} in '{pfad}'.")
+
+    lade = lambda name, modus=None: np.load(os.path.join(pfad, f"{name}.npy"), mmap_mode=modus)
+    # 'c' = copy-on-write: Änderungen (z.B. Löschen) bleiben im Prozess, die Datei wird nie verändert
+    arrays = {name: lade(f"merkmale_{name}", 'c' if mmap and name == 'vektoren' else None) for name in MERKMAL_ARRAYS}
+    gewebe._merkmale = MerkmalSpeicher.aus_arrays(arrays, meta['konzepte'], meta.get('kern_lemmata'))
+
+    gewebe._fragmente = meta['fragmente']
+    gewebe._text_ids = {}
+    for index, text in enumerate(gewebe._fragmente):
+        if text is not None:
+            gewebe._text_ids.setdefault(text, []).append(index)
+
+    kanten = {name: lade(f"kanten_{name}") for name in ('quelle', 'ziel', 'art', 'staerke', 'kontext')}
+    # Format 1 hatte keine Ereignis-Spalte (der Kontext-Text enthielt alle Ereignisse) und Stärken als float64
+    kanten['ereignis'] = lade('kanten_ereignis') if os.path.exists(os.path.join(pfad, 'kanten_ereignis.npy')) else None
+    gewebe._resonanzen_struktur = KantenSpeicher.aus_spalten(meta['art_namen'], meta['kontexte'], zeilen=lade('struktur_quellen'), **kanten)
+    gewebe._statistik = gewebe._neue_statistik(vollstaendig=True)
+    index_pfad = os.path.join(pfad, INDEX_DATEI)
+    gewebe._vektor_index = lade_vektor_index(index_pfad) if os.path.exists(index_pfad) else None
+    gewebe._struktur_version += 1
+    return meta
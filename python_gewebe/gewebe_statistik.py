@@ -0,0 +1,144 @@
+########################################
+# Datei: ./gewebe_statistik.py
+# Beschreibung: Laufend gepflegte Kennzahlen des Gewebes (Resonanz-Arten, Stimmung, Anzahl Fragmente und Kanten).
+########################################
+
+import math
+from collections import Counter
+
+import numpy as np
+
+# Stärken werden als ganze Zahlen in Einheiten von 2**-64 aufsummiert. Für Stärken ab 2**-12 (gespeicherte Kanten
+# haben staerke >= 0.1) ist das exakt; kleinere werden abgeschnitten, aber beim Hinzufügen und Entfernen identisch.
+# Die Summe driftet daher auch nach Millionen Änderungen nicht.
+_SKALA = 2 ** 64
+
+
+def _exakt(wert: float) -> int:
+    return int(wert * 18446744073709551616.0)
+
+
+def _exakt_summe(werte) -> int:
+    """Summe von _exakt über ein Array, ohne Schleife über die Elemente.
+
+    Jeder Wert ist mantisse * 2**exponent mit einer 53-Bit-Ganzzahl als Mantisse; die Mantissen werden je Exponent
+    in zwei Hälften aufsummiert (damit int64 nicht überläuft) und dann verschoben. Nur Werte unter 2**-11, bei
+    denen _exakt abschneidet, laufen einzeln durch _exakt.
+    """
+    werte = np.asarray(werte, dtype=np.float64)
+    mantisse, exponent = np.frexp(werte)
+    ganz = (mantisse * 9007199254740992.0).astype(np.int64)  # * 2**53, exakt
+    summe = 0
+    for e in np.unique(exponent).tolist():
+        auswahl = exponent == e
+        verschiebung = e + 11  # werte * 2**64 = ganz * 2**(e + 11)
+        if verschiebung < 0:
+            summe += sum(_exakt(wert) for wert in werte[auswahl].tolist())
+            continue
+        teil = ganz[auswahl]
+        summe += ((int((teil >> 26).sum()) << 26) + int((teil & ((1 << 26) - 1)).sum())) << verschiebung
+    return summe
+
+
+class GewebeStatistik:
+    """Kennzahlen, die bei jeder Kantenänderung in O(1) nachgeführt werden.
+
+    Je Resonanz-Art werden Anzahl und Summe der Stärken gehalten; die Stimmung ergibt sich daraus über die
+    'stimmung_effekt'-Gewichte der Spürmuster (Summe über die Arten statt über alle Kanten). Die dominante
+    Resonanz ist die häufigste Art, bei Gleichstand die in `art_namen` zuerst genannte.
+    """
+
+    def __init__(self, stimmung_effekte: dict, art_namen: list[str], stimmung_namen: list[str]):
+        self.stimmung_effekte = stimmung_effekte
+        self.art_rang = {art: rang for rang, art in enumerate(art_namen)}
+        self.stimmung_namen = list(stimmung_namen)
+        self.art_anzahl = Counter()
+        self._art_staerke = {}
+        self.kanten = 0
+        self.aktive_fragmente = 0
+
+    def kante_hinzu(self, art: str, staerke: float):
+        self.art_anzahl[art] += 1
+        self._art_staerke[art] = self._art_staerke.get(art, 0) + _exakt(staerke)
+        self.kanten += 1
+
+    def kante_weg(self, art: str, staerke: float):
+        self.art_anzahl[art] -= 1
+        self._art_staerke[art] -= _exakt(staerke)
+        if not self.art_anzahl[art]:
+            del self.art_anzahl[art]
+            del self._art_staerke[art]
+        self.kanten -= 1
+
+    def kanten_hinzu_viele(self, code_namen: list[str], codes, staerken):
+        """Wie kante_hinzu für viele Kanten; `codes` indizieren `code_namen` (z.B. die Art-Codes des KantenSpeichers)."""
+        self._aendere_viele(code_namen, codes, staerken, 1)
+
+    def kanten_weg_viele(self, code_namen: list[str], codes, staerken):
+        self._aendere_viele(code_namen, codes, staerken, -1)
+
+    def _aendere_viele(self, code_namen: list[str], codes, staerken, vorzeichen: int):
+        codes, staerken = np.asarray(codes), np.asarray(staerken)
+        for code in np.unique(codes).tolist():
+            auswahl = codes == code
+            art, anzahl = code_namen[code], int(auswahl.sum())
+            self.art_anzahl[art] += vorzeichen * anzahl
+            self._art_staerke[art] = self._art_staerke.get(art, 0) + vorzeichen * _exakt_summe(staerken[auswahl])
+            if not self.art_anzahl[art]:
+                del self.art_anzahl[art]
+                del self._art_staerke[art]
+            self.kanten += vorzeichen * anzahl
+
+    def art_staerke(self, art: str) -> float:
+        """Summe der Stärken aller Kanten dieser Art (korrekt gerundet)."""
+        return self._art_staerke.get(art, 0) / _SKALA
+
+    def stimmung(self) -> dict:
+        stimmung = dict.fromkeys(self.stimmung_namen, 0.0)
+        for art in self.art_anzahl:
+            summe = self.art_staerke(art)
+            for key, val in self.stimmung_effekte.get(art, {}).items():
+                stimmung[key] = stimmung.get(key, 0.0) + val * summe
+        return stimmung
+
+    def dominante_resonanz(self) -> str:
+        if not self.art_anzahl:
+            return "Keine"
+        return max(self.art_anzahl, key=lambda art: (self.art_anzahl[art], -self.art_rang.get(art, len(self.art_rang))))
+
+    @classmethod
+    def aus_struktur(cls, struktur: dict, fragmente: list, stimmung_effekte: dict, art_namen: list[str],
+                     stimmung_namen: list[str]) -> 'GewebeStatistik':
+        """Vollständige Neuberechnung aus den Kanten, z.B. nach dem Laden oder zum Abgleich."""
+        statistik = cls(stimmung_effekte, art_namen, stimmung_namen)
+        statistik.aktive_fragmente = sum(1 for fragment in fragmente if fragment is not None)
+        for ausgehende in struktur.values():
+            for res in ausgehende.values():
+                statistik.kante_hinzu(res.art, res.staerke)
+        return statistik
+
+    @classmethod
+    def aus_kanten(cls, code_namen: list[str], codes, staerken, fragmente: list, stimmung_effekte: dict, art_namen: list[str],
+                   stimmung_namen: list[str]) -> 'GewebeStatistik':
+        """Vollständige Neuberechnung aus Kantenspalten (Art-Codes in `code_namen`, Stärken), vektorisiert."""
+        statistik = cls(stimmung_effekte, art_namen, stimmung_namen)
+        statistik.aktive_fragmente = sum(1 for fragment in fragmente if fragment is not None)
+        statistik.kanten_hinzu_viele(code_namen, codes, staerken)
+        return statistik
+
+    def abweichungen(self, andere: 'GewebeStatistik', toleranz: float = 1e-9) -> list[str]:
+        """Beschreibt alle Unterschiede zu `andere`; eine leere Liste heißt konsistent."""
+        fehler = []
+        if self.aktive_fragmente != andere.aktive_fragmente:
+            fehler.append(f"aktive Fragmente: {self.aktive_fragmente} != {andere.aktive_fragmente}")
+        if self.kanten != andere.kanten:
+            fehler.append(f"Kanten: {self.kanten} != {andere.kanten}")
+        if self.art_anzahl != andere.art_anzahl:
+            fehler.append(f"Arten: {dict(self.art_anzahl)} != {dict(andere.art_anzahl)}")
+        if self._art_staerke != andere._art_staerke:
+            fehler.append("Stärkesummen je Art weichen ab")
+        for key, wert in self.stimmung().items():
+            soll = andere.stimmung().get(key, 0.0)
+            if not math.isclose(wert, soll, rel_tol=toleranz, abs_tol=toleranz):
+                fehler.append(f"Stimmung '{key}': {wert} != {soll}")
+        return fehler
@@ -0,0 +1,149 @@
+########################################
+# Datei: ./gewebe_stub.py
+# Beschreibung: Stub-NLP und synthetischer Korpus, damit Benchmarks und Tests ohne 'de_core_news_lg' laufen.
+########################################
+
+import contextlib
+import hashlib
+import io
+import random
+
+import numpy as np
+
+from text_gewebe import NeuesTextVerstehen
+
+VEKTOR_DIM = 300  # wie de_core_news_lg, damit die trainierten Modelle (3 x 300 Features) passen
+
+_STOPWOERTER = {"der", "die", "das", "ein", "eine", "ist", "und", "zu", "es", "sich", "im", "in", "den", "dem", "mit", "auf", "wie", "was"}
+_LEXIKON = {
+    'NOUN': ["Gewebe", "Muster", "Welle", "Versuch", "Gefühl", "Zustand", "Resonanz", "Ziel", "Analyse", "Spürlogik",
+             "Verstehen", "Komplexität", "Linie", "Punkt", "Fragment", "Regen", "Freude", "Konflikt", "Spannung", "Problem"],
+    'VERB': ["erfassen", "zählen", "verstehen", "fühlen", "führen", "tragen", "verbinden", "stören", "wachsen", "zeigen"],
+    'ADJ': ["schwer", "harmonisch", "klar", "dunkel", "offen", "tief", "schwierig", "gut", "traurig", "friedlich"],
+}
+_WORTART = {wort.lower(): pos for pos, woerter in _LEXIKON.items() for wort in woerter}
+
+
+class _StubToken:
+    def __init__(self, text: str):
+        self.text = text
+        self.lemma_ = text.lower()
+        self.is_punct = text in {".", ",", "?", "!"}
+        self.is_stop = self.lemma_ in _STOPWOERTER
+        self.pos_ = 'PUNCT' if self.is_punct else _WORTART.get(self.lemma_, 'X')
+
+
+class _StubVectors:
+    # wie spaCys Vectors: eine Zeile je Lexikonwort (die Wortvektoren selbst kommen aus StubNlp._wortvektor)
+    shape = (len(_WORTART), VEKTOR_DIM)
+    size = shape[0] * shape[1]
+
+
+class _StubVocab:
+    vectors = _StubVectors()
+
+
+class _StubDoc:
+    vocab = _StubVocab()
+
+    def __init__(self, text: str, tokens: list, vector):
+        self.text = text
+        self._tokens = tokens
+        self.vector = vector
+        self.vector_norm = float(np.sqrt(np.sum(vector.astype(np.float64) ** 2)))
+        self.has_vector = bool(tokens)
+
+    def __iter__(self):
+        return iter(self._tokens)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def similarity(self, other) -> float:
+        if [t.text for t in self] == [t.text for t in other]:
+            return 1.0  # wie spaCy: identische Tokenfolgen
+        if self.vector_norm == 0 or other.vector_norm == 0:
+            return 0.0
+        return float(np.dot(self.vector, other.vector) / (self.vector_norm * other.vector_norm))
+
+
+class StubNlp:
+    """Deterministisches Mini-NLP: Wortvektoren aus einem Hash, Wortarten aus einem kleinen Lexikon."""
+    vocab = _StubVocab()
+    meta = {'lang': 'de', 'name': 'stub', 'version': '0'}
+
+    def __init__(self, dim: int = VEKTOR_DIM):
+        self.dim = dim
+        self._wortvektoren = {}
+
+    def _wortvektor(self, wort: str):
+        if wort not in self._wortvektoren:
+            seed = int.from_bytes(hashlib.sha1(wort.encode('utf-8')).digest()[:8], 'little')
+            self._wortvektoren[wort] = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return self._wortvektoren[wort]
+
+    def __call__(self, text: str):
+        tokens = [_StubToken(t) for t in text.replace(".", " .").replace(",", " ,").replace("?", " ?").split()]
+        woerter = [t.lemma_ for t in tokens if not t.is_punct]
+        if woerter:
+            vector = np.mean([self._wortvektor(w) for w in woerter], axis=0).astype(np.float32)
+        else:
+            vector = np.zeros(self.dim, dtype=np.float32)
+        return _StubDoc(text, tokens, vector)
+
+    def pipe(self, texts, batch_size: int = 1000, n_process: int = 1):
+        for text in texts:
+            yield self(text)
+
+    @contextlib.contextmanager
+    def select_pipes(self, enable=None, disable=None):
+        """Wie nlp.select_pipes; der Stub hat keine Pipeline-Komponenten."""
+        yield
+
+    def tokenizer(self, text: str):
+        """Entspricht nlp.tokenizer (nur die Tokens sind gefragt; der Stub rechnet den Vektor ohnehin mit)."""
+        return self(text)
+
+
+class StubGewebe(NeuesTextVerstehen):
+    """NeuesTextVerstehen mit Stub-NLP; die ML-Modelle werden wie gewohnt geladen, falls vorhanden."""
+
+    def _load_spacy_model(self):
+        self.nlp = StubNlp()
+
+
+def synthetischer_korpus(anzahl: int, seed: int = 42) -> list[str]:
+    """Erzeugt deutsche Satzfragmente aus dem Stub-Lexikon."""
+    rng = random.Random(seed)
+    korpus = []
+    for _ in range(anzahl):
+        nomen = rng.sample(_LEXIKON['NOUN'], 2)
+        korpus.append(f"Das {nomen[0]} {rng.choice(_LEXIKON['VERB'])} {rng.choice(_LEXIKON['ADJ'])} "
+                      f"im {nomen[1]}, {rng.choice(['und', 'aber', 'jedoch'])} es ist {rng.choice(_LEXIKON['ADJ'])}.")
+    return korpus
+
+
+def erzeuge_gewebe(triaden_modus: str = 'batch', mit_ml: bool = True) -> StubGewebe:
+    """Ein leeres StubGewebe; `mit_ml=False` schaltet auf die heuristische triadische Bewertung."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        gewebe = StubGewebe()
+    gewebe._triaden_modus = triaden_modus
+    if not mit_ml:
+        gewebe._ml_models_loaded = False
+    return gewebe
+
+
+def kanten_signatur(gewebe: NeuesTextVerstehen) -> dict:
+    """Alle Kanten als {(quelle, ziel): (art, staerke, kontext)}, zum Vergleich zweier Gewebe."""
+    return {(i, j): (res.art, round(res.staerke, 9), res.kontext)
+            for i, ziele in gewebe._resonanzen_struktur.items() for j, res in ziele.items()}
+
+
+def gewebe_ohne_kanten(anzahl: int) -> StubGewebe:
+    """Füllt nur Fragmente und Merkmale (ohne Resonanzen), um einzelne Spür-Schritte isoliert zu messen."""
+    gewebe = erzeuge_gewebe()
+    for i, text in enumerate(synthetischer_korpus(anzahl)):
+        gewebe._fragmente.append(text)
+        gewebe._text_ids.setdefault(text, []).append(i)
+        gewebe._merkmale.setze(i, gewebe._merkmale_aus_text(text))
+    return gewebe
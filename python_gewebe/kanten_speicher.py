@@ -0,0 +1,507 @@
+########################################
+# Datei: ./kanten_speicher.py
+# Beschreibung: Spaltenweise Ablage der Resonanzkanten (Arrays statt eines Objekts pro Kante) mit O(1)-Zugriff über (quelle, ziel).
+########################################
+
+from array import array
+
+import numpy as np
+
+# Fibonacci-Hashing des Schlüssels quelle << 32 | ziel
+_GOLD = 0x9E3779B97F4A7C15
+_M64 = (1 << 64) - 1
+_FREI = -1
+
+
+class ResonanzVerbindung:
+    """Repräsentiert eine gerichtete Resonanzverbindung zwischen zwei Fragmenten.
+
+    Die Kanten selbst liegen spaltenweise im KantenSpeicher; ein ResonanzVerbindung-Objekt ist eine Momentaufnahme
+    einer Kante bzw. der Wert, mit dem eine Kante gesetzt wird. Änderungen am Objekt wirken nicht auf das Gewebe
+    zurück. `kontext` setzt sich aus der Herkunft (z.B. den erfüllten Spür-Kriterien) und dem letzten
+    triadischen Ereignis zusammen.
+    """
+    __slots__ = ('quelle', 'ziel', 'art', 'staerke', 'herkunft', 'ereignis')
+
+    def __init__(self, quelle_index: int, ziel_index: int, art: str, staerke: float, kontext: str, ereignis: str = ''):
+        self.quelle = quelle_index
+        self.ziel = ziel_index
+        self.art = art
+        self.staerke = staerke
+        self.herkunft = kontext
+        self.ereignis = ereignis
+
+    @property
+    def kontext(self) -> str:
+        return ", ".join(teil for teil in (self.herkunft, self.ereignis) if teil)
+
+    def __repr__(self):
+        return f"ResonanzVerbindung(q={self.quelle}, z={self.ziel}, art='{self.art}', staerke={self.staerke:.2f})"
+
+    def to_dict(self):
+        return {'quelle': self.quelle, 'ziel': self.ziel, 'art': self.art, 'staerke': self.staerke, 'kontext': self.kontext}
+
+
+class KantenZeile:
+    """Lesesicht auf die ausgehenden Kanten einer Quelle, wie früher das innere Dict (Ziel -> ResonanzVerbindung)."""
+
+    def __init__(self, speicher: 'KantenSpeicher', quelle: int):
+        self._speicher = speicher
+        self.quelle = quelle
+
+    def __len__(self):
+        return self._speicher.grad(self.quelle)
+
+    def __contains__(self, ziel):
+        return self._speicher.finde(self.quelle, ziel) >= 0
+
+    def __getitem__(self, ziel) -> ResonanzVerbindung:
+        kante = self.get(ziel)
+        if kante is None:
+            raise KeyError(ziel)
+        return kante
+
+    def get(self, ziel, standard=None):
+        slot = self._speicher.finde(self.quelle, ziel)
+        return standard if slot < 0 else self._speicher.verbindung(slot)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self) -> list[int]:
+        return self._speicher._ziel[self._speicher.zeile_slots(self.quelle)].tolist()
+
+    def values(self) -> list[ResonanzVerbindung]:
+        return [self._speicher.verbindung(slot) for slot in self._speicher.zeile_slots(self.quelle).tolist()]
+
+    def items(self) -> list[tuple]:
+        return [(kante.ziel, kante) for kante in self.values()]
+
+
+class KantenSpeicher:
+    """Alle Resonanzkanten in parallelen Arrays: quelle/ziel (int32), Art-Code (uint8), staerke (float32) sowie
+    Herkunft und letztes Ereignis als Ids in einer Tabelle internierter Kontext-Texte.
+
+    Eine offene Hashtabelle (lineares Sondieren) verweist von (quelle, ziel) auf den Slot einer Kante. Neue Kanten
+    werden hinten angehängt, ein Ersetzen behält den Slot, gelöschte Slots (quelle = -1) bleiben als Lücke stehen,
+    bis beim nächsten Wachsen verdichtet wird. Dadurch ist die Slot-Reihenfolge innerhalb einer Quelle die
+    Einfügereihenfolge, wie im früheren Dict-of-Dicts. Quellen werden aufsteigend durchlaufen.
+
+    Je Knoten führt der Speicher die Slots seiner ausgehenden und eingehenden Kanten (`_aus`/`_ein`, ein int32-Array
+    je Knoten, aufsteigend nach Slot). Damit kosten eine Zeile und das Entfernen eines Knotens O(Grad) statt
+    O(Knoten). Gelöschte Slots bleiben in diesen Listen stehen und werden beim Lesen übersprungen; beim Verdichten
+    werden die Listen neu aufgebaut, beim Lesen einer Zeile mit überwiegend gelöschten Slots wird diese bereinigt.
+
+    Lesend verhält sich der Speicher wie das frühere Dict Quelle -> {Ziel -> ResonanzVerbindung}
+    (keys/items/values/get/[]); geschrieben wird nur über setze/entferne und die vektorisierten *_viele-Methoden.
+    """
+
+    def __init__(self, art_namen: list[str], kapazitaet: int = 1024):
+        self.art_namen = list(art_namen)
+        self._art_codes = {art: code for code, art in enumerate(self.art_namen)}
+        self.kontexte = ['']  # Id 0 = kein Kontext
+        self._kontext_ids = {'': 0}
+        self.kanten = 0
+        self._anzahl = 0  # belegte Slots einschließlich gelöschter
+        self._reserviere(max(16, kapazitaet))
+        self._zeile_da = np.zeros(0, dtype=bool)
+        self._grad = np.zeros(0, dtype=np.int32)
+        self._aus, self._ein = [], []  # je Knoten die Slots seiner aus- bzw. eingehenden Kanten
+        self._zeilen = 0
+
+    # --- Ablage ---
+
+    def _reserviere(self, kapazitaet: int):
+        self._quelle = np.full(kapazitaet, -1, dtype=np.int32)
+        self._ziel = np.zeros(kapazitaet, dtype=np.int32)
+        self._art = np.zeros(kapazitaet, dtype=np.uint8)
+        self._staerke = np.zeros(kapazitaet, dtype=np.float32)
+        self._kontext = np.zeros(kapazitaet, dtype=np.int32)
+        self._ereignis = np.zeros(kapazitaet, dtype=np.int32)
+        # Mindestens doppelt so viele Tabellenplätze wie Slots: die Füllung (einschließlich gelöschter) bleibt <= 1/2
+        self._bits = max(5, int(2 * kapazitaet - 1).bit_length())
+        self._verschiebung = 64 - self._bits
+        self._maske = (1 << self._bits) - 1
+        self._tabelle = np.full(1 << self._bits, _FREI, dtype=np.int32)
+
+    def _spalten_arrays(self) -> tuple:
+        return self._quelle, self._ziel, self._art, self._staerke, self._kontext, self._ereignis
+
+    def _baue_neu(self, slots, kapazitaet: int):
+        """Legt die Arrays mit `kapazitaet` Slots neu an, übernimmt die Kanten `slots` in dieser Reihenfolge und baut die Hashtabelle."""
+        alt = [spalte[slots] for spalte in self._spalten_arrays()]
+        self._reserviere(kapazitaet)
+        n = len(slots)
+        for spalte, werte in zip(self._spalten_arrays(), alt):
+            spalte[:n] = werte
+        self._anzahl = n
+        self._eintragen_viele(np.arange(n, dtype=np.int32))
+        self._baue_listen()
+
+    def _baue_listen(self):
+        """Baut die Slot-Listen je Knoten aus den belegten Slots neu auf (aufsteigend nach Slot)."""
+        slots = np.flatnonzero(self._quelle[:self._anzahl] >= 0)
+        self._aus = [array('i') for _ in range(len(self._grad))]
+        self._ein = [array('i') for _ in range(len(self._grad))]
+        self._haenge_an(self._quelle[slots], self._ziel[slots], slots)
+
+    def _haenge_an(self, quelle, ziel, slots):
+        """Hängt aufsteigende Slots an die Listen ihrer Quellen und Ziele an (eine Schleife über die Knoten, nicht die Kanten)."""
+        slots = np.asarray(slots, dtype=np.int32)
+        for listen, knoten in ((self._aus, quelle), (self._ein, ziel)):
+            ordnung = np.argsort(knoten, kind='stable')
+            sortiert = np.asarray(knoten)[ordnung]
+            grenzen = np.flatnonzero(np.diff(sortiert)) + 1
+            for k, teil in zip(sortiert[np.r_[0, grenzen]].tolist() if len(sortiert) else [], np.split(slots[ordnung], grenzen)):
+                listen[k].frombytes(teil.tobytes())
+
+    def _lebende_slots(self, listen: list, knoten: int):
+        """Die noch belegten Slots der Liste eines Knotens; überwiegen die gelöschten, wird die Liste bereinigt."""
+        if knoten >= len(listen) or not listen[knoten]:
+            return np.zeros(0, dtype=np.intp)
+        slots = np.frombuffer(listen[knoten], dtype=np.int32).astype(np.intp)
+        lebend = slots[self._quelle[slots] >= 0]
+        if 2 * len(lebend) < len(slots):
+            listen[knoten] = array('i', lebend.astype(np.int32).tobytes())
+        return lebend
+
+    def _platz_fuer(self, anzahl: int):
+        """Sorgt für `anzahl` freie Slots am Ende: verdichtet, wenn mindestens die Hälfte der Slots gelöscht ist, sonst wächst der Speicher."""
+        if self._anzahl + anzahl <= len(self._quelle):
+            return
+        lebend = np.flatnonzero(self._quelle[:self._anzahl] >= 0)
+        kapazitaet = len(self._quelle)
+        if 2 * len(lebend) > self._anzahl or len(lebend) + anzahl > kapazitaet:
+            kapazitaet = max(2 * kapazitaet, len(lebend) + anzahl)
+        self._baue_neu(lebend, kapazitaet)
+
+    def _sichere_knoten(self, anzahl: int):
+        if anzahl > len(self._grad):
+            neu = max(anzahl, 2 * len(self._grad), 64)
+            self._zeile_da = np.concatenate([self._zeile_da, np.zeros(neu - len(self._zeile_da), dtype=bool)])
+            self._grad = np.concatenate([self._grad, np.zeros(neu - len(self._grad), dtype=np.int32)])
+            self._aus.extend(array('i') for _ in range(neu - len(self._aus)))
+            self._ein.extend(array('i') for _ in range(neu - len(self._ein)))
+
+    def art_code(self, art: str) -> int:
+        code = self._art_codes.get(art)
+        if code is None:
+            if len(self.art_namen) >= 256:
+                raise ValueError(f"Zu viele Resonanz-Arten für einen uint8-Code: '{art}'.")
+            code = self._art_codes[art] = len(self.art_namen)
+            self.art_namen.append(art)
+        return code
+
+    def kontext_id(self, text: str) -> int:
+        kontext_id = self._kontext_ids.get(text)
+        if kontext_id is None:
+            kontext_id = self._kontext_ids[text] = len(self.kontexte)
+            self.kontexte.append(text)
+        return kontext_id
+
+    # --- Hashtabelle ---
+
+    def _hash_viele(self, quelle, ziel):
+        schluessel = (quelle.astype(np.uint64) << np.uint64(32)) | ziel.astype(np.uint64)
+        return ((schluessel * np.uint64(_GOLD)) >> np.uint64(self._verschiebung)).astype(np.intp)
+
+    def finde(self, quelle: int, ziel: int) -> int:
+        """Slot der Kante quelle -> ziel oder -1."""
+        quelle, ziel = int(quelle), int(ziel)
+        h = ((((quelle << 32) | ziel) * _GOLD) & _M64) >> self._verschiebung
+        tabelle, quellen, ziele, maske = self._tabelle, self._quelle, self._ziel, self._maske
+        while True:
+            slot = int(tabelle[h])
+            if slot < 0:
+                return -1
+            if quellen[slot] == quelle and ziele[slot] == ziel:
+                return slot
+            h = (h + 1) & maske
+
+    def finde_viele(self, quelle, ziel):
+        """Slots der Kanten quelle[k] -> ziel[k] (-1, wo es keine gibt)."""
+        quelle, ziel = np.asarray(quelle, dtype=np.int64), np.asarray(ziel, dtype=np.int64)
+        slots = np.full(len(quelle), -1, dtype=np.intp)
+        offen = np.arange(len(quelle))
+        h = self._hash_viele(quelle, ziel)
+        while len(offen):
+            kandidat = self._tabelle[h]
+            leer = kandidat < 0
+            sicher = np.where(leer, 0, kandidat)
+            treffer = ~leer & (self._quelle[sicher] == quelle[offen]) & (self._ziel[sicher] == ziel[offen])
+            slots[offen[treffer]] = kandidat[treffer]
+            weiter = ~leer & ~treffer
+            offen, h = offen[weiter], (h[weiter] + 1) & self._maske
+        return slots
+
+    def _eintragen(self, slot: int, quelle: int, ziel: int):
+        quelle, ziel = int(quelle), int(ziel)
+        h = ((((quelle << 32) | ziel) * _GOLD) & _M64) >> self._verschiebung
+        while self._tabelle[h] >= 0:
+            h = (h + 1) & self._maske
+        self._tabelle[h] = slot
+
+    def _eintragen_viele(self, slots):
+        """Trägt Slots ein, deren Kanten noch nicht in der Tabelle stehen; Gelöschte bleiben als Grabstein belegt."""
+        h = self._hash_viele(self._quelle[slots], self._ziel[slots])
+        while len(slots):
+            frei = np.flatnonzero(self._tabelle[h] < 0)
+            _, erste = np.unique(h[frei], return_index=True)  # je freiem Platz gewinnt der erste Bewerber
+            gewaehlt = frei[erste]
+            self._tabelle[h[gewaehlt]] = slots[gewaehlt]
+            rest = np.ones(len(slots), dtype=bool)
+            rest[gewaehlt] = False
+            slots, h = slots[rest], (h[rest] + 1) & self._maske
+
+    # --- Dict-kompatible Lesesicht ---
+
+    def __len__(self):
+        return self._zeilen
+
+    def __contains__(self, quelle):
+        return 0 <= quelle < len(self._zeile_da) and bool(self._zeile_da[quelle])
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, quelle) -> KantenZeile:
+        if quelle not in self:
+            raise KeyError(quelle)
+        return KantenZeile(self, quelle)
+
+    def get(self, quelle, standard=None):
+        return KantenZeile(self, quelle) if quelle in self else standard
+
+    def keys(self) -> list[int]:
+        return np.flatnonzero(self._zeile_da).tolist()
+
+    def values(self) -> list[KantenZeile]:
+        return [KantenZeile(self, quelle) for quelle in self.keys()]
+
+    def items(self) -> list[tuple]:
+        return [(quelle, KantenZeile(self, quelle)) for quelle in self.keys()]
+
+    def grad(self, quelle: int) -> int:
+        return int(self._grad[quelle]) if 0 <= quelle < len(self._grad) else 0
+
+    def mittlere_staerke(self, knoten):
+        """Mittlere Stärke der ausgehenden Kanten je Knoten (0 ohne Kanten); eine Summe über alle belegten Slots."""
+        knoten = np.asarray(knoten, dtype=np.intp)
+        quelle = self._quelle[:self._anzahl]
+        belegt = quelle >= 0
+        summe = np.bincount(quelle[belegt], weights=self._staerke[:self._anzahl][belegt], minlength=len(self._grad))
+        grad = self._grad[knoten] if len(knoten) else np.zeros(0, dtype=np.int32)
+        return np.where(grad > 0, summe[knoten] / np.maximum(grad, 1), 0.0)
+
+    def staerken(self, quelle, ziel):
+        """Die Stärken der Kanten quelle[k] -> ziel[k] (0 für fehlende Kanten)."""
+        slots = self.finde_viele(quelle, ziel)
+        return np.where(slots >= 0, self._staerke[np.maximum(slots, 0)], 0.0) if len(slots) else np.zeros(0)
+
+    def verbindung(self, slot: int) -> ResonanzVerbindung:
+        ereignis = int(self._ereignis[slot])
+        return ResonanzVerbindung(int(self._quelle[slot]), int(self._ziel[slot]), self.art_namen[self._art[slot]],
+                                  float(self._staerke[slot]), self.kontexte[self._kontext[slot]], self.kontexte[ereignis] if ereignis else '')
+
+    def kante(self, quelle: int, ziel: int):
+        """Die Kante quelle -> ziel als ResonanzVerbindung oder None."""
+        slot = self.finde(quelle, ziel)
+        return None if slot < 0 else self.verbindung(slot)
+
+    def zeile_slots(self, quelle: int):
+        """Slots der ausgehenden Kanten einer Quelle in Einfügereihenfolge (O(Grad), über die Slot-Liste der Quelle)."""
+        if not self.grad(quelle):
+            return np.zeros(0, dtype=np.intp)
+        return self._lebende_slots(self._aus, quelle)
+
+    def spalten(self, nur_knoten=None) -> dict:
+        """Alle Kanten spaltenweise, nach Quelle und innerhalb einer Quelle in Einfügereihenfolge.
+
+        `nur_knoten` (bool-Array über die Knoten-Ids) lässt Kanten weg, deren Quelle oder Ziel dort False ist.
+        """
+        slots = np.flatnonzero(self._quelle[:self._anzahl] >= 0)
+        if nur_knoten is not None:
+            nur_knoten = np.asarray(nur_knoten, dtype=bool)
+            quelle, ziel = self._quelle[slots], self._ziel[slots]
+            gueltig = (quelle < len(nur_knoten)) & (ziel < len(nur_knoten))
+            slots = slots[gueltig]
+            slots = slots[nur_knoten[self._quelle[slots]] & nur_knoten[self._ziel[slots]]]
+        slots = slots[np.argsort(self._quelle[slots], kind='stable')]
+        return {'quelle': self._quelle[slots], 'ziel': self._ziel[slots], 'art': self._art[slots],
+                'staerke': self._staerke[slots], 'kontext': self._kontext[slots], 'ereignis': self._ereignis[slots]}
+
+    def speicherbedarf(self) -> int:
+        """Bytes der Arrays (Slots, Hashtabelle, Zeilen, Slot-Listen je Knoten) ohne die Kontext-Tabelle."""
+        listen = sum(liste.buffer_info()[1] * liste.itemsize for liste in self._aus + self._ein)
+        return (sum(spalte.nbytes for spalte in self._spalten_arrays()) + self._tabelle.nbytes + self._zeile_da.nbytes
+                + self._grad.nbytes + listen)
+
+    # --- Schreiben ---
+
+    def neue_zeile(self, quelle: int):
+        """Legt die (leere) Zeile einer Quelle an, wie früher struktur[quelle] = {}."""
+        self._sichere_knoten(quelle + 1)
+        if not self._zeile_da[quelle]:
+            self._zeile_da[quelle] = True
+            self._zeilen += 1
+
+    def setze(self, quelle: int, ziel: int, art: str, staerke: float, kontext: str = '', ereignis: str = ''):
+        """Setzt bzw. ersetzt die Kante quelle -> ziel; gibt (art, staerke) der ersetzten Kante zurück oder None."""
+        code, kontext_id, ereignis_id = self.art_code(art), self.kontext_id(kontext), self.kontext_id(ereignis)
+        slot = self.finde(quelle, ziel)
+        if slot >= 0:
+            alte = (self.art_namen[self._art[slot]], float(self._staerke[slot]))
+        else:
+            alte = None
+            self.neue_zeile(quelle)
+            self._sichere_knoten(ziel + 1)
+            self._platz_fuer(1)
+            slot = self._anzahl
+            self._anzahl += 1
+            self._quelle[slot], self._ziel[slot] = quelle, ziel
+            self._eintragen(slot, quelle, ziel)
+            self._aus[quelle].append(slot)
+            self._ein[ziel].append(slot)
+            self._grad[quelle] += 1
+            self.kanten += 1
+        self._art[slot], self._staerke[slot], self._kontext[slot], self._ereignis[slot] = code, staerke, kontext_id, ereignis_id
+        return alte
+
+    def _loesche_slots(self, slots):
+        quelle = self._quelle[slots]
+        alte = (self._art[slots].copy(), self._staerke[slots].copy())
+        np.subtract.at(self._grad, quelle, 1)
+        self._quelle[slots] = -1
+        self.kanten -= len(slots)
+        return alte
+
+    def entferne(self, quelle: int, ziel: int) -> tuple:
+        """Entfernt die Kante quelle -> ziel und gibt ihre (art, staerke) zurück; KeyError, wenn es sie nicht gibt."""
+        slot = self.finde(quelle, ziel)
+        if slot < 0:
+            raise KeyError((quelle, ziel))
+        alte = (self.art_namen[self._art[slot]], float(self._staerke[slot]))
+        self._quelle[slot] = -1
+        self._grad[quelle] -= 1
+        self.kanten -= 1
+        return alte
+
+    def setze_viele(self, quelle, ziel, art_codes, staerke, kontext_id=0, ereignis_id=0) -> tuple:
+        """Setzt viele Kanten auf einmal, neue in der gegebenen Reihenfolge; die Paare müssen verschieden sein.
+
+        `kontext_id` und `ereignis_id` gelten für alle Kanten oder sind Arrays mit einem Wert je Kante.
+        Gibt (Art-Codes, Stärken) der ersetzten Kanten zurück.
+        """
+        quelle, ziel = np.asarray(quelle, dtype=np.int64), np.asarray(ziel, dtype=np.int64)
+        art_codes, staerke = np.asarray(art_codes, dtype=np.uint8), np.asarray(staerke, dtype=np.float32)
+        kontext_id = np.broadcast_to(np.asarray(kontext_id, dtype=np.int32), quelle.shape)
+        ereignis_id = np.broadcast_to(np.asarray(ereignis_id, dtype=np.int32), quelle.shape)
+        slots = self.finde_viele(quelle, ziel)
+        da = slots >= 0
+        vorhanden = slots[da]
+        alte = (self._art[vorhanden].copy(), self._staerke[vorhanden].copy())
+        self._art[vorhanden], self._staerke[vorhanden] = art_codes[da], staerke[da]
+        self._kontext[vorhanden], self._ereignis[vorhanden] = kontext_id[da], ereignis_id[da]
+        neu = ~da
+        anzahl = int(neu.sum())
+        if anzahl:
+            quelle, ziel = quelle[neu], ziel[neu]
+            self._sichere_knoten(int(max(quelle.max(), ziel.max())) + 1)
+            ohne_zeile = np.unique(quelle[~self._zeile_da[quelle]])
+            self._zeile_da[ohne_zeile] = True
+            self._zeilen += len(ohne_zeile)
+            self._platz_fuer(anzahl)
+            slots = np.arange(self._anzahl, self._anzahl + anzahl, dtype=np.int32)
+            self._anzahl += anzahl
+            self._quelle[slots], self._ziel[slots] = quelle, ziel
+            self._art[slots], self._staerke[slots] = art_codes[neu], staerke[neu]
+            self._kontext[slots], self._ereignis[slots] = kontext_id[neu], ereignis_id[neu]
+            self._eintragen_viele(slots)
+            self._haenge_an(quelle, ziel, slots)
+            np.add.at(self._grad, quelle, 1)
+            self.kanten += anzahl
+        return alte
+
+    def entferne_viele(self, quelle, ziel) -> dict:
+        """Entfernt die vorhandenen unter den Kanten quelle[k] -> ziel[k]; gibt deren Spalten zurück (quelle, ziel, art, staerke)."""
+        quelle, ziel = np.asarray(quelle, dtype=np.int64), np.asarray(ziel, dtype=np.int64)
+        slots = self.finde_viele(quelle, ziel)
+        da = slots >= 0
+        art, staerke = self._loesche_slots(slots[da])
+        return {'quelle': quelle[da], 'ziel': ziel[da], 'art': art, 'staerke': staerke}
+
+    def entferne_knoten(self, knoten: int) -> dict:
+        """Entfernt die Zeile und alle ein- und ausgehenden Kanten eines Knotens (O(Grad), über seine Slot-Listen).
+
+        Gibt die Spalten der entfernten Kanten zurück (quelle, ziel, art, staerke, kontext, ereignis), nach Slot geordnet.
+        """
+        slots = np.unique(np.concatenate([self._lebende_slots(self._aus, knoten), self._lebende_slots(self._ein, knoten)]))
+        if knoten < len(self._aus):
+            self._aus[knoten], self._ein[knoten] = array('i'), array('i')
+        quelle, ziel = self._quelle[slots].copy(), self._ziel[slots].copy()
+        kontext, ereignis = self._kontext[slots].copy(), self._ereignis[slots].copy()
+        art, staerke = self._loesche_slots(slots)
+        if knoten in self:
+            self._zeile_da[knoten] = False
+            self._zeilen -= 1
+        return {'quelle': quelle, 'ziel': ziel, 'art': art, 'staerke': staerke, 'kontext': kontext, 'ereignis': ereignis}
+
+    def nummeriere_um(self, abbildung):
+        """Ersetzt alle Knoten-Ids über `abbildung` (alte Id -> neue Id, -1 = entfällt) und verdichtet die Slots.
+
+        Die Abbildung muss die Reihenfolge erhalten; Kanten zu entfallenden Knoten werden verworfen.
+        """
+        abbildung = np.asarray(abbildung, dtype=np.int64)
+        slots = np.flatnonzero(self._quelle[:self._anzahl] >= 0)
+        slots = slots[(abbildung[self._quelle[slots]] >= 0) & (abbildung[self._ziel[slots]] >= 0)]
+        self._quelle[slots] = abbildung[self._quelle[slots]]
+        self._ziel[slots] = abbildung[self._ziel[slots]]
+        # Zeilen und Grade zuerst, damit _baue_neu die Slot-Listen gleich in der neuen Knotenzahl anlegt
+        zeilen = abbildung[np.flatnonzero(self._zeile_da)]
+        anzahl = int(abbildung.max()) + 1 if len(abbildung) else 0
+        self._zeile_da = np.zeros(anzahl, dtype=bool)
+        self._zeile_da[zeilen[zeilen >= 0]] = True
+        self._zeilen = int(self._zeile_da.sum())
+        self._grad = np.bincount(self._quelle[slots], minlength=anzahl).astype(np.int32)
+        self._baue_neu(slots, len(self._quelle))
+        self.kanten = self._anzahl
+        self.verdichte_kontexte()
+
+    def verdichte_kontexte(self):
+        """Verwirft Kontext-Texte, auf die keine Kante mehr verweist (z.B. Ereignisse gelöschter Fragmente)."""
+        lebend = self._quelle[:self._anzahl] >= 0
+        benutzt = np.union1d(self._kontext[:self._anzahl][lebend], self._ereignis[:self._anzahl][lebend])
+        benutzt = np.union1d(benutzt, [0])
+        neu = np.zeros(len(self.kontexte), dtype=np.int32)
+        neu[benutzt] = np.arange(len(benutzt), dtype=np.int32)
+        self._kontext[:self._anzahl] = neu[self._kontext[:self._anzahl]]
+        self._ereignis[:self._anzahl] = neu[self._ereignis[:self._anzahl]]
+        self.kontexte = [self.kontexte[i] for i in benutzt.tolist()]
+        self._kontext_ids = {text: i for i, text in enumerate(self.kontexte)}
+
+    @classmethod
+    def aus_spalten(cls, art_namen: list[str], kontexte: list[str], quelle, ziel, art, staerke, kontext, ereignis=None,
+                    zeilen=None) -> 'KantenSpeicher':
+        """Baut einen Speicher aus Spalten (z.B. eines Snapshots); Art-Codes beziehen sich auf `art_namen`,
+        Kontext-Ids auf `kontexte`. `zeilen` sind die Quellen, deren (evtl. leere) Zeile existiert."""
+        speicher = cls(art_namen, kapazitaet=max(16, len(quelle)))
+        umcodiert = np.array([speicher.art_code(name) for name in art_namen], dtype=np.uint8)
+        kontext_neu = np.array([speicher.kontext_id(text) for text in kontexte], dtype=np.int32)
+        n = len(quelle)
+        speicher._quelle[:n], speicher._ziel[:n] = quelle, ziel
+        speicher._art[:n] = umcodiert[np.asarray(art, dtype=np.intp)] if n else 0
+        speicher._staerke[:n] = staerke
+        speicher._kontext[:n] = kontext_neu[np.asarray(kontext, dtype=np.intp)] if n else 0
+        if ereignis is not None and n:
+            speicher._ereignis[:n] = kontext_neu[np.asarray(ereignis, dtype=np.intp)]
+        speicher._anzahl = speicher.kanten = n
+        speicher._eintragen_viele(np.arange(n, dtype=np.int32))
+        quelle, ziel = np.asarray(quelle, dtype=np.int64), np.asarray(ziel, dtype=np.int64)
+        zeilen = np.unique(quelle) if zeilen is None else np.asarray(zeilen, dtype=np.int64)
+        groesse = int(max(quelle.max(initial=-1), ziel.max(initial=-1), zeilen.max(initial=-1))) + 1
+        speicher._sichere_knoten(groesse)
+        speicher._zeile_da[zeilen] = True
+        speicher._zeilen = int(speicher._zeile_da.sum())
+        speicher._grad[:] = np.bincount(quelle, minlength=len(speicher._grad)).astype(np.int32)
+        speicher._baue_listen()
+        return speicher
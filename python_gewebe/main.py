@@ -3,8 +3,13 @@
 # Beschreibung: Beispielskript zur Verwendung der ML-gestützten NeuesTextVerstehen-Klasse.
 ########################################
 
+import logging
+
 from text_gewebe import NeuesTextVerstehen
 
+# Meldungen des Gewebes (Laden der Modelle, Löschen, Verschmelzen, ...); level=logging.DEBUG zeigt jedes Einfügen
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
 # HINWEIS: Bevor Sie dieses Skript ausführen, stellen Sie sicher, dass Sie:
 # 1. Mit dem Annotations-UI (dem Next.js-Teil) Trainingsdaten in 'training_data.jsonl' gesammelt haben.
 # 2. Das Trainingsskript 'model_trainer.py' ausgeführt haben, um die .joblib-Modelle zu erstellen.
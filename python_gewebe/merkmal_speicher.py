@@ -0,0 +1,228 @@
+########################################
+# Datei: ./merkmal_speicher.py
+# Beschreibung: Kompakte, array-basierte Ablage der pro Fragment einmalig berechneten NLP-Merkmale.
+########################################
+
+import hashlib
+
+import numpy as np
+
+# Wortarten, deren Lemmata als "Konzepte" eines Fragments gelten
+KONZEPT_WORTARTEN = ('NOUN', 'VERB', 'ADJ')
+# Wortarten, aus deren Lemmata antworte_aus_resonanz den Kern einer Antwort bildet
+KERN_WORTARTEN = ('NOUN', 'VERB')
+
+
+def token_schluessel(doc) -> int:
+    """Stabiler 63-Bit-Schlüssel über die Token-Texte; gleiche Tokenfolgen haben laut spaCy die Ähnlichkeit 1.0."""
+    digest = hashlib.blake2b("\x00".join(token.text for token in doc).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') >> 1
+
+
+def sentiment_label(score: int) -> str:
+    """Übersetzt den Lexikon-Score eines Fragments in 'positive', 'negative' oder 'neutral'."""
+    if score > 0:
+        return 'positive'
+    elif score < 0:
+        return 'negative'
+    return 'neutral'
+
+
+class FragmentMerkmale:
+    """Die Merkmale eines einzelnen Fragments bzw. Impulses, wie sie die Spürlogik liest.
+
+    `kern_lemmata` sind die Lemmata der Nomen und Verben (ohne Stoppwörter, in Textreihenfolge, ohne Wiederholung);
+    None, wenn sie unbekannt sind (z.B. aus einem Snapshot, der sie noch nicht enthielt).
+    """
+    __slots__ = ('vektor', 'norm', 'konzepte', 'sentiment', 'hat_vektor', 'schluessel', 'kern_lemmata')
+
+    def __init__(self, vektor, norm: float, konzepte: frozenset, sentiment: int, hat_vektor: bool, schluessel: int = 0,
+                 kern_lemmata: tuple = None):
+        self.vektor = vektor
+        self.norm = norm
+        self.konzepte = konzepte
+        self.sentiment = sentiment
+        self.hat_vektor = hat_vektor
+        self.schluessel = schluessel
+        self.kern_lemmata = kern_lemmata
+
+    @property
+    def sentiment_label(self) -> str:
+        return sentiment_label(self.sentiment)
+
+    def similarity(self, other: 'FragmentMerkmale') -> float:
+        """Kosinus-Ähnlichkeit wie Doc.similarity; 0.0 wenn einer der beiden keinen Vektor hat."""
+        if not self.hat_vektor or not other.hat_vektor:
+            return 0.0
+        if self.schluessel == other.schluessel:
+            return 1.0
+        if self.norm == 0 or other.norm == 0:
+            return 0.0
+        return float(np.dot(self.vektor, other.vektor) / (self.norm * other.norm))
+
+    def __repr__(self):
+        return f"FragmentMerkmale(norm={self.norm:.2f}, konzepte={len(self.konzepte)}, sentiment={self.sentiment}, hat_vektor={self.hat_vektor})"
+
+
+class MerkmalSpeicher:
+    """Merkmale aller Fragmente, indiziert über die Fragment-Id.
+
+    Vektoren, Normen, Sentiment-Scores, Token-Schlüssel und das has_vector-Flag liegen in zusammenhängenden NumPy-Arrays,
+    die bei Bedarf verdoppelt werden. Gespeichert wird der Rohvektor (die ML-Modelle wurden auf
+    doc.vector trainiert) zusammen mit seiner Norm; der normierte Vektor ergibt sich als vektor / norm.
+    """
+
+    def __init__(self, dim: int = 0, kapazitaet: int = 64):
+        self.dim = dim
+        self._anzahl = 0
+        self._geteilt_bis = 0  # Zeilen darunter teilt sich der Speicher mit einer Ansicht (Copy-on-Write)
+        self._reserviere(kapazitaet, dim)
+        self.konzepte = []
+        self.konzept_index = {}  # Lemma -> Ids der Fragmente, die es als Konzept enthalten
+        self.kern_lemmata = []  # je Fragment ein Tupel (oder None, siehe FragmentMerkmale)
+
+    def _reserviere(self, kapazitaet: int, dim: int):
+        self.vektoren = np.zeros((kapazitaet, dim), dtype=np.float32)
+        self.normen = np.zeros(kapazitaet, dtype=np.float64)  # wie Doc.vector_norm in doppelter Genauigkeit
+        self.sentiments = np.zeros(kapazitaet, dtype=np.int32)
+        self.hat_vektor = np.zeros(kapazitaet, dtype=bool)
+        self.schluessel = np.zeros(kapazitaet, dtype=np.int64)
+
+    def _wachse(self, kapazitaet: int, dim: int):
+        alt = (self.vektoren, self.normen, self.sentiments, self.hat_vektor, self.schluessel)
+        self._reserviere(kapazitaet, dim)
+        n = self._anzahl
+        if alt[0].shape[1] == dim:
+            self.vektoren[:n] = alt[0][:n]
+        self.normen[:n], self.sentiments[:n], self.hat_vektor[:n], self.schluessel[:n] = alt[1][:n], alt[2][:n], alt[3][:n], alt[4][:n]
+
+    def __len__(self):
+        return self._anzahl
+
+    def ansicht(self) -> 'MerkmalSpeicher':
+        """Unveränderliche Sicht auf die belegten Zeilen, ohne die Arrays zu kopieren.
+
+        Neue Fragmente landen in Zeilen hinter der Sicht. Belegte Zeilen werden danach nicht mehr in place
+        geschrieben: entferne() und ein erneutes setze() kopieren vorher die Arrays, Konzeptlisten werden
+        ersetzt statt verändert.
+        """
+        n = self._anzahl
+        sicht = MerkmalSpeicher(dim=self.dim, kapazitaet=0)
+        sicht.vektoren, sicht.normen, sicht.sentiments = self.vektoren[:n], self.normen[:n], self.sentiments[:n]
+        sicht.hat_vektor, sicht.schluessel = self.hat_vektor[:n], self.schluessel[:n]
+        sicht._anzahl = n
+        sicht.konzepte = self.konzepte[:n]
+        sicht.kern_lemmata = self.kern_lemmata[:n]
+        sicht.konzept_index = dict(self.konzept_index)
+        self._geteilt_bis = n
+        return sicht
+
+    def _vor_schreiben(self, index: int):
+        if index < self._geteilt_bis:
+            self._wachse(len(self.normen), self.dim)
+            self._geteilt_bis = 0
+
+    def setze(self, index: int, merkmale: FragmentMerkmale):
+        """Legt die Merkmale für Fragment `index` ab; Ids werden fortlaufend vergeben."""
+        if self.dim == 0 and merkmale.hat_vektor:
+            self.dim = len(merkmale.vektor)
+            self._wachse(len(self.normen), self.dim)
+        if index >= len(self.normen):
+            self._wachse(max(index + 1, 2 * len(self.normen)), self.dim)
+        vorhanden = index < self._geteilt_bis
+        self._vor_schreiben(index)
+        while len(self.konzepte) <= index:
+            self.konzepte.append(frozenset())
+            self.kern_lemmata.append(None)
+        self._anzahl = max(self._anzahl, index + 1)
+        for konzept in self.konzepte[index]:
+            self._entferne_aus_index(konzept, index)
+        self.konzepte[index] = merkmale.konzepte
+        self.kern_lemmata[index] = merkmale.kern_lemmata
+        for konzept in merkmale.konzepte:
+            ids = self.konzept_index.setdefault(konzept, [])
+            if vorhanden:
+                self.konzept_index[konzept] = ids + [index]  # die Liste gehört auch einer Ansicht
+            else:
+                ids.append(index)
+        self.sentiments[index] = merkmale.sentiment
+        self.schluessel[index] = merkmale.schluessel
+        self.normen[index] = merkmale.norm
+        self.hat_vektor[index] = merkmale.hat_vektor and len(merkmale.vektor) == self.dim
+        self.vektoren[index] = merkmale.vektor if self.hat_vektor[index] else 0.0
+
+    def entferne(self, index: int):
+        """Gibt die Merkmale eines gelöschten Fragments frei (die Id bleibt als Tombstone belegt)."""
+        self._vor_schreiben(index)
+        for konzept in self.konzepte[index]:
+            self._entferne_aus_index(konzept, index)
+        self.konzepte[index] = frozenset()
+        self.kern_lemmata[index] = ()
+        self.sentiments[index] = 0
+        self.schluessel[index] = 0
+        self.normen[index] = 0.0
+        self.hat_vektor[index] = False
+        self.vektoren[index] = 0.0
+
+    def als_arrays(self) -> dict:
+        """Die belegten Zeilen aller Arrays (ohne Reservekapazität), z.B. zum Speichern."""
+        n = self._anzahl
+        return {'vektoren': self.vektoren[:n], 'normen': self.normen[:n], 'sentiments': self.sentiments[:n],
+                'hat_vektor': self.hat_vektor[:n], 'schluessel': self.schluessel[:n]}
+
+    @classmethod
+    def aus_arrays(cls, arrays: dict, konzepte: list, kern_lemmata: list = None) -> 'MerkmalSpeicher':
+        """Übernimmt gespeicherte Arrays ohne Kopie (z.B. memory-mapped); erst beim Wachsen wird kopiert.
+
+        Ohne `kern_lemmata` (ältere Snapshots) sind sie für alle Fragmente unbekannt (None).
+        """
+        speicher = cls(dim=arrays['vektoren'].shape[1], kapazitaet=0)
+        speicher.vektoren, speicher.normen = arrays['vektoren'], arrays['normen']
+        speicher.sentiments, speicher.hat_vektor, speicher.schluessel = arrays['sentiments'], arrays['hat_vektor'], arrays['schluessel']
+        speicher._anzahl = len(konzepte)
+        speicher.konzepte = [frozenset(k) for k in konzepte]
+        speicher.kern_lemmata = [None if k is None else tuple(k) for k in kern_lemmata] if kern_lemmata is not None else [None] * len(konzepte)
+        for index, konzepte_fragment in enumerate(speicher.konzepte):
+            for konzept in konzepte_fragment:
+                speicher.konzept_index.setdefault(konzept, []).append(index)
+        return speicher
+
+    def auswahl(self, ids: list[int]) -> 'MerkmalSpeicher':
+        """Neuer Speicher mit den Merkmalen der gegebenen Ids in dieser Reihenfolge (Ids werden 0..len(ids)-1)."""
+        ids = np.asarray(ids, dtype=np.intp)
+        arrays = {name: array[ids] for name, array in self.als_arrays().items()}
+        return MerkmalSpeicher.aus_arrays(arrays, [self.konzepte[i] for i in ids.tolist()], [self.kern_lemmata[i] for i in ids.tolist()])
+
+    def _entferne_aus_index(self, konzept: str, index: int):
+        # Neue Liste statt list.remove: eine Ansicht kann dieselbe Liste noch lesen
+        ids = [i for i in self.konzept_index[konzept] if i != index]
+        if ids:
+            self.konzept_index[konzept] = ids
+        else:
+            del self.konzept_index[konzept]
+
+    def gemeinsame_konzepte(self, konzepte: frozenset):
+        """Anzahl gemeinsamer Konzepte mit `konzepte` für jede Fragment-Id, als Array der Länge len(self)."""
+        listen = [self.konzept_index[k] for k in konzepte if k in self.konzept_index]
+        if not listen:
+            return np.zeros(self._anzahl, dtype=np.intp)
+        # Listen, die sich der Speicher mit einer Ansicht teilt, können schon neuere Ids enthalten
+        return np.bincount(np.concatenate(listen), minlength=self._anzahl)[:self._anzahl]
+
+    def naechste_nachbarn(self, merkmale: FragmentMerkmale, ids, k: int):
+        """Die (bis zu) k Ids aus `ids` mit der höchsten Kosinus-Ähnlichkeit zu `merkmale`; exakt per Matrix-Vektor-Produkt."""
+        ids = np.asarray(ids, dtype=np.intp)
+        ids = ids[self.hat_vektor[ids]]
+        if not merkmale.hat_vektor or merkmale.norm == 0 or k <= 0:
+            return ids[:0]
+        if k >= len(ids):
+            return ids
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = (self.vektoren[ids] @ merkmale.vektor) / (self.normen[ids] * merkmale.norm)
+        similarity = np.nan_to_num(similarity, nan=-np.inf)
+        return ids[np.argpartition(-similarity, k - 1)[:k]]
+
+    def __getitem__(self, index: int) -> FragmentMerkmale:
+        return FragmentMerkmale(self.vektoren[index], float(self.normen[index]), self.konzepte[index],
+                                int(self.sentiments[index]), bool(self.hat_vektor[index]), int(self.schluessel[index]),
+                                self.kern_lemmata[index])
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import numpy as np
 import spacy
@@ -7,12 +8,62 @@ from sklearn.metrics import classification_report, mean_squared_error, r2_score
 from sklearn.preprocessing import LabelEncoder
 import joblib
 import os
+import argparse
+
+from vektor_cache import VektorCache, modell_kennung
+from wald_kompiliert import KOMPILIERT_DATEI, kompiliere_modelle
 
 # Konstanten für Dateipfade
 DATA_FILE = 'training_data.jsonl'
-ART_CLASSIFIER_FILE = 'triadic_art_classifier.joblib'
-STAERKE_REGRESSOR_FILE = 'triadic_staerke_regressor.joblib'
-LABEL_ENCODER_FILE = 'triadic_label_encoder.joblib'
+# Modelle landen neben text_gewebe.py, wo NeuesTextVerstehen sie unabhängig vom Arbeitsverzeichnis findet
+MODELL_VERZEICHNIS = os.path.dirname(os.path.abspath(__file__))
+ART_CLASSIFIER_FILE = os.path.join(MODELL_VERZEICHNIS, 'triadic_art_classifier.joblib')
+STAERKE_REGRESSOR_FILE = os.path.join(MODELL_VERZEICHNIS, 'triadic_staerke_regressor.joblib')
+LABEL_ENCODER_FILE = os.path.join(MODELL_VERZEICHNIS, 'triadic_label_encoder.joblib')
+KOMPILIERT_FILE = os.path.join(MODELL_VERZEICHNIS, KOMPILIERT_DATEI)
+# Text-Hash -> Vektor; dasselbe Verzeichnis kann das Gewebe mit setze_vektor_cache() mitbenutzen
+VEKTOR_CACHE_DIR = os.path.join(MODELL_VERZEICHNIS, 'vektor_cache')
+# Trainingsstand für --inkrementell: gelesene Bytes der Trainingsdaten samt Prüfsumme, und Anker-Beispiele je Klasse
+TRAINING_STATE_FILE = 'training_state.json'
+TRAINING_ANCHORS_FILE = 'training_anchors.npz'
+CHUNK_LINES = 1000
+
+def model_paths(model_dir=MODELL_VERZEICHNIS):
+    """Alle Dateien eines Trainingsstands in `model_dir`."""
+    return {
+        'art': os.path.join(model_dir, os.path.basename(ART_CLASSIFIER_FILE)),
+        'staerke': os.path.join(model_dir, os.path.basename(STAERKE_REGRESSOR_FILE)),
+        'encoder': os.path.join(model_dir, os.path.basename(LABEL_ENCODER_FILE)),
+        'kompiliert': os.path.join(model_dir, KOMPILIERT_DATEI),
+        'state': os.path.join(model_dir, TRAINING_STATE_FILE),
+        'anchors': os.path.join(model_dir, TRAINING_ANCHORS_FILE),
+    }
+
+def stream_data(filepath=DATA_FILE, offset=0, chunk_lines=CHUNK_LINES, hasher=None):
+    """Liest die .jsonl Trainingsdaten ab Byte `offset` in Blöcken; liefert (Datenpunkte, Byte-Position danach).
+
+    Eine letzte Zeile ohne Zeilenumbruch wird nicht gelesen (der Annotator schreibt sie womöglich noch) und
+    beim nächsten Lauf nachgeholt. `hasher` wird mit allen gelesenen Bytes fortgeschrieben.
+    """
+    chunk = []
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            if hasher is not None:
+                hasher.update(line)
+            if not line.strip():
+                continue
+            try:
+                chunk.append(json.loads(line.decode('utf-8')))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                print(f"Warnung: Ungültige JSON-Zeile übersprungen in {filepath}")
+            if len(chunk) >= chunk_lines:
+                yield chunk, offset
+                chunk = []
+    yield chunk, offset
 
 def load_data(filepath=DATA_FILE):
     """Lädt die .jsonl Trainingsdaten."""
@@ -20,61 +71,163 @@ def load_data(filepath=DATA_FILE):
         print(f"Fehler: Trainingsdatendatei '{filepath}' nicht gefunden.")
         print("Bitte erstellen Sie zuerst Trainingsdaten mit dem Next.js Annotator.")
         return []
-    data = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data.append(json.loads(line))
-            except json.JSONDecodeError:
-                print(f"Warnung: Ungültige JSON-Zeile übersprungen in {filepath}")
-    return data
+    return [sample for chunk, _ in stream_data(filepath) for sample in chunk]
+
+def embed_texts(texts, nlp, cache=None, n_process=1, batch_size=256):
+    """Dokumentvektoren für eindeutige Texte; nur Texte, die noch nicht im Cache sind, werden eingebettet.
 
-def create_features_and_labels(data, nlp):
+    doc.vector ist der Mittelwert der statischen Wortvektoren und braucht keine Pipeline-Komponente, deshalb
+    laufen Tagger, Parser usw. hier gar nicht erst.
+    """
+    if cache is not None:
+        vectors, missing = cache.hole_viele(texts)
+    else:
+        vectors, missing = np.zeros((len(texts), nlp.vocab.vectors.shape[1]), dtype=np.float32), np.arange(len(texts))
+    print(f"  {len(texts)} eindeutige Fragmente, davon {len(texts) - len(missing)} aus dem Cache, {len(missing)} neu einzubetten.")
+    if len(missing):
+        with nlp.select_pipes(enable=[]):
+            docs = nlp.pipe((texts[i] for i in missing), batch_size=batch_size, n_process=n_process)
+            for i, doc in zip(missing, docs):
+                vectors[i] = doc.vector
+        if cache is not None:
+            cache.fuege_hinzu_viele([texts[i] for i in missing], vectors[missing])
+    return vectors
+
+def create_features_and_labels(data, nlp, cache=None, n_process=1):
     """Erstellt Feature-Vektoren und Labels aus den Rohdaten."""
-    features = []
-    labels_art = []
-    labels_staerke = []
-    
     print(f"Verarbeite {len(data)} Datenpunkte...")
-    for i, sample in enumerate(data):
-        print(f"  Verarbeite Punkt {i+1}/{len(data)}...", end='\r')
-        doc_a = nlp(sample['fragment_a'])
-        doc_b = nlp(sample['fragment_b'])
-        doc_c = nlp(sample['fragment_c'])
-        
-        # Feature-Vektor: Konkatenation der spaCy-Vektoren der drei Fragmente
-        feature_vector = np.concatenate([doc_a.vector, doc_b.vector, doc_c.vector])
-        features.append(feature_vector)
-        
-        labels_art.append(sample['label']['ergebnis_art'])
-        labels_staerke.append(float(sample['label']['ergebnis_staerke']))
-        
-    print("\nFeature-Erstellung abgeschlossen.")
-    return np.array(features), np.array(labels_art), np.array(labels_staerke)
-
-def train():
+    # Jedes Fragment nur einmal einbetten, auch wenn es in vielen Tripeln vorkommt
+    texts = list(dict.fromkeys(sample[key] for sample in data for key in ('fragment_a', 'fragment_b', 'fragment_c')))
+    row = {text: i for i, text in enumerate(texts)}
+    vectors = embed_texts(texts, nlp, cache, n_process)
+
+    # Feature-Vektor: Konkatenation der spaCy-Vektoren der drei Fragmente
+    features = np.concatenate([vectors[[row[sample[key]] for sample in data]] for key in ('fragment_a', 'fragment_b', 'fragment_c')], axis=1)
+    labels_art = [sample['label']['ergebnis_art'] for sample in data]
+    labels_staerke = [float(sample['label']['ergebnis_staerke']) for sample in data]
+
+    print("Feature-Erstellung abgeschlossen.")
+    return features, np.array(labels_art), np.array(labels_staerke)
+
+def load_nlp():
+    """Lädt das spaCy-Modell; None, wenn es nicht installiert ist."""
+    print("\nLade spaCy-Modell 'de_core_news_lg' (kann einen Moment dauern)...")
+    try:
+        return spacy.load("de_core_news_lg")
+    except IOError:
+        print("\n[FEHLER] spaCy-Modell 'de_core_news_lg' nicht gefunden.")
+        print("Bitte führen Sie aus: python -m spacy download de_core_news_lg")
+        return None
+
+def _replace_atomic(path, write):
+    """Schreibt über eine temporäre Datei und ersetzt dann atomar: ein laufendes Gewebe liest nie eine halbe Datei."""
+    tmp = path + '.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+def save_models(art_classifier, staerke_regressor, le, paths):
+    _replace_atomic(paths['art'], lambda p: joblib.dump(art_classifier, p))
+    _replace_atomic(paths['staerke'], lambda p: joblib.dump(staerke_regressor, p))
+    _replace_atomic(paths['encoder'], lambda p: joblib.dump(le, p))
+    # Wälder zusätzlich als NumPy-Arrays, damit die Laufzeit ohne sklearn auskommt (zuletzt, damit sie nie älter sind)
+    _replace_atomic(paths['kompiliert'], lambda p: kompiliere_modelle(art_classifier, staerke_regressor, le, p))
+
+def update_anchors(anchors, X, y_art, y_staerke, seen, per_class, rng):
+    """Reservoir-Stichprobe von höchstens `per_class` Beispielen je Resonanz-Art über alle bisher gelesenen Daten.
+
+    Neue Bäume im inkrementellen Training sehen die neuen Annotationen plus diese Anker: so kommt jede Klasse
+    vor (die Bäume eines Waldes müssen dieselben Klassen kennen) und die neuen Bäume vergessen die alten Daten nicht.
+    """
+    for x, klasse, staerke in zip(X, y_art.tolist(), y_staerke.tolist()):
+        n = seen.get(klasse, 0)
+        seen[klasse] = n + 1
+        reservoir = anchors.setdefault(klasse, [])
+        if len(reservoir) < per_class:
+            reservoir.append((x, staerke))
+        else:
+            j = int(rng.integers(n + 1))
+            if j < per_class:
+                reservoir[j] = (x, staerke)
+
+def anchor_arrays(anchors, dim):
+    rows = [(x, klasse, staerke) for klasse, reservoir in sorted(anchors.items()) for x, staerke in reservoir]
+    if not rows:
+        return np.zeros((0, dim), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return (np.array([r[0] for r in rows], dtype=np.float32), np.array([r[1] for r in rows], dtype=np.int64),
+            np.array([r[2] for r in rows], dtype=np.float64))
+
+def save_training_state(paths, data_file, offset, hasher, samples, anchors, seen, dim):
+    X, y_art, y_staerke = anchor_arrays(anchors, dim)
+    def write_anchors(path):
+        with open(path, 'wb') as f:
+            np.savez(f, X=X, y_art=y_art, y_staerke=y_staerke)
+    def write_state(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'data_file': os.path.abspath(data_file), 'offset': offset, 'sha256': hasher.hexdigest(),
+                       'samples': samples, 'anchor_seen': {str(k): v for k, v in seen.items()}}, f)
+    # Erst die Anker, dann der Stand: ein Absturz dazwischen liest höchstens Daten erneut, verliert aber keine
+    _replace_atomic(paths['anchors'], write_anchors)
+    _replace_atomic(paths['state'], write_state)
+
+def load_training_state(paths):
+    """Trainingsstand und Anker; None, wenn es keinen vollständigen Stand gibt."""
+    if not all(os.path.exists(paths[k]) for k in ('state', 'anchors', 'art', 'staerke', 'encoder')):
+        return None
+    with open(paths['state'], 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    anchors = {}
+    with np.load(paths['anchors']) as data:
+        for x, klasse, staerke in zip(data['X'], data['y_art'].tolist(), data['y_staerke'].tolist()):
+            anchors.setdefault(klasse, []).append((x, staerke))
+    seen = {int(k): v for k, v in state['anchor_seen'].items()}
+    return state, anchors, seen
+
+def verify_prefix(filepath, offset, digest):
+    """Prüft, ob die ersten `offset` Bytes noch dieselben sind wie beim letzten Training.
+
+    Gibt den fortsetzbaren Hasher zurück oder None, wenn die Datei gekürzt oder verändert wurde.
+    """
+    if os.path.getsize(filepath) < offset:
+        return None
+    hasher = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        rest = offset
+        while rest:
+            block = f.read(min(rest, 1 << 20))
+            if not block:
+                return None
+            hasher.update(block)
+            rest -= len(block)
+    return hasher if hasher.hexdigest() == digest else None
+
+def train(n_process=1, cache_dir=VEKTOR_CACHE_DIR, data_file=DATA_FILE, model_dir=MODELL_VERZEICHNIS, nlp=None,
+          anchors_per_class=50):
     """Der Haupt-Trainingsprozess."""
     print("="*50)
     print("Starte Trainingsprozess für triadische Resonanz-Modelle")
     print("="*50)
+    paths = model_paths(model_dir)
     
-    # 1. Daten laden
-    trainingsdaten = load_data()
+    # 1. Daten laden (dabei Position und Prüfsumme für das inkrementelle Training mitschreiben)
+    if not os.path.exists(data_file):
+        load_data(data_file)
+        return
+    hasher = hashlib.sha256()
+    trainingsdaten, offset = [], 0
+    for chunk, offset in stream_data(data_file, hasher=hasher):
+        trainingsdaten.extend(chunk)
     if len(trainingsdaten) < 10:
         print(f"Nicht genügend Trainingsdaten ({len(trainingsdaten)}). Training wird abgebrochen.")
         print("Es werden mindestens 10 annotierte Beispiele benötigt, um die Modelle sinnvoll zu trainieren.")
         return
 
     # 2. NLP-Modell laden und Features erstellen
-    print("\nLade spaCy-Modell 'de_core_news_lg' (kann einen Moment dauern)...")
-    try:
-        nlp = spacy.load("de_core_news_lg")
-    except IOError:
-        print("\n[FEHLER] spaCy-Modell 'de_core_news_lg' nicht gefunden.")
-        print("Bitte führen Sie aus: python -m spacy download de_core_news_lg")
+    nlp = nlp or load_nlp()
+    if nlp is None:
         return
     
-    X, y_art_str, y_staerke = create_features_and_labels(trainingsdaten, nlp)
+    cache = VektorCache(cache_dir, modell_kennung(nlp), nlp.vocab.vectors.shape[1]) if cache_dir else None
+    X, y_art_str, y_staerke = create_features_and_labels(trainingsdaten, nlp, cache, n_process)
     
     # Label-Encoding für Resonanz-Arten (z.B. 'VERSTAERKUNG' -> 0)
     le = LabelEncoder()
@@ -113,15 +266,82 @@ def train():
     
     # 7. Modelle und LabelEncoder für die spätere Verwendung speichern
     print("\n" + "="*18 + " SPEICHERN " + "="*20)
-    joblib.dump(art_classifier, ART_CLASSIFIER_FILE)
-    joblib.dump(staerke_regressor, STAERKE_REGRESSOR_FILE)
-    joblib.dump(le, LABEL_ENCODER_FILE)
+    save_models(art_classifier, staerke_regressor, le, paths)
+    anchors, seen = {}, {}
+    update_anchors(anchors, X, y_art, y_staerke, seen, anchors_per_class, np.random.default_rng(len(X)))
+    save_training_state(paths, data_file, offset, hasher, len(X), anchors, seen, X.shape[1])
     
     print(f"Modelle erfolgreich trainiert und gespeichert:")
-    print(f"  -> {ART_CLASSIFIER_FILE}")
-    print(f"  -> {STAERKE_REGRESSOR_FILE}")
-    print(f"  -> {LABEL_ENCODER_FILE}")
+    for key in ('art', 'staerke', 'encoder', 'kompiliert'):
+        print(f"  -> {paths[key]}")
     print("="*50)
 
+def train_incremental(n_process=1, cache_dir=VEKTOR_CACHE_DIR, data_file=DATA_FILE, model_dir=MODELL_VERZEICHNIS, nlp=None,
+                      trees_per_chunk=20, chunk_lines=CHUNK_LINES, anchors_per_class=50):
+    """Trainiert nur mit den Annotationen, die seit dem letzten Training an die Datei angehängt wurden.
+
+    Die Datei wird ab der gespeicherten Byte-Position blockweise gelesen. Je Block wachsen beide Wälder per
+    warm_start um `trees_per_chunk` Bäume, die auf dem Block plus den Anker-Beispielen trainiert werden; die
+    vorhandenen Bäume bleiben unverändert. Ein volles Training ist nötig (und wird ausgeführt), wenn es keinen
+    Trainingsstand gibt, die bereits gelesenen Bytes verändert wurden oder eine neue Resonanz-Art auftaucht.
+    Ein laufendes Gewebe übernimmt die neuen Modelle mit lade_ml_modelle_neu() bzw. beobachte_modelle().
+    """
+    paths = model_paths(model_dir)
+    full = lambda: train(n_process, cache_dir, data_file, model_dir, nlp, anchors_per_class)
+    loaded = load_training_state(paths)
+    if loaded is None or loaded[0]['data_file'] != os.path.abspath(data_file):
+        print("Kein Trainingsstand für diese Daten gefunden. Starte volles Training.")
+        return full()
+    state, anchors, seen = loaded
+    hasher = verify_prefix(data_file, state['offset'], state['sha256'])
+    if hasher is None:
+        print("Die bereits trainierten Daten wurden verändert. Starte volles Training.")
+        return full()
+    if os.path.getsize(data_file) == state['offset']:
+        print("Keine neuen Annotationen seit dem letzten Training.")
+        return
+
+    nlp = nlp or load_nlp()
+    if nlp is None:
+        return
+    cache = VektorCache(cache_dir, modell_kennung(nlp), nlp.vocab.vectors.shape[1]) if cache_dir else None
+    art_classifier, staerke_regressor, le = (joblib.load(paths[k]) for k in ('art', 'staerke', 'encoder'))
+    rng = np.random.default_rng(state['samples'])
+    offset, samples, rounds = state['offset'], state['samples'], 0
+    for chunk, offset in stream_data(data_file, state['offset'], chunk_lines, hasher):
+        if not chunk:
+            continue
+        X, y_art_str, y_staerke = create_features_and_labels(chunk, nlp, cache, n_process)
+        unknown = set(y_art_str) - set(le.classes_)
+        if unknown:
+            print(f"Neue Resonanz-Art(en) {sorted(map(str, unknown))}: die Wälder brauchen ein volles Training.")
+            return full()
+        y_art = le.transform(y_art_str)
+        X_anchor, y_art_anchor, y_staerke_anchor = anchor_arrays(anchors, X.shape[1])
+        X_fit = np.concatenate([X, X_anchor])
+        for forest, y in ((art_classifier, np.concatenate([y_art, y_art_anchor])), (staerke_regressor, np.concatenate([y_staerke, y_staerke_anchor]))):
+            forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + trees_per_chunk)
+            forest.fit(X_fit, y)
+        update_anchors(anchors, X, y_art, y_staerke, seen, anchors_per_class, rng)
+        samples += len(X)
+        rounds += 1
+        print(f"  +{len(X)} Annotationen -> {len(art_classifier.estimators_)} / {len(staerke_regressor.estimators_)} Bäume")
+
+    if rounds:
+        save_models(art_classifier, staerke_regressor, le, paths)
+    save_training_state(paths, data_file, offset, hasher, samples, anchors, seen, art_classifier.n_features_in_)
+    print(f"Inkrementelles Training abgeschlossen: {samples} Annotationen insgesamt, {rounds} Block/Blöcke neu.")
+
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Trainiert die Modelle für die triadische Resonanz")
+    parser.add_argument('--n-process', type=int, default=1, help="Prozesse für nlp.pipe beim Einbetten")
+    parser.add_argument('--ohne-cache', action='store_true', help="Alle Fragmente neu einbetten, ohne den Vektor-Cache")
+    parser.add_argument('--inkrementell', action='store_true', help="Nur neue Annotationen trainieren (Bäume per warm_start ergänzen)")
+    parser.add_argument('--baeume', type=int, default=20, help="Neue Bäume je Block im inkrementellen Training")
+    parser.add_argument('--chunk', type=int, default=CHUNK_LINES, help="Annotationen je Block im inkrementellen Training")
+    args = parser.parse_args()
+    cache_dir = None if args.ohne_cache else VEKTOR_CACHE_DIR
+    if args.inkrementell:
+        train_incremental(n_process=args.n_process, cache_dir=cache_dir, trees_per_chunk=args.baeume, chunk_lines=args.chunk)
+    else:
+        train(n_process=args.n_process, cache_dir=cache_dir)
\ No newline at end of file
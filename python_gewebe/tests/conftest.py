@@ -0,0 +1,39 @@
+########################################
+# Datei: ./tests/conftest.py
+# Beschreibung: Gemeinsame Fixtures der Tests: Stub-NLP, synthetischer Korpus und frische Gewebe mit und ohne ML.
+########################################
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gewebe_stub import StubNlp, erzeuge_gewebe, synthetischer_korpus  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def stub_nlp() -> StubNlp:
+    """Ein Stub-NLP für alle Tests; die gecachten Wortvektoren hängen nur vom Wort ab."""
+    return StubNlp()
+
+
+@pytest.fixture(params=[True, False], ids=['ml', 'heuristik'])
+def mit_ml(request) -> bool:
+    return request.param
+
+
+@pytest.fixture
+def neues_gewebe(stub_nlp):
+    """Fabrik für leere Gewebe mit dem gemeinsamen Stub-NLP: neues_gewebe(triaden_modus='batch', mit_ml=True)."""
+    def erzeuge(triaden_modus: str = 'batch', mit_ml: bool = True):
+        gewebe = erzeuge_gewebe(triaden_modus, mit_ml)
+        gewebe.nlp = stub_nlp
+        return gewebe
+    return erzeuge
+
+
+@pytest.fixture
+def korpus() -> list[str]:
+    return synthetischer_korpus(30)
@@ -0,0 +1,67 @@
+########################################
+# Datei: ./tests/test_abfragen.py
+# Beschreibung: Bewertung und Abfragen: die gebündelten Wege liefern dasselbe wie die Einzelbewertung.
+########################################
+
+import pytest
+
+from gewebe_stub import gewebe_ohne_kanten, synthetischer_korpus
+from vektor_index import BruteForceIndex
+
+ARTEN = ['VERSTAERKUNG', 'ERGAENZUNG', 'KONTRAST']
+IMPULSE = ["Was ist schwer zu erfassen im Gewebe?", "Die Welle ist tief und klar.", "Der Konflikt stört die Harmonie."]
+
+
+def test_dyadisch_matrix_gleich_schleife():
+    gewebe = gewebe_ohne_kanten(40)
+    merkmale = gewebe._merkmale_aus_text("Das Gewebe zeigt eine tiefe Resonanz, aber es ist schwer.")
+    bewertung = gewebe._bewerte_dyadisch_gegen_alle(merkmale, range(40))
+    namen = gewebe._dyadische_muster['namen']
+    for i, muster, staerke in zip(bewertung['ziel_ids'].tolist(), bewertung['muster'].tolist(), bewertung['staerke'].tolist()):
+        einzeln = gewebe._bewerte_dyadische_resonanz(merkmale, gewebe._merkmale[i], -1, i)
+        if muster < 0:
+            assert einzeln is None
+        else:
+            assert (einzeln.art, einzeln.staerke) == (namen[muster], staerke)
+
+
+@pytest.fixture
+def kleines_gewebe(neues_gewebe, mit_ml):
+    # Klein genug für die Engine 'pfade', deren Wellen mit der Zahl der Pfade wachsen
+    gewebe = neues_gewebe('batch', mit_ml)
+    gewebe.fuege_ein_viele(synthetischer_korpus(12), modus='batch')
+    return gewebe
+
+
+@pytest.mark.parametrize('impuls', IMPULSE)
+def test_sparse_gleich_pfade(kleines_gewebe, impuls):
+    reaktionen = {}
+    for engine in ['pfade', 'sparse']:
+        kleines_gewebe._wellen_engine = engine
+        reaktionen[engine] = kleines_gewebe.reagiere(impuls)
+    pfade, sparse = reaktionen['pfade'], reaktionen['sparse']
+    for mindest_staerke in [0.05, 0.2, 0.4]:
+        assert sparse.treffer(ARTEN, mindest_staerke) == pfade.treffer(ARTEN, mindest_staerke)
+    for i in range(len(kleines_gewebe._fragmente)):
+        staerkste = pfade.staerkste_pfade(i, 1)
+        if staerkste:
+            assert sparse.staerkste_pfade(i, 1)[0][1] == pytest.approx(staerkste[0][1], rel=1e-5)
+
+
+@pytest.mark.parametrize('engine', ['pfade', 'sparse'])
+def test_reagiere_viele_gleich_einzeln(kleines_gewebe, engine):
+    kleines_gewebe._wellen_engine = engine
+    ansicht = kleines_gewebe.ansicht()
+    einzeln = [kleines_gewebe.reagiere(impuls, ansicht) for impuls in IMPULSE]
+    viele = kleines_gewebe.reagiere_viele(IMPULSE, arbeiter=2)
+    for r_einzeln, r_viele in zip(einzeln, viele):
+        assert r_viele.treffer(ARTEN, 0.3) == r_einzeln.treffer(ARTEN, 0.3)
+    assert (kleines_gewebe.finde_fragmente_mit_resonanz_viele(IMPULSE, ARTEN, 0.3)
+            == [kleines_gewebe.finde_fragmente_mit_resonanz(impuls, ARTEN, 0.3) for impuls in IMPULSE])
+
+
+def test_reagiere_viele_mit_index_gleich_einzeln(kleines_gewebe):
+    kleines_gewebe.setze_vektor_index(BruteForceIndex(), top_k=5)
+    ansicht = kleines_gewebe.ansicht()
+    einzeln = [kleines_gewebe.reagiere(impuls, ansicht).treffer(ARTEN, 0.3) for impuls in IMPULSE]
+    assert [r.treffer(ARTEN, 0.3) for r in kleines_gewebe.reagiere_viele(IMPULSE)] == einzeln
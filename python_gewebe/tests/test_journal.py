@@ -0,0 +1,120 @@
+########################################
+# Datei: ./tests/test_journal.py
+# Beschreibung: Journal: Wiederherstellung, flush je Eintrag, fsync nach Intervall ohne weiteres Schreiben, Abbruch per SIGKILL.
+########################################
+
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import gewebe_journal
+from gewebe_journal import JOURNAL_DATEI, GewebeJournal
+from gewebe_stub import kanten_signatur, synthetischer_korpus
+
+
+def test_journal_wiederherstellung(neues_gewebe, korpus, mit_ml, tmp_path):
+    gewebe = neues_gewebe('batch', mit_ml)
+    gewebe.oeffne_journal(str(tmp_path), kompaktieren_ab=12)
+    for text in korpus[:10]:
+        gewebe.fuege_ein(text)
+    gewebe.fuege_ein_viele(korpus[10:25], modus='batch')
+    gewebe.loesche_fragment(4)
+    gewebe.verschmelze_fragmente(1, 2)
+    gewebe.verschmelze_viele([(5, 6), (7, 8)])
+    gewebe.verschmelze_fragmente(9, 10, modus='merkmale')
+    gewebe.schliesse_journal()
+
+    wiederhergestellt = neues_gewebe('batch', mit_ml)
+    wiederhergestellt.oeffne_journal(str(tmp_path))
+    wiederhergestellt.schliesse_journal()
+    assert wiederhergestellt._fragmente == gewebe._fragmente
+    assert kanten_signatur(wiederhergestellt) == kanten_signatur(gewebe)
+    n = len(gewebe._fragmente)
+    assert np.array_equal(wiederhergestellt._merkmale.vektoren[:n], gewebe._merkmale.vektoren[:n])
+    assert np.array_equal(wiederhergestellt._merkmale.sentiments[:n], gewebe._merkmale.sentiments[:n])
+
+
+def test_journal_nach_abgebrochenem_eintrag(neues_gewebe, korpus, tmp_path):
+    gewebe = neues_gewebe('batch')
+    gewebe.oeffne_journal(str(tmp_path))
+    for text in korpus[:8]:
+        gewebe.fuege_ein(text)
+    gewebe.schliesse_journal()
+    erwartet = kanten_signatur(gewebe)
+    # ein beim Absturz halb geschriebener letzter Eintrag wird verworfen
+    with open(tmp_path / JOURNAL_DATEI, 'a', encoding='utf-8') as f:
+        f.write('{"op": "fuege_ein", "text": "Das Gew')
+    wiederhergestellt = neues_gewebe('batch')
+    wiederhergestellt.oeffne_journal(str(tmp_path))
+    wiederhergestellt.schliesse_journal()
+    assert kanten_signatur(wiederhergestellt) == erwartet
+
+
+def test_eintrag_sofort_in_der_datei(tmp_path):
+    journal = GewebeJournal(str(tmp_path), sync_alle=1000, sync_intervall=60.0)
+    journal.oeffnen()
+    try:
+        journal.schreibe({'op': 'loesche', 'id': 3})
+        with open(tmp_path / JOURNAL_DATEI, encoding='utf-8') as f:
+            assert f.read() == '{"op": "loesche", "id": 3, "seq": 1}\n'
+    finally:
+        journal.schliessen()
+
+
+def test_fsync_nach_intervall_ohne_weiteres_schreiben(tmp_path, monkeypatch):
+    synchronisiert = []
+    monkeypatch.setattr(gewebe_journal.os, 'fsync', lambda fd: synchronisiert.append(time.monotonic()))
+    journal = GewebeJournal(str(tmp_path), sync_alle=1000, sync_intervall=0.1)
+    journal.oeffnen()
+    try:
+        time.sleep(0.15)  # der erste Eintrag nach einer Pause wird sofort synchronisiert
+        journal.schreibe({'op': 'loesche', 'id': 1})
+        assert len(synchronisiert) == 1
+        geschrieben = time.monotonic()
+        journal.schreibe({'op': 'loesche', 'id': 2})
+        journal.schreibe({'op': 'loesche', 'id': 3})
+        assert len(synchronisiert) == 1
+        frist = time.monotonic() + 5.0
+        while len(synchronisiert) < 2 and time.monotonic() < frist:
+            time.sleep(0.01)
+        assert len(synchronisiert) == 2
+        assert synchronisiert[1] - geschrieben < 1.0
+        assert journal._unsynchronisiert == 0 and journal._timer is None
+    finally:
+        journal.schliessen()
+
+
+_ABSTURZ_CODE = """
+import sys, time
+sys.path.insert(0, {modulpfad!r})
+from gewebe_stub import erzeuge_gewebe, synthetischer_korpus
+gewebe = erzeuge_gewebe('batch', mit_ml=False)
+gewebe.oeffne_journal({verzeichnis!r})
+for text in synthetischer_korpus(5):
+    gewebe.fuege_ein(text)
+print('eingefuegt', flush=True)
+time.sleep(60)
+"""
+
+
+def test_wiederherstellung_nach_sigkill(neues_gewebe, tmp_path):
+    modulpfad = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    prozess = subprocess.Popen([sys.executable, '-c', _ABSTURZ_CODE.format(modulpfad=modulpfad, verzeichnis=str(tmp_path))],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        assert prozess.stdout.readline().strip() == 'eingefuegt'
+    finally:
+        prozess.kill()  # SIGKILL: kein schliesse_journal, kein atexit
+        prozess.wait()
+
+    wiederhergestellt = neues_gewebe('batch', mit_ml=False)
+    wiederhergestellt.oeffne_journal(str(tmp_path))
+    wiederhergestellt.schliesse_journal()
+    erwartet = neues_gewebe('batch', mit_ml=False)
+    for text in synthetischer_korpus(5):
+        erwartet.fuege_ein(text)
+    assert wiederhergestellt._fragmente == erwartet._fragmente
+    assert kanten_signatur(wiederhergestellt) == kanten_signatur(erwartet)
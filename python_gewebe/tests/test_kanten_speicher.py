@@ -0,0 +1,86 @@
+########################################
+# Datei: ./tests/test_kanten_speicher.py
+# Beschreibung: KantenSpeicher gegen ein Dict-of-Dicts als Modell: Zeilen, Reihenfolge, Knoten entfernen, Umnummerieren.
+########################################
+
+import random
+
+import numpy as np
+import pytest
+
+from kanten_speicher import KantenSpeicher
+
+ARTEN = ['ERGAENZUNG', 'KONTRAST', 'VERSTAERKUNG']
+
+
+def _vergleiche(speicher: KantenSpeicher, modell: dict):
+    assert speicher.keys() == sorted(modell)
+    assert speicher.kanten == sum(len(zeile) for zeile in modell.values())
+    for quelle, zeile in modell.items():
+        # Ziele in Einfügereihenfolge, wie im Dict
+        assert [(k.ziel, k.art, k.staerke, k.herkunft) for _, k in speicher[quelle].items()] == \
+               [(ziel, *werte) for ziel, werte in zeile.items()]
+        assert len(speicher[quelle]) == len(zeile)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_zufaellige_operationen_wie_dict(seed):
+    rng = random.Random(seed)
+    speicher, modell = KantenSpeicher(ARTEN, kapazitaet=16), {}
+    knoten = 30
+    for schritt in range(600):
+        aktion = rng.random()
+        if aktion < 0.55:
+            quelle, ziel = rng.sample(range(knoten), 2)
+            art, staerke, kontext = rng.choice(ARTEN), float(np.float32(rng.random())), f"k{rng.randrange(5)}"
+            speicher.setze(quelle, ziel, art, staerke, kontext)
+            modell.setdefault(quelle, {})[ziel] = (art, staerke, kontext)
+        elif aktion < 0.7:
+            paare = {tuple(rng.sample(range(knoten), 2)) for _ in range(rng.randint(1, 12))}
+            quelle, ziel = np.array(sorted(paare)).T
+            staerke = np.random.default_rng(schritt).random(len(paare)).astype(np.float32)
+            speicher.setze_viele(quelle, ziel, np.zeros(len(paare)), staerke, speicher.kontext_id('viele'))
+            for q, z, s in zip(quelle.tolist(), ziel.tolist(), staerke.tolist()):
+                modell.setdefault(q, {})[z] = (ARTEN[0], s, 'viele')
+        elif aktion < 0.8:
+            kanten = [(q, z) for q, zeile in modell.items() for z in zeile]
+            if kanten:
+                quelle, ziel = rng.choice(kanten)
+                speicher.entferne(quelle, ziel)
+                del modell[quelle][ziel]
+        elif aktion < 0.95:
+            k = rng.randrange(knoten)
+            weg = speicher.entferne_knoten(k)
+            erwartet = sorted((q, z) for q, zeile in modell.items() for z in zeile if k in (q, z))
+            assert sorted(zip(weg['quelle'].tolist(), weg['ziel'].tolist())) == erwartet
+            modell.pop(k, None)
+            for zeile in modell.values():
+                zeile.pop(k, None)
+        else:
+            bleiben = sorted(rng.sample(range(knoten), knoten - 3))
+            abbildung = np.full(knoten, -1)
+            abbildung[bleiben] = np.arange(len(bleiben))
+            speicher.nummeriere_um(abbildung)
+            modell = {int(abbildung[q]): {int(abbildung[z]): w for z, w in zeile.items() if abbildung[z] >= 0}
+                      for q, zeile in modell.items() if abbildung[q] >= 0}
+            knoten = len(bleiben) + 3  # neue Knoten-Ids hinten
+        _vergleiche(speicher, modell)
+
+    spalten = speicher.spalten()
+    kopie = KantenSpeicher.aus_spalten(speicher.art_namen, speicher.kontexte, spalten['quelle'], spalten['ziel'], spalten['art'],
+                                       spalten['staerke'], spalten['kontext'], spalten['ereignis'], zeilen=speicher.keys())
+    _vergleiche(kopie, modell)
+    k = max(modell, key=lambda q: len(modell[q]), default=0)
+    assert len(kopie.entferne_knoten(k)['quelle']) == len(speicher.entferne_knoten(k)['quelle'])
+
+
+def test_zeile_ohne_suche_ueber_alle_knoten():
+    speicher = KantenSpeicher(ARTEN)
+    n = 2000
+    speicher.setze_viele(np.zeros(n - 1), np.arange(1, n), np.zeros(n - 1), np.ones(n - 1))
+    speicher.setze(5, 6, 'KONTRAST', 0.5)
+    speicher.finde_viele = None  # eine Zeile und das Entfernen eines Knotens sondieren nicht mehr alle Ziele
+    assert speicher[5].keys() == [6]
+    weg = speicher.entferne_knoten(6)
+    assert sorted(zip(weg['quelle'].tolist(), weg['ziel'].tolist())) == [(0, 6), (5, 6)]
+    assert len(speicher[0]) == n - 2
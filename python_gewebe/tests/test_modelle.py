@@ -0,0 +1,29 @@
+########################################
+# Datei: ./tests/test_modelle.py
+# Beschreibung: Die kompilierten Wälder (wald_kompiliert.py) sagen bitgleich dasselbe voraus wie die sklearn-Modelle.
+########################################
+
+import os
+import warnings
+
+import numpy as np
+import pytest
+
+from gewebe_stub import VEKTOR_DIM
+from text_gewebe import MODELL_VERZEICHNIS
+from wald_kompiliert import KOMPILIERT_DATEI, lade_kompilierte_modelle
+
+joblib = pytest.importorskip('joblib')
+pytest.importorskip('sklearn')
+
+
+def test_kompilierte_waelder_bitgleich():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        art, staerke, labels = (joblib.load(os.path.join(MODELL_VERZEICHNIS, name)) for name in
+                                ('triadic_art_classifier.joblib', 'triadic_staerke_regressor.joblib', 'triadic_label_encoder.joblib'))
+    k_art, k_staerke, k_labels = lade_kompilierte_modelle(os.path.join(MODELL_VERZEICHNIS, KOMPILIERT_DATEI))
+    X = np.random.default_rng(0).normal(0, 0.5, size=(512, 3 * VEKTOR_DIM)).astype(np.float32)
+    assert np.array_equal(art.predict_proba(X), k_art.predict_proba(X))
+    assert np.array_equal(staerke.predict(X), k_staerke.predict(X))
+    assert np.array_equal(labels.inverse_transform(art.predict(X)), k_labels.inverse_transform(k_art.predict(X)))
@@ -0,0 +1,98 @@
+########################################
+# Datei: ./tests/test_nebenlaeufigkeit.py
+# Beschreibung: Leser gegen einen Schreiber: jede Antwort gleicht der Antwort eines einzelnen Threads in derselben Version; schliesse().
+########################################
+
+import threading
+
+import pytest
+
+from gewebe_stub import synthetischer_korpus
+
+ARTEN = ['VERSTAERKUNG', 'ERGAENZUNG', 'KONTRAST']
+IMPULSE = ["Was ist schwer zu erfassen im Gewebe?", "Die Welle ist tief und klar.", "Der Konflikt stört die Harmonie."]
+
+
+def _antwort(reaktionen) -> list:
+    return [reaktion.treffer(ARTEN, 0.3) for reaktion in reaktionen]
+
+
+@pytest.mark.parametrize('engine', ['sparse', 'pfade'])
+def test_leser_sehen_nur_ganze_versionen(neues_gewebe, engine):
+    korpus = synthetischer_korpus(16)
+    # Referenz: ein Thread, nach jedem Einfügen die Antworten auf die dann aktuelle Version
+    referenz = neues_gewebe('batch', mit_ml=False)
+    referenz._wellen_engine = engine
+    referenz.fuege_ein_viele(korpus[:8], modus='sequentiell')
+    erwartet = {}
+    for text in [None] + korpus[8:]:
+        if text is not None:
+            referenz.fuege_ein(text)
+        ansicht = referenz.ansicht()
+        erwartet[ansicht.version] = _antwort(referenz.reagiere(impuls, ansicht) for impuls in IMPULSE)
+
+    gewebe = neues_gewebe('batch', mit_ml=False)
+    gewebe._wellen_engine = engine
+    gewebe._ansicht_intervall = 0.0  # der Schreiber veröffentlicht nach jeder Mutation
+    gewebe.fuege_ein_viele(korpus[:8], modus='sequentiell')
+    gewebe.ansicht()
+    fertig = threading.Event()
+    gesehen, fehler = [], []
+
+    def lies(mit_viele: bool):
+        try:
+            while True:
+                zuletzt = fertig.is_set()
+                if mit_viele:
+                    reaktionen = gewebe.reagiere_viele(IMPULSE, arbeiter=2, warten=False)
+                else:
+                    ansicht = gewebe.ansicht(warten=False)
+                    reaktionen = [gewebe.reagiere(impuls, ansicht) for impuls in IMPULSE]
+                versionen = {reaktion.ansicht.version for reaktion in reaktionen}
+                assert len(versionen) == 1  # alle Impulse eines Aufrufs auf derselben Ansicht
+                gesehen.append((versionen.pop(), _antwort(reaktionen)))
+                if zuletzt:
+                    return
+        except Exception as e:
+            fehler.append(e)
+
+    def schreibe():
+        try:
+            for text in korpus[8:]:
+                gewebe.fuege_ein(text)
+        except Exception as e:
+            fehler.append(e)
+        finally:
+            fertig.set()
+
+    threads = [threading.Thread(target=lies, args=(i % 2 == 0,)) for i in range(4)] + [threading.Thread(target=schreibe)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    gewebe.schliesse()
+
+    assert not fehler
+    assert gewebe.ansicht().version == max(erwartet)
+    assert gesehen
+    for version, antwort in gesehen:
+        assert antwort == erwartet[version]
+    assert any(version == max(erwartet) for version, _ in gesehen)
+
+
+def test_schliesse_beendet_hintergrund_threads(neues_gewebe, tmp_path):
+    gewebe = neues_gewebe('batch', mit_ml=False)
+    gewebe._wellen_engine = 'pfade'
+    gewebe.oeffne_journal(str(tmp_path))
+    gewebe.setze_verfeinerung(aktiv=True)
+    gewebe.fuege_ein_viele(synthetischer_korpus(10), modus='sequentiell')
+    gewebe.reagiere_viele(IMPULSE, arbeiter=2)
+    gewebe.schliesse()
+
+    namen = [thread.name for thread in threading.enumerate() if thread.is_alive()]
+    assert not [name for name in namen if name.startswith(('gewebe-abfrage', 'gewebe-verfeinerung'))]
+    assert gewebe._verfeinerer is None and gewebe._journal is None and not gewebe._triaden_auftraege
+    # das Gewebe bleibt benutzbar; reagiere_viele legt seinen Pool neu an
+    gewebe.fuege_ein("Das Gewebe wächst weiter.")
+    assert len(gewebe.reagiere_viele(IMPULSE, arbeiter=2)) == len(IMPULSE)
+    gewebe.schliesse()
@@ -0,0 +1,31 @@
+########################################
+# Datei: ./tests/test_persistenz.py
+# Beschreibung: Snapshot-Rundreise: das geladene Gewebe gleicht dem gespeicherten und wächst wie dieses weiter.
+########################################
+
+import numpy as np
+
+from gewebe_stub import StubGewebe, kanten_signatur
+
+
+def _merkmale_gleich(a, b):
+    n = len(a._fragmente)
+    assert len(b._fragmente) == n
+    assert np.array_equal(a._merkmale.vektoren[:n], b._merkmale.vektoren[:n])
+    assert np.array_equal(a._merkmale.sentiments[:n], b._merkmale.sentiments[:n])
+
+
+def test_snapshot_rundreise(neues_gewebe, korpus, mit_ml, tmp_path):
+    gewebe = neues_gewebe('batch', mit_ml)
+    gewebe.fuege_ein_viele(korpus, modus='batch')
+    gewebe.loesche_fragment(3)
+    gewebe.save(str(tmp_path))
+    geladen = StubGewebe.load(str(tmp_path))
+    geladen._ml_models_loaded = gewebe._ml_models_loaded
+    assert geladen._fragmente == gewebe._fragmente
+    assert kanten_signatur(geladen) == kanten_signatur(gewebe)
+    _merkmale_gleich(geladen, gewebe)
+    # das geladene Gewebe wächst weiter wie das ursprüngliche
+    gewebe.fuege_ein("Das Muster wächst klar im Regen.")
+    geladen.fuege_ein("Das Muster wächst klar im Regen.")
+    assert kanten_signatur(geladen) == kanten_signatur(gewebe)
@@ -0,0 +1,197 @@
+########################################
+# Datei: ./tests/test_server.py
+# Beschreibung: gewebe_server im Prozess: alle Endpunkte, Fehlerfälle, Gegendruck (503 + Retry-After), MikroBatcher und Lasttest-Client.
+########################################
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gewebe_last import Verbindung, lasttest
+from gewebe_server import GewebeServer, MikroBatcher, Ueberlastet
+from gewebe_stub import synthetischer_korpus
+
+ARTEN = ['VERSTAERKUNG', 'ERGAENZUNG', 'KONTRAST']
+IMPULS = "Die Welle ist tief und klar."
+
+
+@pytest.fixture
+def gewebe(neues_gewebe):
+    gewebe = neues_gewebe('batch', mit_ml=False)
+    gewebe.fuege_ein_viele(synthetischer_korpus(10), modus='batch')
+    yield gewebe
+    gewebe.schliesse()
+
+
+def _im_server(gewebe, test, **kwargs):
+    """Startet GewebeServer(port=0) in einer frischen Ereignisschleife und ruft `await test(server)`."""
+    async def laufe():
+        server = GewebeServer(gewebe, port=0, **kwargs)
+        await server.starte()
+        try:
+            return await test(server)
+        finally:
+            await server.stoppe()
+    return asyncio.run(laufe())
+
+
+async def _roh(port: int, anfrage: bytes) -> tuple[int, dict, dict]:
+    """Schickt eine Anfrage unverändert und liest Status, Kopfzeilen und JSON-Antwort."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(anfrage)
+        await writer.drain()
+        status = int((await reader.readline()).split(b' ', 2)[1])
+        kopf = {}
+        while (zeile := await reader.readline()) not in (b'\r\n', b''):
+            name, _, wert = zeile.decode('latin-1').partition(':')
+            kopf[name.strip().lower()] = wert.strip()
+        return status, kopf, json.loads(await reader.readexactly(int(kopf['content-length'])))
+    finally:
+        writer.close()
+
+
+def test_endpunkte(gewebe):
+    gewebe.aktiviere_messung()
+
+    async def test(server):
+        verbindung = Verbindung('127.0.0.1', server.port)
+        await verbindung.oeffne()
+        try:
+            antworten = {}
+            for schluessel, methode, pfad, koerper in [
+                    ('einfuegen', 'POST', '/fragmente', {'text': "Das Gewebe wächst weiter."}),
+                    ('viele', 'POST', '/fragmente/viele', {'texte': ["Die Welle trägt.", "Der Kontrast bleibt."]}),
+                    ('loeschen', 'DELETE', '/fragmente/3', None),
+                    ('nochmal_loeschen', 'DELETE', '/fragmente/3', None),
+                    ('verschmelzen', 'POST', '/verschmelzen', {'index1': 1, 'index2': 2, 'modus': 'merkmale'}),
+                    ('verschmelzen_viele', 'POST', '/verschmelzen/viele', {'paare': [[4, 5], [3, 6]]}),
+                    ('reaktion', 'POST', '/reaktion', {'impuls': IMPULS}),
+                    ('suche', 'POST', '/suche', {'impuls': IMPULS, 'arten': ARTEN, 'mindest_staerke': 0.3}),
+                    ('zustand', 'GET', '/zustand', None),
+                    ('messwerte', 'GET', '/messwerte', None),
+                    ('unbekannt', 'GET', '/gibt/es/nicht', None),
+                    ('methode', 'GET', '/fragmente', None),
+                    ('ohne_text', 'POST', '/fragmente', {'text': ''}),
+                    ('konsistenz', 'POST', '/reaktion', {'impuls': IMPULS, 'konsistenz': 'irgendwie'})]:
+                antworten[schluessel] = await verbindung.anfrage(methode, pfad, koerper)
+            return antworten
+        finally:
+            await verbindung.schliesse()
+
+    antworten = _im_server(gewebe, test)
+    assert antworten['einfuegen'] == (200, {'id': 10})
+    assert antworten['viele'] == (200, {'ids': [11, 12]})
+    assert antworten['loeschen'] == (200, {'geloescht': 3})
+    assert antworten['nochmal_loeschen'][0] == 404
+    status, verschmolzen = antworten['verschmelzen']
+    assert status == 200 and verschmolzen['fragmente'] == len(gewebe._fragmente) - 1
+    assert gewebe._fragmente[verschmolzen['id']] is not None and gewebe._fragmente[1] is None
+    status, viele = antworten['verschmelzen_viele']
+    assert status == 200 and viele['ids'][0] is not None and viele['ids'][1] is None  # 3 ist gelöscht
+
+    status, reaktion = antworten['reaktion']
+    ansicht = gewebe.ansicht()
+    assert status == 200 and reaktion['version'] == ansicht.version and reaktion['vorlaeufig'] is False
+    assert reaktion['report'] == json.loads(json.dumps(gewebe.reagiere(IMPULS, ansicht).bericht()))
+    status, suche = antworten['suche']
+    assert status == 200
+    assert suche['fragmente'] == json.loads(json.dumps(gewebe.reagiere(IMPULS, ansicht).fragmente_mit_resonanz(ARTEN, 0.3)))
+
+    status, zustand = antworten['zustand']
+    assert status == 200 and zustand['version'] == ansicht.version
+    assert zustand['warteschlangen']['einfuegen']['auftraege'] == 2
+    assert zustand['warteschlangen']['impulse']['auftraege'] == 2
+    status, messwerte = antworten['messwerte']
+    assert status == 200 and 'triaden' in messwerte and 'verfeinerung' in messwerte
+    assert [antworten[s][0] for s in ('unbekannt', 'methode', 'ohne_text', 'konsistenz')] == [404, 405, 400, 400]
+
+
+def test_fehlerhafte_anfragen(gewebe):
+    async def test(server):
+        return [await _roh(server.port, b"POST /fragmente HTTP/1.1\r\nContent-Length: zehn\r\n\r\n"),
+                await _roh(server.port, b"POST /fragmente HTTP/1.1\r\nContent-Length: -4\r\n\r\n"),
+                await _roh(server.port, b"POST /fragmente HTTP/1.1\r\nContent-Length: 5\r\n\r\n{text"),
+                await _roh(server.port, b"POST /fragmente HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]")]
+
+    (status, kopf, antwort), *andere = _im_server(gewebe, test)
+    assert status == 400 and kopf['connection'] == 'close' and 'Content-Length' in antwort['fehler']
+    assert [s for s, _, _ in andere] == [400, 400, 400]
+    assert len(gewebe._fragmente) == 10
+
+
+def test_volle_warteschlange_gibt_503(gewebe):
+    async def test(server):
+        # Hält der Test die Schreibsperre, hängt der erste Stapel im Schreiber-Thread; ein Auftrag passt noch in die Warteschlange
+        gewebe._schreib_sperre.acquire()
+        try:
+            erster = asyncio.ensure_future(_roh(server.port, _post('/fragmente', {'text': "Der erste Text."})))
+            while server.einfuegen.stapel == 0:
+                await asyncio.sleep(0.005)
+            zweiter = asyncio.ensure_future(_roh(server.port, _post('/fragmente', {'text': "Der zweite Text."})))
+            while len(server.einfuegen) == 0:
+                await asyncio.sleep(0.005)
+            abgelehnt = await _roh(server.port, _post('/fragmente', {'text': "Der dritte Text."}))
+            zustand = server._zustand()
+        finally:
+            gewebe._schreib_sperre.release()
+        return abgelehnt, zustand, await erster, await zweiter
+
+    (status, kopf, antwort), zustand, erster, zweiter = _im_server(gewebe, test, max_warteschlange=1)
+    assert status == 503 and kopf['retry-after'] == '1' and 'voll' in antwort['fehler']
+    assert zustand['warteschlangen']['einfuegen']['abgelehnt'] == 1
+    assert (erster[0], erster[2], zweiter[0], zweiter[2]) == (200, {'id': 10}, 200, {'id': 11})
+
+
+def _post(pfad: str, koerper: dict) -> bytes:
+    daten = json.dumps(koerper).encode('utf-8')
+    return f"POST {pfad} HTTP/1.1\r\nContent-Length: {len(daten)}\r\nConnection: close\r\n\r\n".encode('latin-1') + daten
+
+
+def test_mikrobatcher_sammelt_und_lehnt_ab():
+    freigabe = threading.Event()
+    stapel = []
+
+    def verarbeite(auftraege):
+        freigabe.wait(5)
+        stapel.append(list(auftraege))
+        return [ValueError(a) if a < 0 else 2 * a for a in auftraege]
+
+    async def laufe():
+        with ThreadPoolExecutor(1) as executor:
+            batcher = MikroBatcher('test', verarbeite, executor, fenster=0.05, max_batch=3, max_warteschlange=4)
+            batcher.starte()
+            try:
+                erster = asyncio.ensure_future(batcher.einreichen(1))
+                while batcher.stapel == 0:
+                    await asyncio.sleep(0.001)  # der erste Stapel wartet in verarbeite auf die Freigabe
+                folgende = [asyncio.ensure_future(batcher.einreichen(a)) for a in [2, -3, 4, 5]]
+                await asyncio.sleep(0)
+                with pytest.raises(Ueberlastet):
+                    await batcher.einreichen(6)
+                freigabe.set()
+                ergebnisse = await asyncio.gather(erster, *folgende, return_exceptions=True)
+                return ergebnisse, batcher.abgelehnt, batcher.auftraege
+            finally:
+                await batcher.stoppe()
+
+    ergebnisse, abgelehnt, auftraege = asyncio.run(laufe())
+    assert stapel == [[1], [2, -3, 4], [5]]  # max_batch begrenzt den Stapel, Wartendes kommt ohne Fenster mit
+    assert ergebnisse[:2] == [2, 4] and isinstance(ergebnisse[2], ValueError) and ergebnisse[3:] == [8, 10]
+    assert (abgelehnt, auftraege) == (1, 5)
+
+
+def test_lasttest_client(gewebe):
+    texte = [f"Neuer Gedanke Nummer {i} im Gewebe." for i in range(200)]
+
+    async def test(server):
+        return await lasttest('127.0.0.1', server.port, [IMPULS, "Der Konflikt stört die Harmonie."], texte,
+                              verbindungen=4, dauer=0.5, mischung={'reaktion': 0.5, 'suche': 0.3, 'einfuegen': 0.2})
+
+    ergebnis = _im_server(gewebe, test)
+    assert ergebnis['anfragen'] > 0 and set(ergebnis['status']) == {200} and ergebnis['abgelehnt'] == 0
+    assert ergebnis['gesamt']['p50_ms'] <= ergebnis['gesamt']['p99_ms']
+    assert len(gewebe._fragmente) == 10 + ergebnis.get('einfuegen', {'anzahl': 0})['anzahl']
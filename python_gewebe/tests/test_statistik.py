@@ -0,0 +1,79 @@
+########################################
+# Datei: ./tests/test_statistik.py
+# Beschreibung: Die laufend gepflegte GewebeStatistik bleibt über zufällige Mutationsfolgen gleich ihrer Neuberechnung.
+########################################
+
+import random
+
+import pytest
+
+from gewebe_stub import synthetischer_korpus
+
+SCHRITTE = 40
+
+
+def _aktive(gewebe) -> list[int]:
+    return [i for i, text in enumerate(gewebe._fragmente) if text is not None]
+
+
+def _zufaelliger_schritt(gewebe, rng: random.Random, nachschub) -> str:
+    """Führt eine zufällige Mutation aus und gibt ihren Namen zurück."""
+    aktive = _aktive(gewebe)
+    operationen = ['fuege_ein', 'fuege_ein_viele']
+    if len(aktive) >= 1:
+        operationen += ['loesche_fragment']
+    if len(aktive) >= 2:
+        operationen += ['verschmelze_merkmale', 'verschmelze_neu_parsen', 'verschmelze_viele']
+    if len(aktive) >= 3:
+        operationen += ['triaden', 'kompaktiere_ids']
+    operation = rng.choice(operationen)
+    if operation == 'fuege_ein':
+        gewebe.fuege_ein(next(nachschub))
+    elif operation == 'fuege_ein_viele':
+        gewebe.fuege_ein_viele([next(nachschub) for _ in range(rng.randint(1, 4))], modus=rng.choice(['sequentiell', 'batch']))
+    elif operation == 'loesche_fragment':
+        gewebe.loesche_fragment(rng.choice(aktive))
+    elif operation == 'verschmelze_merkmale':
+        gewebe.verschmelze_fragmente(*rng.sample(aktive, 2), modus='merkmale')
+    elif operation == 'verschmelze_neu_parsen':
+        gewebe.verschmelze_fragmente(*rng.sample(aktive, 2))
+    elif operation == 'verschmelze_viele':
+        ids = rng.sample(aktive, 2 * min(3, len(aktive) // 2))
+        gewebe.verschmelze_viele(list(zip(ids[::2], ids[1::2])))
+    elif operation == 'triaden':
+        # ein weiterer triadischer Durchlauf mit einem bestehenden Fragment als drittem Glied
+        drittes = rng.choice(aktive)
+        gewebe._aktualisiere_triaden(drittes, [i for i in aktive if i != drittes])
+    else:
+        gewebe.kompaktiere_ids()
+    return operation
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+@pytest.mark.parametrize('triaden_modus', ['batch', 'einzeln'])
+def test_statistik_bleibt_konsistent(neues_gewebe, mit_ml, triaden_modus, seed):
+    rng = random.Random(seed)
+    nachschub = iter(synthetischer_korpus(10 * SCHRITTE, seed=seed))
+    gewebe = neues_gewebe(triaden_modus, mit_ml)
+    assert gewebe.pruefe_statistik() == []
+    for schritt in range(SCHRITTE):
+        operation = _zufaelliger_schritt(gewebe, rng, nachschub)
+        assert gewebe.pruefe_statistik() == [], f"nach Schritt {schritt} ({operation})"
+    assert gewebe._statistik.kanten > 0
+
+
+@pytest.mark.parametrize('seed', [4, 5])
+def test_statistik_bleibt_konsistent_bei_verfeinerung(neues_gewebe, mit_ml, seed):
+    rng = random.Random(seed)
+    nachschub = iter(synthetischer_korpus(10 * SCHRITTE, seed=seed))
+    gewebe = neues_gewebe('batch', mit_ml)
+    gewebe.setze_verfeinerung(hintergrund=False, budget_paare=30)
+    for schritt in range(SCHRITTE):
+        if rng.random() < 0.3:
+            operation = 'verfeinere'
+            gewebe.verfeinere()
+        else:
+            operation = _zufaelliger_schritt(gewebe, rng, nachschub)
+        assert gewebe.pruefe_statistik() == [], f"nach Schritt {schritt} ({operation})"
+    gewebe.verfeinere_alles()
+    assert gewebe.pruefe_statistik() == []
@@ -0,0 +1,130 @@
+########################################
+# Datei: ./tests/test_training.py
+# Beschreibung: Inkrementelles Training (Fortsetzen ab Byte-Position, volles Training bei verändertem Anfang) und Hot-Reload.
+########################################
+
+import contextlib
+import hashlib
+import io
+import json
+import random
+import threading
+
+import pytest
+
+from gewebe_stub import StubGewebe, StubNlp, synthetischer_korpus
+
+model_trainer = pytest.importorskip('model_trainer', exc_type=ImportError)  # braucht spaCy, sklearn und joblib
+
+ARTEN = ['ERGAENZUNG', 'KONTRAST', 'ENTWICKLUNG']
+
+# warm_start mit class_weight='balanced' (siehe train_incremental) warnt bei jedem Block
+pytestmark = pytest.mark.filterwarnings('ignore:class_weight presets:UserWarning')
+
+
+def _zeilen(anzahl: int, seed: int, arten=ARTEN) -> list[str]:
+    rng = random.Random(seed)
+    korpus = synthetischer_korpus(40, seed=seed)
+    return [json.dumps({'fragment_a': rng.choice(korpus), 'fragment_b': rng.choice(korpus), 'fragment_c': rng.choice(korpus),
+                        'label': {'ergebnis_art': arten[i % len(arten)], 'ergebnis_staerke': round(rng.random(), 2)}}) + '\n'
+            for i in range(anzahl)]
+
+
+@pytest.fixture
+def trainer(tmp_path):
+    """Führt model_trainer.train/train_incremental still auf Daten und Modellen in tmp_path aus."""
+    daten = tmp_path / 'training_data.jsonl'
+    nlp = StubNlp()
+
+    def trainiere(funktion, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            funktion(cache_dir=str(tmp_path / 'cache'), data_file=str(daten), model_dir=str(tmp_path), nlp=nlp, **kwargs)
+    trainiere.daten = daten
+    return trainiere
+
+
+def _stand(tmp_path) -> dict:
+    with open(tmp_path / model_trainer.TRAINING_STATE_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _baeume(tmp_path) -> tuple:
+    joblib = pytest.importorskip('joblib')
+    paths = model_trainer.model_paths(str(tmp_path))
+    return tuple(len(joblib.load(paths[k]).estimators_) for k in ('art', 'staerke'))
+
+
+def test_inkrementell_setzt_an_byte_position_fort(trainer, tmp_path):
+    trainer.daten.write_text(''.join(_zeilen(40, seed=1)), encoding='utf-8')
+    trainer(model_trainer.train)
+    assert _baeume(tmp_path) == (100, 100)
+
+    with open(trainer.daten, 'a', encoding='utf-8') as f:
+        f.writelines(_zeilen(25, seed=2))
+        f.write(_zeilen(1, seed=3)[0].rstrip('\n'))  # noch unvollständige letzte Zeile: erst im nächsten Lauf
+    trainer(model_trainer.train_incremental, trees_per_chunk=5, chunk_lines=10)
+    assert _baeume(tmp_path) == (115, 115)  # drei Blöcke (10, 10, 5)
+    inhalt = trainer.daten.read_bytes()
+    vollstaendig = inhalt[:inhalt.rindex(b'\n') + 1]
+    stand = _stand(tmp_path)
+    assert (stand['offset'], stand['samples']) == (len(vollstaendig), 65)
+    assert stand['sha256'] == hashlib.sha256(vollstaendig).hexdigest()
+
+    with open(trainer.daten, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    trainer(model_trainer.train_incremental, trees_per_chunk=5, chunk_lines=10)  # nur die nachgeholte Zeile
+    assert _baeume(tmp_path) == (120, 120)
+    stand = _stand(tmp_path)
+    assert (stand['offset'], stand['samples']) == (len(inhalt) + 1, 66)
+
+
+def test_veraenderter_anfang_erzwingt_volles_training(trainer, tmp_path):
+    zeilen = _zeilen(40, seed=1)
+    trainer.daten.write_text(''.join(zeilen), encoding='utf-8')
+    trainer(model_trainer.train)
+    trainer.daten.write_text(''.join(_zeilen(1, seed=9) + zeilen[1:] + _zeilen(10, seed=2)), encoding='utf-8')
+    trainer(model_trainer.train_incremental, trees_per_chunk=5)
+    assert _baeume(tmp_path) == (100, 100)
+    stand = _stand(tmp_path)
+    assert stand['samples'] == 50
+    assert stand['sha256'] == hashlib.sha256(trainer.daten.read_bytes()).hexdigest()
+
+    # eine neue Resonanz-Art braucht ebenfalls ein volles Training
+    with open(trainer.daten, 'a', encoding='utf-8') as f:
+        f.writelines(_zeilen(12, seed=4, arten=ARTEN + ['KONFLIKT']))
+    trainer(model_trainer.train_incremental, trees_per_chunk=5)
+    assert _baeume(tmp_path) == (100, 100)
+    assert _stand(tmp_path)['samples'] == 62
+
+
+def test_hot_reload(trainer, tmp_path):
+    trainer.daten.write_text(''.join(_zeilen(40, seed=1)), encoding='utf-8')
+    trainer(model_trainer.train)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gewebe = StubGewebe(modell_verzeichnis=str(tmp_path))
+    assert gewebe._ml_models_loaded
+    gewebe.fuege_ein_viele(synthetischer_korpus(5), modus='batch')
+    baeume = len(gewebe._art_classifier.wurzeln)
+
+    with open(trainer.daten, 'a', encoding='utf-8') as f:
+        f.writelines(_zeilen(10, seed=2))
+    trainer(model_trainer.train_incremental, trees_per_chunk=5)
+    gewebe.beobachte_modelle(0.0)
+    gewebe.fuege_ein("Das Gewebe wächst weiter.")  # prüft vor dem triadischen Durchlauf und lädt neu
+    assert len(gewebe._art_classifier.wurzeln) == baeume + 5
+
+    # Ausgetauscht wird unter der Schreibsperre: ein laufender Schreiber sieht nie einen halben Wechsel
+    with open(trainer.daten, 'a', encoding='utf-8') as f:
+        f.writelines(_zeilen(10, seed=3))
+    trainer(model_trainer.train_incremental, trees_per_chunk=5)
+    neu_geladen = threading.Event()
+    with gewebe._schreib_sperre:
+        vorher = (gewebe._art_classifier, gewebe._staerke_regressor, gewebe._label_encoder)
+        laden = threading.Thread(target=lambda: gewebe.lade_ml_modelle_neu() and neu_geladen.set())
+        laden.start()
+        assert not neu_geladen.wait(0.5)
+        assert (gewebe._art_classifier, gewebe._staerke_regressor, gewebe._label_encoder) == vorher
+    laden.join(10)
+    assert neu_geladen.is_set()
+    assert len(gewebe._art_classifier.wurzeln) == baeume + 10
+    assert gewebe._label_encoder is not vorher[2]
@@ -0,0 +1,74 @@
+########################################
+# Datei: ./tests/test_triaden.py
+# Beschreibung: Die schnellen triadischen Wege liefern dieselben Kanten wie der Pfad pro Paar.
+########################################
+
+import pytest
+
+from gewebe_stub import gewebe_ohne_kanten, kanten_signatur
+
+
+def test_batch_gleich_einzeln(neues_gewebe, korpus, mit_ml):
+    signaturen = []
+    for modus in ['einzeln', 'batch']:
+        gewebe = neues_gewebe(modus, mit_ml)
+        for text in korpus[:15]:
+            gewebe.fuege_ein(text)
+        signaturen.append(kanten_signatur(gewebe))
+    assert signaturen[0]
+    assert signaturen[0] == signaturen[1]
+
+
+@pytest.mark.parametrize('modus', ['sequentiell', 'batch'])
+def test_fuege_ein_viele_gleich_schleife(neues_gewebe, korpus, mit_ml, modus):
+    if modus == 'batch' and not mit_ml:
+        pytest.skip("'batch' wendet die heuristischen Regeln früherer Fragmente des Stapels nicht an (siehe fuege_ein_viele)")
+    schleife = neues_gewebe('batch', mit_ml)
+    for text in korpus:
+        schleife.fuege_ein(text)
+    viele = neues_gewebe('batch', mit_ml)
+    viele.fuege_ein_viele(korpus, modus=modus)
+    assert viele._fragmente == schleife._fragmente
+    assert kanten_signatur(viele) == kanten_signatur(schleife)
+
+
+def test_aufgeschoben_gleich_sofort(neues_gewebe, korpus, mit_ml):
+    signaturen = []
+    for aufgeschoben in [False, True]:
+        gewebe = neues_gewebe('batch', mit_ml)
+        gewebe.fuege_ein_viele(korpus[:20], modus='batch')
+        if aufgeschoben:
+            gewebe.setze_verfeinerung(hintergrund=False, budget_paare=50)
+        for text in korpus[20:]:
+            gewebe.fuege_ein(text)
+        if aufgeschoben:
+            assert gewebe.verfeinerung_status()['ausstehende_auftraege'] > 0
+            gewebe.verfeinere_alles()
+        signaturen.append(kanten_signatur(gewebe))
+    assert signaturen[0] == signaturen[1]
+
+
+def test_pool_gleich_seriell():
+    gewebe = gewebe_ohne_kanten(41)
+    gewebe.setze_triaden_top_k(8)
+    aktive = list(range(40))
+    gewebe._aktualisiere_triaden_gebuendelt(40, aktive)
+    referenz = kanten_signatur(gewebe)
+    gewebe.setze_triaden_pool(2, min_fragmente=0)
+    try:
+        gewebe._aktualisiere_triaden_gebuendelt(40, aktive)
+    finally:
+        gewebe.setze_triaden_pool(0)
+    assert kanten_signatur(gewebe) == referenz
+
+
+def test_top_k_ab_gewebegroesse_exakt(neues_gewebe, korpus):
+    signaturen = []
+    for k in [None, len(korpus)]:
+        gewebe = neues_gewebe('batch')
+        gewebe.setze_triaden_top_k(k)
+        gewebe.fuege_ein_viele(korpus, modus='sequentiell')
+        signaturen.append(kanten_signatur(gewebe))
+    assert signaturen[0] == signaturen[1]
+    with pytest.raises(ValueError):
+        gewebe.setze_triaden_top_k(0)
@@ -0,0 +1,90 @@
+########################################
+# Datei: ./tests/test_vektor_cache.py
+# Beschreibung: Vektor-Cache: das Gewebe schreibt gebündelt hinein, das Training bettet nur noch unbekannte Texte ein.
+########################################
+
+import numpy as np
+import pytest
+
+from gewebe_stub import StubNlp, synthetischer_korpus
+from vektor_cache import VektorCache, modell_kennung
+
+
+class ZaehlendesNlp(StubNlp):
+    """StubNlp, das sich die über nlp.pipe eingebetteten Texte merkt."""
+
+    def __init__(self):
+        super().__init__()
+        self.eingebettet = []
+
+    def pipe(self, texts, batch_size: int = 1000, n_process: int = 1):
+        texts = list(texts)
+        self.eingebettet.extend(texts)
+        return super().pipe(texts, batch_size, n_process)
+
+
+def _annotationen(texte: list[str], anzahl: int, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    return [{'fragment_a': texte[a], 'fragment_b': texte[b], 'fragment_c': texte[c],
+             'label': {'ergebnis_art': 'ERGAENZUNG', 'ergebnis_staerke': 0.5}}
+            for a, b, c in rng.integers(len(texte), size=(anzahl, 3)).tolist()]
+
+
+def test_gewebe_schreibt_gebuendelt(neues_gewebe, tmp_path, monkeypatch):
+    aufrufe = []
+    schreibe = VektorCache.fuege_hinzu_viele
+
+    def zaehle(cache, texte, vektoren):
+        aufrufe.append(len(texte))
+        return schreibe(cache, texte, vektoren)
+    monkeypatch.setattr(VektorCache, 'fuege_hinzu_viele', zaehle)
+    korpus = synthetischer_korpus(40)
+    gewebe = neues_gewebe('batch', mit_ml=False)
+    gewebe.setze_vektor_cache(str(tmp_path))
+    for modus in ['sequentiell', 'batch']:
+        gewebe.fuege_ein_viele(korpus[:10] if modus == 'sequentiell' else korpus[10:20], modus=modus)
+    assert aufrufe == [10, 10]
+    for text in korpus[20:]:
+        gewebe.fuege_ein(text)
+    assert aufrufe == [10, 10]  # einzelne fuege_ein sammeln bis VEKTOR_CACHE_PUFFER
+    gewebe.setze_vektor_cache(None)
+    assert aufrufe == [10, 10, 20]
+
+    cache = VektorCache(str(tmp_path), modell_kennung(gewebe.nlp), gewebe.nlp.vocab.vectors.shape[1])
+    vektoren, fehlend = cache.hole_viele(korpus)
+    assert len(fehlend) == 0
+    assert np.array_equal(vektoren, gewebe._merkmale.vektoren[:len(korpus)])
+
+
+def test_training_bettet_nur_neue_texte_ein(tmp_path):
+    model_trainer = pytest.importorskip('model_trainer', exc_type=ImportError)  # braucht spaCy und sklearn
+    nlp = ZaehlendesNlp()
+    korpus = synthetischer_korpus(60)
+    neue_texte = [f"{text} Nummer {i}" for i, text in enumerate(synthetischer_korpus(8, seed=5))]
+    cache = VektorCache(str(tmp_path), modell_kennung(nlp), nlp.vocab.vectors.shape[1])
+
+    daten = _annotationen(korpus, 100, seed=1)
+    X, _, _ = model_trainer.create_features_and_labels(daten, nlp, cache)
+    assert set(nlp.eingebettet) == {d[k] for d in daten for k in ('fragment_a', 'fragment_b', 'fragment_c')}
+
+    nlp.eingebettet.clear()
+    daten_neu = daten + _annotationen(neue_texte, 20, seed=2)
+    X_neu, _, _ = model_trainer.create_features_and_labels(daten_neu, nlp, cache)
+    assert sorted(nlp.eingebettet) == sorted({d[k] for d in daten_neu[100:] for k in ('fragment_a', 'fragment_b', 'fragment_c')})
+    assert np.array_equal(X_neu[:100], X)
+    ohne_cache, _, _ = model_trainer.create_features_and_labels(daten_neu, StubNlp())
+    assert np.array_equal(X_neu, ohne_cache)
+
+
+def test_training_nutzt_vektoren_des_gewebes(neues_gewebe, tmp_path):
+    model_trainer = pytest.importorskip('model_trainer', exc_type=ImportError)  # braucht spaCy und sklearn
+    korpus = synthetischer_korpus(30)
+    gewebe = neues_gewebe('batch', mit_ml=False)
+    gewebe.fuege_ein_viele(korpus[:20], modus='batch')
+    gewebe.setze_vektor_cache(str(tmp_path))
+    gewebe.setze_vektor_cache(None)
+
+    nlp = ZaehlendesNlp()
+    cache = VektorCache(str(tmp_path), modell_kennung(nlp), nlp.vocab.vectors.shape[1])
+    model_trainer.create_features_and_labels(_annotationen(korpus, 50, seed=3), nlp, cache)
+    assert set(nlp.eingebettet) <= set(korpus[20:])
@@ -0,0 +1,84 @@
+########################################
+# Datei: ./tests/test_vektor_index.py
+# Beschreibung: IVFIndex gegen BruteForceIndex: Recall, Speichern und Laden, inkrementelle Pflege durch das Gewebe.
+########################################
+
+import numpy as np
+import pytest
+
+from gewebe_stub import synthetischer_korpus
+from vektor_index import BruteForceIndex, IVFIndex, lade_vektor_index
+
+
+def _zufallsvektoren(anzahl: int, dim: int = 32, seed: int = 0):
+    return np.random.default_rng(seed).standard_normal((anzahl, dim)).astype(np.float32)
+
+
+def _gefuellt(index, vektoren):
+    index.hinzufuegen_viele(np.arange(len(vektoren)), vektoren)
+    return index
+
+
+def test_ivf_mit_allen_listen_gleich_exakt():
+    vektoren = _zufallsvektoren(600)
+    ivf = _gefuellt(IVFIndex(nlist=12, min_training=100), vektoren)
+    exakt = _gefuellt(BruteForceIndex(), vektoren)
+    assert ivf._zentroide is not None
+    for anfrage in _zufallsvektoren(20, seed=1):
+        ids, sim = ivf.suche(anfrage, 10, nprobe=12)
+        ref_ids, ref_sim = exakt.suche(anfrage, 10)
+        assert ids.tolist() == ref_ids.tolist()
+        assert np.allclose(sim, ref_sim)
+    # mit nprobe=1 wird nur eine Liste durchsucht; kein Treffer ist ähnlicher als der beste exakte
+    ids, sim = ivf.suche(anfrage, 10, nprobe=1)
+    assert len(ids) and np.all(sim <= ref_sim[0] + 1e-6)
+
+
+def test_ivf_speichern_und_laden(tmp_path):
+    vektoren = _zufallsvektoren(300)
+    ivf = _gefuellt(IVFIndex(nlist=6, nprobe=2, min_training=100), vektoren)
+    ivf.entfernen(5)
+    pfad = str(tmp_path / 'index.npz')
+    ivf.speichere(pfad)
+    geladen = lade_vektor_index(pfad)
+    assert isinstance(geladen, IVFIndex)
+    assert (len(geladen), geladen.nprobe, geladen.nlist) == (len(ivf), 2, 6)
+    assert np.array_equal(geladen._zentroide, ivf._zentroide)
+    assert geladen._listen == ivf._listen
+    for anfrage in _zufallsvektoren(10, seed=2):
+        for gefunden, erwartet in zip(geladen.suche(anfrage, 8), ivf.suche(anfrage, 8)):
+            assert np.array_equal(gefunden, erwartet)
+    # der geladene Index wird weiter inkrementell gepflegt
+    geladen.hinzufuegen(300, vektoren[5])
+    assert geladen.suche(vektoren[5], 1, nprobe=6)[0].tolist() == [300]
+
+
+def test_ivf_folgt_einfuegen_und_loeschen(neues_gewebe):
+    gewebe = neues_gewebe('batch', mit_ml=False)
+    korpus = synthetischer_korpus(40)
+    gewebe.fuege_ein_viele(korpus[:10], modus='sequentiell')
+    ivf = IVFIndex(nlist=4, min_training=20, neu_trainieren_ab=100.0)
+    gewebe.setze_vektor_index(ivf, top_k=5)
+    for text in korpus[10:]:
+        gewebe.fuege_ein(text)
+    for index in [3, 17, 25]:
+        gewebe.loesche_fragment(index)
+
+    aktive = [i for i, text in enumerate(gewebe._fragmente) if text is not None]
+    assert ivf._zentroide is not None
+    assert np.flatnonzero(ivf._aktiv).tolist() == aktive
+    assert sorted(i for liste in ivf._listen for i in liste) == aktive
+    exakt = BruteForceIndex()
+    exakt.hinzufuegen_viele(aktive, gewebe._merkmale.vektoren[aktive])
+    for text in synthetischer_korpus(5, seed=3):
+        vektor = gewebe._merkmale_aus_text(text).vektor
+        assert ivf.suche(vektor, 5, nprobe=4)[0].tolist() == exakt.suche(vektor, 5)[0].tolist()
+
+    # kompaktiere_ids baut den Index in der neuen Nummerierung neu auf und behält top_k
+    gewebe.kompaktiere_ids()
+    assert gewebe._vektor_index is ivf and gewebe._impuls_top_k == 5
+    assert np.flatnonzero(ivf._aktiv).tolist() == list(range(len(aktive)))
+    with pytest.raises(ValueError):
+        gewebe.setze_vektor_index(ivf, top_k=0)
+    gewebe.setze_vektor_index(None, top_k=5)
+    assert gewebe._impuls_top_k is None
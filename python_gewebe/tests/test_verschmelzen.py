@@ -0,0 +1,97 @@
+########################################
+# Datei: ./tests/test_verschmelzen.py
+# Beschreibung: Verschmelzen: gebündelt wie einzeln; bei automatischer Kompaktierung bleiben Ids, Kanten und Journal stimmig.
+########################################
+
+import numpy as np
+import pytest
+
+from gewebe_stub import kanten_signatur
+
+
+
+def test_verschmelze_viele_gleich_einzeln(neues_gewebe, korpus, mit_ml):
+    paare = [(0, 7), (3, 12), (20, 4), (9, 9), (0, 5)]  # (9, 9) ungültig, 0 im selben Aufruf schon verschmolzen
+    einzeln = neues_gewebe('batch', mit_ml)
+    einzeln.fuege_ein_viele(korpus, modus='batch')
+    erwartet = [einzeln.verschmelze_fragmente(i, j, modus='merkmale') for i, j in paare]
+    viele = neues_gewebe('batch', mit_ml)
+    viele.fuege_ein_viele(korpus, modus='batch')
+    assert viele.verschmelze_viele(paare) == erwartet == [30, 31, 32, None, None]
+    assert viele._fragmente == einzeln._fragmente
+    assert kanten_signatur(viele) == kanten_signatur(einzeln)
+
+
+def test_merkmale_nah_an_neu_parsen(neues_gewebe, korpus, mit_ml):
+    # Standard bleibt neu_parsen; der abgeleitete Weg weicht davon nur im Rahmen der Rundung ab
+    paare = [(0, 7), (3, 12), (20, 4), (9, 15)]
+    gewebe = {}
+    for modus in ['standard', 'neu_parsen', 'merkmale']:
+        g = gewebe[modus] = neues_gewebe('batch', mit_ml)
+        g.fuege_ein_viele(korpus, modus='batch')
+        for i, j in paare:
+            if modus == 'standard':
+                g.verschmelze_fragmente(i, j)
+            else:
+                g.verschmelze_fragmente(i, j, modus=modus)
+    referenz, abgeleitet = gewebe['neu_parsen'], gewebe['merkmale']
+    assert kanten_signatur(gewebe['standard']) == kanten_signatur(referenz)
+    assert abgeleitet._fragmente == referenz._fragmente
+    for i in range(len(korpus), len(korpus) + len(paare)):
+        a, b = referenz._merkmale[i], abgeleitet._merkmale[i]
+        assert np.allclose(a.vektor, b.vektor, atol=1e-5)
+        assert (a.konzepte, a.sentiment, a.kern_lemmata) == (b.konzepte, b.sentiment, b.kern_lemmata)
+        kanten_a, kanten_b = referenz._resonanzen_struktur[i], abgeleitet._resonanzen_struktur[i]
+        assert set(kanten_a) == set(kanten_b)
+        for j in kanten_a:
+            assert kanten_a[j].art == kanten_b[j].art
+            assert kanten_a[j].staerke == pytest.approx(kanten_b[j].staerke, abs=1e-4)
+
+def _gewebe_mit_tombstones(neues_gewebe, korpus, tombstone_anteil_max=None):
+    gewebe = neues_gewebe('batch')
+    gewebe.setze_kompaktierung(tombstone_anteil_max)
+    gewebe.fuege_ein_viele(korpus[:10], modus='batch')
+    for index in range(3):  # 3 von 10 Slots gelöscht: genau an der Schwelle, noch ohne Kompaktierung
+        gewebe.loesche_fragment(index)
+    assert len(gewebe._fragmente) == 10
+    return gewebe
+
+
+@pytest.mark.parametrize('modus', ['merkmale', 'neu_parsen'])
+def test_verschmelzen_mit_automatischer_kompaktierung(neues_gewebe, korpus, modus, tmp_path):
+    referenz = _gewebe_mit_tombstones(neues_gewebe, korpus)
+    erwartet = referenz.verschmelze_fragmente(4, 5, modus=modus)
+    erwartet = referenz.kompaktiere_ids()[erwartet]
+
+    gewebe = _gewebe_mit_tombstones(neues_gewebe, korpus, tombstone_anteil_max=0.3)
+    gewebe.oeffne_journal(str(tmp_path))
+    neu = gewebe.verschmelze_fragmente(4, 5, modus=modus)
+    gewebe.schliesse_journal()
+
+    assert None not in gewebe._fragmente
+    assert neu == erwartet
+    assert gewebe._fragmente[neu] == f"{korpus[4].strip()}. {korpus[5].strip()}"
+    assert gewebe._fragmente == referenz._fragmente
+    assert kanten_signatur(gewebe) == kanten_signatur(referenz)
+    assert gewebe.pruefe_statistik() == []
+
+    wiederhergestellt = neues_gewebe('batch')
+    wiederhergestellt.oeffne_journal(str(tmp_path))
+    wiederhergestellt.schliesse_journal()
+    assert wiederhergestellt._fragmente == gewebe._fragmente
+    assert kanten_signatur(wiederhergestellt) == kanten_signatur(gewebe)
+
+
+def test_verschmelze_viele_mit_automatischer_kompaktierung(neues_gewebe, korpus):
+    paare = [(4, 5), (6, 7), (8, 4)]  # 4 ist im selben Aufruf schon verschmolzen
+    referenz = _gewebe_mit_tombstones(neues_gewebe, korpus)
+    abbildung_vorher = referenz.verschmelze_viele(paare)
+    abbildung = referenz.kompaktiere_ids()
+    erwartet = [None if i is None else abbildung[i] for i in abbildung_vorher]
+
+    gewebe = _gewebe_mit_tombstones(neues_gewebe, korpus, tombstone_anteil_max=0.3)
+    neue_ids = gewebe.verschmelze_viele(paare)
+    assert None not in gewebe._fragmente
+    assert neue_ids == erwartet
+    assert [gewebe._fragmente[i] for i in neue_ids[:2]] == [f"{korpus[4]}. {korpus[5]}", f"{korpus[6]}. {korpus[7]}"]
+    assert kanten_signatur(gewebe) == kanten_signatur(referenz)
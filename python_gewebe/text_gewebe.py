@@ -6,12 +6,31 @@
 
 import re
 import random
-from collections import Counter
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
+import logging
 import os
-import spacy
+import threading
+import time
 import numpy as np
-import joblib
+
+from gewebe_ansicht import GewebeAnsicht, ImpulsReaktion, zustandsbericht
+from gewebe_journal import GewebeJournal, merkmale_als_dict
+from gewebe_messung import GewebeMessung
+from gewebe_snapshot import speichere_snapshot, lade_snapshot
+from gewebe_statistik import GewebeStatistik
+from kanten_speicher import KantenSpeicher, ResonanzVerbindung
+from vektor_cache import VektorCache, modell_kennung
+from triaden_pool import TriadenPool, band_paare
+from triaden_verfeinerung import TriadenAuftrag, Verfeinerer
+from vektor_index import VektorIndex
+from wald_kompiliert import KOMPILIERT_DATEI, lade_kompilierte_modelle
+from wellen_matrix import ResonanzAdjazenz, propagiere_wellen, propagiere_wellen_viele
+from merkmal_speicher import FragmentMerkmale, MerkmalSpeicher, KERN_WORTARTEN, KONZEPT_WORTARTEN, sentiment_label, token_schluessel
+
+logger = logging.getLogger(__name__)
 
 # Liste aller bekannten Resonanz-Arten
 ALL_RESONANCE_TYPES = [
@@ -21,20 +40,38 @@ ALL_RESONANCE_TYPES = [
     'KONFLIKT', 'ECHTBEZUG', 'ENTWICKLUNG'
 ]
 
-class ResonanzVerbindung:
-    """Repräsentiert eine gerichtete Resonanzverbindung zwischen zwei Fragmenten."""
-    def __init__(self, quelle_index: int, ziel_index: int, art: str, staerke: float, kontext: str):
-        self.quelle = quelle_index
-        self.ziel = ziel_index
-        self.art = art
-        self.staerke = staerke
-        self.kontext = kontext
+# Verzeichnis der trainierten Modelle; unabhängig vom Arbeitsverzeichnis, im Konstruktor überschreibbar
+MODELL_VERZEICHNIS = os.path.dirname(os.path.abspath(__file__))
+SPACY_MODELL = "de_core_news_lg"
 
-    def __repr__(self):
-        return f"ResonanzVerbindung(q={self.quelle}, z={self.ziel}, art='{self.art}', staerke={self.staerke:.2f})"
+# Ausgeschlossene spaCy-Komponenten je Profil. Das Gewebe liest nur lemma_, pos_, is_stop, is_punct und die
+# Vektoren; Parser, NER und Satzsegmentierung tragen dazu nichts bei und kosten nur Lade- und Parsezeit.
+NLP_PROFILE = {
+    'schlank': ('parser', 'ner', 'senter'),
+    'voll': (),
+}
 
-    def to_dict(self):
-        return {'quelle': self.quelle, 'ziel': self.ziel, 'art': self.art, 'staerke': self.staerke, 'kontext': self.kontext}
+# Anzahl Impulse, deren Merkmale zwischen Abfragen im Speicher bleiben (LRU)
+IMPULS_CACHE_GROESSE = 512
+
+# Fragmentvektoren, die einzelne fuege_ein sammeln, bevor sie in einem Zug in den VektorCache gehen (Sperre und fsync je Zug)
+VEKTOR_CACHE_PUFFER = 256
+
+# Maximale Anzahl Paare, die pro predict-Aufruf an die ML-Modelle gehen (begrenzt den Speicher der Feature-Matrix)
+TRIADEN_BATCH_GROESSE = 4096
+
+# Maximale Anzahl Einträge der Score-Matrix (Muster x Impulse x Fragmente), wenn viele Impulse gemeinsam bewertet werden
+STARTWELLEN_BLOCK = 1 << 22
+
+# Konsistenz einer Abfrage bei aufgeschobenen triadischen Durchläufen (siehe setze_verfeinerung): 'vorlaeufig'
+# liest das Gewebe, während es noch verfeinert wird, 'vollstaendig' arbeitet vorher alle Aufträge ab
+KONSISTENZ_STUFEN = ('vorlaeufig', 'vollstaendig')
+
+# Antwort von antworte_aus_resonanz, wenn keine Welle der Ziel-Art stark genug ankommt (wird nicht eingefügt)
+KEINE_ANTWORT = "Aus dieser Resonanz entsteht noch keine klare Formulierung."
+
+# Beim Verschmelzen: Anzahl der am stärksten verbundenen Nachbarn, über deren Paare der triadische Durchlauf läuft
+VERSCHMELZ_NACHBARN = 32
 
 class ResonanzWelle:
     """Repräsentiert eine Welle, die sich durch das Gewebe ausbreitet."""
@@ -50,17 +87,104 @@ class ResonanzWelle:
     def to_dict(self):
         return {'ursprung': self.ursprung, 'art': self.art, 'staerke': self.staerke, 'pfad': self.pfad}
 
+def _schreibend(methode):
+    """Führt eine Mutation unter der Schreibsperre aus; Abfragen lesen derweil die zuletzt veröffentlichte Ansicht.
+
+    Gibt es Leser (eine Ansicht wurde schon angefordert), veröffentlicht der Schreiber nach der äußersten
+    Mutation höchstens alle `_ansicht_intervall` Sekunden selbst eine neue Ansicht, damit Leser mit
+    warten=False auch unter Dauerlast neue Versionen sehen.
+    """
+    @functools.wraps(methode)
+    def unter_sperre(self, *args, **kwargs):
+        with self._schreib_sperre:
+            self._schreib_tiefe += 1
+            try:
+                return methode(self, *args, **kwargs)
+            finally:
+                self._schreib_tiefe -= 1
+                if (self._schreib_tiefe == 0 and self._ansicht is not None and self._ansicht.version != self._struktur_version
+                        and time.monotonic() - self._ansicht_zeit >= self._ansicht_intervall):
+                    self._veroeffentliche_ansicht()
+    return unter_sperre
+
 class NeuesTextVerstehen:
-  def __init__(self):
+  def __init__(self, laden: str = 'sofort', nlp_profil: str = 'schlank', modell_verzeichnis: str = None, spacy_modell: str = SPACY_MODELL):
+    """
+    laden: 'sofort' lädt spaCy und die ML-Modelle im Konstruktor, 'lazy' erst beim ersten Zugriff auf nlp,
+           'hintergrund' startet das Laden in einem Thread; ein früherer Zugriff wartet darauf.
+    nlp_profil: Schlüssel in NLP_PROFILE ('schlank' oder 'voll').
+    modell_verzeichnis: Verzeichnis der ML-Modelle (Standard: MODELL_VERZEICHNIS); spacy_modell: Name oder Pfad.
+    """
+    if laden not in ('sofort', 'lazy', 'hintergrund'):
+        raise ValueError(f"Unbekannter Lademodus '{laden}'. Erlaubt: 'sofort', 'lazy', 'hintergrund'.")
+    if nlp_profil not in NLP_PROFILE:
+        raise ValueError(f"Unbekanntes NLP-Profil '{nlp_profil}'. Erlaubt: {', '.join(NLP_PROFILE)}.")
     self._fragmente = []
-    self._fragment_docs = {}
-    self._resonanzen_struktur = {}
-    self._gewebe_stimmung = {'harmonisch': 0.0, 'spannungsreich': 0.0, 'offen': 0.0, 'reflexiv': 0.0}
-    self._wave_arrival_effects = {}
+    self._merkmale = MerkmalSpeicher()  # einmal pro Fragment berechnete Merkmale statt ganzer spaCy-Docs
+    self._text_ids = {}  # Text -> Ids aller aktiven Fragmente mit diesem Text (Duplikate erlaubt)
+    # Kanten spaltenweise in Arrays; liest sich wie ein Dict Quelle -> {Ziel -> ResonanzVerbindung}
+    self._resonanzen_struktur = KantenSpeicher(ALL_RESONANCE_TYPES)
+    self._tombstone_anteil_max = None  # z.B. 0.5: ab diesem Anteil gelöschter Ids wird kompaktiert (siehe setze_kompaktierung)
+    # Abfragen geben ihr Ergebnis zurück (ImpulsReaktion); gemerkt wird nur die letzte der klassischen Methoden
+    # (spuere_reaktion_des_gewebes usw.) für staerkste_pfade und _wave_arrival_effects
+    self._letzte_reaktion = None
+    # Schreiber (fuege_ein, loesche_fragment, ...) halten die Schreibsperre; Leser arbeiten ohne Sperre auf der
+    # zuletzt veröffentlichten GewebeAnsicht (siehe ansicht)
+    self._schreib_sperre = threading.RLock()
+    self._schreib_tiefe = 0
+    self._ansicht = None
+    self._ansicht_zeit = 0.0
+    self._ansicht_intervall = 1.0  # Sekunden zwischen zwei Veröffentlichungen durch Schreiber
+    self._index_sperre = threading.Lock()  # Vektor-Index: Suchen der Leser gegen Änderungen der Schreiber
+    self._impuls_sperre = threading.Lock()  # LRU-Cache der Impulsmerkmale
+    self._abfrage_sperre = threading.Lock()
+    self._abfrage_pool = None  # (arbeiter, ThreadPoolExecutor) für reagiere_viele
+    # 'sparse' breitet Wellen über die CSR-Adjazenz aus, 'pfade' ist die ursprüngliche Ausbreitung Welle für Welle
+    self._wellen_engine = 'sparse'
+    self._struktur_version = 0  # wird bei jeder Änderung von _resonanzen_struktur erhöht
+    self._adjazenz = None
+    self._adjazenz_version = -1
+    self._impuls_cache = OrderedDict()  # Impulstext -> FragmentMerkmale, begrenzt auf IMPULS_CACHE_GROESSE
+    # 'batch' bewertet alle Paare eines Einfügens gebündelt, 'einzeln' ist der ursprüngliche Pfad pro Paar
+    self._triaden_modus = 'batch'
+    # Kandidaten für den gebündelten ML-Durchlauf: None prüft alle Paare (exakt), eine Zahl k nur Paare, bei denen
+    # mindestens ein Ende unter den k ähnlichsten Fragmenten des neuen Fragments ist
+    self._triaden_top_k = None
+    self._triaden_zaehler = {'paare': 0, 'ml_paare': 0, 'ml_geprueft': 0}
+    self._triaden_pool = None  # optionaler TriadenPool für die ML-Bewertung großer Gewebe (siehe setze_triaden_pool)
+    # Latenzbegrenztes Einfügen (siehe setze_verfeinerung): die triadischen Durchläufe warten als TriadenAufträge
+    # und werden vom Verfeinerer in Schritten abgearbeitet; None führt sie sofort im Einfügen aus
+    self._verfeinerer = None
+    self._triaden_auftraege = deque()
+    self._verfeinerung_zaehler = {'ausstehende_paare': 0, 'schritte': 0, 'bearbeitete_paare': 0, 'verworfene_paare': 0}
+    self._vektor_index = None  # optionaler VektorIndex über die Fragmentvektoren (siehe setze_vektor_index)
+    self._vektor_cache = None  # optionaler VektorCache, den auch model_trainer liest (siehe setze_vektor_cache)
+    self._vektor_cache_puffer = []  # (Text, Vektor) neuer Fragmente, noch nicht in den Cache geschrieben
+    # Startwellen eines Impulses: None bewertet alle Fragmente (exakt), eine Zahl k nur die k nächsten Nachbarn
+    # aus dem Vektor-Index plus alle Fragmente mit einem gemeinsamen Konzept (siehe setze_vektor_index)
+    self._impuls_top_k = None
+    self._journal = None  # GewebeJournal, wenn das Journal aktiv ist
+    self._kanten_deltas = None  # Kanten-Änderungen der laufenden Mutation (nur bei aktivem Journal)
+    self._messung = GewebeMessung()  # Zeiten je Phase und Zähler, erst nach aktiviere_messung() (siehe messwerte)
 
     # --- NLP und Model Setup ---
-    self._load_spacy_model()
-    self._load_ml_models()
+    self._nlp_profil = nlp_profil
+    self._spacy_modell = spacy_modell
+    self._modell_verzeichnis = os.path.abspath(modell_verzeichnis or MODELL_VERZEICHNIS)
+    self._nlp = None
+    self._art_classifier = None
+    self._staerke_regressor = None
+    self._label_encoder = None
+    self._ml_models_loaded = False
+    self._modelle_geladen = False
+    self._modelle_sperre = threading.Lock()
+    self._modelle_stand = None  # Dateistand der geladenen ML-Modelle (für lade_ml_modelle_neu/beobachte_modelle)
+    self._modelle_pruef_intervall = None
+    self._modelle_geprueft = 0.0
+    if laden == 'sofort':
+        self._stelle_modelle_bereit()
+    elif laden == 'hintergrund':
+        threading.Thread(target=self._stelle_modelle_bereit, name='gewebe-modelle', daemon=True).start()
 
     # Heuristische Muster bleiben als Fallback und für die 2-Fragment-Analyse erhalten
     self._spuer_muster = {
@@ -77,42 +201,217 @@ class NeuesTextVerstehen:
       'ECHTBEZUG': {'nlp_criteria': {}, 'stimmung_effekt': {'harmonisch': 0.1, 'reflexiv': 0.1}},
       'ENTWICKLUNG': {'nlp_criteria': {}, 'stimmung_effekt': {'offen': 0.1, 'harmonisch': 0.05}}
     }
+    self._kompiliere_spuer_muster()
+    self._statistik = self._neue_statistik()  # laufende Kennzahlen für den Zustandsbericht
+
+  @property
+  def _wave_arrival_effects(self) -> dict:
+    """Ankünfte der letzten Abfrage je Fragment (ohne inzwischen gelöschte Fragmente)."""
+    if self._letzte_reaktion is None:
+        return {}
+    return {i: wellen for i, wellen in self._letzte_reaktion.wellen.items() if self._ist_aktiv(i)}
+
+  @property
+  def _gewebe_stimmung(self) -> dict:
+    return self._statistik.stimmung()
+
+  def _aktuelle_adjazenz(self) -> ResonanzAdjazenz:
+    """CSR-Adjazenz der Resonanzen; wird nach einer Änderung beim nächsten Zugriff neu gebaut."""
+    if self._adjazenz_version != self._struktur_version:
+        with self._messung.phase('adjazenz'):
+            self._adjazenz = ResonanzAdjazenz.aus_speicher(self._resonanzen_struktur, self._fragmente)
+        self._adjazenz_version = self._struktur_version
+    return self._adjazenz
+
+  def _neue_statistik(self, vollstaendig: bool = False) -> GewebeStatistik:
+    """Leere Statistik bzw. bei `vollstaendig` eine komplette Neuberechnung aus _resonanzen_struktur."""
+    effekte = {art: muster.get('stimmung_effekt', {}) for art, muster in self._spuer_muster.items()}
+    stimmung_namen = ['harmonisch', 'spannungsreich', 'offen', 'reflexiv']
+    if vollstaendig:
+        kanten = self._resonanzen_struktur
+        spalten = kanten.spalten()
+        return GewebeStatistik.aus_kanten(kanten.art_namen, spalten['art'], spalten['staerke'], self._fragmente, effekte,
+                                          ALL_RESONANCE_TYPES, stimmung_namen)
+    return GewebeStatistik(effekte, ALL_RESONANCE_TYPES, stimmung_namen)
+
+  def pruefe_statistik(self) -> list[str]:
+      """Vergleicht die laufend gepflegten Kennzahlen mit einer vollständigen Neuberechnung.
+
+      Gibt die gefundenen Abweichungen zurück (leer = konsistent); gedacht für Tests und Diagnose.
+      """
+      return self._statistik.abweichungen(self._neue_statistik(vollstaendig=True))
+
+  def _setze_resonanz(self, resonanz: ResonanzVerbindung):
+    self._setze_kante(resonanz.quelle, resonanz.ziel, resonanz.art, resonanz.staerke, resonanz.herkunft, resonanz.ereignis)
+
+  def _setze_kante(self, quelle: int, ziel: int, art: str, staerke: float, herkunft: str, ereignis: str = ''):
+    """Setzt bzw. ersetzt eine Kante; alle Kantenänderungen laufen hierüber oder über _setze_kanten (Journal, Statistik)."""
+    staerke = float(np.float32(staerke))  # so, wie der KantenSpeicher sie ablegt
+    alte = self._resonanzen_struktur.setze(quelle, ziel, art, staerke, herkunft, ereignis)
+    if alte is not None:
+        self._statistik.kante_weg(*alte)
+    self._statistik.kante_hinzu(art, staerke)
+    if self._kanten_deltas is not None:
+        self._kanten_deltas.append(['s', quelle, ziel, art, staerke, herkunft] + ([ereignis] if ereignis else []))
+
+  def _entferne_resonanz(self, quelle_index: int, ziel_index: int):
+    self._statistik.kante_weg(*self._resonanzen_struktur.entferne(quelle_index, ziel_index))
+    if self._kanten_deltas is not None:
+        self._kanten_deltas.append(['d', quelle_index, ziel_index])
+
+  def _setze_kanten(self, quelle, ziel, art_codes, staerken, herkunft: str):
+    """Vektorisiertes _setze_kante für viele verschiedene Paare mit derselben Herkunft; `art_codes` sind Codes des KantenSpeichers."""
+    if not len(quelle):
+        return
+    self._setze_kanten_spalten(quelle, ziel, art_codes, staerken, self._resonanzen_struktur.kontext_id(herkunft), 0)
+
+  def _setze_kanten_spalten(self, quelle, ziel, art_codes, staerken, kontext_ids, ereignis_ids):
+    """Wie _setze_kanten, aber mit Herkunft und Ereignis als Kontext-Ids des KantenSpeichers, je Kante oder für alle."""
+    if not len(quelle):
+        return
+    kanten = self._resonanzen_struktur
+    staerken = np.asarray(staerken, dtype=np.float32)
+    alte_codes, alte_staerken = kanten.setze_viele(quelle, ziel, art_codes, staerken, kontext_ids, ereignis_ids)
+    self._statistik.kanten_weg_viele(kanten.art_namen, alte_codes, alte_staerken)
+    self._statistik.kanten_hinzu_viele(kanten.art_namen, art_codes, staerken)
+    if self._kanten_deltas is not None:
+        arten = [kanten.art_namen[code] for code in np.asarray(art_codes).tolist()]
+        kontexte = [kanten.kontexte[k] for k in np.broadcast_to(kontext_ids, staerken.shape).tolist()]
+        ereignisse = np.broadcast_to(ereignis_ids, staerken.shape).tolist()
+        self._kanten_deltas.extend(['s', q, z, art, staerke, herkunft] + ([kanten.kontexte[e]] if e else [])
+                                   for q, z, art, staerke, herkunft, e in zip(np.asarray(quelle).tolist(), np.asarray(ziel).tolist(),
+                                                                             arten, staerken.tolist(), kontexte, ereignisse))
+
+  def _entferne_kanten(self, quelle, ziel):
+    """Entfernt die vorhandenen unter den Kanten quelle[k] -> ziel[k]; fehlende werden übergangen."""
+    if not len(quelle):
+        return
+    weg = self._resonanzen_struktur.entferne_viele(quelle, ziel)
+    self._statistik.kanten_weg_viele(self._resonanzen_struktur.art_namen, weg['art'], weg['staerke'])
+    if self._kanten_deltas is not None:
+        self._kanten_deltas.extend(['d', q, z] for q, z in zip(weg['quelle'].tolist(), weg['ziel'].tolist()))
+
+  def _art_codes_aus_modell(self, modell_codes):
+    """Übersetzt die Klassen-Codes des Art-Klassifikators in Art-Codes des KantenSpeichers."""
+    klassen, position = np.unique(modell_codes, return_inverse=True)
+    codes = [self._resonanzen_struktur.art_code(art) for art in self._label_encoder.inverse_transform(klassen)]
+    return np.asarray(codes, dtype=np.uint8)[position]
+
+  @property
+  def nlp(self):
+      """Die spaCy-Pipeline; lädt (bzw. wartet auf) spaCy und die ML-Modelle beim ersten Zugriff."""
+      if self._nlp is None:
+          self._stelle_modelle_bereit()
+      return self._nlp
+
+  @nlp.setter
+  def nlp(self, nlp):
+      self._nlp = nlp
+
+  def _stelle_modelle_bereit(self):
+      """Lädt spaCy und die ML-Modelle genau einmal, auch wenn Hintergrund-Thread und Aufrufer gleichzeitig kommen."""
+      with self._modelle_sperre:
+          if self._modelle_geladen:
+              return
+          self._load_spacy_model()
+          self._load_ml_models()
+          self._modelle_geladen = True
+
+  def modelle_geladen(self) -> bool:
+      """True, sobald spaCy und die ML-Modelle bereitstehen (ohne das Laden auszulösen)."""
+      return self._modelle_geladen
 
   def _load_spacy_model(self):
+    import spacy  # erst hier, damit ein Gewebe im Modus 'lazy' ohne den spaCy-Import startet
     try:
-        self.nlp = spacy.load("de_core_news_lg")
-        print("spaCy model 'de_core_news_lg' loaded successfully.")
+        self.nlp = spacy.load(self._spacy_modell, exclude=list(NLP_PROFILE[self._nlp_profil]))
+        logger.info("spaCy model '%s' loaded successfully (Profil '%s').", self._spacy_modell, self._nlp_profil)
     except IOError:
-        print("\n[ERROR] spaCy model 'de_core_news_lg' not found. Please run: python -m spacy download de_core_news_lg")
-        print("Falling back to a blank model. Semantic features will be limited.")
+        logger.error("spaCy model '%s' not found. Please run: python -m spacy download %s", self._spacy_modell, SPACY_MODELL)
+        logger.error("Falling back to a blank model. Semantic features will be limited.")
         self.nlp = spacy.blank("de")
 
-  def _load_ml_models(self):
-    """Lädt die trainierten ML-Modelle für die triadische Resonanz."""
-    self._art_classifier = None
-    self._staerke_regressor = None
-    self._label_encoder = None
-    self._ml_models_loaded = False
+  def _modell_pfade(self) -> dict:
+    return {
+        'art': os.path.join(self._modell_verzeichnis, 'triadic_art_classifier.joblib'),
+        'staerke': os.path.join(self._modell_verzeichnis, 'triadic_staerke_regressor.joblib'),
+        'encoder': os.path.join(self._modell_verzeichnis, 'triadic_label_encoder.joblib'),
+        'kompiliert': os.path.join(self._modell_verzeichnis, KOMPILIERT_DATEI),
+    }
+
+  def _modell_dateistand(self) -> tuple:
+    """Änderungszeiten der Modelldateien (0 = fehlt); ändert sich der Stand, wurde neu trainiert."""
+    return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else 0 for p in self._modell_pfade().values())
+
+  def _lade_ml_dateien(self):
+    """Liest Klassifikator, Regressor und LabelEncoder von der Platte; None, wenn keine (gültigen) Modelle da sind."""
+    pfade = self._modell_pfade()
+    kompiliert_pfad = pfade['kompiliert']
+    joblib_pfade = [pfade['art'], pfade['staerke'], pfade['encoder']]
     
-    art_model_path = 'triadic_art_classifier.joblib'
-    staerke_model_path = 'triadic_staerke_regressor.joblib'
-    encoder_path = 'triadic_label_encoder.joblib'
+    # Bevorzugt die kompilierten Wälder (nur NumPy, kein sklearn-Import), sofern sie nicht älter als die .joblib-Modelle sind
+    if os.path.exists(kompiliert_pfad) and all(os.path.getmtime(kompiliert_pfad) >= os.path.getmtime(p) for p in joblib_pfade if os.path.exists(p)):
+        try:
+            modelle = lade_kompilierte_modelle(kompiliert_pfad)
+            logger.info("Kompilierte ML-Modelle für triadische Resonanz erfolgreich geladen.")
+            return modelle
+        except Exception as e:
+            logger.warning("Fehler beim Laden der kompilierten ML-Modelle: %s. Versuche die .joblib-Modelle.", e)
     
-    if all(os.path.exists(p) for p in [art_model_path, staerke_model_path, encoder_path]):
+    if all(os.path.exists(p) for p in joblib_pfade):
         try:
-            self._art_classifier = joblib.load(art_model_path)
-            self._staerke_regressor = joblib.load(staerke_model_path)
-            self._label_encoder = joblib.load(encoder_path)
-            self._ml_models_loaded = True
-            print("[INFO] Trainierte ML-Modelle für triadische Resonanz erfolgreich geladen.")
+            import joblib
+            modelle = tuple(joblib.load(p) for p in joblib_pfade)
+            logger.info("Trainierte ML-Modelle für triadische Resonanz erfolgreich geladen.")
+            return modelle
         except Exception as e:
-            print(f"[WARNUNG] Fehler beim Laden der ML-Modelle: {e}. Verwende heuristische Regeln als Fallback.")
+            logger.warning("Fehler beim Laden der ML-Modelle: %s. Verwende heuristische Regeln als Fallback.", e)
     else:
-        print("[INFO] Keine trainierten ML-Modelle gefunden. Verwende heuristische Regeln für triadische Resonanz.")
+        logger.info("Keine trainierten ML-Modelle gefunden. Verwende heuristische Regeln für triadische Resonanz.")
+    return None
+
+  def _load_ml_models(self):
+    """Lädt die trainierten ML-Modelle für die triadische Resonanz."""
+    self._modelle_stand = self._modell_dateistand()
+    modelle = self._lade_ml_dateien()
+    self._art_classifier, self._staerke_regressor, self._label_encoder = modelle or (None, None, None)
+    self._ml_models_loaded = modelle is not None
+
+  def lade_ml_modelle_neu(self) -> bool:
+      """Lädt neu trainierte Modelle im laufenden Betrieb; schlägt das fehl, bleiben die bisherigen Modelle aktiv.
+
+      Die drei Modelle werden ohne Sperre vollständig gelesen und dann unter der Schreibsperre gemeinsam
+      ausgetauscht. Triadische Durchläufe (auch die des Verfeinerers) laufen unter derselben Sperre, sodass keiner
+      Klassifikator, Regressor und LabelEncoder verschiedener Trainingsstände mischt.
+      """
+      stand = self._modell_dateistand()
+      modelle = self._lade_ml_dateien()
+      self._tausche_ml_modelle(modelle, stand)
+      return modelle is not None
+
+  @_schreibend
+  def _tausche_ml_modelle(self, modelle, stand: tuple):
+    self._modelle_stand = stand
+    if modelle is not None:
+        self._art_classifier, self._staerke_regressor, self._label_encoder = modelle
+        self._ml_models_loaded = True
+
+  def beobachte_modelle(self, intervall: float = 5.0):
+      """Prüft vor triadischen Durchläufen höchstens alle `intervall` Sekunden, ob neue Modelle geschrieben wurden,
+      und lädt sie dann mit lade_ml_modelle_neu(). None schaltet die Beobachtung ab."""
+      self._modelle_pruef_intervall = intervall
+      self._modelle_geprueft = time.monotonic()
+
+  def _pruefe_modelle(self):
+      if time.monotonic() - self._modelle_geprueft < self._modelle_pruef_intervall:
+          return
+      self._modelle_geprueft = time.monotonic()
+      if self._modell_dateistand() != self._modelle_stand:
+          self.lade_ml_modelle_neu()
 
   # --- NLP Helper Methods ---
-  def _analyze_sentiment(self, doc) -> str:
-      """Simple sentiment analysis based on a small lexicon and spaCy tokens."""
+  def _sentiment_score(self, doc) -> int:
+      """Simple sentiment score based on a small lexicon and spaCy tokens (>0 positive, <0 negative)."""
       positive_words = {"gut", "schön", "freude", "glücklich", "harmonisch", "offen", "friedlich", "sonnig", "verstehen", "klar"}
       negative_words = {"schwer", "spannung", "konflikt", "nicht", "aber", "jedoch", "traurig", "regen", "dunkel", "sorgenvoll", "widerstand", "unerwartet", "problem", "schwierig"}
       score = 0
@@ -122,38 +421,94 @@ class NeuesTextVerstehen:
               score += 1
           elif lemma in negative_words:
               score -= 1
-      if score > 0:
-          return 'positive'
-      elif score < 0:
-          return 'negative'
-      else:
-          return 'neutral'
+      return score
+
+  def _analyze_sentiment(self, doc) -> str:
+      """Simple sentiment analysis based on a small lexicon and spaCy tokens."""
+      return sentiment_label(self._sentiment_score(doc))
+
+  def _konzepte(self, doc) -> frozenset:
+      """Noun, verb and adjective lemmas of a doc, lowercased, without stop words and punctuation."""
+      return frozenset(token.lemma_.lower() for token in doc if token.pos_ in KONZEPT_WORTARTEN and not token.is_stop and not token.is_punct)
 
   def _get_shared_concepts(self, doc1, doc2) -> list[str]:
       """Extracts shared noun, verb, and adjective lemmas between two spaCy docs."""
-      concepts1 = {token.lemma_.lower() for token in doc1 if token.pos_ in ['NOUN', 'VERB', 'ADJ'] and not token.is_stop and not token.is_punct}
-      concepts2 = {token.lemma_.lower() for token in doc2 if token.pos_ in ['NOUN', 'VERB', 'ADJ'] and not token.is_stop and not token.is_punct}
-      return list(concepts1.intersection(concepts2))
+      return list(self._konzepte(doc1).intersection(self._konzepte(doc2)))
+
+  def _merkmale_aus_doc(self, doc) -> FragmentMerkmale:
+      """Berechnet die Merkmale, die die Spürlogik von einem Doc braucht, genau einmal."""
+      hat_vektor = bool(doc.has_vector and doc.vocab.vectors.size > 0)
+      vektor = np.array(doc.vector, dtype=np.float32) if hat_vektor else np.zeros(0, dtype=np.float32)
+      norm = float(doc.vector_norm) if hat_vektor else 0.0
+      kern_lemmata = tuple(dict.fromkeys(t.lemma_ for t in doc if t.pos_ in KERN_WORTARTEN and not t.is_stop))
+      return FragmentMerkmale(vektor, norm, self._konzepte(doc), self._sentiment_score(doc), hat_vektor, token_schluessel(doc),
+                              kern_lemmata)
+
+  def _merkmale_aus_text(self, text: str) -> FragmentMerkmale:
+      """Parst einen Text und berechnet seine Merkmale."""
+      return self._merkmale_aus_doc(self.nlp(text))
+
+  def _impuls_merkmale(self, impuls: str) -> FragmentMerkmale:
+      """Merkmale eines Impulses aus dem LRU-Cache; nur bei einem Fehltreffer wird spaCy aufgerufen."""
+      with self._impuls_sperre:
+          merkmale = self._impuls_cache.get(impuls)
+          if merkmale is not None:
+              self._impuls_cache.move_to_end(impuls)
+              self._messung.zaehle('impuls_cache_treffer')
+              return merkmale
+      self._messung.zaehle('impuls_cache_fehltreffer')
+      merkmale = self._merkmale_aus_text(impuls)  # außerhalb der Sperre: parallele Abfragen parsen gleichzeitig
+      with self._impuls_sperre:
+          self._impuls_cache[impuls] = merkmale
+          if len(self._impuls_cache) > IMPULS_CACHE_GROESSE:
+              self._impuls_cache.popitem(last=False)
+      return merkmale
+
+  def _impuls_merkmale_viele(self, impulse: list[str]) -> list[FragmentMerkmale]:
+      """Merkmale vieler Impulse; die noch nicht im LRU-Cache liegen, werden in einem nlp.pipe-Aufruf geparst und dort abgelegt.
+
+      Die frisch geparsten Merkmale werden direkt zurückgegeben, auch wenn ein großer Batch sie schon wieder aus dem Cache verdrängt hat.
+      """
+      with self._impuls_sperre:
+          fehlend = list(dict.fromkeys(impuls for impuls in impulse if impuls not in self._impuls_cache))
+      neu = {}
+      if len(fehlend) >= 2:
+          self._messung.zaehle('impuls_cache_vorab_geparst', len(fehlend))
+          neu = dict(zip(fehlend, self._merkmale_aus_texten(fehlend, batch_size=256, n_process=1)))
+          with self._impuls_sperre:
+              for impuls, merkmale in neu.items():
+                  self._impuls_cache[impuls] = merkmale
+              while len(self._impuls_cache) > IMPULS_CACHE_GROESSE:
+                  self._impuls_cache.popitem(last=False)
+      return [neu[impuls] if impuls in neu else self._impuls_merkmale(impuls) for impuls in impulse]
 
   # --- Kernlogik: Spüren ---
 
   def _spuere_art_und_staerke_der_resonanz(self, teil_a_text, teil_b_text, gesamtes_gewebe_struktur, quelle_index=None, ziel_index=None):
-    """Spürt die direkte Resonanz zwischen ZWEI Textteilen."""
+    """Spürt die direkte Resonanz zwischen ZWEI Textteilen (textbasierter Einstieg, z.B. für Impulse)."""
     try:
-        doc_a = self._fragment_docs.get(quelle_index) if quelle_index is not None and quelle_index in self._fragment_docs else self.nlp(teil_a_text)
-        doc_b = self._fragment_docs.get(ziel_index) if ziel_index is not None and ziel_index in self._fragment_docs else self.nlp(teil_b_text)
+        merkmale_a = self._merkmale[quelle_index] if self._ist_aktiv(quelle_index) else self._impuls_merkmale(teil_a_text)
+        merkmale_b = self._merkmale[ziel_index] if self._ist_aktiv(ziel_index) else self._impuls_merkmale(teil_b_text)
+    except Exception as e:
+        logger.error("Error during NLP processing for resonance: %s", e)
+        return ResonanzVerbindung(-1 if quelle_index is None else quelle_index, -1 if ziel_index is None else ziel_index, 'NEUTRAL_SCHWACH', 0.05, "NLP Fehler")
+    return self._bewerte_dyadische_resonanz(merkmale_a, merkmale_b, quelle_index, ziel_index)
 
-        if not doc_a.has_vector or not doc_b.has_vector or doc_a.vocab.vectors.size == 0 or doc_b.vocab.vectors.size == 0:
-             similarity = 0.0
-        else:
-             similarity = doc_a.similarity(doc_b)
+  def _ist_aktiv(self, index) -> bool:
+    return index is not None and 0 <= index < len(self._fragmente) and self._fragmente[index] is not None
 
-        sentiment_a = self._analyze_sentiment(doc_a)
-        sentiment_b = self._analyze_sentiment(doc_b)
-        shared_concepts = self._get_shared_concepts(doc_a, doc_b)
-    except Exception as e:
-        print(f"Error during NLP processing for resonance: {e}")
-        return ResonanzVerbindung(quelle_index or -1, ziel_index or -1, 'NEUTRAL_SCHWACH', 0.05, "NLP Fehler")
+  def _spuere_resonanz_ids(self, quelle_index: int, ziel_index: int):
+    """Spürt die direkte Resonanz zwischen zwei Fragmenten des Gewebes anhand ihrer Ids."""
+    return self._bewerte_dyadische_resonanz(self._merkmale[quelle_index], self._merkmale[ziel_index], quelle_index, ziel_index)
+
+  def _bewerte_dyadische_resonanz(self, merkmale_a: FragmentMerkmale, merkmale_b: FragmentMerkmale, quelle_index=None, ziel_index=None):
+    """Bewertet die Spür-Muster allein anhand der vorberechneten Merkmale zweier Fragmente."""
+    quelle_index = -1 if quelle_index is None else quelle_index
+    ziel_index = -1 if ziel_index is None else ziel_index
+    similarity = merkmale_a.similarity(merkmale_b)
+    sentiment_a = merkmale_a.sentiment_label
+    sentiment_b = merkmale_b.sentiment_label
+    shared_concepts = merkmale_a.konzepte & merkmale_b.konzepte
 
     potenzielle_scores = {}
     for art, info in self._spuer_muster.items():
@@ -191,26 +546,168 @@ class NeuesTextVerstehen:
     beste_resonanz_staerke = potenzielle_scores[beste_art_above_threshold]['score']
     beste_resonanz_kontext = ", ".join(potenzielle_scores[beste_art_above_threshold]['kontext_teile'])
     
-    return ResonanzVerbindung(quelle_index or -1, ziel_index or -1, beste_resonanz_art, beste_resonanz_staerke, beste_resonanz_kontext)
+    return ResonanzVerbindung(quelle_index, ziel_index, beste_resonanz_art, beste_resonanz_staerke, beste_resonanz_kontext)
   
+  def _kompiliere_spuer_muster(self):
+    """Legt die nlp_criteria der dyadischen Muster als Arrays ab, damit _bewerte_dyadisch_gegen_alle alle Muster auf einmal prüft.
+
+    Muss erneut aufgerufen werden, wenn _spuer_muster verändert wird.
+    """
+    namen = [art for art in self._spuer_muster if art not in ['NEUTRAL_SCHWACH', 'KONFLIKT', 'ECHTBEZUG', 'ENTWICKLUNG']]
+    kriterien = [self._spuer_muster[art].get('nlp_criteria', {}) for art in namen]
+    spalte = lambda werte: np.array(werte, dtype=np.float64)[:, None]
+    self._dyadische_muster = {
+        'namen': namen,
+        'sim_aktiv': np.array(['similarity' in c for c in kriterien])[:, None],
+        'sim_min': spalte([c.get('similarity', {}).get('min', -1.0) for c in kriterien]),
+        'sim_max': spalte([c.get('similarity', {}).get('max', 1.0) for c in kriterien]),
+        'sim_gewicht': spalte([c.get('similarity', {}).get('weight', 0) for c in kriterien]),
+        'match_gewicht': spalte([c['sentiment_match'].get('weight', 0) if 'sentiment_match' in c else 0 for c in kriterien]),
+        'kontrast_gewicht': spalte([c['sentiment_contrast'].get('weight', 0) if 'sentiment_contrast' in c else 0 for c in kriterien]),
+        'konzepte_aktiv': np.array(['shared_concepts' in c for c in kriterien])[:, None],
+        'konzepte_min': spalte([c.get('shared_concepts', {}).get('min_count', 0) for c in kriterien]),
+        'konzepte_gewicht': spalte([c.get('shared_concepts', {}).get('weight', 0) for c in kriterien]),
+    }
+
+  def _bewerte_dyadisch_gegen_alle(self, merkmale: FragmentMerkmale, ziel_ids, speicher: MerkmalSpeicher = None) -> dict:
+    """Vektorisierte Variante von _bewerte_dyadische_resonanz: ein Fragment bzw. Impuls gegen viele Fragmente.
+
+    Ähnlichkeiten kommen aus einem Matrix-Vektor-Produkt, Sentiment-Match/-Kontrast und gemeinsame Konzepte
+    aus Arrays, und alle Muster werden gleichzeitig ausgewertet. 'muster' ist der Index der besten Art in
+    self._dyadische_muster['namen'] bzw. -1, wenn die Signifikanzschwelle nicht erreicht wird. `speicher` ist
+    der Merkmalspeicher einer GewebeAnsicht (Standard: der des Gewebes).
+    """
+    ziel_ids = np.asarray(ziel_ids, dtype=np.intp)
+    speicher = self._merkmale if speicher is None else speicher
+    self._messung.zaehle('paare_dyadisch', len(ziel_ids))
+    similarity = np.zeros(len(ziel_ids), dtype=np.float64)
+    if merkmale.hat_vektor:
+        mit_vektor = speicher.hat_vektor[ziel_ids]
+        ids = ziel_ids[mit_vektor]
+        nenner = speicher.normen[ids] * merkmale.norm
+        with np.errstate(divide='ignore', invalid='ignore'):
+            werte = np.where(nenner > 0, (speicher.vektoren[ids] @ merkmale.vektor) / nenner, 0.0)
+        similarity[mit_vektor] = np.where(speicher.schluessel[ids] == merkmale.schluessel, 1.0, werte)
+
+    sentiment_a = np.sign(merkmale.sentiment)
+    sentiment_b = np.sign(speicher.sentiments[ziel_ids])
+    match = (sentiment_a != 0) & (sentiment_b == sentiment_a)
+    kontrast = (sentiment_a != 0) & (sentiment_b != 0) & (sentiment_b != sentiment_a)
+    konzepte = speicher.gemeinsame_konzepte(merkmale.konzepte)[ziel_ids] if len(ziel_ids) else np.zeros(0, dtype=np.intp)
+
+    # Summe in derselben Reihenfolge wie im Einzelpfad, damit die Scores bitgleich sind
+    m = self._dyadische_muster
+    scores = np.where(m['sim_aktiv'] & (similarity >= m['sim_min']) & (similarity <= m['sim_max']), m['sim_gewicht'], 0.0)
+    scores = scores + np.where(match, m['match_gewicht'], 0.0)
+    scores = scores + np.where(kontrast, m['kontrast_gewicht'], 0.0)
+    scores = scores + np.where(m['konzepte_aktiv'] & (konzepte >= m['konzepte_min']), m['konzepte_gewicht'], 0.0)
+    scores = np.minimum(1.0, scores)
+
+    muster = np.argmax(scores, axis=0) if len(scores) else np.zeros(len(ziel_ids), dtype=np.intp)
+    staerke = scores[muster, np.arange(len(ziel_ids))] if len(scores) else np.zeros(len(ziel_ids))
+    muster = np.where(staerke >= 0.25, muster, -1)  # Signifikanzschwelle
+    return {'ziel_ids': ziel_ids, 'muster': muster, 'staerke': staerke, 'similarity': similarity,
+            'sentiment_ziel': speicher.sentiments[ziel_ids], 'konzepte': konzepte}
+
+  def _startwellen(self, merkmale: FragmentMerkmale, ziel_ids, speicher: MerkmalSpeicher):
+    """Die Startwellen eines Impulses: (Fragmente, Muster, Stärke) aller Bewertungen über der Startschwelle."""
+    bewertung = self._bewerte_dyadisch_gegen_alle(merkmale, ziel_ids, speicher)
+    start = np.flatnonzero((bewertung['muster'] >= 0) & (bewertung['staerke'] > 0.1))
+    return bewertung['ziel_ids'][start], bewertung['muster'][start], bewertung['staerke'][start]
+
+  def _startwellen_viele(self, merkmale_liste: list[FragmentMerkmale], ziel_ids, speicher: MerkmalSpeicher) -> list[tuple]:
+    """Die Startwellen vieler Impulse gegen dieselben Fragmente, wie _startwellen je Impuls.
+
+    Die Ähnlichkeiten aller Impulse eines Blocks kommen aus einem Matrixprodukt (Impulse x Fragmente), Sentiment
+    und gemeinsame Konzepte aus Arrays derselben Form, und alle Muster werden zugleich ausgewertet. Ein Block
+    umfasst so viele Impulse, dass die Score-Matrix höchstens etwa STARTWELLEN_BLOCK Einträge hat.
+    """
+    ziel_ids = np.asarray(ziel_ids, dtype=np.intp)
+    m = self._dyadische_muster
+    if not m['namen']:
+        return [(ziel_ids[:0], np.zeros(0, dtype=np.intp), np.zeros(0)) for _ in merkmale_liste]
+    self._messung.zaehle('paare_dyadisch', len(ziel_ids) * len(merkmale_liste))
+    mit_vektor = np.flatnonzero(speicher.hat_vektor[ziel_ids])
+    ids = ziel_ids[mit_vektor]
+    vektoren, normen, schluessel = speicher.vektoren[ids], speicher.normen[ids], speicher.schluessel[ids]
+    sentiment_b = np.sign(speicher.sentiments[ziel_ids])
+    spalte = lambda name: m[name][:, :, None]  # (Muster, 1, 1) gegen (Impulse, Fragmente)
+
+    starts = []
+    block = max(1, STARTWELLEN_BLOCK // max(1, len(ziel_ids) * len(m['namen'])))
+    for anfang in range(0, len(merkmale_liste), block):
+        teil = merkmale_liste[anfang:anfang + block]
+        similarity = np.zeros((len(teil), len(ziel_ids)), dtype=np.float64)
+        zeilen = [z for z, merkmale in enumerate(teil) if merkmale.hat_vektor]
+        if zeilen and len(ids):
+            impulse = [teil[z] for z in zeilen]
+            nenner = normen[None, :] * np.array([merkmale.norm for merkmale in impulse], dtype=np.float64)[:, None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                werte = np.where(nenner > 0, (np.stack([merkmale.vektor for merkmale in impulse]) @ vektoren.T) / nenner, 0.0)
+            gleich = schluessel[None, :] == np.array([merkmale.schluessel for merkmale in impulse])[:, None]
+            similarity[np.ix_(zeilen, mit_vektor)] = np.where(gleich, 1.0, werte)
+
+        sentiment_a = np.sign(np.array([merkmale.sentiment for merkmale in teil]))[:, None]
+        match = (sentiment_a != 0) & (sentiment_b == sentiment_a)
+        kontrast = (sentiment_a != 0) & (sentiment_b != 0) & (sentiment_b != sentiment_a)
+        konzepte = np.stack([speicher.gemeinsame_konzepte(merkmale.konzepte)[ziel_ids] for merkmale in teil])
+
+        # Summe in derselben Reihenfolge wie in _bewerte_dyadisch_gegen_alle, damit die Scores gleich sind
+        scores = np.where(spalte('sim_aktiv') & (similarity >= spalte('sim_min')) & (similarity <= spalte('sim_max')), spalte('sim_gewicht'), 0.0)
+        scores = scores + np.where(match, spalte('match_gewicht'), 0.0)
+        scores = scores + np.where(kontrast, spalte('kontrast_gewicht'), 0.0)
+        scores = scores + np.where(spalte('konzepte_aktiv') & (konzepte >= spalte('konzepte_min')), spalte('konzepte_gewicht'), 0.0)
+        scores = np.minimum(1.0, scores)
+        muster = np.argmax(scores, axis=0)
+        staerke = np.take_along_axis(scores, muster[None], axis=0)[0]
+        start = (staerke >= 0.25) & (staerke > 0.1)  # Signifikanz- und Startschwelle
+        for z in range(len(teil)):
+            auswahl = np.flatnonzero(start[z])
+            starts.append((ziel_ids[auswahl], muster[z, auswahl], staerke[z, auswahl]))
+    return starts
+
+  def _baue_dyadische_resonanz(self, bewertung: dict, k: int, sentiment_quelle: int, quelle_index: int, ziel_index: int, umgekehrt: bool = False):
+    """Erzeugt die ResonanzVerbindung für Position k einer Bewertung; `umgekehrt` für die Richtung Ziel -> Quelle."""
+    art = self._dyadische_muster['namen'][bewertung['muster'][k]]
+    criteria = self._spuer_muster[art].get('nlp_criteria', {})
+    similarity = float(bewertung['similarity'][k])
+    sentiment_a, sentiment_b = sentiment_label(sentiment_quelle), sentiment_label(int(bewertung['sentiment_ziel'][k]))
+    if umgekehrt:
+        sentiment_a, sentiment_b = sentiment_b, sentiment_a
+    anzahl_konzepte = int(bewertung['konzepte'][k])
+
+    kontext_teile = []
+    if 'similarity' in criteria and criteria['similarity'].get('min', -1.0) <= similarity <= criteria['similarity'].get('max', 1.0):
+        kontext_teile.append(f"Sim({similarity:.2f})")
+    if 'sentiment_match' in criteria and sentiment_a != 'neutral' and sentiment_a == sentiment_b:
+        kontext_teile.append(f"SentMatch({sentiment_a})")
+    if 'sentiment_contrast' in criteria and sentiment_a != 'neutral' and sentiment_b != 'neutral' and sentiment_a != sentiment_b:
+        kontext_teile.append(f"SentContr({sentiment_a} vs {sentiment_b})")
+    if 'shared_concepts' in criteria and anzahl_konzepte >= criteria['shared_concepts'].get('min_count', 0):
+        kontext_teile.append(f"Concepts({anzahl_konzepte})")
+    return ResonanzVerbindung(quelle_index, ziel_index, art, float(bewertung['staerke'][k]), ", ".join(kontext_teile))
+
   def _spuere_einfluss_auf_resonanz(self, teil_a_text, teil_b_text, neuer_teil_text, aktuelle_resonanz_ab, gesamtes_gewebe_struktur):
-    """Spürt den Einfluss eines dritten Fragments auf die Beziehung zwischen zwei anderen. Priorisiert ML-Modelle."""
+    """Textbasierter Einstieg für _spuere_einfluss_ids; löst die Texte über die Text->Id-Tabelle auf."""
     try:
-        index_a = self._fragmente.index(teil_a_text)
-        index_b = self._fragmente.index(teil_b_text)
-        index_neuer = self._fragmente.index(neuer_teil_text)
-    except (ValueError, IndexError):
+        index_a = self._text_ids[teil_a_text][0]
+        index_b = self._text_ids[teil_b_text][0]
+        index_neuer = self._text_ids[neuer_teil_text][-1]  # das neue Fragment ist bei Duplikaten das jüngste
+    except (KeyError, IndexError):
         return aktuelle_resonanz_ab
+    return self._spuere_einfluss_ids(index_a, index_b, index_neuer, aktuelle_resonanz_ab)
+
+  def _spuere_einfluss_ids(self, index_a: int, index_b: int, index_neuer: int, aktuelle_resonanz_ab):
+    """Spürt den Einfluss eines dritten Fragments auf die Beziehung zwischen zwei anderen. Priorisiert ML-Modelle."""
+    neuer_teil_text = self._fragmente[index_neuer]
 
     # --- Weg 1: ML-gestützte Vorhersage ---
     if self._ml_models_loaded:
         try:
-            doc_a = self._fragment_docs.get(index_a)
-            doc_b = self._fragment_docs.get(index_b)
-            doc_c = self._fragment_docs.get(index_neuer)
-            
-            if doc_a and doc_b and doc_c and doc_a.has_vector and doc_b.has_vector and doc_c.has_vector:
-                feature_vector = np.concatenate([doc_a.vector, doc_b.vector, doc_c.vector]).reshape(1, -1)
+            hat_vektor = self._merkmale.hat_vektor
+            if hat_vektor[index_a] and hat_vektor[index_b] and hat_vektor[index_neuer]:
+                vektoren = self._merkmale.vektoren
+                feature_vector = np.concatenate([vektoren[index_a], vektoren[index_b], vektoren[index_neuer]]).reshape(1, -1)
                 
                 art_index = self._art_classifier.predict(feature_vector)[0]
                 staerke = self._staerke_regressor.predict(feature_vector)[0]
@@ -221,12 +718,11 @@ class NeuesTextVerstehen:
                 kontext = "ML-Vorhersage (Triade)"
                 return ResonanzVerbindung(index_a, index_b, art, staerke, kontext)
         except Exception as e:
-            print(f"[WARNUNG] ML-Vorhersage für {index_a}->{index_b} fehlgeschlagen: {e}. Nutze heuristischen Fallback.")
+            logger.warning("ML-Vorhersage für %d->%d fehlgeschlagen: %s. Nutze heuristischen Fallback.", index_a, index_b, e)
     
     # --- Weg 2: Heuristischer Fallback ---
-    # print(f"    Nutze heuristische Regeln für Einfluss auf {index_a}->{index_b}.")
-    res_neua = self._spuere_art_und_staerke_der_resonanz(neuer_teil_text, teil_a_text, self._resonanzen_struktur, quelle_index=index_neuer, ziel_index=index_a)
-    res_neub = self._spuere_art_und_staerke_der_resonanz(neuer_teil_text, teil_b_text, self._resonanzen_struktur, quelle_index=index_neuer, ziel_index=index_b)
+    res_neua = self._spuere_resonanz_ids(index_neuer, index_a)
+    res_neub = self._spuere_resonanz_ids(index_neuer, index_b)
     
     neue_resonanz_ab = aktuelle_resonanz_ab
     
@@ -234,8 +730,8 @@ class NeuesTextVerstehen:
     if (res_neua and res_neua.art in ['VERSTAERKUNG', 'ERGAENZUNG'] and res_neua.staerke > 0.6) and \
        (res_neub and res_neub.art in ['VERSTAERKUNG', 'ERGAENZUNG'] and res_neub.staerke > 0.6):
         neue_staerke = min(1.0, (aktuelle_resonanz_ab.staerke if aktuelle_resonanz_ab else 0) + 0.2)
-        neuer_kontext = (aktuelle_resonanz_ab.kontext + ", " if aktuelle_resonanz_ab else "") + f"durch '{neuer_teil_text[:15]}...' gefestigt"
-        neue_resonanz_ab = ResonanzVerbindung(index_a, index_b, 'ERGAENZUNG', neue_staerke, neuer_kontext)
+        herkunft = aktuelle_resonanz_ab.herkunft if aktuelle_resonanz_ab else ""
+        neue_resonanz_ab = ResonanzVerbindung(index_a, index_b, 'ERGAENZUNG', neue_staerke, herkunft, f"durch '{neuer_teil_text[:15]}...' gefestigt")
         return neue_resonanz_ab
 
     # Regel: "Störenfried"
@@ -243,186 +739,1233 @@ class NeuesTextVerstehen:
        (aktuelle_resonanz_ab and aktuelle_resonanz_ab.art == 'VERSTAERKUNG'):
         neue_staerke = max(0.0, aktuelle_resonanz_ab.staerke - res_neua.staerke * 0.5)
         if neue_staerke < 0.1: return None # Löschen
-        neuer_kontext = aktuelle_resonanz_ab.kontext + f", durch Kontrast von '{neuer_teil_text[:15]}...' destabilisiert"
-        neue_resonanz_ab = ResonanzVerbindung(index_a, index_b, aktuelle_resonanz_ab.art, neue_staerke, neuer_kontext)
+        neue_resonanz_ab = ResonanzVerbindung(index_a, index_b, aktuelle_resonanz_ab.art, neue_staerke, aktuelle_resonanz_ab.herkunft,
+                                              f"durch Kontrast von '{neuer_teil_text[:15]}...' destabilisiert")
         return neue_resonanz_ab
 
     return aktuelle_resonanz_ab
 
+  def _aktualisiere_triaden_einzeln(self, neuer_index: int, aktive_indices: list[int]):
+    """Ursprünglicher triadischer Pfad: ein Aufruf von _spuere_einfluss_ids pro geordnetem Paar."""
+    self._messung.zaehle('paare_triadisch', len(aktive_indices) * (len(aktive_indices) - 1))
+    for i in aktive_indices:
+        for j in aktive_indices:
+            if i == j: continue
+            aktuelle_resonanz = self._resonanzen_struktur.kante(i, j)
+            neue_resonanz = self._spuere_einfluss_ids(i, j, neuer_index, aktuelle_resonanz)
+
+            if neue_resonanz and neue_resonanz.staerke >= 0.1:
+                if neue_resonanz is not aktuelle_resonanz:
+                    self._setze_resonanz(neue_resonanz)
+            elif aktuelle_resonanz is not None:
+                self._entferne_resonanz(i, j)
+
+  def _triaden_kandidaten(self, neuer_index: int, idx):
+    """Geordnete Paare (i, j), i != j, die der ML-Durchlauf bewertet, in derselben Reihenfolge wie die Doppelschleife.
+
+    Ohne Top-k alle n·(n-1) Paare. Mit Top-k nur Paare, bei denen i oder j unter den k nächsten Nachbarn des neuen
+    Fragments liegt: k·(n-1) + (n-k)·k Paare statt n·(n-1).
+    """
+    n = len(idx)
+    k = self._triaden_top_k
+    if k is None or k >= n:
+        paar_i, paar_j = np.repeat(idx, n), np.tile(idx, n)
+        ungleich = paar_i != paar_j
+        return paar_i[ungleich], paar_j[ungleich]
+    nachbarn = np.sort(self._naechste_nachbarn(neuer_index, idx, k))
+    andere = idx[~np.isin(idx, nachbarn)]
+    paar_i = np.concatenate([np.repeat(nachbarn, n), np.repeat(andere, len(nachbarn))])
+    paar_j = np.concatenate([np.tile(idx, len(nachbarn)), np.tile(nachbarn, len(andere))])
+    ungleich = paar_i != paar_j
+    paar_i, paar_j = paar_i[ungleich], paar_j[ungleich]
+    ordnung = np.lexsort((paar_j, paar_i))
+    return paar_i[ordnung], paar_j[ordnung]
+
+  def _naechste_nachbarn(self, neuer_index: int, idx, k: int, merkmale: FragmentMerkmale = None):
+    """Die k nächsten älteren Nachbarn des neuen Fragments; über den Vektor-Index, falls gesetzt, sonst exakt."""
+    merkmale = self._merkmale[neuer_index] if merkmale is None else merkmale
+    if self._vektor_index is None:
+        return self._merkmale.naechste_nachbarn(merkmale, idx, k)
+    if not merkmale.hat_vektor:
+        return idx[:0]
+    ids, _ = self._vektor_index.suche(merkmale.vektor, k + 1)
+    return ids[np.isin(ids, idx)][:k]
+
+  def triaden_statistik(self) -> dict:
+      """Wie viele der ML-fähigen Paare der gebündelte Durchlauf seit dem Start geprüft bzw. übersprungen hat."""
+      z = self._triaden_zaehler
+      uebersprungen = z['ml_paare'] - z['ml_geprueft']
+      return {**z, 'uebersprungen': uebersprungen, 'anteil_uebersprungen': uebersprungen / z['ml_paare'] if z['ml_paare'] else 0.0}
+
+  def aktiviere_messung(self, aktiv: bool = True, zuruecksetzen: bool = True):
+      """Schaltet Zeitmessung und Zähler der heißen Pfade ein (bzw. mit aktiv=False wieder aus); siehe messwerte."""
+      if zuruecksetzen:
+          self._messung.zuruecksetzen()
+      self._messung.aktiv = aktiv
+
+  def messwerte(self, zuruecksetzen: bool = False) -> dict:
+      """Zeiten je Phase, Zähler und Verteilungen seit aktiviere_messung(), dazu Triaden-Statistik, Rückstand der
+      Verfeinerung (verfeinerung_status) und Größe des Gewebes.
+
+      Phasen: parsen, einfuegen(_viele), dyadisch, triadisch(_ml/_pool), verfeinerung, loeschen, verschmelzen, journal(_kompaktieren),
+      ansicht, adjazenz, impuls_bewertung, wellen. Zähler: bewertete Paare (paare_dyadisch, paare_triadisch,
+      paare_triadisch_ml, paare_verfeinert), gegriffene heuristische Regeln, Impulse, Start- und ausgebreitete Wellen,
+      Treffer und Fehltreffer des Impuls-Caches, veröffentlichte Ansichten. Verteilungen: ml_batch_groesse und
+      verfeinerung_rueckstand (offene ML-Paare nach jedem Einreihen und Schritt). Das Ergebnis ist JSON-fähig.
+      """
+      werte = self._messung.werte()
+      werte['triaden'] = self.triaden_statistik()
+      werte['verfeinerung'] = self.verfeinerung_status()
+      werte['gewebe'] = {'fragmente_aktiv': self._statistik.aktive_fragmente, 'fragmente_gesamt': len(self._fragmente),
+                         'kanten': self._statistik.kanten, 'struktur_version': self._struktur_version}
+      if zuruecksetzen:
+          self._messung.zuruecksetzen()
+      return werte
+
+  def _triaden_ml_ueber_pool(self, neuer_index: int, idx) -> bool:
+    """Weg 1 des gebündelten Durchlaufs über den TriadenPool; dieselben Kanten wie der Pfad im Hauptprozess.
+
+    Die Worker liefern nur die Kanten mit staerke >= 0.1 zurück. Entfernt wird jede bestehende Kante eines
+    geprüften Paares, das nicht darunter ist; danach werden die Kanten in Paar-Reihenfolge gesetzt, sodass auch
+    die Reihenfolge in _resonanzen_struktur der des seriellen Pfades entspricht.
+    """
+    k = self._triaden_top_k
+    nachbarn = None if k is None or k >= len(idx) else np.sort(self._naechste_nachbarn(neuer_index, idx, k))
+    try:
+        kante_i, kante_j, art_codes, staerken, geprueft = self._triaden_pool.bewerte(
+            self._merkmale, self._art_classifier, self._staerke_regressor, neuer_index, idx, nachbarn, TRIADEN_BATCH_GROESSE)
+        art_codes = self._art_codes_aus_modell(art_codes)
+    except Exception as e:
+        logger.warning("ML-Vorhersage im Triaden-Pool für Fragment %d fehlgeschlagen: %s. Nutze heuristischen Fallback.", neuer_index, e)
+        return False
+    self._triaden_zaehler['ml_geprueft'] += geprueft
+    self._messung.zaehle('paare_triadisch_ml', geprueft)
+    hat_vektor = self._merkmale.hat_vektor
+    ml_idx = idx[hat_vektor[idx]]
+    ml_nachbarn = None if nachbarn is None else nachbarn[hat_vektor[nachbarn]]
+    gesetzt = np.sort((kante_i.astype(np.int64) << 32) | kante_j)
+    # Die geprüften Paare zeilenweise in Blöcken neu aufzählen und deren bestehende, nicht mehr gesetzte Kanten entfernen
+    zeilen_je_block = max(1, 16 * TRIADEN_BATCH_GROESSE // max(1, len(ml_idx)))
+    for start in range(0, len(ml_idx), zeilen_je_block):
+        paar_i, paar_j = band_paare(ml_idx[start:start + zeilen_je_block], ml_idx, ml_nachbarn)
+        vorhanden = self._resonanzen_struktur.finde_viele(paar_i, paar_j) >= 0
+        paar_i, paar_j = paar_i[vorhanden], paar_j[vorhanden]
+        veraltet = ~np.isin((paar_i.astype(np.int64) << 32) | paar_j, gesetzt, assume_unique=True)
+        self._entferne_kanten(paar_i[veraltet], paar_j[veraltet])
+    self._setze_kanten(kante_i, kante_j, art_codes, staerken, "ML-Vorhersage (Triade)")
+    return True
+
+  def _aktualisiere_triaden_gebuendelt(self, neuer_index: int, aktive_indices: list[int]):
+    """Gebündelter triadischer Pfad: ein predict für alle Kandidatenpaare, Heuristik nur für die Paare, bei denen eine Regel greifen kann.
+
+    Ohne Top-k (setze_triaden_top_k(None)) liefert er dieselben Kanten wie _aktualisiere_triaden_einzeln. Mit
+    Top-k behalten ML-Paare außerhalb der Nachbarschaft ihre Kante; die heuristischen Regeln bleiben exakt,
+    weil sie ohnehin nur Paare mit starker Resonanz zum neuen Fragment ändern. Jedes Paar (i, j) liest und
+    schreibt nur seine eigene Kante, daher ist die Reihenfolge der Anwendung egal.
+    """
+    if len(aktive_indices) < 2:
+        return
+    idx = np.asarray(aktive_indices, dtype=np.intp)
+    n = len(idx)
+    hat_vektor = self._merkmale.hat_vektor
+    ml_genutzt = False
+
+    # --- Weg 1: ML-gestützte Vorhersage für alle Kandidatenpaare mit Vektoren ---
+    if self._ml_models_loaded and hat_vektor[neuer_index]:
+        mit_vektor = int(hat_vektor[idx].sum())
+        self._triaden_zaehler['paare'] += n * (n - 1)
+        self._triaden_zaehler['ml_paare'] += mit_vektor * (mit_vektor - 1)
+        self._messung.zaehle('paare_triadisch', n * (n - 1))
+        ml_genutzt = True
+        if self._triaden_pool is not None and n >= self._triaden_pool.min_fragmente:
+            with self._messung.phase('triadisch_pool'):
+                ml_genutzt = self._triaden_ml_ueber_pool(neuer_index, idx)
+            ml_i = idx[:0]
+        else:
+            paar_i, paar_j = self._triaden_kandidaten(neuer_index, idx)
+            ml_paare = hat_vektor[paar_i] & hat_vektor[paar_j]
+            ml_i, ml_j = paar_i[ml_paare], paar_j[ml_paare]
+            self._triaden_zaehler['ml_geprueft'] += len(ml_i)
+            self._messung.zaehle('paare_triadisch_ml', len(ml_i))
+        if len(ml_i):
+            try:
+                self._triaden_ml_anwenden(ml_i, ml_j, self._merkmale.vektoren[neuer_index])
+            except Exception as e:
+                logger.warning("Gebündelte ML-Vorhersage für Fragment %d fehlgeschlagen: %s. Nutze heuristischen Fallback.", neuer_index, e)
+                ml_genutzt = False
+
+    # --- Weg 2: Heuristischer Fallback für die übrigen Paare (ohne Modelle oder mit einem Ende ohne Vektor) ---
+    if ml_genutzt and hat_vektor[idx].all():
+        return
+    self._triaden_heuristik(neuer_index, idx, self._merkmale[neuer_index], self._fragmente[neuer_index], ml_genutzt)
+
+  def _triaden_ml_anwenden(self, ml_i, ml_j, vektor_c):
+    """Bewertet die Paare (ml_i, ml_j) mit dem neuen Fragment (Vektor vektor_c) über die ML-Modelle und schreibt ihre Kanten.
+
+    Wirft die Ausnahme der Modelle weiter, bevor eine Kante geändert ist.
+    """
+    with self._messung.phase('triadisch_ml'):
+        vektoren = self._merkmale.vektoren
+        art_codes, staerken = [], []
+        for start in range(0, len(ml_i), TRIADEN_BATCH_GROESSE):
+            a = ml_i[start:start + TRIADEN_BATCH_GROESSE]
+            b = ml_j[start:start + TRIADEN_BATCH_GROESSE]
+            features = np.hstack([vektoren[a], vektoren[b], np.broadcast_to(vektor_c, (len(a), len(vektor_c)))])
+            art_codes.append(self._art_classifier.predict(features))
+            staerken.append(self._staerke_regressor.predict(features))
+            self._messung.verteile('ml_batch_groesse', len(a))
+        art_codes = self._art_codes_aus_modell(np.concatenate(art_codes))
+        staerken = np.clip(np.concatenate(staerken), 0.0, 1.0)
+    # Jedes Paar hat seine eigene Kante: erst alle zu schwachen entfernen, dann alle übrigen setzen
+    kante = staerken >= 0.1
+    self._entferne_kanten(ml_i[~kante], ml_j[~kante])
+    self._setze_kanten(ml_i[kante], ml_j[kante], art_codes[kante], staerken[kante], "ML-Vorhersage (Triade)")
+
+  def _triaden_heuristik(self, neuer_index: int, idx, merkmale: FragmentMerkmale, text: str, ml_genutzt: bool):
+    """Die heuristischen Regeln des gebündelten Durchlaufs für alle Paare, die die ML-Modelle nicht bewertet haben."""
+    hat_vektor = self._merkmale.hat_vektor
+    heuristisch = lambda i, j: not ml_genutzt or not (hat_vektor[i] and hat_vektor[j])
+    # Die dyadische Resonanz neu->x hängt nicht vom Partner ab und wird daher einmal für alle Fragmente gespürt
+    bewertung = self._bewerte_dyadisch_gegen_alle(merkmale, idx)
+    namen = np.array(self._dyadische_muster['namen'] + ['-'])  # Index -1 -> '-' (keine Resonanz)
+    arten, staerken = namen[bewertung['muster']], bewertung['staerke']
+    nenner = idx[np.isin(arten, ['VERSTAERKUNG', 'ERGAENZUNG']) & (staerken > 0.6)].tolist()
+    stoerer_maske = (arten == 'KONTRAST') & (staerken > 0.7)
+    stoerer = dict(zip(idx[stoerer_maske].tolist(), staerken[stoerer_maske].tolist()))
+
+    # Alle übrigen Paare behalten ihre Kante unverändert (gespeicherte Kanten haben stets staerke >= 0.1)
+    # Regel: "Gemeinsamer Nenner"
+    gefestigt = set()
+    for i in nenner:
+        for j in nenner:
+            if i == j or not heuristisch(i, j): continue
+            aktuelle_resonanz = self._resonanzen_struktur.kante(i, j)
+            neue_staerke = min(1.0, (aktuelle_resonanz.staerke if aktuelle_resonanz else 0) + 0.2)
+            herkunft = aktuelle_resonanz.herkunft if aktuelle_resonanz else ""
+            self._setze_kante(i, j, 'ERGAENZUNG', neue_staerke, herkunft, f"durch '{text[:15]}...' gefestigt")
+            gefestigt.add((i, j))
+    self._messung.zaehle('regel_gefestigt', len(gefestigt))
+
+    # Regel: "Störenfried" (nur für Paare innerhalb von idx, z.B. der Nachbarschaft einer Verschmelzung)
+    innen = set(idx.tolist())
+    for i in stoerer:
+        for j, aktuelle_resonanz in self._resonanzen_struktur[i].items():
+            # Kanten zu jüngeren Fragmenten gab es beim Einfügen noch nicht (nur bei aufgeschobenen Durchläufen möglich)
+            if j >= neuer_index or j not in innen or self._fragmente[j] is None or not heuristisch(i, j): continue
+            if (i, j) in gefestigt or aktuelle_resonanz.art != 'VERSTAERKUNG': continue
+            neue_staerke = max(0.0, aktuelle_resonanz.staerke - stoerer[i] * 0.5)
+            self._messung.zaehle('regel_destabilisiert')
+            if neue_staerke < 0.1:
+                self._entferne_resonanz(i, j)
+                continue
+            self._setze_kante(i, j, aktuelle_resonanz.art, neue_staerke, aktuelle_resonanz.herkunft,
+                              f"durch Kontrast von '{text[:15]}...' destabilisiert")
+
   # --- Gewebe-Management ---
   
-  def fuege_ein(self, text: str):
-    """Fügt ein neues Textfragment zum Gewebe hinzu und aktualisiert die Resonanzstruktur."""
-    print(f"\nFüge Fragment '{text[:50]}...' hinzu...")
-    neuer_index = len(self._fragmente)
-    self._fragmente.append(text)
+  @_schreibend
+  def fuege_ein(self, text: str) -> int:
+    """Fügt ein neues Textfragment zum Gewebe hinzu und aktualisiert die Resonanzstruktur; gibt die Id des Fragments zurück."""
+    logger.debug("Füge Fragment '%s...' hinzu...", text[:50])
     try:
-        self._fragment_docs[neuer_index] = self.nlp(text)
-        print(f"  SpaCy Doc gecacht für Fragment {neuer_index}.")
+        with self._messung.phase('parsen'):
+            merkmale_neu = self._merkmale_aus_text(text)
     except Exception as e:
-        print(f"Error caching spaCy doc: {e}")
-        self._fragment_docs[neuer_index] = self.nlp("")
+        logger.error("Error computing fragment features: %s", e)
+        merkmale_neu = self._merkmale_aus_text("")
+    with self._messung.phase('einfuegen'):
+        neuer_index = self._fuege_ein_mit_merkmalen(text, merkmale_neu)
+    self._schreibe_vektor_cache(mindestens=VEKTOR_CACHE_PUFFER)
+    logger.debug("Gewebe aktualisiert.")
+    return neuer_index
+
+  def _fuege_ein_mit_merkmalen(self, text: str, merkmale: FragmentMerkmale, ausgabe: bool = True) -> int:
+    """Einfügen mit bereits berechneten Merkmalen: dyadische, dann triadische Resonanzen. Gibt die neue Id zurück."""
+    neuer_index = self._registriere_fragment(text, merkmale)
+    self._messung.zaehle('fragmente_eingefuegt')
+    if ausgabe:
+        logger.debug("Merkmale gespeichert für Fragment %d.", neuer_index)
+    if self._journal is not None:
+        self._kanten_deltas = []
 
-    self._resonanzen_struktur[neuer_index] = {}
-    
     # 1. Direkte (dyadische) Resonanzen zum neuen Fragment spüren
-    for i in range(neuer_index):
-        if self._fragmente[i] is None: continue
-        res_neu_i = self._spuere_art_und_staerke_der_resonanz(text, self._fragmente[i], self._resonanzen_struktur, neuer_index, i)
-        if res_neu_i: self._resonanzen_struktur[neuer_index][i] = res_neu_i
-        res_i_neu = self._spuere_art_und_staerke_der_resonanz(self._fragmente[i], text, self._resonanzen_struktur, i, neuer_index)
-        if res_i_neu:
-            if i not in self._resonanzen_struktur: self._resonanzen_struktur[i] = {}
-            self._resonanzen_struktur[i][neuer_index] = res_i_neu
-
-    # 2. Indirekten (triadischen) Einfluss auf alle bestehenden Paare spüren
+    aktive_indices = self._spuere_dyadisch(neuer_index)
+
+    # 2. Indirekten (triadischen) Einfluss auf alle bestehenden Paare spüren (oder als Auftrag einreihen)
+    if ausgabe and len(aktive_indices) > 1:
+        logger.debug("Spüre Einfluss von Fragment %d auf bestehende Resonanzen...", neuer_index)
+    aufgeschoben = self._aktualisiere_triaden(neuer_index, aktive_indices)
+
+    self._struktur_version += 1
+    if self._journal is not None:
+        eintrag = {'op': 'fuege_ein', 'id': neuer_index, 'text': text,
+                   'merkmale': merkmale_als_dict(self._merkmale[neuer_index]), 'kanten': self._kanten_deltas}
+        if aufgeschoben:
+            eintrag['triaden'] = 'aufgeschoben'
+        self._kanten_deltas = None
+        self._protokolliere(eintrag)
+    return neuer_index
+
+  def _spuere_dyadisch(self, neuer_index: int, kandidaten: list[int] = None) -> list[int]:
+    """Setzt die dyadischen Kanten zwischen Fragment `neuer_index` und allen älteren aktiven Fragmenten
+    (bzw. nur den `kandidaten`).
+
+    Die Muster sind symmetrisch: beide Richtungen teilen Art und Stärke, nur der Kontext unterscheidet sich.
+    Gibt die bewerteten Ids zurück.
+    """
+    aktive_indices = [i for i in range(neuer_index) if self._fragmente[i] is not None] if kandidaten is None else kandidaten
+    merkmale_neu = self._merkmale[neuer_index]
+    with self._messung.phase('dyadisch'):
+        bewertung = self._bewerte_dyadisch_gegen_alle(merkmale_neu, aktive_indices)
+        for k in np.flatnonzero(bewertung['muster'] >= 0).tolist():
+            i = aktive_indices[k]
+            self._setze_resonanz(self._baue_dyadische_resonanz(bewertung, k, merkmale_neu.sentiment, neuer_index, i))
+            self._setze_resonanz(self._baue_dyadische_resonanz(bewertung, k, merkmale_neu.sentiment, i, neuer_index, umgekehrt=True))
+    return aktive_indices
+
+  def _aktualisiere_triaden(self, neuer_index: int, aktive_indices: list[int], alle_paare: bool = True) -> bool:
+    """Triadischer Durchlauf des neuen Fragments; gibt True zurück, wenn er als Auftrag für die Verfeinerung wartet.
+
+    alle_paare=False heißt, dass `aktive_indices` nur ein Ausschnitt der älteren Fragmente ist (z.B. beim Verschmelzen).
+    """
+    if not self._modelle_geladen:
+        self._stelle_modelle_bereit()  # Modus 'lazy'/'hintergrund': die ML-Modelle müssen vor der Bewertung bereitstehen
+    if self._modelle_pruef_intervall is not None:
+        self._pruefe_modelle()
+    if self._verfeinerer is not None:
+        return self._stelle_auftrag_ein(neuer_index, aktive_indices, self._merkmale[neuer_index], self._fragmente[neuer_index], alle_paare)
+    with self._messung.phase('triadisch'):
+        if self._triaden_modus == 'einzeln':
+            self._aktualisiere_triaden_einzeln(neuer_index, aktive_indices)
+        else:
+            self._aktualisiere_triaden_gebuendelt(neuer_index, aktive_indices)
+    return False
+
+  # --- Aufgeschobene triadische Durchläufe (latenzbegrenztes Einfügen) ---
+
+  def _stelle_auftrag_ein(self, neuer_index: int, aktive_indices, merkmale: FragmentMerkmale, text: str,
+                          alle_paare: bool = True) -> bool:
+    """Reiht den gebündelten triadischen Durchlauf des neuen Fragments als TriadenAuftrag ein.
+
+    Ein Auftrag, dessen ML-Modelle alle Paare bewerten (ohne Top-k), überschreibt die Kanten aller älteren ML-Paare;
+    die noch offenen ML-Zeilen früherer Aufträge werden daher verworfen, wie beim Modus 'batch' von fuege_ein_viele
+    ("das letzte gewinnt"). Deren heuristische Regeln laufen weiterhin, und zwar vor dem neuen Auftrag.
+    Mit alle_paare=False (nur ein Ausschnitt der Fragmente, z.B. beim Verschmelzen) wird nichts verworfen.
+    """
+    if len(aktive_indices) < 2:
+        return False
+    idx = np.asarray(aktive_indices, dtype=np.intp)
+    n = len(idx)
+    hat_vektor = self._merkmale.hat_vektor
+    ml = self._ml_models_loaded and merkmale.hat_vektor
+    ml_idx, nachbarn = idx[:0], None
+    if ml:
+        ml_idx = idx[hat_vektor[idx]]
+        self._triaden_zaehler['paare'] += n * (n - 1)
+        self._triaden_zaehler['ml_paare'] += len(ml_idx) * (len(ml_idx) - 1)
+        self._messung.zaehle('paare_triadisch', n * (n - 1))
+        k = self._triaden_top_k
+        if k is not None and k < n:
+            nachbarn = np.sort(self._naechste_nachbarn(neuer_index, idx, k, merkmale))
+            nachbarn = nachbarn[hat_vektor[nachbarn]]
+    if ml and nachbarn is None and alle_paare:
+        verworfen = sum(auftrag.verwirf_ml() for auftrag in self._triaden_auftraege)
+        self._verfeinerung_zaehler['verworfene_paare'] += verworfen
+        self._verfeinerung_zaehler['ausstehende_paare'] -= verworfen
+    auftrag = TriadenAuftrag(neuer_index, merkmale, text, idx, ml, ml_idx, nachbarn)
+    self._triaden_auftraege.append(auftrag)
+    self._verfeinerung_zaehler['ausstehende_paare'] += auftrag.offene_paare
+    self._messung.verteile('verfeinerung_rueckstand', self._verfeinerung_zaehler['ausstehende_paare'])
+    if self._verfeinerer is not None:
+        self._verfeinerer.anstossen()
+    return True
+
+  def _stelle_auftrag_wieder_ein(self, neuer_index: int, merkmale: FragmentMerkmale, text: str, nachbarschaft: list[int] = None):
+    """Reiht beim Abspielen des Journals einen Auftrag wieder ein, der beim Absturz noch nicht fertig war.
+
+    `nachbarschaft` sind die Fragmente eines Auftrags über einen Ausschnitt (Verschmelzung), sonst alle älteren aktiven.
+    """
+    if not self._modelle_geladen:
+        self._stelle_modelle_bereit()
+    if nachbarschaft is not None:
+        self._stelle_auftrag_ein(neuer_index, nachbarschaft, merkmale, text, alle_paare=False)
+        return
     aktive_indices = [i for i in range(neuer_index) if self._fragmente[i] is not None]
-    if len(aktive_indices) > 1:
-        print(f"  Spüre Einfluss von Fragment {neuer_index} auf bestehende Resonanzen...")
-    for i in aktive_indices:
-        for j in aktive_indices:
-            if i == j: continue
-            aktuelle_resonanz = self._resonanzen_struktur.get(i, {}).get(j)
-            neue_resonanz = self._spuere_einfluss_auf_resonanz(self._fragmente[i], self._fragmente[j], text, aktuelle_resonanz, self._resonanzen_struktur)
-            
-            if neue_resonanz and neue_resonanz.staerke >= 0.1:
-                if i not in self._resonanzen_struktur: self._resonanzen_struktur[i] = {}
-                self._resonanzen_struktur[i][j] = neue_resonanz
-            elif aktuelle_resonanz is not None:
-                del self._resonanzen_struktur[i][j]
+    self._stelle_auftrag_ein(neuer_index, aktive_indices, merkmale, text)
+
+  def _auftraege_erledigt(self, ids):
+    """Entfernt beim Abspielen des Journals die Aufträge, die laut Eintrag 'verfeinere' abgeschlossen sind."""
+    ids = set(ids)
+    while self._triaden_auftraege and self._triaden_auftraege[0].neuer_index in ids:
+        auftrag = self._triaden_auftraege.popleft()
+        self._verfeinerung_zaehler['ausstehende_paare'] -= auftrag.offene_paare
+
+  def _triaden_prioritaet(self, auftrag: TriadenAuftrag):
+    """Priorität der ML-Zeilen eines Auftrags: Kosinus-Ähnlichkeit zum neuen Fragment plus mittlere Stärke der bestehenden Kanten."""
+    merkmale = auftrag.merkmale
+    vektoren = self._merkmale.vektoren[auftrag.ml_idx]
+    normen = self._merkmale.normen[auftrag.ml_idx]
+    aehnlichkeit = vektoren @ merkmale.vektor / np.maximum(normen * merkmale.norm, 1e-12)
+    return aehnlichkeit + self._resonanzen_struktur.mittlere_staerke(auftrag.ml_idx)
+
+  def _verfeinere_ml(self, auftrag: TriadenAuftrag, max_paare: int) -> int:
+    """Bewertet die nächsten ML-Zeilen eines Auftrags (zusammen etwa max_paare Paare); gibt die Anzahl Paare zurück."""
+    if not auftrag.priorisiert:
+        auftrag.priorisiere(self._triaden_prioritaet(auftrag))
+    zeilen, paare = auftrag.naechste_zeilen(max_paare)
+    self._verfeinerung_zaehler['ausstehende_paare'] -= paare
+    # Inzwischen gelöschte Fragmente haben keinen Vektor mehr und fallen heraus
+    hat_vektor = self._merkmale.hat_vektor
+    ml_idx = auftrag.ml_idx[hat_vektor[auftrag.ml_idx]]
+    nachbarn = None if auftrag.nachbarn is None else auftrag.nachbarn[hat_vektor[auftrag.nachbarn]]
+    ml_i, ml_j = band_paare(zeilen[hat_vektor[zeilen]], ml_idx, nachbarn)
+    self._triaden_zaehler['ml_geprueft'] += len(ml_i)
+    self._messung.zaehle('paare_triadisch_ml', len(ml_i))
+    if len(ml_i):
+        try:
+            self._triaden_ml_anwenden(ml_i, ml_j, auftrag.merkmale.vektor)
+        except Exception as e:
+            logger.warning("ML-Vorhersage der Verfeinerung für Fragment %d fehlgeschlagen: %s. Nutze heuristischen Fallback.",
+                           auftrag.neuer_index, e)
+            auftrag.ml = False
+            self._verfeinerung_zaehler['ausstehende_paare'] -= auftrag.verwirf_ml()
+    return paare
+
+  def _schliesse_auftrag_ab(self, auftrag: TriadenAuftrag):
+    """Letzter Schritt eines Auftrags: die heuristischen Regeln für die Paare, die die ML-Modelle nicht bewertet haben."""
+    idx = np.array([i for i in auftrag.idx.tolist() if self._fragmente[i] is not None], dtype=np.intp)
+    if len(idx) < 2 or (auftrag.ml and self._merkmale.hat_vektor[idx].all()):
+        return
+    self._triaden_heuristik(auftrag.neuer_index, idx, auftrag.merkmale, auftrag.text, auftrag.ml)
+
+  @_schreibend
+  def verfeinere(self, budget_paare: int = None, budget_s: float = None) -> int:
+      """Ein Schritt der Verfeinerung: arbeitet die Aufträge der Reihe nach ab, bis `budget_paare` ML-Paare bewertet
+      sind oder `budget_s` Sekunden vergangen sind (None: unbegrenzt). Gibt die Zahl der noch offenen Aufträge zurück.
+
+      Geprüft wird das Budget zwischen zwei Blöcken von höchstens TRIADEN_BATCH_GROESSE Paaren. Die Kanten eines
+      Schritts gehen als ein Journal-Eintrag 'verfeinere' ins Journal, zusammen mit den dabei abgeschlossenen Aufträgen.
+      """
+      if not self._triaden_auftraege:
+          return 0
+      start = time.perf_counter()
+      bearbeitet = 0
+      fertig = []
+      if self._journal is not None:
+          self._kanten_deltas = []
+      with self._messung.phase('verfeinerung'):
+          while self._triaden_auftraege:
+              if (budget_paare is not None and bearbeitet >= budget_paare) or \
+                      (budget_s is not None and time.perf_counter() - start >= budget_s):
+                  break
+              auftrag = self._triaden_auftraege[0]
+              if auftrag.offene_paare:
+                  block = TRIADEN_BATCH_GROESSE if budget_paare is None else max(1, min(TRIADEN_BATCH_GROESSE, budget_paare - bearbeitet))
+                  bearbeitet += self._verfeinere_ml(auftrag, block)
+                  continue
+              self._schliesse_auftrag_ab(auftrag)
+              self._triaden_auftraege.popleft()
+              fertig.append(auftrag.neuer_index)
+      zaehler = self._verfeinerung_zaehler
+      zaehler['schritte'] += 1
+      zaehler['bearbeitete_paare'] += bearbeitet
+      self._messung.zaehle('paare_verfeinert', bearbeitet)
+      self._messung.verteile('verfeinerung_rueckstand', zaehler['ausstehende_paare'])
+      self._struktur_version += 1
+      if self._journal is not None:
+          eintrag = {'op': 'verfeinere', 'fertig': fertig, 'kanten': self._kanten_deltas}
+          self._kanten_deltas = None
+          if fertig or eintrag['kanten']:
+              self._protokolliere(eintrag)
+      return len(self._triaden_auftraege)
+
+  @_schreibend
+  def verfeinere_alles(self):
+      """Arbeitet alle wartenden triadischen Aufträge sofort ab; danach hat das Gewebe dieselben Kanten wie beim sofortigen Einfügen."""
+      if self._triaden_auftraege:
+          logger.debug("Verfeinere %d ausstehende Aufträge...", len(self._triaden_auftraege))
+          self.verfeinere()
+
+  def verfeinerung_status(self) -> dict:
+      """Rückstand der Verfeinerung: wartende Aufträge und ihre offenen ML-Paare, dazu Schritte und Paare seit dem Start."""
+      return {'aktiv': self._verfeinerer is not None, 'ausstehende_auftraege': len(self._triaden_auftraege), **self._verfeinerung_zaehler}
+
+  @_schreibend
+  def setze_verfeinerung(self, aktiv: bool = True, budget_paare: int = 20000, budget_ms: float = 50.0, pause_ms: float = 5.0,
+                         hintergrund: bool = True):
+      """Latenzbegrenztes Einfügen: fuege_ein und fuege_ein_viele schreiben nur die dyadischen Kanten sofort.
+
+      Der triadische Durchlauf wird als Auftrag eingereiht; ein Hintergrund-Thread arbeitet die Aufträge in Schritten
+      von höchstens `budget_paare` ML-Paaren bzw. `budget_ms` Millisekunden ab, mit `pause_ms` zwischen den Schritten.
+      Innerhalb eines Auftrags kommen die Zeilen mit der größten Ähnlichkeit zum neuen Fragment und den stärksten
+      bestehenden Kanten zuerst. Mit hintergrund=False ruft der Aufrufer verfeinere() selbst auf. Abfragen wählen mit
+      konsistenz='vollstaendig', ob sie vorher alles abarbeiten (siehe ansicht). Der Modus verfeinert immer gebündelt;
+      aktiv=False arbeitet den Rückstand ab und kehrt zum sofortigen Durchlauf zurück.
+      """
+      if self._verfeinerer is not None:
+          self._verfeinerer.schliessen()
+          self._verfeinerer = None
+      if not aktiv:
+          self.verfeinere_alles()
+          return
+      self._verfeinerer = Verfeinerer(self.verfeinere, budget_paare=budget_paare, budget_ms=budget_ms, pause_ms=pause_ms,
+                                      hintergrund=hintergrund)
+      if self._triaden_auftraege:
+          self._verfeinerer.anstossen()
+
+  def _merkmale_aus_texten(self, texte: list[str], batch_size: int, n_process: int) -> list[FragmentMerkmale]:
+    """Parst viele Texte über nlp.pipe; schlägt das fehl, wird jeder Text einzeln geparst."""
+    with self._messung.phase('parsen'):
+        try:
+            return [self._merkmale_aus_doc(doc) for doc in self.nlp.pipe(texte, batch_size=batch_size, n_process=n_process)]
+        except Exception as e:
+            logger.warning("nlp.pipe fehlgeschlagen: %s. Parse die Texte einzeln.", e)
+        merkmale = []
+        for text in texte:
+            try:
+                merkmale.append(self._merkmale_aus_text(text))
+            except Exception as e:
+                logger.error("Error computing fragment features: %s", e)
+                merkmale.append(self._merkmale_aus_text(""))
+        return merkmale
+
+  @_schreibend
+  def fuege_ein_viele(self, texte: list[str], modus: str = 'sequentiell', batch_size: int = 256, n_process: int = 1) -> list[int]:
+    """Fügt viele Fragmente auf einmal ein; die Texte werden gebündelt über nlp.pipe geparst.
 
-    print("  Gewebe aktualisiert.")
+    modus='sequentiell' liefert exakt dasselbe Gewebe wie fuege_ein für jeden Text in dieser Reihenfolge
+    (nur das Parsen ist gebündelt).
 
+    modus='batch' spürt die dyadischen Resonanzen jedes neuen Fragments gegen alle älteren (auch die
+    übrigen neuen) und führt den triadischen Durchlauf nur einmal aus, und zwar mit dem letzten Fragment
+    des Stapels als drittem Glied über alle Paare der übrigen aktiven Fragmente ("das letzte gewinnt").
+    Solange die ML-Modelle alle Paare bewerten, ist das Ergebnis dasselbe wie sequentiell: dort überschreibt
+    jedes neue Fragment die Kanten aller älteren Paare, unabhängig von ihrem bisherigen Zustand, sodass
+    am Ende nur der letzte Durchlauf sichtbar bleibt. Die heuristischen Regeln früherer Fragmente des
+    Stapels (für Paare ohne Vektor oder ohne Modelle) werden dagegen nicht angewendet.
+
+    Gibt die Ids der neuen Fragmente in Eingabereihenfolge zurück.
+    """
+    if modus not in ('sequentiell', 'batch'):
+        raise ValueError(f"Unbekannter Modus '{modus}' (erlaubt: 'sequentiell', 'batch').")
+    texte = list(texte)
+    if not texte:
+        return []
+    logger.info("Füge %d Fragmente hinzu (Modus '%s')...", len(texte), modus)
+    alle_merkmale = self._merkmale_aus_texten(texte, batch_size, n_process)
+    logger.debug("%d Texte geparst.", len(texte))
+
+    if modus == 'sequentiell':
+        with self._messung.phase('einfuegen_viele'):
+            neue_ids = [self._fuege_ein_mit_merkmalen(text, merkmale, ausgabe=False) for text, merkmale in zip(texte, alle_merkmale)]
+        self._schreibe_vektor_cache()
+        logger.info("Gewebe aktualisiert (%d Fragmente).", len(neue_ids))
+        return neue_ids
+
+    if self._journal is not None:
+        self._kanten_deltas = []
+    neue_ids = []
+    with self._messung.phase('einfuegen_viele'):
+        for text, merkmale in zip(texte, alle_merkmale):
+            neuer_index = self._registriere_fragment(text, merkmale)
+            aktive_indices = self._spuere_dyadisch(neuer_index)
+            neue_ids.append(neuer_index)
+        self._messung.zaehle('fragmente_eingefuegt', len(neue_ids))
+        logger.debug("Spüre Einfluss von Fragment %d auf %d Fragmente...", neue_ids[-1], len(aktive_indices))
+        aufgeschoben = self._aktualisiere_triaden(neue_ids[-1], aktive_indices)
+
+    self._struktur_version += 1
+    if self._journal is not None:
+        fragmente = [{'id': i, 'text': self._fragmente[i], 'merkmale': merkmale_als_dict(self._merkmale[i])} for i in neue_ids]
+        eintrag = {'op': 'fuege_ein_viele', 'fragmente': fragmente, 'kanten': self._kanten_deltas}
+        if aufgeschoben:
+            eintrag['triaden'] = 'aufgeschoben'  # der Auftrag gehört zum letzten Fragment
+        self._kanten_deltas = None
+        self._protokolliere(eintrag)
+    self._schreibe_vektor_cache()
+    logger.info("Gewebe aktualisiert (%d Fragmente).", len(neue_ids))
+    return neue_ids
+
+  def _registriere_fragment(self, text: str, merkmale: FragmentMerkmale, cachen: bool = True) -> int:
+    """Legt ein Fragment mit fertigen Merkmalen an (ohne Resonanzen) und gibt seine Id zurück.
+
+    cachen=False hält den Vektor aus dem VektorCache heraus (abgeleitete Merkmale, z.B. einer Verschmelzung).
+    """
+    neuer_index = len(self._fragmente)
+    self._fragmente.append(text)
+    self._text_ids.setdefault(text, []).append(neuer_index)
+    self._merkmale.setze(neuer_index, merkmale)
+    if self._vektor_index is not None and self._merkmale.hat_vektor[neuer_index]:
+        with self._index_sperre:
+            self._vektor_index.hinzufuegen(neuer_index, self._merkmale.vektoren[neuer_index])
+    if cachen and self._vektor_cache is not None and merkmale.hat_vektor:
+        self._vektor_cache_puffer.append((text, merkmale.vektor))
+    self._resonanzen_struktur.neue_zeile(neuer_index)
+    self._statistik.aktive_fragmente += 1
+    return neuer_index
+
+  def _schreibe_vektor_cache(self, mindestens: int = 1):
+    """Schreibt die gesammelten Fragmentvektoren mit einem fuege_hinzu_viele in den VektorCache, sobald es `mindestens` sind."""
+    if self._vektor_cache is None or len(self._vektor_cache_puffer) < mindestens:
+        return
+    texte, vektoren = zip(*self._vektor_cache_puffer)
+    self._vektor_cache_puffer = []
+    self._vektor_cache.fuege_hinzu_viele(list(texte), np.stack(vektoren))
+
+  @_schreibend
   def loesche_fragment(self, index: int):
     """Markiert ein Fragment als gelöscht (Tombstone) und entfernt zugehörige Resonanzen."""
     if not (0 <= index < len(self._fragmente) and self._fragmente[index] is not None):
-        print(f"Fehler: Fragment {index} kann nicht gelöscht werden (existiert nicht oder bereits gelöscht).")
+        logger.warning("Fragment %d kann nicht gelöscht werden (existiert nicht oder bereits gelöscht).", index)
         return
 
-    print(f"\nLösche Fragment {index} logisch...")
+    with self._messung.phase('loeschen'):
+        self._loesche_intern(index)
+    self._protokolliere({'op': 'loesche', 'id': index})
+    logger.debug("Fragment %d als gelöscht markiert.", index)
+    self._kompaktiere_bei_bedarf()
+
+  def _kompaktiere_bei_bedarf(self, ids: list = ()) -> list:
+    """Kompaktiert die Ids, wenn der Anteil gelöschter Slots _tombstone_anteil_max übersteigt; gibt `ids` in neuer Nummerierung zurück."""
+    if self._tombstone_anteil_max is None or self._fragmente.count(None) <= self._tombstone_anteil_max * len(self._fragmente):
+        return list(ids)
+    abbildung = self.kompaktiere_ids()
+    return [None if i is None else abbildung[i] for i in ids]
+
+  def _loesche_intern(self, index: int) -> dict:
+    """Setzt den Tombstone und entfernt alle ein- und ausgehenden Kanten des Fragments; gibt deren Spalten zurück."""
+    ids = self._text_ids[self._fragmente[index]]
+    ids.remove(index)
+    if not ids: del self._text_ids[self._fragmente[index]]
     self._fragmente[index] = None
-    if index in self._fragment_docs: del self._fragment_docs[index]
-    if index in self._resonanzen_struktur: del self._resonanzen_struktur[index]
-    
-    for quelle_index in list(self._resonanzen_struktur.keys()):
-        if index in self._resonanzen_struktur[quelle_index]:
-            del self._resonanzen_struktur[quelle_index][index]
-    
-    if index in self._wave_arrival_effects: del self._wave_arrival_effects[index]
-    print(f"  Fragment {index} als gelöscht markiert.")
-
-  def verschmelze_fragmente(self, index1: int, index2: int):
-      """Verschmilzt zwei Fragmente zu einem neuen und löscht die alten."""
-      if not (0 <= index1 < len(self._fragmente) and self._fragmente[index1] is not None and \
-              0 <= index2 < len(self._fragmente) and self._fragmente[index2] is not None and index1 != index2):
-          print("Fehler: Ungültige oder inaktive Indices für Verschmelzung.")
+    self._merkmale.entferne(index)
+    if self._vektor_index is not None:
+        with self._index_sperre:
+            self._vektor_index.entfernen(index)
+    # Ein- und ausgehende Kanten über die Slot-Listen des KantenSpeichers (O(Grad))
+    weg = self._resonanzen_struktur.entferne_knoten(index)
+    self._statistik.kanten_weg_viele(self._resonanzen_struktur.art_namen, weg['art'], weg['staerke'])
+    self._statistik.aktive_fragmente -= 1
+    self._struktur_version += 1
+    self._messung.zaehle('fragmente_geloescht')
+    return weg
+
+  @_schreibend
+  def kompaktiere_ids(self) -> dict:
+    """Gibt die Slots gelöschter Fragmente frei und nummeriert die aktiven Fragmente lückenlos neu.
+
+    Die Reihenfolge der Fragmente bleibt erhalten. Merkmale, Kanten und Text->Id-Tabelle
+    werden umgeschrieben; Wellenergebnisse früherer Abfragen verfallen, weil sie alte Ids enthalten.
+    Bei aktivem Journal wird anschließend ein Snapshot geschrieben, da ältere Einträge die alten Ids verwenden.
+    Gibt die Abbildung alte Id -> neue Id zurück. Automatisch läuft sie nach setze_kompaktierung.
+    """
+    self.verfeinere_alles()  # wartende Aufträge tragen alte Ids
+    aktiv = [i for i, fragment in enumerate(self._fragmente) if fragment is not None]
+    abbildung = {alt: neu for neu, alt in enumerate(aktiv)}
+    if len(aktiv) == len(self._fragmente):
+        return abbildung
+    logger.info("Kompaktiere Ids: %d gelöschte Slots werden freigegeben...", len(self._fragmente) - len(aktiv))
+    start = time.perf_counter()
+    neue_ids = np.full(len(self._fragmente), -1, dtype=np.int64)
+    neue_ids[aktiv] = np.arange(len(aktiv))
+    self._resonanzen_struktur.nummeriere_um(neue_ids)
+    self._fragmente = [self._fragmente[i] for i in aktiv]
+    self._merkmale = self._merkmale.auswahl(aktiv)
+    if self._vektor_index is not None:
+        self.setze_vektor_index(self._vektor_index, self._impuls_top_k)
+    self._text_ids = {}
+    for index, text in enumerate(self._fragmente):
+        self._text_ids.setdefault(text, []).append(index)
+    self._letzte_reaktion = None
+    self._struktur_version += 1
+    if self._journal is not None:
+        self.kompaktiere_journal()
+    logger.info("%d Fragmente neu nummeriert (%.1f ms).", len(self._fragmente), 1000 * (time.perf_counter() - start))
+    return abbildung
+
+  @_schreibend
+  def setze_kompaktierung(self, tombstone_anteil_max: float = None):
+      """Kompaktiert die Ids automatisch, sobald mehr als `tombstone_anteil_max` der Slots gelöscht sind (None: nie).
+
+      Geprüft wird nach loesche_fragment und nach Verschmelzungen; Ids, die der Aufrufer noch hält, gelten danach
+      nicht mehr (verschmelze_fragmente und verschmelze_viele geben die Ids schon in neuer Nummerierung zurück).
+      """
+      if tombstone_anteil_max is not None and not 0.0 <= tombstone_anteil_max < 1.0:
+          raise ValueError(f"tombstone_anteil_max muss in [0, 1) liegen, nicht {tombstone_anteil_max}.")
+      self._tombstone_anteil_max = tombstone_anteil_max
+      self._kompaktiere_bei_bedarf()
+
+  def _verschmelzbar(self, index1: int, index2: int) -> bool:
+    return self._ist_aktiv(index1) and self._ist_aktiv(index2) and index1 != index2
+
+  @_schreibend
+  def verschmelze_fragmente(self, index1: int, index2: int, modus: str = 'neu_parsen', nachbarn: int = VERSCHMELZ_NACHBARN):
+      """Verschmilzt zwei Fragmente zu einem neuen und löscht die alten; gibt die Id des neuen Fragments zurück (None bei ungültigen Ids).
+
+      modus='neu_parsen' (Standard) löscht beide Fragmente und fügt den verschmolzenen Text wie mit fuege_ein ein.
+
+      modus='merkmale' parst den verschmolzenen Text nicht, sondern leitet seine Merkmale aus denen der beiden
+      Fragmente ab (siehe _merkmale_verschmolzen). Das neue Fragment erbt je Nachbar und Richtung die stärkere der
+      Kanten beider Fragmente; neu gespürt werden nur die dyadischen Resonanzen zu diesen Nachbarn und der
+      triadische Durchlauf über die Paare der `nachbarn` am stärksten verbundenen unter ihnen. Fragmente ohne Kante
+      zu einem der beiden bleiben unberührt. Das ist schneller, kann aber bei Fragmenten ohne Kante zu den beiden
+      Resonanzen auslassen, die ein neues Parsen gespürt hätte; Konsolidierungsläufe wählen es ausdrücklich
+      (verschmelze_viele verschmilzt immer so).
+
+      In beiden Modi werden die Ids erst danach (höchstens einmal) kompaktiert, siehe _kompaktiere_bei_bedarf.
+      """
+      if modus not in ('merkmale', 'neu_parsen'):
+          raise ValueError(f"Unbekannter Modus '{modus}' (erlaubt: 'merkmale', 'neu_parsen').")
+      if not self._verschmelzbar(index1, index2):
+          logger.warning("Ungültige oder inaktive Indices für Verschmelzung: %d, %d.", index1, index2)
+          return None
+
+      logger.info("Verschmelze Fragmente %d und %d...", index1, index2)
+      self._messung.zaehle('verschmelzungen')
+      if modus == 'neu_parsen':
+          neues_fragment_text = f"{self._fragmente[index1].strip()}. {self._fragmente[index2].strip()}"
+          # Nicht über loesche_fragment: das könnte zwischen den beiden Löschungen kompaktieren und index2 umnummerieren
+          for index in (index1, index2):
+              with self._messung.phase('loeschen'):
+                  self._loesche_intern(index)
+              self._protokolliere({'op': 'loesche', 'id': index})
+          return self._kompaktiere_bei_bedarf([self.fuege_ein(neues_fragment_text)])[0]
+
+      if self._journal is not None:
+          self._kanten_deltas = []
+      with self._messung.phase('verschmelzen'):
+          verschmelzung = self._verschmelze_intern(index1, index2, nachbarn)
+      self._struktur_version += 1
+      if self._journal is not None:
+          eintrag = {'op': 'verschmelze', **verschmelzung, 'kanten': self._kanten_deltas}
+          self._kanten_deltas = None
+          self._protokolliere(eintrag)
+      return self._kompaktiere_bei_bedarf([verschmelzung['id']])[0]
+
+  @_schreibend
+  def verschmelze_viele(self, paare: list[tuple], nachbarn: int = VERSCHMELZ_NACHBARN) -> list:
+      """Verschmilzt viele Paare (index1, index2) in einem Durchgang, wie verschmelze_fragmente(..., modus='merkmale') je Paar in dieser Reihenfolge.
+
+      Alle Verschmelzungen gehen als ein Journal-Eintrag 'verschmelze_viele' ins Journal, die Struktur-Version steigt
+      einmal, und die Ids werden höchstens einmal am Ende kompaktiert. Ein Paar mit ungültiger oder im selben Aufruf
+      schon verschmolzener Id wird mit einer Warnung übersprungen. Gibt je Paar die Id des neuen Fragments bzw. None zurück.
+      """
+      paare = [(int(index1), int(index2)) for index1, index2 in paare]
+      if not paare:
+          return []
+      logger.info("Verschmelze %d Paare...", len(paare))
+      neue_ids, verschmelzungen = [], []
+      with self._messung.phase('verschmelzen'):
+          for index1, index2 in paare:
+              if not self._verschmelzbar(index1, index2):
+                  logger.warning("Ungültige oder inaktive Indices für Verschmelzung: %d, %d.", index1, index2)
+                  neue_ids.append(None)
+                  continue
+              if self._journal is not None:
+                  self._kanten_deltas = []
+              verschmelzung = self._verschmelze_intern(index1, index2, nachbarn)
+              if self._journal is not None:
+                  verschmelzungen.append({**verschmelzung, 'kanten': self._kanten_deltas})
+                  self._kanten_deltas = None
+              neue_ids.append(verschmelzung['id'])
+      self._messung.zaehle('verschmelzungen', len(neue_ids) - neue_ids.count(None))
+      self._struktur_version += 1
+      if verschmelzungen:
+          self._protokolliere({'op': 'verschmelze_viele', 'verschmelzungen': verschmelzungen})
+      logger.info("%d Paare verschmolzen.", len(neue_ids) - neue_ids.count(None))
+      return self._kompaktiere_bei_bedarf(neue_ids)
+
+  def _verschmelze_intern(self, index1: int, index2: int, nachbarn: int) -> dict:
+    """Eine Verschmelzung mit abgeleiteten Merkmalen; gibt den Journal-Eintrag ohne Kanten zurück."""
+    text = f"{self._fragmente[index1].strip()}. {self._fragmente[index2].strip()}"
+    merkmale = self._merkmale_verschmolzen(index1, index2, text)
+    weg = [self._loesche_intern(index1), self._loesche_intern(index2)]
+    neuer_index = self._registriere_fragment(text, merkmale, cachen=False)
+    umgebung = self._erbe_kanten(neuer_index, (index1, index2), weg)
+    self._spuere_dyadisch(neuer_index, umgebung.tolist())
+    nachbarschaft = self._staerkste_nachbarn(neuer_index, umgebung, nachbarn)
+    aufgeschoben = self._aktualisiere_triaden(neuer_index, nachbarschaft, alle_paare=False)
+
+    verschmelzung = {'quellen': [index1, index2], 'id': neuer_index, 'text': text}
+    if self._journal is not None:
+        verschmelzung['merkmale'] = merkmale_als_dict(self._merkmale[neuer_index])
+        if aufgeschoben:
+            verschmelzung.update(triaden='aufgeschoben', nachbarschaft=nachbarschaft)
+    return verschmelzung
+
+  def _merkmale_verschmolzen(self, index1: int, index2: int, text: str) -> FragmentMerkmale:
+    """Merkmale des verschmolzenen Textes aus den gespeicherten Merkmalen beider Fragmente, ohne zu parsen.
+
+    Der Vektor ist das nach Tokenanzahl gewichtete Mittel der beiden Vektoren (Doc.vector mittelt über die Tokens),
+    Konzepte und Kern-Lemmata sind die Vereinigung, der Sentiment-Score die Summe der Lexikon-Scores. Es läuft nur
+    der Tokenizer, für die Gewichte und den Token-Schlüssel des neuen Textes.
+    """
+    tokenizer = self.nlp.tokenizer
+    teile = [(self._merkmale[i], max(1, len(tokenizer(self._fragmente[i].strip())))) for i in (index1, index2)]
+    mit_vektor = [(merkmale, gewicht) for merkmale, gewicht in teile if merkmale.hat_vektor]
+    if mit_vektor:
+        summe = sum(gewicht * merkmale.vektor.astype(np.float64) for merkmale, gewicht in mit_vektor)
+        vektor = (summe / sum(gewicht for _, gewicht in mit_vektor)).astype(np.float32)
+        norm = float(np.sqrt(np.dot(vektor.astype(np.float64), vektor.astype(np.float64))))
+    else:
+        vektor, norm = np.zeros(0, dtype=np.float32), 0.0
+    (erste, _), (zweite, _) = teile
+    kern_lemmata = None
+    if erste.kern_lemmata is not None and zweite.kern_lemmata is not None:
+        kern_lemmata = tuple(dict.fromkeys(erste.kern_lemmata + zweite.kern_lemmata))
+    return FragmentMerkmale(vektor, norm, erste.konzepte | zweite.konzepte, erste.sentiment + zweite.sentiment,
+                            bool(mit_vektor), token_schluessel(tokenizer(text)), kern_lemmata)
+
+  def _erbe_kanten(self, neuer_index: int, quellen: tuple, weg: list[dict]):
+    """Setzt die Kanten des verschmolzenen Fragments aus den entfernten Kanten `weg` seiner beiden Quellen.
+
+    Je Nachbar und Richtung gewinnt die stärkere Kante (bei Gleichstand die der ersten Quelle) mit Art, Stärke,
+    Herkunft und Ereignis; Kanten zwischen den Quellen entfallen. Gibt die Nachbarn aufsteigend zurück.
+    """
+    spalte = lambda name: np.concatenate([w[name] for w in weg])
+    quelle, ziel = spalte('quelle'), spalte('ziel')
+    rang = np.concatenate([np.full(len(w['quelle']), k) for k, w in enumerate(weg)])
+    ausgehend = np.isin(quelle, quellen)
+    partner = np.where(ausgehend, ziel, quelle).astype(np.int64)
+    behalten = np.flatnonzero(~np.isin(partner, quellen))
+    schluessel = 2 * partner[behalten] + ausgehend[behalten]
+    ordnung = np.lexsort((rang[behalten], -spalte('staerke')[behalten], schluessel))
+    _, erste = np.unique(schluessel[ordnung], return_index=True)
+    sieger = behalten[ordnung[erste]]
+
+    partner, ausgehend = partner[sieger], ausgehend[sieger]
+    neu = np.full(len(sieger), neuer_index, dtype=np.int64)
+    self._setze_kanten_spalten(np.where(ausgehend, neu, partner), np.where(ausgehend, partner, neu), spalte('art')[sieger],
+                               spalte('staerke')[sieger], spalte('kontext')[sieger], spalte('ereignis')[sieger])
+    return np.unique(partner)
+
+  def _staerkste_nachbarn(self, neuer_index: int, umgebung, k: int) -> list[int]:
+    """Die k Nachbarn mit der stärksten Kante zum Fragment (in einer der beiden Richtungen), aufsteigend nach Id."""
+    if len(umgebung) <= k:
+        return umgebung.tolist()
+    kanten = self._resonanzen_struktur
+    neu = np.full(len(umgebung), neuer_index)
+    staerke = np.maximum(kanten.staerken(neu, umgebung), kanten.staerken(umgebung, neu))
+    return np.sort(umgebung[np.lexsort((umgebung, -staerke))[:k]]).tolist()
+
+  @_schreibend
+  def setze_vektor_index(self, index: VektorIndex = None, top_k: int = None):
+      """Setzt (bzw. mit None entfernt) den Vektor-Index und füllt ihn mit allen aktiven Fragmenten.
+
+      Der Index liefert die Nachbarn für die Top-k-Auswahl im triadischen Durchlauf (setze_triaden_top_k). Mit
+      `top_k` bewertet ein Impuls nur noch die top_k nächsten Nachbarn aus dem Index plus alle Fragmente mit einem
+      gemeinsamen Konzept statt aller Fragmente (siehe _impuls_kandidaten); None bewertet weiter alle. Danach wird
+      der Index von fuege_ein und loesche_fragment inkrementell gepflegt.
+      """
+      if top_k is not None and top_k < 1:
+          raise ValueError(f"top_k muss mindestens 1 sein oder None, nicht {top_k}.")
+      with self._index_sperre:
+          self._vektor_index = index
+          self._impuls_top_k = top_k if index is not None else None
+          if index is None:
+              return
+          index.leeren()
+          ids = np.flatnonzero(self._merkmale.hat_vektor[:len(self._merkmale)])
+          index.hinzufuegen_viele(ids, self._merkmale.vektoren[ids])
+
+  @_schreibend
+  def setze_vektor_cache(self, verzeichnis: str = None):
+      """Schreibt die Vektoren aller Fragmente in den Vektor-Cache unter `verzeichnis` (None schaltet das ab).
+
+      Der Cache ist derselbe, den model_trainer.py beim Einbetten der Trainingsfragmente nutzt (Standard:
+      VEKTOR_CACHE_DIR); Fragmente, die das Gewebe schon gesehen hat, muss das Training nicht mehr einbetten.
+      Das Gewebe schreibt nur hinein: seine Vektoren entstehen ohnehin beim Parsen. Neue Fragmente gehen gebündelt
+      in den Cache, am Ende von fuege_ein_viele bzw. je VEKTOR_CACHE_PUFFER einzelne fuege_ein; der Rest beim
+      Abschalten des Caches. Fehlt nach einem Absturz ein Vektor, bettet das Training den Text selbst ein.
+      """
+      self._schreibe_vektor_cache()
+      if verzeichnis is None:
+          self._vektor_cache = None
+          return
+      dim = self.nlp.vocab.vectors.shape[1] if self.nlp.vocab.vectors.size else 0
+      if not dim:
+          logger.warning("Das spaCy-Modell hat keine Wortvektoren; der Vektor-Cache bleibt aus.")
           return
-      
-      print(f"\nVerschmelze Fragmente {index1} und {index2}...")
-      neues_fragment_text = f"{self._fragmente[index1].strip()}. {self._fragmente[index2].strip()}"
-      self.loesche_fragment(index1)
-      self.loesche_fragment(index2)
-      self.fuege_ein(neues_fragment_text)
+      self._vektor_cache = VektorCache(verzeichnis, modell_kennung(self.nlp), dim)
+      aktive = [i for i, text in enumerate(self._fragmente) if text is not None and self._merkmale.hat_vektor[i]]
+      if aktive:
+          self._vektor_cache.fuege_hinzu_viele([self._fragmente[i] for i in aktive], self._merkmale.vektoren[aktive])
+
+  @_schreibend
+  def setze_triaden_top_k(self, k: int = None):
+      """Beschränkt den ML-Teil des triadischen Durchlaufs auf Paare mit einem Ende unter den k ähnlichsten Fragmenten.
+
+      Statt n·(n-1) Paaren bewertet ein Einfügen dann etwa 2·k·n; ML-Paare außerhalb dieser Nachbarschaft behalten
+      ihre Kante, die heuristischen Regeln bleiben exakt. Die Nachbarn kommen aus dem Vektor-Index, falls gesetzt.
+      None (Standard) bewertet alle Paare und liefert dieselben Kanten wie der Pfad pro Paar.
+      """
+      if k is not None and k < 1:
+          raise ValueError(f"k muss mindestens 1 sein oder None, nicht {k}.")
+      self._triaden_top_k = k
+
+  @_schreibend
+  def setze_triaden_pool(self, arbeiter: int = None, min_fragmente: int = 256):
+      """Verteilt die ML-Bewertung des gebündelten triadischen Durchlaufs auf `arbeiter` Prozesse (None: alle Kerne).
+
+      Genutzt wird der Pool erst ab `min_fragmente` aktiven Fragmenten; darunter überwiegt der Aufwand für
+      das Verteilen. arbeiter=0 beendet den Pool. Die heuristischen Regeln laufen weiterhin im Hauptprozess.
+      """
+      if self._triaden_pool is not None:
+          self._triaden_pool.schliessen()
+          self._triaden_pool = None
+      if arbeiter == 0:
+          return
+      self._triaden_pool = TriadenPool(arbeiter, min_fragmente=min_fragmente)
+
+  def fragment_ids(self, text: str) -> list[int]:
+      """Gibt die Ids aller aktiven Fragmente mit genau diesem Text zurück."""
+      return list(self._text_ids.get(text, []))
+
+  # --- Persistenz ---
+
+  def _protokolliere(self, eintrag: dict):
+      """Schreibt eine abgeschlossene Mutation ins Journal und kompaktiert, wenn es fällig ist."""
+      if self._journal is None:
+          return
+      with self._messung.phase('journal'):
+          self._journal.schreibe(eintrag)
+      if self._journal.kompaktieren_faellig():
+          self.kompaktiere_journal()
+
+  @_schreibend
+  def oeffne_journal(self, verzeichnis: str, sync_alle: int = 64, sync_intervall: float = 1.0, kompaktieren_ab: int = None):
+      """Aktiviert das Journal in `verzeichnis`.
+
+      Liegt dort bereits ein Zustand (Snapshot und/oder Journal), wird er in dieses noch leere Gewebe
+      wiederhergestellt: Snapshot laden, dann die Kanten-Deltas des Journals direkt anwenden. Andernfalls wird
+      der aktuelle Zustand als Ausgangs-Snapshot geschrieben. Danach wird jede Mutation angehängt.
+      """
+      journal = GewebeJournal(verzeichnis, sync_alle=sync_alle, sync_intervall=sync_intervall, kompaktieren_ab=kompaktieren_ab)
+      if journal.hat_zustand():
+          if self._fragmente:
+              raise ValueError(f"'{verzeichnis}' enthält bereits ein Gewebe; es kann nur in ein leeres Gewebe geladen werden.")
+          angewendet = journal.stelle_wieder_her(self, ResonanzVerbindung)
+          logger.info("Gewebe aus Journal '%s' wiederhergestellt: %d Fragmente, %d Journal-Einträge angewendet.",
+                      verzeichnis, len(self._fragmente), angewendet)
+          journal.oeffnen()
+      else:
+          self.verfeinere_alles()
+          journal.oeffnen()
+          journal.kompaktiere(self)
+      self._journal = journal
+      # Beim Absturz unfertige Aufträge wurden wieder eingereiht; ohne Verfeinerer werden sie jetzt abgearbeitet
+      if self._verfeinerer is not None:
+          self._verfeinerer.anstossen()
+      else:
+          self.verfeinere_alles()
+
+  @_schreibend
+  def kompaktiere_journal(self):
+      """Faltet das Journal in einen neuen Snapshot, damit die Wiederherstellung nicht mit der Laufzeit wächst."""
+      if self._journal is None:
+          return
+      self.verfeinere_alles()  # der Snapshot enthält keine wartenden Aufträge
+      with self._messung.phase('journal_kompaktieren'):
+          self._journal.kompaktiere(self)
+      logger.info("Journal kompaktiert (%d Fragmente im Snapshot).", len(self._fragmente))
+
+  @_schreibend
+  def schliesse_journal(self):
+      """Synchronisiert ausstehende Einträge und beendet das Journal."""
+      if self._journal is not None:
+          self._journal.schliessen()
+          self._journal = None
+
+  def schliesse(self):
+      """Gibt alles frei, was im Hintergrund läuft: Abfrage-Threads, Verfeinerer, Triaden-Pool und Journal.
+
+      Wartende triadische Aufträge werden vorher abgearbeitet, gepufferte Vektoren in den Vektor-Cache geschrieben.
+      Danach bleibt das Gewebe benutzbar (ohne Verfeinerung, Pool und Journal); ein späteres reagiere_viele legt
+      seinen Thread-Pool neu an.
+      """
+      verfeinerer = self._verfeinerer
+      self.setze_verfeinerung(aktiv=False)
+      if verfeinerer is not None:
+          verfeinerer.warte()
+      self.setze_triaden_pool(0)
+      self.schliesse_journal()
+      self._schreibe_vektor_cache()
+      with self._abfrage_sperre:
+          abfrage_pool, self._abfrage_pool = self._abfrage_pool, None
+      if abfrage_pool is not None:
+          abfrage_pool[1].shutdown(wait=True)
+
+  @_schreibend
+  def save(self, pfad: str):
+      """Speichert Fragmente, Merkmale und Resonanzen als Snapshot-Verzeichnis (siehe gewebe_snapshot.py)."""
+      self.verfeinere_alles()
+      speichere_snapshot(self, pfad)
+      logger.info("Gewebe mit %d Fragmenten nach '%s' gespeichert.", len(self._fragmente), pfad)
+
+  @classmethod
+  def load(cls, pfad: str, mmap: bool = True, **kwargs) -> 'NeuesTextVerstehen':
+      """Lädt ein mit save() gespeichertes Gewebe, ohne Fragmente neu zu parsen oder Resonanzen neu zu spüren."""
+      gewebe = cls(**kwargs)
+      lade_snapshot(gewebe, pfad, mmap=mmap)
+      logger.info("Gewebe mit %d Fragmenten aus '%s' geladen.", len(gewebe._fragmente), pfad)
+      return gewebe
 
   # --- Analyse und Reaktion ---
 
-  def spuere_reaktion_des_gewebes(self, impuls: str) -> dict:
+  def ansicht(self, warten: bool = True, konsistenz: str = 'vorlaeufig') -> GewebeAnsicht:
+      """Die veröffentlichte Ansicht des aktuellen Stands; ist sie veraltet, wird unter der Schreibsperre eine neue gebaut.
+
+      Mit warten=False gibt es, solange ein Schreiber die Sperre hält, die zuletzt veröffentlichte (ältere,
+      aber in sich konsistente) Ansicht, statt auf das Ende der Mutation zu warten.
+      Warten triadische Aufträge (siehe setze_verfeinerung), liefert konsistenz='vorlaeufig' das Gewebe im
+      Zustand der Verfeinerung (GewebeAnsicht.vorlaeufig); 'vollstaendig' arbeitet vorher alle Aufträge ab.
+      """
+      if konsistenz not in KONSISTENZ_STUFEN:
+          raise ValueError(f"Unbekannte Konsistenz '{konsistenz}'. Erlaubt: {', '.join(KONSISTENZ_STUFEN)}.")
+      if konsistenz == 'vollstaendig' and self._triaden_auftraege:
+          self.verfeinere_alles()
+      ansicht = self._ansicht
+      if ansicht is not None and ansicht.version == self._struktur_version:
+          return ansicht
+      if not self._schreib_sperre.acquire(blocking=warten or ansicht is None):
+          return ansicht
+      try:
+          if self._ansicht is None or self._ansicht.version != self._struktur_version:
+              self._veroeffentliche_ansicht()
+          return self._ansicht
+      finally:
+          self._schreib_sperre.release()
+
+  def _veroeffentliche_ansicht(self):
+      """Baut die Ansicht des aktuellen Stands (unter der Schreibsperre) und ersetzt die veröffentlichte atomar."""
+      with self._messung.phase('ansicht'):
+          self._ansicht = GewebeAnsicht(self._struktur_version, tuple(self._fragmente), self._merkmale.ansicht(),
+                                        self._aktuelle_adjazenz(), self._kennzahlen(self._statistik),
+                                        ausstehende_auftraege=len(self._triaden_auftraege))
+      self._messung.zaehle('ansichten_veroeffentlicht')
+      self._ansicht_zeit = time.monotonic()
+
+  def reagiere(self, impuls: str, ansicht: GewebeAnsicht = None, konsistenz: str = 'vorlaeufig') -> ImpulsReaktion:
+      """Breitet einen Impuls auf einer Ansicht (Standard: der aktuellen, siehe ansicht für `konsistenz`) aus und gibt das Ergebnis zurück.
+
+      Verändert das Gewebe nicht und kann daher aus beliebig vielen Threads gleichzeitig aufgerufen werden.
+      """
+      return self._propagiere_impuls(impuls, ansicht if ansicht is not None else self.ansicht(konsistenz=konsistenz))
+
+  def reagiere_viele(self, impulse: list[str], arbeiter: int = 4, warten: bool = True, konsistenz: str = 'vorlaeufig') -> list[ImpulsReaktion]:
+      """Beantwortet viele Impulse auf derselben Ansicht; je Impuls dieselbe ImpulsReaktion wie reagiere.
+
+      Noch nicht gecachte Impulse werden vorher gemeinsam über nlp.pipe geparst. Mit der Engine 'sparse' werden
+      alle Impulse zusammen bewertet und ausgebreitet (siehe _propagiere_impulse, `arbeiter` wird nicht gebraucht),
+      sonst parallel in einem Thread-Pool.
+      """
+      alle_merkmale = self._impuls_merkmale_viele(impulse)
+      ansicht = self.ansicht(warten, konsistenz)
+      if self._wellen_engine == 'sparse' and impulse:
+          return self._propagiere_impulse(impulse, alle_merkmale, ansicht)
+      if arbeiter <= 1 or len(impulse) <= 1:
+          return [self._propagiere_impuls(impuls, ansicht) for impuls in impulse]
+      with self._abfrage_sperre:
+          if self._abfrage_pool is None or self._abfrage_pool[0] != arbeiter:
+              if self._abfrage_pool is not None:
+                  self._abfrage_pool[1].shutdown(wait=False)
+              self._abfrage_pool = (arbeiter, ThreadPoolExecutor(arbeiter, thread_name_prefix='gewebe-abfrage'))
+          pool = self._abfrage_pool[1]
+      return list(pool.map(lambda impuls: self._propagiere_impuls(impuls, ansicht), impulse))
+
+  def spuere_reaktion_des_gewebes(self, impuls: str, konsistenz: str = 'vorlaeufig') -> dict:
       """Simuliert die Reaktion des Gewebes auf einen externen Impuls, inkl. Wellen."""
+      reaktion = self.reagiere(impuls, konsistenz=konsistenz)
+      self._letzte_reaktion = reaktion
+      return {
+          'impuls': impuls,
+          'report': reaktion.bericht()
+      }
+
+  def _propagiere_impuls(self, impuls: str, ansicht: GewebeAnsicht) -> ImpulsReaktion:
+      """Spürt die Anfangsresonanzen eines Impulses und breitet sie auf der Ansicht als Wellen aus."""
+      self._messung.zaehle('impulse')
+      with self._messung.phase('impuls_bewertung'):
+          # Der Impuls wird genau einmal geparst (bzw. aus dem Cache gelesen) und gegen alle Fragmente zugleich bewertet
+          merkmale = self._impuls_merkmale(impuls)
+          start_knoten, start_muster, start_staerke = self._startwellen(merkmale, self._impuls_kandidaten(merkmale, ansicht), ansicht.merkmale)
+      adjazenz = ansicht.adjazenz
+      self._messung.zaehle('startwellen', len(start_knoten))
+
+      if self._wellen_engine == 'sparse':
+          with self._messung.phase('wellen'):
+              art_codes = {art: code for code, art in enumerate(adjazenz.art_namen)}
+              start_arten = [art_codes[self._dyadische_muster['namen'][m]] for m in start_muster]
+              wellen = propagiere_wellen(adjazenz, start_knoten, start_arten, start_staerke)
+          self._messung.zaehle('wellen', sum(len(stufe.knoten) for stufe in wellen.stufen))
+          return ImpulsReaktion(impuls, ansicht, wellen_ergebnis=wellen, wellen_klasse=ResonanzWelle)
+
       initial_waves = []
-      for i, fragment_text in enumerate(self._fragmente):
-          if fragment_text is None: continue
-          res = self._spuere_art_und_staerke_der_resonanz(impuls, fragment_text, self._resonanzen_struktur, -1, i)
-          if res and res.staerke > 0.1:
-              initial_waves.append(ResonanzWelle(-1, res.art, res.staerke, [-1, i]))
+      for knoten, muster, staerke in zip(start_knoten.tolist(), start_muster.tolist(), start_staerke.tolist()):
+          initial_waves.append(ResonanzWelle(-1, self._dyadische_muster['namen'][muster], staerke, [-1, knoten]))
 
-      self._wave_arrival_effects = {}
+      # Welle für Welle über die Zeilen der CSR-Adjazenz (Kanten in derselben Reihenfolge wie in _resonanzen_struktur)
+      ankuenfte = {}
       waves_to_propagate = initial_waves[:]
-      
+
       for step in range(3): # Max 3 Hops
           if not waves_to_propagate: break
           next_waves = []
           for wave in waves_to_propagate:
               current_node_idx = wave.pfad[-1]
-              if current_node_idx not in self._wave_arrival_effects: self._wave_arrival_effects[current_node_idx] = []
-              self._wave_arrival_effects[current_node_idx].append(wave)
+              if current_node_idx not in ankuenfte: ankuenfte[current_node_idx] = []
+              ankuenfte[current_node_idx].append(wave)
 
-              outgoing = self._resonanzen_struktur.get(current_node_idx, {})
-              for target_idx, conn in outgoing.items():
-                  if self._fragmente[target_idx] is None: continue
+              von, bis = adjazenz.indptr[current_node_idx], adjazenz.indptr[current_node_idx + 1]
+              for target_idx, staerke, art in zip(adjazenz.ziele[von:bis].tolist(), adjazenz.staerke[von:bis].tolist(),
+                                                  adjazenz.arten[von:bis].tolist()):
                   if len(wave.pfad) > 1 and target_idx == wave.pfad[-2]: continue # No immediate bounce-back
 
-                  new_staerke = wave.staerke * conn.staerke * 0.7 # Damping
+                  new_staerke = wave.staerke * staerke * 0.7 # Damping
                   if new_staerke > 0.05:
-                      new_wave = ResonanzWelle(wave.ursprung, conn.art, new_staerke, wave.pfad + [target_idx])
+                      new_wave = ResonanzWelle(wave.ursprung, adjazenz.art_namen[art], new_staerke, wave.pfad + [target_idx])
                       next_waves.append(new_wave)
           waves_to_propagate = next_waves
+      self._messung.zaehle('wellen', sum(len(wellen) for wellen in ankuenfte.values()))
+      return ImpulsReaktion(impuls, ansicht, ankuenfte=ankuenfte)
 
-      zustand_daten = self._analysiere_gewebe_zustand(self._resonanzen_struktur, self._wave_arrival_effects, return_data=True)
-      return {
-          'impuls': impuls,
-          'report': self._analysiere_gewebe_zustand(self._resonanzen_struktur, self._wave_arrival_effects)
-      }
+  def _propagiere_impulse(self, impulse: list[str], alle_merkmale: list[FragmentMerkmale], ansicht: GewebeAnsicht) -> list[ImpulsReaktion]:
+      """Gebündelte Variante von _propagiere_impuls (Engine 'sparse'): alle Impulse in einer Bewertung und einer Ausbreitung.
+
+      Ohne approximative Kandidatenauswahl werden alle Impulse gegen dieselben Fragmente bewertet, als Matrixprodukt
+      (_startwellen_viele); mit ihr hat jeder Impuls eigene Kandidaten und wird einzeln bewertet. Die Wellen laufen
+      für alle Impulse gemeinsam (propagiere_wellen_viele). Die Aufwände wachsen so mit der Zahl der Blöcke und
+      Hops statt mit der Zahl der Impulse.
+      """
+      self._messung.zaehle('impulse', len(impulse))
+      with self._messung.phase('impuls_bewertung'):
+          if self._impuls_top_k is None or self._vektor_index is None:
+              starts = self._startwellen_viele(alle_merkmale, ansicht.aktive_ids(), ansicht.merkmale)
+          else:
+              starts = [self._startwellen(merkmale, self._impuls_kandidaten(merkmale, ansicht), ansicht.merkmale)
+                        for merkmale in alle_merkmale]
+      adjazenz = ansicht.adjazenz
+      self._messung.zaehle('startwellen', sum(len(start[0]) for start in starts))
+
+      with self._messung.phase('wellen'):
+          art_codes = {art: code for code, art in enumerate(adjazenz.art_namen)}
+          start_arten = [[art_codes[self._dyadische_muster['namen'][m]] for m in start[1]] for start in starts]
+          alle_wellen = propagiere_wellen_viele(adjazenz, [start[0] for start in starts], start_arten, [start[2] for start in starts])
+      self._messung.zaehle('wellen', sum(len(stufe.knoten) for wellen in alle_wellen for stufe in wellen.stufen))
+      return [ImpulsReaktion(impuls, ansicht, wellen_ergebnis=wellen, wellen_klasse=ResonanzWelle)
+              for impuls, wellen in zip(impulse, alle_wellen)]
+
+  def _impuls_kandidaten(self, merkmale: FragmentMerkmale, ansicht: GewebeAnsicht) -> list[int]:
+      """Fragmente, gegen die ein Impuls bewertet wird: alle aktiven oder (approximativ) Vektor-Nachbarn plus Konzeptträger.
 
-  def finde_fragmente_mit_resonanz(self, impuls: str, gewuenschte_arten: list[str], mindest_staerke: float = 0.2) -> list[str]:
+      Die approximative Auswahl findet alle Startwellen, deren Muster auf Ähnlichkeit oder gemeinsamen Konzepten
+      beruht, sofern der Index die Nachbarn findet. Rein über das Sentiment getragene Startwellen (z.B.
+      EMOTIONALE_HARMONIE) bei unähnlichen Fragmenten ohne gemeinsames Konzept können fehlen.
+      """
+      if self._impuls_top_k is None or self._vektor_index is None:
+          return ansicht.aktive_ids()
+      konzept_index = ansicht.merkmale.konzept_index
+      teile = [konzept_index[k] for k in merkmale.konzepte if k in konzept_index]
+      if merkmale.hat_vektor:
+          # Der Index gehört zum laufenden Gewebe; seine Treffer werden auf die Ansicht beschränkt
+          with self._index_sperre:
+              teile.append(self._vektor_index.suche(merkmale.vektor, self._impuls_top_k)[0])
+      if not teile:
+          return []
+      return np.unique(ansicht.nur_aktive(np.concatenate(teile).astype(np.intp))).tolist()
+
+  def finde_fragmente_mit_resonanz(self, impuls: str, gewuenschte_arten: list[str], mindest_staerke: float = 0.2,
+                                   konsistenz: str = 'vorlaeufig') -> list[str]:
       """Findet Fragmente, die auf einen Impuls mit bestimmten Resonanz-Arten reagieren."""
-      self.spuere_reaktion_des_gewebes(impuls)
-      gefundene_indices = set()
-      for fragment_index, waves in self._wave_arrival_effects.items():
-          for wave in waves:
-              if wave.art in gewuenschte_arten and wave.staerke >= mindest_staerke:
-                  gefundene_indices.add(fragment_index)
-      
-      return [self._fragmente[i] for i in sorted(list(gefundene_indices))]
-
-  def antworte_aus_resonanz(self, impuls: str, ziel_art: str = "VERSTAERKUNG") -> str:
-      """Generiert ein neues Fragment, das aus den Resonanzen eines Impulses entsteht."""
-      reaktion = self.spuere_reaktion_des_gewebes(impuls)
-      relevante_indices = set()
-      for fragment_index, waves in self._wave_arrival_effects.items():
-          for wave in waves:
-              if wave.art == ziel_art and wave.staerke >= 0.3:
-                  relevante_indices.add(fragment_index)
-      
+      reaktion = self.reagiere(impuls, konsistenz=konsistenz)
+      self._letzte_reaktion = reaktion
+      return reaktion.fragmente_mit_resonanz(gewuenschte_arten, mindest_staerke)
+
+  def finde_fragmente_mit_resonanz_viele(self, impulse: list[str], gewuenschte_arten: list[str], mindest_staerke: float = 0.2,
+                                         konsistenz: str = 'vorlaeufig') -> list[list[str]]:
+      """finde_fragmente_mit_resonanz für viele Impulse in einem Durchlauf (siehe reagiere_viele); eine Trefferliste je Impuls."""
+      reaktionen = self.reagiere_viele(impulse, konsistenz=konsistenz)
+      if reaktionen:
+          self._letzte_reaktion = reaktionen[-1]
+      return [reaktion.fragmente_mit_resonanz(gewuenschte_arten, mindest_staerke) for reaktion in reaktionen]
+
+  def staerkste_pfade(self, fragment_index: int, k: int = 3) -> list[tuple]:
+      """Die k stärksten Wellen der letzten Abfrage an einem Fragment als (art, staerke, pfad)."""
+      if self._letzte_reaktion is None:
+          return []
+      return self._letzte_reaktion.staerkste_pfade(fragment_index, k)
+
+  def antworte_aus_resonanz(self, impuls: str, ziel_art: str = "VERSTAERKUNG", einfuegen: bool = True,
+                            konsistenz: str = 'vorlaeufig') -> str:
+      """Generiert ein neues Fragment, das aus den Resonanzen eines Impulses entsteht.
+
+      Mit einfuegen=False bleibt es eine reine Abfrage; sonst wird das Fragment über fuege_ein (Schreibsperre) eingefügt.
+      """
+      reaktion = self.reagiere(impuls, konsistenz=konsistenz)
+      self._letzte_reaktion = reaktion
+      synthetisches_fragment = self._formuliere_antwort(reaktion, ziel_art)
+      if einfuegen and synthetisches_fragment != KEINE_ANTWORT:
+          self.fuege_ein(synthetisches_fragment)
+      return synthetisches_fragment
+
+  def antworte_aus_resonanz_viele(self, impulse: list[str], ziel_art: str = "VERSTAERKUNG", einfuegen: bool = True,
+                                  konsistenz: str = 'vorlaeufig') -> list[str]:
+      """antworte_aus_resonanz für viele Impulse in einem Durchlauf (siehe reagiere_viele); eine Antwort je Impuls.
+
+      Alle Impulse werden auf derselben Ansicht beantwortet, die Antworten erst danach gemeinsam über fuege_ein_viele
+      eingefügt. Anders als bei einzelnen Aufrufen nacheinander sieht ein Impuls also die Antworten der vorherigen nicht.
+      """
+      reaktionen = self.reagiere_viele(impulse, konsistenz=konsistenz)
+      if reaktionen:
+          self._letzte_reaktion = reaktionen[-1]
+      antworten = [self._formuliere_antwort(reaktion, ziel_art) for reaktion in reaktionen]
+      if einfuegen:
+          neue = [antwort for antwort in antworten if antwort != KEINE_ANTWORT]
+          if neue:
+              self.fuege_ein_viele(neue)
+      return antworten
+
+  def _formuliere_antwort(self, reaktion: ImpulsReaktion, ziel_art: str) -> str:
+      """Das synthetische Fragment zu einer Reaktion: die ersten Kern-Lemmata der Fragmente, an denen ziel_art ankam.
+
+      Die Kern-Lemmata (Nomen und Verben ohne Stoppwörter) kommen aus den gespeicherten Merkmalen der Fragmente;
+      nur Fragmente aus älteren Snapshots ohne sie werden neu geparst.
+      """
+      relevante_indices = set(reaktion.treffer([ziel_art], 0.3))
       if not relevante_indices:
-          return "Aus dieser Resonanz entsteht noch keine klare Formulierung."
-      
-      combined_text = " ".join([self._fragmente[idx] for idx in relevante_indices])
-      combined_doc = self.nlp(combined_text)
-      concepts = {t.lemma_ for t in combined_doc if t.pos_ in ['NOUN', 'VERB'] and not t.is_stop}
+          return KEINE_ANTWORT
+
+      concepts = set()
+      for idx in relevante_indices:
+          lemmata = reaktion.ansicht.merkmale.kern_lemmata[idx]
+          if lemmata is None:
+              lemmata = [t.lemma_ for t in self.nlp(reaktion.ansicht.fragmente[idx]) if t.pos_ in KERN_WORTARTEN and not t.is_stop]
+          concepts.update(lemmata)
       kern = ", ".join(list(concepts)[:3])
-      
-      template = f"Die Resonanz um '{kern}' deutet auf eine {ziel_art.lower()} hin."
-      synthetisches_fragment = template
-      self.fuege_ein(synthetisches_fragment)
-      return synthetisches_fragment
+      return f"Die Resonanz um '{kern}' deutet auf eine {ziel_art.lower()} hin."
+
+  def _kennzahlen(self, statistik: GewebeStatistik) -> dict:
+      """Die Werte des Zustandsberichts; aus der laufenden Statistik O(1) in der Größe des Gewebes."""
+      return {'aktive_fragmente': statistik.aktive_fragmente, 'fragmente_gesamt': len(self._fragmente),
+              'kanten': statistik.kanten, 'dominante_resonanz': statistik.dominante_resonanz(), 'stimmung': statistik.stimmung()}
+
+  def _analysiere_gewebe_zustand(self, resonanzen_struktur, wave_arrival_effects=None, return_data=False):
+      """Analysiert und berichtet den aktuellen Zustand des Gewebes.
+
+      Für die eigene Struktur kommen alle Kennzahlen aus der laufend gepflegten Statistik (O(1) in der Größe
+      des Gewebes); eine fremde Struktur wird vollständig durchgezählt.
+      """
+      if resonanzen_struktur is self._resonanzen_struktur:
+          statistik = self._statistik
+      else:
+          statistik = GewebeStatistik.aus_struktur(resonanzen_struktur, self._fragmente, self._statistik.stimmung_effekte,
+                                                   ALL_RESONANCE_TYPES, self._statistik.stimmung_namen)
+      kennzahlen = self._kennzahlen(statistik)
 
-  def _analysiere_gewebe_zustand(self, resonanzen_struktur, wave_arrival_effects, return_data=False):
-      """Analysiert und berichtet den aktuellen Zustand des Gewebes."""
-      active_frags = [f for f in self._fragmente if f is not None]
-      all_active_res = [res for res_list in resonanzen_struktur.values() for res in res_list.values() if self._fragmente[res.quelle] and self._fragmente[res.ziel]]
-      
-      res_counts = Counter(res.art for res in all_active_res)
-      dominant_res = res_counts.most_common(1)[0][0] if res_counts else "Keine"
-
-      # Stimmung berechnen
-      self._gewebe_stimmung = {'harmonisch': 0.0, 'spannungsreich': 0.0, 'offen': 0.0, 'reflexiv': 0.0}
-      for res in all_active_res:
-          effekt = self._spuer_muster.get(res.art, {}).get('stimmung_effekt', {})
-          for key, val in effekt.items(): self._gewebe_stimmung[key] += val * res.staerke
-      
       if return_data:
-          return {'num_active_fragments': len(active_frags), 'dominant_resonance': dominant_res}
-
-      report = [
-          "\n--- Gewebe Zustandsbericht ---",
-          f"Fragmente: {len(active_frags)} aktiv / {len(self._fragmente)} total",
-          f"Resonanzen (aktiv): {len(all_active_res)}",
-          f"Dominante Resonanz: {dominant_res}",
-          f"Stimmung: " + ", ".join([f"{k}:{v:.2f}" for k, v in self._gewebe_stimmung.items()]),
-          "---"
-      ]
-      return "\n".join(report)
+          return {'num_active_fragments': kennzahlen['aktive_fragmente'], 'dominant_resonance': kennzahlen['dominante_resonanz']}
+      return zustandsbericht(kennzahlen)
 
   def fuehle_zustand_des_gewebes(self):
       """Gibt einen Bericht über den aktuellen Zustand des Gewebes aus."""
-      print(self._analysiere_gewebe_zustand(self._resonanzen_struktur, self._wave_arrival_effects))
\ No newline at end of file
+      print(self._analysiere_gewebe_zustand(self._resonanzen_struktur))
\ No newline at end of file
@@ -0,0 +1,164 @@
+########################################
+# Datei: ./triaden_pool.py
+# Beschreibung: Verteilt die ML-Bewertung des triadischen Durchlaufs zeilenweise auf Worker-Prozesse (Vektoren im Shared Memory).
+########################################
+
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Ein Auftrag ist ein Zeilenband der Paarmatrix: die Zeilen i und, implizit, ihre Spalten j. Ohne Top-k hat jede Zeile
+# alle älteren aktiven Fragmente als Spalten, mit Top-k nur Nachbarzeilen; die übrigen Zeilen haben die Nachbarn als
+# Spalten (wie _triaden_kandidaten). Zurück kommen nur die Kanten mit staerke >= 0.1, in der Reihenfolge der Paare.
+
+_ARBEITER = {}  # Zustand je Worker-Prozess: Modelle und eingeblendete Shared-Memory-Blöcke
+
+
+def _init_arbeiter(art_classifier, staerke_regressor):
+    _ARBEITER['modelle'] = (art_classifier, staerke_regressor)
+    _ARBEITER['speicher'] = {}
+
+
+def _blende_ein(namen: tuple):
+    """Blendet die Shared-Memory-Blöcke des Auftrags ein (je Worker nur einmal) und gibt veraltete frei."""
+    speicher = _ARBEITER['speicher']
+    for name in [name for name in speicher if name not in namen]:
+        try:
+            speicher.pop(name).close()
+        except BufferError:
+            pass  # noch ein Array aus einem früheren Auftrag in Benutzung; der Block wird mit dem Prozess frei
+    for name in namen:
+        if name not in speicher:
+            speicher[name] = shared_memory.SharedMemory(name=name)
+    return [speicher[name] for name in namen]
+
+
+def band_paare(zeilen, idx, nachbarn):
+    """Alle Kandidatenpaare (i, j), i != j, der Zeilen `zeilen`, geordnet nach (i, j)."""
+    if nachbarn is None:
+        paar_i, paar_j = np.repeat(zeilen, len(idx)), np.tile(idx, len(zeilen))
+    else:
+        voll = np.isin(zeilen, nachbarn)
+        volle, teil = zeilen[voll], zeilen[~voll]
+        paar_i = np.concatenate([np.repeat(volle, len(idx)), np.repeat(teil, len(nachbarn))])
+        paar_j = np.concatenate([np.tile(idx, len(volle)), np.tile(nachbarn, len(teil))])
+        ordnung = np.lexsort((paar_j, paar_i))
+        paar_i, paar_j = paar_i[ordnung], paar_j[ordnung]
+    ungleich = paar_i != paar_j
+    return paar_i[ungleich], paar_j[ungleich]
+
+
+def bewerte_band(auftrag: dict):
+    """Bewertet ein Zeilenband mit den ML-Modellen; liefert (i, j, Art-Code, Stärke) der Kanten und die Anzahl geprüfter Paare."""
+    art_classifier, staerke_regressor = _ARBEITER['modelle']
+    block_vektoren, block_hat = _blende_ein((auftrag['vektoren'], auftrag['hat_vektor']))
+    vektoren = np.ndarray(auftrag['form'], dtype=np.float32, buffer=block_vektoren.buf)
+    hat_vektor = np.ndarray(auftrag['form'][:1], dtype=np.bool_, buffer=block_hat.buf)
+    paar_i, paar_j = band_paare(auftrag['zeilen'], auftrag['idx'], auftrag['nachbarn'])
+    ml_paare = hat_vektor[paar_i] & hat_vektor[paar_j]
+    ml_i, ml_j = paar_i[ml_paare], paar_j[ml_paare]
+    vektor_c = vektoren[auftrag['neuer_index']]
+    batch = auftrag['batch']
+    art_codes, staerken = [], []
+    for start in range(0, len(ml_i), batch):
+        a, b = ml_i[start:start + batch], ml_j[start:start + batch]
+        features = np.hstack([vektoren[a], vektoren[b], np.broadcast_to(vektor_c, (len(a), len(vektor_c)))])
+        art_codes.append(art_classifier.predict(features))
+        staerken.append(staerke_regressor.predict(features))
+    if not art_codes:
+        return ml_i, ml_j, np.zeros(0, dtype=np.int64), np.zeros(0), 0
+    art_codes, staerken = np.concatenate(art_codes), np.clip(np.concatenate(staerken), 0.0, 1.0)
+    kante = staerken >= 0.1
+    return ml_i[kante], ml_j[kante], art_codes[kante], staerken[kante], len(ml_i)
+
+
+class TriadenPool:
+    """Prozess-Pool für die ML-Bewertung im gebündelten triadischen Durchlauf.
+
+    Die Fragmentvektoren und has_vector liegen in multiprocessing.shared_memory und werden vor jedem Durchlauf
+    nur um die seit dem letzten Mal hinzugekommenen Fragmente ergänzt. Die Worker bekommen die Modelle einmal beim
+    Start; werden die Modelle des Gewebes ausgetauscht (lade_ml_modelle_neu), startet der Pool neu.
+    """
+
+    def __init__(self, arbeiter: int = None, min_fragmente: int = 256, baender_je_arbeiter: int = 2):
+        self.arbeiter = arbeiter or multiprocessing.cpu_count()
+        self.min_fragmente = min_fragmente
+        self.baender_je_arbeiter = baender_je_arbeiter
+        self._modelle = None
+        self._kapazitaet = 0
+        self._dim = 0
+        self._quelle = None  # MerkmalSpeicher, aus dem zuletzt kopiert wurde (neu nach Laden/Kompaktieren)
+        self._synchron_bis = 0
+        # Executor und Blöcke werden auch dann freigegeben, wenn der Pool ohne schliessen() verworfen wird
+        self._zustand = {'executor': None, 'bloecke': []}
+        weakref.finalize(self, TriadenPool._raeume_ab, self._zustand)
+
+    @staticmethod
+    def _raeume_ab(zustand: dict):
+        if zustand['executor'] is not None:
+            zustand['executor'].shutdown(wait=True, cancel_futures=True)
+        for block in zustand['bloecke']:
+            block.close()
+            block.unlink()
+        zustand['executor'], zustand['bloecke'] = None, []
+
+    def schliessen(self):
+        """Beendet die Worker und gibt den Shared Memory frei."""
+        TriadenPool._raeume_ab(self._zustand)
+        self._modelle, self._quelle, self._synchron_bis, self._kapazitaet = None, None, 0, 0
+
+    def _starte(self, art_classifier, staerke_regressor):
+        if self._zustand['executor'] is not None:
+            self._zustand['executor'].shutdown(wait=True)
+        self._zustand['executor'] = ProcessPoolExecutor(self.arbeiter, mp_context=multiprocessing.get_context('spawn'),
+                                                        initializer=_init_arbeiter, initargs=(art_classifier, staerke_regressor))
+        self._modelle = (art_classifier, staerke_regressor)
+
+    def _synchronisiere(self, merkmale):
+        """Kopiert neue Fragmentvektoren in den Shared Memory; wächst der Speicher, werden neue Blöcke angelegt."""
+        n, dim = len(merkmale), merkmale.vektoren.shape[1]
+        if merkmale is not self._quelle:
+            self._quelle, self._synchron_bis = merkmale, 0
+        if n > self._kapazitaet or dim != self._dim:
+            kapazitaet = max(n, 2 * self._kapazitaet, 64)
+            for block in self._zustand['bloecke']:
+                block.close()
+                block.unlink()
+            self._zustand['bloecke'] = [shared_memory.SharedMemory(create=True, size=max(1, kapazitaet * dim * 4)),
+                                        shared_memory.SharedMemory(create=True, size=kapazitaet)]
+            self._kapazitaet, self._dim, self._synchron_bis = kapazitaet, dim, 0
+        block_vektoren, block_hat = self._zustand['bloecke']
+        vektoren = np.ndarray((self._kapazitaet, dim), dtype=np.float32, buffer=block_vektoren.buf)
+        hat_vektor = np.ndarray((self._kapazitaet,), dtype=np.bool_, buffer=block_hat.buf)
+        vektoren[self._synchron_bis:n] = merkmale.vektoren[self._synchron_bis:n]
+        hat_vektor[self._synchron_bis:n] = merkmale.hat_vektor[self._synchron_bis:n]
+        self._synchron_bis = n
+
+    def _baender(self, idx, nachbarn):
+        """Teilt die Zeilen so in Bänder, dass jedes ungefähr gleich viele Paare enthält."""
+        if nachbarn is None:
+            pro_zeile = np.full(len(idx), len(idx), dtype=np.int64)
+        else:
+            pro_zeile = np.where(np.isin(idx, nachbarn), len(idx), len(nachbarn))
+        anzahl = min(len(idx), self.arbeiter * self.baender_je_arbeiter)
+        grenzen = np.searchsorted(np.cumsum(pro_zeile), np.linspace(0, pro_zeile.sum(), anzahl + 1)[1:-1])
+        return [band for band in np.split(idx, grenzen) if len(band)]
+
+    def bewerte(self, merkmale, art_classifier, staerke_regressor, neuer_index: int, idx, nachbarn, batch: int):
+        """Bewertet alle Kandidatenpaare über die Worker; liefert (i, j, Art-Codes, Stärken) in Paar-Reihenfolge und die Anzahl geprüfter Paare."""
+        if self._zustand['executor'] is None or self._modelle[0] is not art_classifier or self._modelle[1] is not staerke_regressor:
+            self._starte(art_classifier, staerke_regressor)
+        self._synchronisiere(merkmale)
+        block_vektoren, block_hat = self._zustand['bloecke']
+        auftraege = [{'vektoren': block_vektoren.name, 'hat_vektor': block_hat.name, 'form': (self._kapazitaet, self._dim),
+                      'neuer_index': neuer_index, 'zeilen': zeilen, 'idx': idx, 'nachbarn': nachbarn, 'batch': batch}
+                     for zeilen in self._baender(idx, nachbarn)]
+        ergebnisse = list(self._zustand['executor'].map(bewerte_band, auftraege))
+        if not ergebnisse:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.int64), np.zeros(0), 0
+        teile = list(zip(*ergebnisse))
+        return (np.concatenate(teile[0]), np.concatenate(teile[1]), np.concatenate(teile[2]), np.concatenate(teile[3]),
+                int(sum(teile[4])))
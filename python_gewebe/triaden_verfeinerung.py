@@ -0,0 +1,119 @@
+########################################
+# Datei: ./triaden_verfeinerung.py
+# Beschreibung: Aufgeschobene triadische Durchläufe für latenzbegrenztes Einfügen und der Hintergrund-Thread, der sie in Schritten abarbeitet.
+########################################
+
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Ein Auftrag ist der triadische Durchlauf eines eingefügten Fragments, der nicht sofort, sondern in Schritten läuft:
+# erst die ML-Paare zeilenweise (die Zeile i mit allen ihren Spalten j, wie band_paare), nach Priorität der Zeile
+# geordnet, dann als letzter Schritt die heuristischen Regeln. Die Aufträge werden in Einfügereihenfolge abgearbeitet.
+
+
+class TriadenAuftrag:
+    """Aufgeschobener triadischer Durchlauf des Fragments `neuer_index` über die Paare der älteren Fragmente `idx`.
+
+    Merkmale und Text des neuen Fragments werden beim Einreihen festgehalten, damit der Auftrag auch nach dem Löschen
+    des Fragments dasselbe bewirkt wie der sofortige Durchlauf. Mit ml=True laufen die ML-Modelle über die Paare
+    von `ml_idx` (die Fragmente mit Vektor), `nachbarn` sind die Top-k-Nachbarn darunter oder None.
+    """
+
+    def __init__(self, neuer_index: int, merkmale, text: str, idx, ml: bool, ml_idx, nachbarn=None):
+        self.neuer_index = neuer_index
+        self.merkmale = merkmale
+        self.text = text
+        self.idx = idx
+        self.ml_idx = ml_idx
+        self.nachbarn = nachbarn
+        self.ml = ml
+        if nachbarn is None:
+            self._paare_je_zeile = np.full(len(ml_idx), max(0, len(ml_idx) - 1), dtype=np.int64)
+        else:
+            self._paare_je_zeile = np.where(np.isin(ml_idx, nachbarn), len(ml_idx) - 1, len(nachbarn)).astype(np.int64)
+        self.zeilen = None  # ml_idx in Prioritätsreihenfolge, gesetzt durch priorisiere()
+        self._position = 0
+        self.offene_paare = int(self._paare_je_zeile.sum())
+
+    @property
+    def priorisiert(self) -> bool:
+        return self.zeilen is not None
+
+    def priorisiere(self, prioritaet):
+        """Ordnet die Zeilen absteigend nach `prioritaet` (ein Wert je Eintrag von ml_idx); Gleichstand nach Id."""
+        ordnung = np.argsort(-np.asarray(prioritaet, dtype=np.float64), kind='stable')
+        self.zeilen = self.ml_idx[ordnung]
+        self._paare_je_zeile = self._paare_je_zeile[ordnung]
+
+    def naechste_zeilen(self, max_paare: int):
+        """Die nächsten Zeilen mit zusammen höchstens `max_paare` Paaren (mindestens eine) und ihre Paaranzahl."""
+        summe = np.cumsum(self._paare_je_zeile[self._position:])
+        anzahl = max(1, int(np.searchsorted(summe, max_paare, side='right')))
+        zeilen = self.zeilen[self._position:self._position + anzahl]
+        paare = int(summe[len(zeilen) - 1]) if len(zeilen) else 0
+        self._position += len(zeilen)
+        self.offene_paare -= paare
+        return zeilen, paare
+
+    def verwirf_ml(self) -> int:
+        """Verwirft die noch offenen ML-Zeilen (z.B. weil ein späterer Auftrag dieselben Paare überschreibt)."""
+        verworfen = self.offene_paare
+        self._position = len(self._paare_je_zeile)
+        self.offene_paare = 0
+        return verworfen
+
+
+class Verfeinerer:
+    """Thread, der die Warteschlange der TriadenAufträge in Schritten abarbeitet.
+
+    Jeder Schritt ruft `schritt(budget_paare, budget_s)` auf (NeuesTextVerstehen.verfeinere), das unter der
+    Schreibsperre höchstens so viele Paare bzw. so viel Zeit verbraucht und die Zahl der offenen Aufträge zurückgibt.
+    Zwischen zwei Schritten wartet der Thread `pause_ms`, damit wartende Schreiber und Abfragen an die Sperre kommen.
+    Mit hintergrund=False läuft kein Thread; die Schritte ruft dann der Aufrufer selbst auf.
+    """
+
+    def __init__(self, schritt, budget_paare: int = 20000, budget_ms: float = 50.0, pause_ms: float = 5.0, hintergrund: bool = True):
+        self.budget_paare = budget_paare
+        self.budget_ms = budget_ms
+        self.pause_ms = pause_ms
+        self._schritt = schritt
+        self._arbeit = threading.Event()
+        self._stopp = threading.Event()
+        self._thread = None
+        if hintergrund:
+            self._thread = threading.Thread(target=self._laufe, name='gewebe-verfeinerung', daemon=True)
+            self._thread.start()
+
+    def anstossen(self):
+        """Weckt den Thread nach dem Einreihen eines Auftrags."""
+        self._arbeit.set()
+
+    def schliessen(self):
+        """Beendet den Thread nach seinem laufenden Schritt, ohne darauf zu warten (der Aufrufer hält meist die Schreibsperre)."""
+        self._stopp.set()
+        self._arbeit.set()
+
+    def warte(self, timeout: float = None):
+        """Wartet nach schliessen(), bis der Thread beendet ist; nur ohne die Schreibsperre aufrufen."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _laufe(self):
+        while True:
+            self._arbeit.wait()
+            self._arbeit.clear()
+            while not self._stopp.is_set():
+                try:
+                    offen = self._schritt(self.budget_paare, None if self.budget_ms is None else self.budget_ms / 1000)
+                except Exception:
+                    logger.exception("Schritt der triadischen Verfeinerung fehlgeschlagen.")
+                    break
+                if not offen:
+                    break
+                self._stopp.wait(self.pause_ms / 1000)
+            if self._stopp.is_set():
+                return
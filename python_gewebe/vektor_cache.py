@@ -0,0 +1,153 @@
+########################################
+# Datei: ./vektor_cache.py
+# Beschreibung: Persistenter Cache Text-Hash -> spaCy-Vektor (memory-mapped), gemeinsam genutzt von model_trainer und Gewebe.
+########################################
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+try:
+    import fcntl  # Sperre zwischen Prozessen (Trainer und laufendes Gewebe); fehlt unter Windows
+except ImportError:
+    fcntl = None
+
+# Verzeichnislayout:
+#   meta.json        spaCy-Modell und Dimension; Vektoren anderer Modelle sind nicht vergleichbar
+#   vektoren.f32     rohe float32-Zeilen, nur angehängt, per np.memmap gelesen
+#   schluessel.txt   ein Inhalts-Hash je Zeile, in derselben Reihenfolge; wird erst nach den Vektoren geschrieben,
+#                    sodass jeder Schlüssel auf eine vollständige Zeile zeigt
+META_DATEI = 'meta.json'
+VEKTOR_DATEI = 'vektoren.f32'
+SCHLUESSEL_DATEI = 'schluessel.txt'
+SPERR_DATEI = '.sperre'
+
+
+def modell_kennung(nlp) -> str:
+    """Name und Version des spaCy-Modells, z.B. 'de_core_news_lg-3.8.0'."""
+    meta = getattr(nlp, 'meta', {}) or {}
+    return f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+
+
+def inhalts_schluessel(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class VektorCache:
+    """Nur anhängender Cache der Dokumentvektoren je Text, für mehrere Prozesse gleichzeitig nutzbar.
+
+    Gelesen wird über eine memory-mapped Datei; Einträge anderer Prozesse werden mit aktualisiere() sichtbar.
+    Gehört ein vorhandener Cache zu einem anderen Modell oder einer anderen Dimension, gibt es einen ValueError.
+    """
+
+    def __init__(self, verzeichnis: str, modell: str, dim: int):
+        self.verzeichnis = os.path.abspath(verzeichnis)
+        self.modell = modell
+        self.dim = int(dim)
+        os.makedirs(self.verzeichnis, exist_ok=True)
+        meta_pfad = os.path.join(self.verzeichnis, META_DATEI)
+        with self._sperre():
+            if os.path.exists(meta_pfad):
+                with open(meta_pfad, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get('modell') != modell or meta.get('dim') != self.dim:
+                    raise ValueError(f"Vektor-Cache '{self.verzeichnis}' gehört zu {meta.get('modell')} (dim {meta.get('dim')}), "
+                                     f"nicht zu {modell} (dim {self.dim}).")
+            else:
+                with open(meta_pfad, 'w', encoding='utf-8') as f:
+                    json.dump({'modell': modell, 'dim': self.dim}, f)
+        self._zeilen = {}
+        self._vektoren = np.zeros((0, self.dim), dtype=np.float32)
+        self._schluessel_gelesen = 0  # Byte-Position in schluessel.txt
+        self.aktualisiere()
+
+    def _pfad(self, name: str) -> str:
+        return os.path.join(self.verzeichnis, name)
+
+    def _sperre(self):
+        return _DateiSperre(self._pfad(SPERR_DATEI))
+
+    def __len__(self):
+        return len(self._zeilen)
+
+    def __contains__(self, text: str):
+        return inhalts_schluessel(text) in self._zeilen
+
+    def aktualisiere(self):
+        """Liest neu angehängte Schlüssel (auch anderer Prozesse) und blendet die Vektordatei neu ein."""
+        pfad = self._pfad(SCHLUESSEL_DATEI)
+        if not os.path.exists(pfad):
+            return
+        with open(pfad, 'rb') as f:
+            f.seek(self._schluessel_gelesen)
+            for zeile in f:
+                if not zeile.endswith(b'\n'):
+                    break
+                self._schluessel_gelesen += len(zeile)
+                self._zeilen.setdefault(zeile[:-1].decode('ascii'), len(self._zeilen))
+        if len(self._zeilen) > len(self._vektoren):
+            self._vektoren = np.memmap(self._pfad(VEKTOR_DATEI), dtype=np.float32, mode='r', shape=(len(self._zeilen), self.dim))
+
+    def hole(self, text: str):
+        """Der gespeicherte Vektor oder None."""
+        zeile = self._zeilen.get(inhalts_schluessel(text))
+        return None if zeile is None else self._vektoren[zeile]
+
+    def hole_viele(self, texte: list[str]):
+        """Matrix der Vektoren aller Texte und die Positionen der Texte, die (noch) fehlen (ihre Zeilen sind 0)."""
+        zeilen = np.array([self._zeilen.get(inhalts_schluessel(text), -1) for text in texte], dtype=np.int64)
+        fehlend = np.flatnonzero(zeilen < 0)
+        vektoren = np.zeros((len(texte), self.dim), dtype=np.float32)
+        vorhanden = zeilen >= 0
+        vektoren[vorhanden] = self._vektoren[zeilen[vorhanden]]
+        return vektoren, fehlend
+
+    def fuege_hinzu_viele(self, texte: list[str], vektoren):
+        """Hängt die Vektoren aller noch unbekannten Texte an; doppelte und bereits vorhandene werden übersprungen."""
+        vektoren = np.asarray(vektoren, dtype=np.float32).reshape(len(texte), self.dim)
+        with self._sperre():
+            self.aktualisiere()  # ein anderer Prozess könnte dieselben Texte inzwischen angehängt haben
+            neu, schluessel = [], {}
+            for text, vektor in zip(texte, vektoren):
+                s = inhalts_schluessel(text)
+                if s not in self._zeilen and s not in schluessel:
+                    neu.append(vektor)
+                    schluessel[s] = None
+            if not neu:
+                return 0
+            with open(self._pfad(VEKTOR_DATEI), 'ab') as f:
+                # Nur vollständige Zeilen zählen: eine abgebrochene Zeile am Ende wird überschrieben
+                f.truncate(len(self._zeilen) * self.dim * 4)
+                f.write(np.ascontiguousarray(neu, dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._pfad(SCHLUESSEL_DATEI), 'ab') as f:
+                f.truncate(self._schluessel_gelesen)
+                f.write(''.join(s + '\n' for s in schluessel).encode('ascii'))
+            self.aktualisiere()
+        return len(neu)
+
+    def fuege_hinzu(self, text: str, vektor):
+        return self.fuege_hinzu_viele([text], [vektor])
+
+
+class _DateiSperre:
+    """Exklusive Sperre über eine Datei (fcntl.flock); ohne fcntl wird nicht gesperrt."""
+
+    def __init__(self, pfad: str):
+        self.pfad = pfad
+        self._datei = None
+
+    def __enter__(self):
+        self._datei = open(self.pfad, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._datei.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._datei.fileno(), fcntl.LOCK_UN)
+        self._datei.close()
+        self._datei = None
@@ -0,0 +1,238 @@
+########################################
+# Datei: ./vektor_index.py
+# Beschreibung: Austauschbare Vektor-Indizes (exakt und IVF) für die Suche nach ähnlichen Fragmenten, rein in NumPy.
+########################################
+
+import numpy as np
+
+
+class VektorIndex:
+    """Schnittstelle eines Index über Fragmentvektoren (Kosinus-Ähnlichkeit).
+
+    Ids sind die Fragment-Ids des Gewebes. Der Index wird inkrementell über hinzufuegen/entfernen gepflegt
+    und lässt sich mit speichere/lade_vektor_index persistieren.
+    """
+    typ = None
+
+    def __init__(self, dim: int = 0, kapazitaet: int = 64):
+        self.dim = dim
+        self._vektoren = np.zeros((kapazitaet, dim), dtype=np.float32)  # normierte Vektoren je Id
+        self._aktiv = np.zeros(kapazitaet, dtype=bool)
+        self._anzahl = 0
+
+    def __len__(self):
+        return self._anzahl
+
+    def _wachse(self, index: int, dim: int):
+        if dim != self.dim:
+            self.dim = dim
+            self._vektoren = np.zeros((len(self._aktiv), dim), dtype=np.float32)
+        if index >= len(self._aktiv):
+            kapazitaet = max(index + 1, 2 * len(self._aktiv))
+            vektoren = np.zeros((kapazitaet, self.dim), dtype=np.float32)
+            vektoren[:len(self._vektoren)] = self._vektoren
+            aktiv = np.zeros(kapazitaet, dtype=bool)
+            aktiv[:len(self._aktiv)] = self._aktiv
+            self._vektoren, self._aktiv = vektoren, aktiv
+
+    def hinzufuegen(self, index: int, vektor):
+        """Nimmt den Vektor von Fragment `index` auf; Nullvektoren werden ignoriert."""
+        vektor = np.asarray(vektor, dtype=np.float32)
+        norm = float(np.linalg.norm(vektor))
+        if norm == 0:
+            return
+        if self._anzahl == 0 and self.dim != len(vektor):
+            self._wachse(index, len(vektor))
+        self._wachse(index, self.dim)
+        if not self._aktiv[index]:
+            self._anzahl += 1
+        self._vektoren[index] = vektor / norm
+        self._aktiv[index] = True
+
+    def hinzufuegen_viele(self, ids, vektoren):
+        for index, vektor in zip(np.asarray(ids).tolist(), vektoren):
+            self.hinzufuegen(index, vektor)
+
+    def entfernen(self, index: int):
+        if index < len(self._aktiv) and self._aktiv[index]:
+            self._aktiv[index] = False
+            self._vektoren[index] = 0.0
+            self._anzahl -= 1
+
+    def leeren(self):
+        self.__init__(self.dim)
+
+    def _bewerte(self, kandidaten, anfrage, k: int):
+        """Top-k der Kandidaten-Ids nach Ähnlichkeit zur normierten Anfrage, absteigend sortiert."""
+        if len(kandidaten) == 0 or k <= 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        similarity = self._vektoren[kandidaten] @ anfrage
+        if k < len(kandidaten):
+            top = np.argpartition(-similarity, k - 1)[:k]
+            kandidaten, similarity = kandidaten[top], similarity[top]
+        ordnung = np.argsort(-similarity, kind='stable')
+        return kandidaten[ordnung], similarity[ordnung]
+
+    def suche(self, vektor, k: int):
+        """Die (bis zu) k ähnlichsten Ids und ihre Kosinus-Ähnlichkeiten, absteigend sortiert."""
+        raise NotImplementedError
+
+    def _zustand(self) -> dict:
+        return {'vektoren': self._vektoren[:self._belegt()], 'aktiv': self._aktiv[:self._belegt()]}
+
+    def _belegt(self) -> int:
+        aktive = np.flatnonzero(self._aktiv)
+        return int(aktive[-1]) + 1 if len(aktive) else 0
+
+    def speichere(self, pfad: str):
+        """Schreibt den Index als .npz-Datei nach `pfad`."""
+        np.savez(pfad, typ=np.array(self.typ), **self._zustand())
+
+    def _lade_zustand(self, daten):
+        self.dim = daten['vektoren'].shape[1]
+        self._vektoren = np.array(daten['vektoren'], dtype=np.float32)
+        self._aktiv = np.array(daten['aktiv'], dtype=bool)
+        self._anzahl = int(self._aktiv.sum())
+
+
+class BruteForceIndex(VektorIndex):
+    """Exakte Suche: ein Matrix-Vektor-Produkt über alle aktiven Vektoren."""
+    typ = 'brute_force'
+
+    def suche(self, vektor, k: int):
+        vektor = np.asarray(vektor, dtype=np.float32)
+        norm = float(np.linalg.norm(vektor))
+        if norm == 0 or self._anzahl == 0:
+            return self._bewerte(np.zeros(0, dtype=np.intp), None, 0)
+        return self._bewerte(np.flatnonzero(self._aktiv), vektor / norm, k)
+
+
+class IVFIndex(VektorIndex):
+    """Invertierte Listen über k-Means-Zentroide (IVF): durchsucht nur die `nprobe` nächstgelegenen Listen.
+
+    Neue Vektoren werden der nächsten Zentroide zugeordnet; gelöschte fallen beim nächsten Zugriff aus ihrer
+    Liste. Bis `min_training` Vektoren vorhanden sind, wird exakt gesucht. Ist der Index seit dem letzten
+    Training um den Faktor `neu_trainieren_ab` gewachsen, werden die Zentroide neu berechnet.
+    """
+    typ = 'ivf'
+
+    def __init__(self, dim: int = 0, nlist: int = None, nprobe: int = 8, min_training: int = 1024,
+                 neu_trainieren_ab: float = 4.0, iterationen: int = 10, seed: int = 0):
+        super().__init__(dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_training = min_training
+        self.neu_trainieren_ab = neu_trainieren_ab
+        self.iterationen = iterationen
+        self.seed = seed
+        self._zentroide = None
+        self._liste = np.full(len(self._aktiv), -1, dtype=np.int64)  # Liste je Id (-1 = keine)
+        self._listen = []
+        self._trainiert_bei = 0
+
+    def leeren(self):
+        self.__init__(self.dim, self.nlist, self.nprobe, self.min_training, self.neu_trainieren_ab, self.iterationen, self.seed)
+
+    def _wachse(self, index: int, dim: int):
+        super()._wachse(index, dim)
+        if len(self._liste) < len(self._aktiv):
+            liste = np.full(len(self._aktiv), -1, dtype=np.int64)
+            liste[:len(self._liste)] = self._liste
+            self._liste = liste
+
+    def hinzufuegen(self, index: int, vektor):
+        war_aktiv = index < len(self._aktiv) and self._aktiv[index]
+        super().hinzufuegen(index, vektor)
+        if not (index < len(self._aktiv) and self._aktiv[index]):
+            return
+        if self._zentroide is None:
+            if self._anzahl >= self.min_training:
+                self.trainiere()
+            return
+        if self._anzahl >= self.neu_trainieren_ab * self._trainiert_bei:
+            self.trainiere()
+            return
+        if war_aktiv:
+            self._listen[self._liste[index]].discard(index)
+        liste = int(np.argmax(self._zentroide @ self._vektoren[index]))
+        self._liste[index] = liste
+        self._listen[liste].add(index)
+
+    def entfernen(self, index: int):
+        if index < len(self._aktiv) and self._aktiv[index] and self._zentroide is not None:
+            self._listen[self._liste[index]].discard(index)
+            self._liste[index] = -1
+        super().entfernen(index)
+
+    def trainiere(self):
+        """Berechnet die Zentroide per sphärischem k-Means neu und ordnet alle Vektoren zu."""
+        ids = np.flatnonzero(self._aktiv)
+        if len(ids) == 0:
+            return
+        nlist = min(len(ids), self.nlist or max(1, int(np.sqrt(len(ids)))))
+        daten = self._vektoren[ids]
+        rng = np.random.default_rng(self.seed)
+        zentroide = daten[rng.choice(len(ids), nlist, replace=False)].copy()
+        for _ in range(self.iterationen):
+            zuordnung = np.argmax(daten @ zentroide.T, axis=1)
+            summen = np.zeros_like(zentroide)
+            np.add.at(summen, zuordnung, daten)
+            normen = np.linalg.norm(summen, axis=1, keepdims=True)
+            leer = normen[:, 0] == 0
+            zentroide = np.where(leer[:, None], zentroide, summen / np.where(normen == 0, 1, normen))
+        zuordnung = np.argmax(daten @ zentroide.T, axis=1)
+        self._zentroide = zentroide.astype(np.float32)
+        self._liste[:] = -1
+        self._liste[ids] = zuordnung
+        self._listen = [set() for _ in range(nlist)]
+        for index, liste in zip(ids.tolist(), zuordnung.tolist()):
+            self._listen[liste].add(index)
+        self._trainiert_bei = len(ids)
+
+    def suche(self, vektor, k: int, nprobe: int = None):
+        vektor = np.asarray(vektor, dtype=np.float32)
+        norm = float(np.linalg.norm(vektor))
+        if norm == 0 or self._anzahl == 0:
+            return self._bewerte(np.zeros(0, dtype=np.intp), None, 0)
+        anfrage = vektor / norm
+        if self._zentroide is None:
+            return self._bewerte(np.flatnonzero(self._aktiv), anfrage, k)
+        nprobe = min(nprobe or self.nprobe, len(self._zentroide))
+        naechste = np.argpartition(-(self._zentroide @ anfrage), nprobe - 1)[:nprobe]
+        kandidaten = [np.fromiter(self._listen[liste], dtype=np.intp, count=len(self._listen[liste])) for liste in naechste.tolist()]
+        return self._bewerte(np.concatenate(kandidaten), anfrage, k)
+
+    def _zustand(self) -> dict:
+        zustand = super()._zustand()
+        zustand['parameter'] = np.array([self.nlist or 0, self.nprobe, self.min_training, self.iterationen, self.seed, self._trainiert_bei])
+        zustand['neu_trainieren_ab'] = np.array(self.neu_trainieren_ab)
+        if self._zentroide is not None:
+            zustand['zentroide'] = self._zentroide
+            zustand['liste'] = self._liste[:self._belegt()]
+        return zustand
+
+    def _lade_zustand(self, daten):
+        super()._lade_zustand(daten)
+        nlist, self.nprobe, self.min_training, self.iterationen, self.seed, self._trainiert_bei = daten['parameter'].tolist()
+        self.nlist = nlist or None
+        self.neu_trainieren_ab = float(daten['neu_trainieren_ab'])
+        self._liste = np.full(len(self._aktiv), -1, dtype=np.int64)
+        self._zentroide = None
+        self._listen = []
+        if 'zentroide' in daten:
+            self._zentroide = np.array(daten['zentroide'], dtype=np.float32)
+            self._liste[:len(daten['liste'])] = daten['liste']
+            self._listen = [set() for _ in range(len(self._zentroide))]
+            for index in np.flatnonzero(self._aktiv).tolist():
+                self._listen[self._liste[index]].add(index)
+
+
+VEKTOR_INDIZES = {klasse.typ: klasse for klasse in (BruteForceIndex, IVFIndex)}
+
+
+def lade_vektor_index(pfad: str) -> VektorIndex:
+    """Lädt einen mit VektorIndex.speichere geschriebenen Index; der Typ steht in der Datei."""
+    with np.load(pfad) as daten:
+        index = VEKTOR_INDIZES[str(daten['typ'])]()
+        index._lade_zustand(daten)
+    return index
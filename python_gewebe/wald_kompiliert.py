@@ -0,0 +1,142 @@
+########################################
+# Datei: ./wald_kompiliert.py
+# Beschreibung: Übersetzt die trainierten RandomForest-Modelle in NumPy-Arrays und wertet sie ohne sklearn aus.
+########################################
+
+import os
+
+import numpy as np
+
+KOMPILIERT_DATEI = 'triadic_modelle_kompiliert.npz'
+
+
+# --- Laufzeit (nur NumPy) ---
+
+class _KompilierterWald:
+    """Alle Bäume eines Waldes als flache Knoten-Arrays; ausgewertet werden alle Bäume und Zeilen gleichzeitig.
+
+    Blätter zeigen auf sich selbst, sodass nach `tiefe` Schritten jede Zeile in jedem Baum auf einem Blatt steht.
+    Wie in sklearn wird X als float32 mit den float64-Schwellen verglichen (X <= schwelle -> links).
+    """
+
+    def __init__(self, merkmal, schwelle, links, rechts, wurzeln, werte, tiefe: int):
+        self.merkmal = merkmal
+        self.schwelle = schwelle
+        self.links = links
+        self.rechts = rechts
+        self.wurzeln = wurzeln
+        self.werte = werte
+        self.tiefe = int(tiefe)
+
+    def blaetter(self, X):
+        """Blatt-Knoten je (Zeile, Baum)."""
+        X = np.asarray(X, dtype=np.float32)
+        knoten = np.repeat(self.wurzeln[None, :], len(X), axis=0)
+        zeilen = np.arange(len(X))[:, None]
+        for _ in range(self.tiefe):
+            nach_links = X[zeilen, self.merkmal[knoten]] <= self.schwelle[knoten]
+            knoten = np.where(nach_links, self.links[knoten], self.rechts[knoten])
+        return knoten
+
+    def _summe(self, X):
+        # Baum für Baum in derselben Reihenfolge aufsummieren wie sklearn, damit das Ergebnis bitgleich ist
+        knoten = self.blaetter(X)
+        summe = np.zeros((len(knoten),) + self.werte.shape[1:], dtype=np.float64)
+        for baum in range(len(self.wurzeln)):
+            summe += self.werte[knoten[:, baum]]
+        summe /= len(self.wurzeln)
+        return summe
+
+
+class KompilierterKlassifikator(_KompilierterWald):
+    def __init__(self, klassen, **arrays):
+        super().__init__(**arrays)
+        self.classes_ = klassen
+
+    def predict_proba(self, X):
+        return self._summe(X)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+class KompilierterRegressor(_KompilierterWald):
+    def predict(self, X):
+        return self._summe(X)
+
+
+class KompilierteLabels:
+    """Ersatz für den LabelEncoder zur Laufzeit: Codes -> Namen der Resonanz-Arten."""
+
+    def __init__(self, klassen):
+        self.classes_ = klassen
+
+    def inverse_transform(self, codes):
+        return self.classes_[np.asarray(codes, dtype=np.intp)]
+
+
+def lade_kompilierte_modelle(pfad: str = KOMPILIERT_DATEI):
+    """Lädt Klassifikator, Regressor und Labels aus einer mit kompiliere_modelle geschriebenen .npz-Datei."""
+    with np.load(pfad) as daten:
+        def wald(praefix):
+            return {name: daten[f'{praefix}_{name}'] for name in ('merkmal', 'schwelle', 'links', 'rechts', 'wurzeln', 'werte', 'tiefe')}
+        klassifikator = KompilierterKlassifikator(daten['art_klassen'], **wald('art'))
+        regressor = KompilierterRegressor(**wald('staerke'))
+        labels = KompilierteLabels(daten['label_klassen'])
+    return klassifikator, regressor, labels
+
+
+# --- Übersetzung (braucht sklearn, läuft beim Training) ---
+
+def _blatt_werte_klassifikation(baum, version: tuple):
+    """Wahrscheinlichkeiten je Knoten genau so, wie DecisionTreeClassifier.predict_proba sie liefert."""
+    werte = baum.tree_.value[:, 0, :baum.n_classes_].astype(np.float64)
+    if version < (1, 4):
+        # Ältere sklearn-Versionen speichern Anzahlen und normieren erst bei der Vorhersage
+        normierer = werte.sum(axis=1)[:, np.newaxis]
+        normierer[normierer == 0.0] = 1.0
+        werte = werte / normierer
+    return werte
+
+
+def kompiliere_wald(wald, klassifikation: bool) -> dict:
+    """Legt alle Bäume eines sklearn-Waldes in gemeinsame Arrays (Knoten-Ids global über alle Bäume)."""
+    import sklearn
+    version = tuple(int(teil) for teil in sklearn.__version__.split('.')[:2])
+    merkmal, schwelle, links, rechts, wurzeln, werte = [], [], [], [], [], []
+    versatz, tiefe = 0, 0
+    for baum in wald.estimators_:
+        t = baum.tree_
+        knoten = np.arange(t.node_count)
+        blatt = t.children_left == -1
+        wurzeln.append(versatz)
+        merkmal.append(np.where(blatt, 0, t.feature))
+        schwelle.append(np.where(blatt, 0.0, t.threshold))
+        links.append(np.where(blatt, knoten, t.children_left) + versatz)
+        rechts.append(np.where(blatt, knoten, t.children_right) + versatz)
+        werte.append(_blatt_werte_klassifikation(baum, version) if klassifikation else t.value[:, 0, 0].astype(np.float64))
+        versatz += t.node_count
+        tiefe = max(tiefe, t.max_depth)
+    return {'merkmal': np.concatenate(merkmal).astype(np.int32), 'schwelle': np.concatenate(schwelle).astype(np.float64),
+            'links': np.concatenate(links).astype(np.int32), 'rechts': np.concatenate(rechts).astype(np.int32),
+            'wurzeln': np.array(wurzeln, dtype=np.int32), 'werte': np.concatenate(werte), 'tiefe': np.array(tiefe)}
+
+
+def kompiliere_modelle(art_classifier, staerke_regressor, label_encoder, pfad: str = KOMPILIERT_DATEI):
+    """Schreibt beide Wälder und die Klassennamen als .npz, die die Laufzeit ohne sklearn laden kann."""
+    arrays = {'art_klassen': np.asarray(art_classifier.classes_), 'label_klassen': np.asarray(label_encoder.classes_)}
+    arrays.update({f'art_{name}': wert for name, wert in kompiliere_wald(art_classifier, True).items()})
+    arrays.update({f'staerke_{name}': wert for name, wert in kompiliere_wald(staerke_regressor, False).items()})
+    with open(pfad, 'wb') as f:  # Dateiobjekt: np.savez hängt dann keine Endung an (atomares Ersetzen über .tmp)
+        np.savez(f, **arrays)
+
+
+if __name__ == "__main__":
+    # Übersetzt bereits trainierte .joblib-Modelle, ohne neu zu trainieren
+    import joblib
+    from model_trainer import ART_CLASSIFIER_FILE, STAERKE_REGRESSOR_FILE, LABEL_ENCODER_FILE, KOMPILIERT_FILE
+    if not all(os.path.exists(p) for p in [ART_CLASSIFIER_FILE, STAERKE_REGRESSOR_FILE, LABEL_ENCODER_FILE]):
+        print("Keine trainierten Modelle gefunden. Bitte zuerst model_trainer.py ausführen.")
+    else:
+        kompiliere_modelle(joblib.load(ART_CLASSIFIER_FILE), joblib.load(STAERKE_REGRESSOR_FILE), joblib.load(LABEL_ENCODER_FILE), KOMPILIERT_FILE)
+        print(f"Kompilierte Modelle gespeichert: {KOMPILIERT_FILE}")
@@ -0,0 +1,279 @@
+########################################
+# Datei: ./wellen_matrix.py
+# Beschreibung: Ausbreitung von Resonanzwellen über eine CSR-Adjazenzmatrix statt über einzelne Wellen-Objekte.
+########################################
+
+import numpy as np
+
+# Richtgröße eines Blocks gemeinsam ausgebreiteter Impulse: Einträge des Zustands (Impulse x Knoten) plus Ankünfte des ersten Hops
+WELLEN_BLOCK = 1 << 18
+
+
+class ResonanzAdjazenz:
+    """CSR-Matrix der aktiven Resonanzen: Zeile = Quelle, Spalte = Ziel, Wert = staerke, dazu die Art je Kante."""
+
+    def __init__(self, indptr, ziele, staerke, arten, art_namen: list[str]):
+        self.indptr = indptr
+        self.ziele = ziele
+        self.staerke = staerke
+        self.arten = arten
+        self.art_namen = art_namen
+        self.anzahl_knoten = len(indptr) - 1
+        self.quelle = np.repeat(np.arange(self.anzahl_knoten, dtype=np.int64), np.diff(indptr))
+
+    @classmethod
+    def aus_kanten(cls, quelle, ziele, staerke, arten, anzahl_knoten: int, art_namen: list[str]) -> 'ResonanzAdjazenz':
+        """Baut die CSR-Matrix aus Kantenlisten (Art als Code in art_namen)."""
+        quelle = np.asarray(quelle, dtype=np.int64)
+        ordnung = np.argsort(quelle, kind='stable')
+        indptr = np.zeros(anzahl_knoten + 1, dtype=np.int64)
+        np.cumsum(np.bincount(quelle, minlength=anzahl_knoten), out=indptr[1:])
+        return cls(indptr, np.asarray(ziele, dtype=np.int64)[ordnung], np.asarray(staerke, dtype=np.float64)[ordnung],
+                   np.asarray(arten, dtype=np.int64)[ordnung], art_namen)
+
+    @classmethod
+    def aus_struktur(cls, struktur: dict, fragmente: list, art_namen: list[str]) -> 'ResonanzAdjazenz':
+        """Baut die CSR-Matrix aus der Dict-of-Dicts-Struktur; Kanten von oder zu gelöschten Fragmenten fallen weg."""
+        art_namen = list(art_namen)
+        art_codes = {art: code for code, art in enumerate(art_namen)}
+        quelle, ziele, staerke, arten = [], [], [], []
+        for q, ausgehende in struktur.items():
+            if fragmente[q] is None: continue
+            for z, res in ausgehende.items():
+                if fragmente[z] is None: continue
+                if res.art not in art_codes:
+                    art_codes[res.art] = len(art_namen)
+                    art_namen.append(res.art)
+                quelle.append(q)
+                ziele.append(z)
+                staerke.append(res.staerke)
+                arten.append(art_codes[res.art])
+        return cls.aus_kanten(quelle, ziele, staerke, arten, len(fragmente), art_namen)
+
+    @classmethod
+    def aus_speicher(cls, speicher, fragmente: list) -> 'ResonanzAdjazenz':
+        """Baut die CSR-Matrix direkt aus den Spalten eines KantenSpeichers (gleiche Kanten und Reihenfolge wie aus_struktur)."""
+        aktiv = np.array([fragment is not None for fragment in fragmente], dtype=bool)
+        spalten = speicher.spalten(nur_knoten=aktiv)
+        return cls.aus_kanten(spalten['quelle'], spalten['ziel'], spalten['staerke'], spalten['art'], len(fragmente),
+                              list(speicher.art_namen))
+
+    def kanten_von(self, knoten):
+        """Ids aller ausgehenden Kanten der gegebenen Knoten (zusammenhängende CSR-Zeilen)."""
+        starts, enden = self.indptr[knoten], self.indptr[np.asarray(knoten) + 1]
+        laengen = enden - starts
+        if laengen.sum() == 0:
+            return np.zeros(0, dtype=np.int64)
+        versatz = np.repeat(starts - (np.cumsum(laengen) - laengen), laengen)
+        return np.arange(laengen.sum(), dtype=np.int64) + versatz
+
+
+class WellenStufe:
+    """Alle Ankünfte eines Hops: Zielknoten, Art, Stärke, die gelaufene Kante und die Kante des Vorgänger-Hops."""
+
+    def __init__(self, knoten, arten, staerke, kanten, eltern):
+        self.knoten = knoten
+        self.arten = arten
+        self.staerke = staerke
+        self.kanten = kanten
+        self.eltern = eltern
+        self._kanten_ordnung = np.argsort(kanten, kind='stable')
+
+    def position_der_kante(self, kante: int) -> int:
+        i = np.searchsorted(self.kanten, kante, sorter=self._kanten_ordnung)
+        return int(self._kanten_ordnung[i])
+
+
+class WellenErgebnis:
+    """Ankünfte einer Impuls-Ausbreitung, aggregiert je (Knoten, Art) auf die stärkste Welle.
+
+    Die Aggregation (knoten, arten, staerke) wird erst beim ersten Zugriff berechnet; fragmente_mit kommt ohne sie aus.
+    """
+
+    def __init__(self, adjazenz: ResonanzAdjazenz, stufen: list[WellenStufe]):
+        self.adjazenz = adjazenz
+        self.stufen = stufen
+        self._aggregiert = None
+
+    def _aggregiere(self) -> tuple:
+        if self._aggregiert is None:
+            stufen = self.stufen
+            knoten = np.concatenate([s.knoten for s in stufen])
+            arten = np.concatenate([s.arten for s in stufen])
+            staerke = np.concatenate([s.staerke for s in stufen])
+            herkunft = np.concatenate([np.stack([np.full(len(s.knoten), h), np.arange(len(s.knoten))], axis=1)
+                                       for h, s in enumerate(stufen)]) if stufen else np.zeros((0, 2), dtype=np.int64)
+            # Je (Knoten, Art) die stärkste Ankunft; bei Gleichstand gewinnt der frühere Hop
+            ordnung = np.lexsort((herkunft[:, 0], -staerke, arten, knoten))
+            knoten, arten = knoten[ordnung], arten[ordnung]
+            erste = np.ones(len(ordnung), dtype=bool)
+            erste[1:] = (knoten[1:] != knoten[:-1]) | (arten[1:] != arten[:-1])
+            self._aggregiert = (knoten[erste], arten[erste], staerke[ordnung][erste], herkunft[ordnung][erste])
+        return self._aggregiert
+
+    @property
+    def knoten(self):
+        return self._aggregiere()[0]
+
+    @property
+    def arten(self):
+        return self._aggregiere()[1]
+
+    @property
+    def staerke(self):
+        return self._aggregiere()[2]
+
+    def __len__(self):
+        return len(self.knoten)
+
+    def art_codes(self, arten: list[str]) -> list[int]:
+        return [code for code, art in enumerate(self.adjazenz.art_namen) if art in arten]
+
+    def fragmente_mit(self, arten: list[str], mindest_staerke: float):
+        """Sortierte Knoten, an denen mindestens eine Welle einer der Arten mit staerke >= mindest_staerke ankommt."""
+        # Die stärkste Welle je (Knoten, Art) erreicht die Schwelle genau dann, wenn irgendeine Ankunft sie erreicht
+        codes = self.art_codes(arten)
+        teile = [s.knoten[np.isin(s.arten, codes) & (s.staerke >= mindest_staerke)] for s in self.stufen]
+        return np.unique(np.concatenate(teile)) if teile else np.zeros(0, dtype=np.int64)
+
+    def pfad(self, stufe: int, position: int) -> list[int]:
+        """Rekonstruiert den Pfad [-1, Startknoten, ..., Zielknoten] einer Ankunft über die Rückverweise."""
+        s = self.stufen[stufe]
+        pfad = [int(s.knoten[position])]
+        kante, eltern = s.kanten[position], s.eltern[position]
+        for h in range(stufe, 0, -1):
+            pfad.append(int(self.adjazenz.quelle[kante]))
+            if h > 1:
+                vorher = self.stufen[h - 1]
+                position = vorher.position_der_kante(eltern)
+                kante, eltern = vorher.kanten[position], vorher.eltern[position]
+        pfad.append(-1)
+        return pfad[::-1]
+
+    def top_k_pfade(self, knoten: int, k: int = 3) -> list[tuple]:
+        """Die k stärksten Ankünfte an einem Knoten über alle Hops und Arten als (art, staerke, pfad)."""
+        kandidaten = []
+        for h, s in enumerate(self.stufen):
+            for p in np.flatnonzero(s.knoten == knoten).tolist():
+                kandidaten.append((float(s.staerke[p]), h, p))
+        kandidaten.sort(key=lambda x: (-x[0], x[1]))
+        return [(self.adjazenz.art_namen[self.stufen[h].arten[p]], staerke, self.pfad(h, p)) for staerke, h, p in kandidaten[:k]]
+
+    def als_wellen(self, wellen_klasse) -> dict:
+        """Eine Welle je (Knoten, Art) mit der stärksten Ankunft und ihrem Pfad, im Format von _wave_arrival_effects."""
+        ankuenfte = {}
+        knoten, arten, staerke, herkunft = self._aggregiere()
+        for knoten, art, staerke, (h, p) in zip(knoten.tolist(), arten.tolist(), staerke.tolist(), herkunft.tolist()):
+            ankuenfte.setdefault(knoten, []).append(wellen_klasse(-1, self.adjazenz.art_namen[art], staerke, self.pfad(h, p)))
+        return ankuenfte
+
+
+def propagiere_wellen(adjazenz: ResonanzAdjazenz, start_knoten, start_arten, start_staerke,
+                      hops: int = 3, daempfung: float = 0.7, schwelle: float = 0.05) -> WellenErgebnis:
+    """Breitet Impulswellen als dünnbesetztes Matrix-Vektor-Produkt im (max, x)-Semiring aus.
+
+    Wie die pfadbasierte Ausbreitung: Stufe 0 sind die Startwellen, jede weitere Stufe läuft eine Kante mit
+    staerke_neu = staerke * kante * daempfung und verwirft Wellen mit staerke_neu <= schwelle; eine Welle darf
+    nicht direkt zum vorherigen Knoten zurücklaufen. Statt jede Welle einzeln zu führen, wird je Knoten nur die
+    stärkste und die zweitstärkste Ankunft (von verschiedenen Vorgängern) weitergegeben. Das genügt, weil die
+    Stärke multiplikativ ist: die stärkste erlaubte Welle über eine Kante stammt immer von einer der beiden.
+    Die maximale Ankunftsstärke je (Knoten, Art, Hop) ist damit exakt dieselbe.
+    """
+    return propagiere_wellen_viele(adjazenz, [start_knoten], [start_arten], [start_staerke], hops, daempfung, schwelle)[0]
+
+
+def propagiere_wellen_viele(adjazenz: ResonanzAdjazenz, start_knoten: list, start_arten: list, start_staerke: list,
+                            hops: int = 3, daempfung: float = 0.7, schwelle: float = 0.05) -> list[WellenErgebnis]:
+    """Breitet die Wellen vieler Impulse gemeinsam aus (Matrix mal Multi-Vektor); ein WellenErgebnis je Impuls.
+
+    Die Listen enthalten je Impuls die Startwellen wie bei propagiere_wellen. Innerhalb eines Blocks läuft jeder
+    Hop für alle Impulse in einem Schritt, und die Stufen jedes Impulses sind exakt dieselben wie bei seiner
+    einzelnen Ausbreitung. Ein Block fasst so viele Impulse, dass Zustand und Ankünfte des ersten Hops zusammen etwa
+    WELLEN_BLOCK Einträge haben (mindestens einen Impuls); größere Blöcke passen nicht mehr in den Cache und werden langsamer.
+    """
+    grad = np.diff(adjazenz.indptr)
+    ergebnisse, anfang, aufwand = [], 0, 0
+    for ende, knoten in enumerate(start_knoten):
+        aufwand += adjazenz.anzahl_knoten + int(grad[np.unique(np.asarray(knoten, dtype=np.int64))].sum())
+        if aufwand >= WELLEN_BLOCK or ende == len(start_knoten) - 1:
+            teil = slice(anfang, ende + 1)
+            ergebnisse.extend(_propagiere_block(adjazenz, start_knoten[teil], start_arten[teil], start_staerke[teil], hops, daempfung, schwelle))
+            anfang, aufwand = ende + 1, 0
+    return ergebnisse
+
+
+def _propagiere_block(adjazenz: ResonanzAdjazenz, start_knoten: list, start_arten: list, start_staerke: list,
+                      hops: int, daempfung: float, schwelle: float) -> list[WellenErgebnis]:
+    """Die Ausbreitung eines Blocks von Impulsen; der Zustand je (Impuls, Knoten) liegt unter dem Schlüssel impuls * n + knoten."""
+    n = adjazenz.anzahl_knoten
+    anzahl = len(start_knoten)
+    impuls = np.repeat(np.arange(anzahl, dtype=np.int64), [len(k) for k in start_knoten])
+    verbinde = lambda teile, dtype: np.concatenate([np.asarray(t, dtype=dtype) for t in teile]) if anzahl else np.zeros(0, dtype=dtype)
+    knoten, staerke = verbinde(start_knoten, np.int64), verbinde(start_staerke, np.float64)
+    keine = np.full(len(knoten), -1, dtype=np.int64)
+    # Je Hop: welche Impulse ihn noch laufen, Impuls je Ankunft und die Spalten der WellenStufe
+    roh = [(np.ones(anzahl, dtype=bool), impuls, knoten, verbinde(start_arten, np.int64), staerke, keine, keine)]
+
+    groesse = anzahl * n
+    beste = np.zeros(groesse)
+    beste_quelle = np.full(groesse, -2, dtype=np.int64)  # Vorgänger der stärksten Ankunft (-1 = Impuls)
+    beste_kante = np.full(groesse, -1, dtype=np.int64)
+    zweite = np.zeros(groesse)
+    zweite_kante = np.full(groesse, -1, dtype=np.int64)
+    schluessel = impuls * n + knoten
+    np.maximum.at(beste, schluessel, staerke)
+    beste_quelle[schluessel] = -1
+    front = np.unique(schluessel)
+
+    for hop in range(1, hops):
+        if len(front) == 0:
+            break
+        laeuft = np.bincount(front // n, minlength=anzahl) > 0
+        front_knoten = front % n
+        kanten = adjazenz.kanten_von(front_knoten)
+        herkunft = np.repeat(front, adjazenz.indptr[front_knoten + 1] - adjazenz.indptr[front_knoten])
+        u, v = adjazenz.quelle[kanten], adjazenz.ziele[kanten]
+        nicht_zurueck = beste_quelle[herkunft] != v
+        staerke = np.where(nicht_zurueck, beste[herkunft], zweite[herkunft]) * adjazenz.staerke[kanten] * daempfung
+        eltern = np.where(nicht_zurueck, beste_kante[herkunft], zweite_kante[herkunft])
+        ok = staerke > schwelle
+        kanten, herkunft, u, v, staerke, eltern = kanten[ok], herkunft[ok], u[ok], v[ok], staerke[ok], eltern[ok]
+        roh.append((laeuft, herkunft // n, v, adjazenz.arten[kanten], staerke, kanten, eltern))
+        if hop == hops - 1:
+            break  # nach dem letzten Hop wird der Zustand nicht mehr gebraucht
+
+        # Neuer Zustand: je Zielknoten stärkste und zweitstärkste Ankunft (eine Kante je Vorgänger); bei
+        # Gleichstand gilt die frühere Ankunft als stärker, wie bei einer stabilen Sortierung nach Stärke
+        beste[front] = 0.0
+        zweite[front] = 0.0
+        beste_quelle[front] = -2
+        schluessel = herkunft - u + v
+        position = np.arange(len(staerke))
+        np.maximum.at(beste, schluessel, staerke)
+        erste = np.full(groesse, len(staerke), dtype=np.int64)
+        kandidat = staerke == beste[schluessel]
+        np.minimum.at(erste, schluessel[kandidat], position[kandidat])
+        belegt = np.zeros(groesse, dtype=bool)
+        belegt[schluessel] = True
+        front = np.flatnonzero(belegt)
+        p = erste[front]
+        beste_quelle[front] = u[p]
+        beste_kante[front] = kanten[p]
+
+        rest = np.ones(len(staerke), dtype=bool)
+        rest[p] = False
+        np.maximum.at(zweite, schluessel[rest], staerke[rest])
+        kandidat = rest & (staerke == zweite[schluessel])
+        erste[front] = len(staerke)
+        np.minimum.at(erste, schluessel[kandidat], position[kandidat])
+        mit_zweiter = front[erste[front] < len(staerke)]
+        zweite_kante[mit_zweiter] = kanten[erste[mit_zweiter]]
+
+    # Die Ankünfte jedes Hops liegen nach Impuls geordnet und werden in zusammenhängende Stücke geteilt
+    stufen = [[] for _ in range(anzahl)]
+    for laeuft, impuls, *spalten in roh:
+        grenzen = np.searchsorted(impuls, np.arange(anzahl + 1))
+        for b in np.flatnonzero(laeuft).tolist():
+            von, bis = grenzen[b], grenzen[b + 1]
+            stufen[b].append(WellenStufe(*(spalte[von:bis] for spalte in spalten)))
+    return [WellenErgebnis(adjazenz, s) for s in stufen]